@@ -1,7 +1,9 @@
-from flask import Flask
+from flask import Flask, make_response
 from flask_restful import Api
-from views.job import JobView, JobCreateView, JobRunView
+from views.job import JobView, JobCreateView, JobRunView, JobPlanView, \
+    JobOutputView, JobRunHistoryView, RunSchedulerView
 
+from libs.resource_access import get_json_codec
 from utils.job_database import JobDatabaseEngine
 
 
@@ -16,24 +18,43 @@ def __set_app():
     return app, api
 
 
+def __set_representations(api):
+    """
+    API 응답도 Job Storage와 동일한 JsonCodec으로 직렬화 한다.
+    """
+    @api.representation('application/json')
+    def output_json(data, code, headers=None):
+        res = make_response(get_json_codec().dumps(data), code)
+        res.headers.extend(headers or {})
+        res.headers['Content-Type'] = 'application/json'
+        return res
+
+
 def __set_uris(api):
     api.add_resource(JobView, '/api/jobs/<int:job_id>')
     api.add_resource(JobCreateView, '/api/jobs')
     api.add_resource(JobRunView, '/api/jobs/<int:job_id>/run')
+    api.add_resource(JobPlanView, '/api/jobs/<int:job_id>/plan')
+    api.add_resource(JobOutputView, '/api/jobs/<int:job_id>/output')
+    api.add_resource(JobRunHistoryView, '/api/jobs/<int:job_id>/runs')
+    api.add_resource(RunSchedulerView, '/api/scheduler')
 
 
 def get_app():
     # Set app
     generate_jobdatabase_engine()
     app, api = __set_app()
+    __set_representations(api)
     __set_uris(api)
 
     return app, api
 
 
 def main():
+    """
+    개발용 서버 실행, 운영 환경에서는 serve.py를 사용한다.
+    """
     app, api = get_app()
-    generate_jobdatabase_engine()
     app.run(debug=True)
 
 
@@ -0,0 +1,40 @@
+from libs.async_api import AsyncApi
+from views.job_async import AsyncJobView, AsyncJobCreateView, \
+    AsyncJobRunView, AsyncJobPlanView, AsyncJobOutputView, \
+    AsyncJobRunHistoryView, AsyncRunSchedulerView, shutdown_executors
+
+from api import generate_jobdatabase_engine
+
+
+def __set_uris(api):
+    api.add_resource(AsyncJobView, '/api/jobs/<int:job_id>')
+    api.add_resource(AsyncJobCreateView, '/api/jobs')
+    api.add_resource(AsyncJobRunView, '/api/jobs/<int:job_id>/run')
+    api.add_resource(AsyncJobPlanView, '/api/jobs/<int:job_id>/plan')
+    api.add_resource(AsyncJobOutputView, '/api/jobs/<int:job_id>/output')
+    api.add_resource(AsyncJobRunHistoryView, '/api/jobs/<int:job_id>/runs')
+    api.add_resource(AsyncRunSchedulerView, '/api/scheduler')
+
+
+def get_asgi_app():
+    """
+    api.get_app()과 동일한 uri를 제공하는 ASGI Application
+    """
+    generate_jobdatabase_engine()
+    api = AsyncApi()
+    api.on_shutdown(shutdown_executors)
+    __set_uris(api)
+
+    return api
+
+
+def main():
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("ASGI 서버(uvicorn)가 필요합니다: pip install uvicorn")
+    uvicorn.run(get_asgi_app(), host='127.0.0.1', port=5000)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+aggregate Task 벤치마크
+
+read -> filter -> aggregate -> write Job을
+read Task와 합치지 않고 실행한 경우와 합쳐서(조각 단위로 읽으면서 집계) 실행한 경우의
+실행 시간과 최대 메모리 사용량을 비교한다.
+입력 파일은 임시 디렉토리에 생성한다.
+
+실행: python -m benchmark.bench_aggregate [--rows 2000000 --groups 1000]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from utils.job_database.task import task_space
+from utils.job_database.task.task_worker import TaskWorker
+
+
+def generate_job(directory: str, rows: int, groups: int):
+    rng = np.random.default_rng(0)
+    pd.DataFrame({
+        'key': rng.integers(0, groups, rows),
+        'kind': rng.choice(['x', 'y', 'z'], rows),
+        'value': rng.random(rows),
+    }).to_csv(os.path.join(directory, 'in.csv'), index=False)
+    return {
+        'task_list': {'R': ['F'], 'F': ['A'], 'A': ['W'], 'W': []},
+        'property': {
+            'R': {'task_name': 'read', 'filename': 'in.csv', 'sep': ','},
+            'F': {'task_name': 'filter', 'expression': "kind != 'z'"},
+            'A': {'task_name': 'aggregate', 'group_by': ['key', 'kind'],
+                  'aggregations': {'value': ['sum', 'mean', 'max']}},
+            'W': {'task_name': 'write', 'filename': 'out.csv', 'sep': ','},
+        }
+    }
+
+
+def measure(job, pushdown: bool):
+    tracemalloc.start()
+    start = time.perf_counter()
+    TaskWorker(job, pushdown=pushdown)()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / (1 << 20)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--groups', type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        task_space.BASE_DIR = tmp
+        job = generate_job(tmp, args.rows, args.groups)
+        for pushdown in (False, True):
+            elapsed, peak = measure(job, pushdown)
+            print(f'fused={str(pushdown):<5}  {elapsed:6.2f}s  '
+                  f'peak {peak:8.1f}MB')
+
+
+if __name__ == '__main__':
+    main()
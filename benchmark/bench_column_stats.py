@@ -0,0 +1,74 @@
+"""
+column 통계 data skipping 벤치마크
+
+정렬된 id column을 가진 결과 파일에서 id 범위 조건으로 일부 행만 읽을 때
+column 통계로 row group을 건너뛴 경우와 파일 전체를 조각 단위로 읽으면서 거른 경우를 비교한다.
+입력 파일은 임시 디렉토리에 생성한다.
+
+실행: python -m benchmark.bench_column_stats [--rows 2000000 --selectivity 0.01]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.job_database.column_stats import load_column_stats, \
+    select_row_groups
+from utils.job_database.task.task_output import write_csv_with_index, \
+    read_row_groups
+from utils.job_database.task.task_reader import read_csv_parallel
+
+
+def measure(func, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--selectivity', type=float, default=0.01)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    dataframe = pd.DataFrame({
+        'id': np.arange(args.rows),
+        'value': rng.random(args.rows),
+        'kind': rng.choice(['alpha', 'beta', 'gamma'], args.rows),
+    })
+    predicate = f'id >= {int(args.rows * (1 - args.selectivity))}'
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'out.csv')
+        start = time.perf_counter()
+        write_csv_with_index(dataframe, path, ',')
+        plain = time.perf_counter() - start
+        start = time.perf_counter()
+        write_csv_with_index(dataframe, path, ',', column_stats=True)
+        print(f'write            {plain:8.3f}s  '
+              f'with stats {time.perf_counter() - start:8.3f}s')
+
+        stats = load_column_stats(path)
+        groups = select_row_groups(stats, [predicate])
+        print(f'row groups       {len(groups)}/{len(stats["row_groups"])}')
+
+        def __skip():
+            return read_row_groups(path, ',', stats, groups,
+                                   predicate=predicate)
+
+        def __scan():
+            return read_csv_parallel(path, ',', 1, None, None, predicate)
+
+        assert __skip().equals(__scan())
+        print(f'stats skip       {measure(__skip) * 1000:8.1f}ms')
+        print(f'full scan        {measure(__scan, repeat=1) * 1000:8.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
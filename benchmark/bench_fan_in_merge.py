@@ -0,0 +1,73 @@
+"""
+Fan-in 병합 벤치마크
+
+같은 key column을 가진 여러 데이터 프레임이 한 Task로 모일 때
+merge_dataframes를 차례대로 호출하는 방식과 DataFrameJoiner를 비교한다.
+
+실행: python -m benchmark.bench_fan_in_merge [--rows 1000000 --inputs 8]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.job_database.task.task_algorithms import merge_dataframes, \
+    DataFrameJoiner
+
+
+def generate_frames(rows: int, inputs: int, keys: int, is_sorted: bool):
+    rng = np.random.default_rng(0)
+    frames = []
+    for i in range(inputs):
+        ids = rng.choice(rows * 2, rows, replace=False)
+        if is_sorted:
+            ids = np.sort(ids)
+        frame = pd.DataFrame({'id': ids, f'v{i}': rng.random(rows)})
+        if keys > 1:
+            frame.insert(1, 'group', ids % 7)
+        frames.append(frame)
+    return frames
+
+
+def merge_one_by_one(frames):
+    merged = pd.DataFrame()
+    for frame in frames:
+        merged, _ = merge_dataframes(merged, frame)
+    return merged
+
+
+def join_all(frames):
+    joiner = DataFrameJoiner()
+    for frame in frames:
+        joiner.join(frame)
+    return joiner.result()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--inputs', type=int, default=8)
+    args = parser.parse_args()
+
+    for keys in (1, 2):
+        for is_sorted in (False, True):
+            frames = generate_frames(args.rows, args.inputs, keys, is_sorted)
+
+            start = time.perf_counter()
+            answer = merge_one_by_one(frames)
+            merge_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            output = join_all(frames)
+            join_time = time.perf_counter() - start
+
+            assert output.equals(answer)
+            print(f'keys={keys} sorted={str(is_sorted):<5} '
+                  f'merge_dataframes {merge_time:6.2f}s  '
+                  f'DataFrameJoiner {join_time:6.2f}s  '
+                  f'x{merge_time / join_time:.1f}')
+
+
+if __name__ == '__main__':
+    main()
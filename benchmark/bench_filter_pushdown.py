@@ -0,0 +1,69 @@
+"""
+filter pushdown 벤치마크
+
+read -> filter 가지 두 개가 하나로 모이는 Job을
+pushdown 없이 실행한 시간과 pushdown을 적용해서 실행한 시간을 비교한다.
+입력 파일은 임시 디렉토리에 생성한다.
+
+실행: python -m benchmark.bench_filter_pushdown [--rows 1000000 --selectivity 0.05]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from utils.job_database.task import task_space
+from utils.job_database.task.task_worker import TaskWorker
+
+
+def generate_job(directory: str, rows: int, selectivity: float):
+    rng = np.random.default_rng(0)
+    task_list = {'R1': ['F1'], 'F1': ['W'], 'R2': ['F2'], 'F2': ['W'],
+                 'W': []}
+    properties = {
+        'W': {'task_name': 'write', 'filename': 'out.csv', 'sep': ','},
+    }
+    for i in (1, 2):
+        pd.DataFrame({
+            'key': rng.integers(0, rows, rows),
+            f'value{i}': rng.random(rows),
+            f'label{i}': rng.choice(['x', 'y', 'z'], rows),
+        }).to_csv(os.path.join(directory, f'in{i}.csv'), index=False)
+        properties[f'R{i}'] = {'task_name': 'read',
+                               'filename': f'in{i}.csv', 'sep': ','}
+        properties[f'F{i}'] = {'task_name': 'filter',
+                               'expression': f'value{i} < {selectivity}'}
+    return {'task_list': task_list, 'property': properties}
+
+
+def measure(job, pushdown: bool):
+    tracemalloc.start()
+    start = time.perf_counter()
+    TaskWorker(job, pushdown=pushdown)()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / (1 << 20)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--selectivity', type=float, default=0.05)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        task_space.BASE_DIR = tmp
+        job = generate_job(tmp, args.rows, args.selectivity)
+        for pushdown in (False, True):
+            elapsed, peak = measure(job, pushdown)
+            print(f'pushdown={str(pushdown):<5}  {elapsed:6.2f}s  '
+                  f'peak {peak:8.1f}MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+API Cold-start 벤치마크
+
+python -X importtime 으로 모듈을 불러오는 시간과 메모리(max RSS)를 측정한다.
+'import api'(CRUD만 처리하는 worker)와 Job 실행 모듈까지 불러오는 경우를 비교한다.
+
+실행: python -m benchmark.bench_import_time [--repeat 5]
+"""
+import argparse
+import re
+import subprocess
+import sys
+
+TARGETS = {
+    'api': 'import api',
+    'api + task': 'import api; import utils.job_database.task',
+}
+
+IMPORTTIME_LINE = re.compile(r'import time:\s*(\d+) \|\s*(\d+) \|(\s*)(\S+)')
+
+
+def run_importtime(statement: str):
+    """
+    :return: (전체 import 시간(us), 모듈별 누적 시간, max RSS(KB), pandas 로딩 여부)
+    """
+    code = (f'{statement}; import resource, sys; '
+            f'print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, '
+            f"'pandas' in sys.modules)")
+    res = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                         capture_output=True, text=True, check=True)
+    modules = {}
+    for line in res.stderr.splitlines():
+        m = IMPORTTIME_LINE.match(line)
+        if m:
+            modules[m.group(4)] = int(m.group(2))
+    total = sum(modules[name] for name in modules
+                if name in statement.replace(';', ' ').split())
+    rss, has_pandas = res.stdout.split()
+    return total, modules, int(rss), has_pandas == 'True'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=5)
+    args = parser.parse_args()
+
+    for name, statement in TARGETS.items():
+        results = [run_importtime(statement) for _ in range(args.repeat)]
+        best = min(results, key=lambda r: r[0])
+        total, modules, rss, has_pandas = best
+        print(f'[{name}] {total / 1000:.1f}ms, max RSS {rss / 1024:.1f}MB, '
+              f'pandas loaded: {has_pandas}')
+        heaviest = sorted(modules.items(), key=lambda kv: -kv[1])
+        for module, us in heaviest[:args.top]:
+            print(f'    {module:<40} {us / 1000:>8.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Job Storage JSON 직렬화 벤치마크
+
+약 50MB 크기의 jobs.json을 만들어 backend/compact 조합별로
+dump(저장), load(파싱) 시간과 파일 크기를 비교한다.
+
+실행: python -m benchmark.bench_json_codec [--size-mb 50]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from libs.resource_access import JsonCodec, JSON_BACKENDS
+
+
+def generate_storage(size_mb: int):
+    """
+    size_mb 크기 정도의 가짜 Job Storage 생성
+    """
+    job = {
+        'job_name': 'Job',
+        'task_list': {
+            'R1': ['R2', 'W1'],
+            'R2': ['W1', 'W2'],
+            'W1': ['W2'],
+            'W2': [],
+        },
+        'property': {
+            'R1': {'task_name': 'read', 'filename': 'a.csv', 'sep': ','},
+            'R2': {'task_name': 'read', 'filename': 'b.csv', 'sep': ','},
+            'W1': {'task_name': 'write', 'filename': 'c.csv', 'sep': ','},
+            'W2': {'task_name': 'write', 'filename': 'd.csv', 'sep': ','},
+        }
+    }
+    # pretty 출력 기준으로 job 하나는 대략 700 byte
+    size = size_mb * 1024 * 1024 // 700
+    return {'jobs': [dict(job, job_id=i + 1) for i in range(size)]}
+
+
+def measure(codec: JsonCodec, storage, path: str, repeat: int):
+    dump_time, load_time = float('inf'), float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with open(path, 'wt', encoding='utf-8') as w:
+            codec.dump(storage, w)
+        dump_time = min(dump_time, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with open(path, 'rt', encoding='utf-8') as r:
+            codec.load(r)
+        load_time = min(load_time, time.perf_counter() - start)
+    return dump_time, load_time, os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size-mb', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    storage = generate_storage(args.size_mb)
+    print(f"jobs: {len(storage['jobs'])}")
+    print(f"{'backend':<8} {'compact':<8} {'size(MB)':>9} "
+          f"{'dump(s)':>8} {'load(s)':>8}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'jobs.json')
+        for backend in JSON_BACKENDS:
+            for compact in (False, True):
+                try:
+                    codec = JsonCodec(backend, compact)
+                except ImportError:
+                    print(f'{backend:<8} (not installed)')
+                    break
+                dump_time, load_time, size = \
+                    measure(codec, storage, path, args.repeat)
+                print(f'{backend:<8} {str(compact):<8} '
+                      f'{size / 1024 / 1024:>9.1f} '
+                      f'{dump_time:>8.3f} {load_time:>8.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+큰 DAG 실행 계획 벤치마크
+
+Task가 많은 Job(프로그램으로 생성한 Job)에서
+위상 정렬, Validator 검증, TaskWorker 생성(TaskSpace 생성 + pushdown 계획)에 걸리는 시간과
+메모리(tracemalloc 최대값, TaskWorker가 유지하는 크기)를 측정한다.
+Task는 실행하지 않는다.
+
+실행: python -m benchmark.bench_large_dag [--tasks 10000 50000]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from typing import Any, Dict
+
+from utils.algorithms import topological_sort
+from utils.job_database.task.task_worker import TaskWorker
+from utils.validator_chains import get_job_validator_chain
+
+
+def generate_job(tasks: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    read Task(10%) -> drop Task -> ... -> write Task(하나) 형태의 임의 DAG
+    Task마다 뒤쪽 Task로 가는 간선이 1~2개 있다.
+    """
+    rnd = random.Random(seed)
+    names = [f'task_{i:06d}' for i in range(tasks)]
+    reads = max(1, tasks // 10)
+    task_list, properties = dict(), dict()
+    for i, name in enumerate(names):
+        if i < reads:
+            properties[name] = {'task_name': 'read', 'filename': 'a.csv',
+                                'sep': ','}
+        elif i == tasks - 1:
+            properties[name] = {'task_name': 'write',
+                                'filename': 'large_dag.csv', 'sep': ','}
+        else:
+            properties[name] = {'task_name': 'drop', 'column_name': 'col0'}
+        targets = set()
+        if i < tasks - 1:
+            targets.add(rnd.randrange(max(i + 1, reads), tasks))
+            if rnd.random() < 0.3:
+                targets.add(rnd.randrange(max(i + 1, reads), tasks))
+        task_list[name] = [names[t] for t in sorted(targets)]
+    return {'job_name': 'large', 'task_list': task_list,
+            'property': properties}
+
+
+def measure(func):
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    result = func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak, current, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tasks', type=int, nargs='+',
+                        default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    validator = get_job_validator_chain()
+    print(f'{"tasks":>7} {"step":10} {"ms":>9} {"peak(MB)":>9} '
+          f'{"kept(MB)":>9}')
+    for tasks in args.tasks:
+        job = generate_job(tasks)
+        steps = [
+            ('sort', lambda: topological_sort(job['task_list'])),
+            ('validate', lambda: validator(job)),
+            ('worker', lambda: TaskWorker(job)),
+        ]
+        for step, func in steps:
+            seconds, peak, current, _ = measure(func)
+            print(f'{tasks:7d} {step:10} {seconds * 1000:9.1f} '
+                  f'{peak / 1e6:9.1f} {current / 1e6:9.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+결과 미리보기 벤치마크
+
+큰 결과 파일의 끝부분 limit개 행을 읽을 때
+행 위치 index를 사용한 경우, skiprows로 처음부터 건너뛴 경우, 파일 전체를 읽은 경우를 비교한다.
+입력 파일은 임시 디렉토리에 생성한다.
+
+실행: python -m benchmark.bench_output_preview [--rows 2000000 --limit 100]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.job_database.task.task_output import write_csv_with_index, \
+    read_csv_slice, remove_index
+
+
+def measure(func, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--limit', type=int, default=100)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    dataframe = pd.DataFrame({
+        'id': np.arange(args.rows),
+        'value': rng.random(args.rows),
+        'kind': rng.choice(['alpha', 'beta', 'gamma'], args.rows),
+    })
+    offset = args.rows - args.limit
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'out.csv')
+        start = time.perf_counter()
+        write_csv_with_index(dataframe, path, ',')
+        print(f'write with index {time.perf_counter() - start:8.3f}s  '
+              f'{os.path.getsize(path) >> 20}MB')
+
+        elapsed = measure(lambda: read_csv_slice(path, ',', offset,
+                                                 args.limit))
+        print(f'indexed slice    {elapsed * 1000:8.1f}ms')
+        remove_index(path)
+        elapsed = measure(lambda: read_csv_slice(path, ',', offset,
+                                                 args.limit), repeat=1)
+        print(f'skiprows slice   {elapsed * 1000:8.1f}ms')
+        elapsed = measure(lambda: pd.read_csv(path).iloc[offset:], repeat=1)
+        print(f'full read        {elapsed * 1000:8.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+병렬 csv 읽기 벤치마크
+
+큰 csv 파일 하나를 pd.read_csv로 한번에 읽은 시간과
+read_csv_parallel로 thread 갯수별로 나눠 읽은 시간을 비교한다.
+입력 파일은 임시 디렉토리에 생성한다.
+
+실행: python -m benchmark.bench_parallel_read [--rows 2000000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.job_database.task.task_reader import read_csv_parallel
+
+
+def generate_file(path: str, rows: int):
+    rng = np.random.default_rng(0)
+    pd.DataFrame({
+        'id': np.arange(rows),
+        'value': rng.random(rows),
+        'count': rng.integers(0, 1000, rows),
+        'label': rng.choice(['alpha', 'beta', 'gamma', 'delta'], rows),
+    }).to_csv(path, index=False)
+
+
+def measure(path: str, workers: int) -> float:
+    start = time.perf_counter()
+    read_csv_parallel(path, ',', workers)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'in.csv')
+        generate_file(path, args.rows)
+        size = os.path.getsize(path) / (1 << 20)
+        print(f'file size          {size:6.1f}MB')
+
+        start = time.perf_counter()
+        expected = pd.read_csv(path)
+        single = time.perf_counter() - start
+        print(f'pd.read_csv        {single:6.2f}s')
+        for workers in (2, 4, 8):
+            elapsed = measure(path, workers)
+            same = read_csv_parallel(path, ',', workers).equals(expected)
+            print(f'parallel={workers:<2}        {elapsed:6.2f}s '
+                  f'(x{single / elapsed:4.2f}, same={same})')
+
+
+if __name__ == '__main__':
+    main()
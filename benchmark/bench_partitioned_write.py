@@ -0,0 +1,67 @@
+"""
+값별로 나눠서 작성하는(partition_by) write Task 벤치마크
+
+결과를 파일 하나로 작성한 시간과,
+partition 값마다 나눠서 차례대로(thread 1개) 작성한 시간, thread pool에서 동시에 작성한 시간을 비교한다.
+압축하지 않는 경우와 gzip으로 압축하는 경우를 같이 측정한다.
+결과 파일은 임시 디렉토리에 생성한다.
+
+실행: python -m benchmark.bench_partitioned_write [--rows 2000000 --partitions 32]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.job_database.task import task_output, task_space
+from utils.job_database.task.task_space import TaskWriteSpace
+
+
+def generate_frame(rows: int, partitions: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'id': np.arange(rows),
+        'tenant': rng.integers(0, partitions, rows),
+        'value': rng.random(rows),
+        'label': rng.choice(['alpha', 'beta', 'gamma', 'delta'], rows),
+    })
+
+
+def measure(dataframe: pd.DataFrame, filename: str, compression: str,
+            partition_by=None) -> float:
+    task = TaskWriteSpace('W', filename, ',', compression,
+                          partition_by=partition_by)
+    task.input_dataframe('R', dataframe)
+    start = time.perf_counter()
+    task.run()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--partitions', type=int, default=32)
+    args = parser.parse_args()
+
+    dataframe = generate_frame(args.rows, args.partitions)
+    workers = task_output.PARTITION_WRITE_WORKERS
+    with tempfile.TemporaryDirectory() as tmp:
+        task_space.BASE_DIR = tmp
+        for compression in ('none', 'gzip'):
+            single = measure(dataframe, 'single.csv', compression)
+            task_output.PARTITION_WRITE_WORKERS = 1
+            serial = measure(dataframe, 'serial', compression, ['tenant'])
+            task_output.PARTITION_WRITE_WORKERS = workers
+            parallel = measure(dataframe, 'parallel', compression,
+                               ['tenant'])
+            print(f'{compression:5} single {single:6.2f}s  '
+                  f'partitions(workers=1) {serial:6.2f}s  '
+                  f'partitions(workers={workers}) {parallel:6.2f}s '
+                  f'(x{serial / parallel:4.2f})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Task 실행 방식(serial/process) 벤치마크
+
+서로 독립적인 read -> drop 가지가 여러 개 있고 마지막에 하나로 모이는 DAG를
+serial과 process pool(worker 갯수별)로 실행해서 걸린 시간을 비교한다.
+입력 파일은 임시 디렉토리에 생성한다.
+
+실행: python -m benchmark.bench_process_executor [--branches 8 --rows 300000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.job_database.task import task_space
+from utils.job_database.task.task_worker import TaskWorker
+
+
+def generate_job(directory: str, branches: int, rows: int):
+    rng = np.random.default_rng(0)
+    task_list, properties = {'W': []}, {
+        'W': {'task_name': 'write', 'filename': 'out.csv', 'sep': ','}
+    }
+    for i in range(branches):
+        pd.DataFrame({
+            f'a{i}': rng.random(rows),
+            f'b{i}': rng.integers(0, 1000, rows),
+            f'c{i}': rng.choice(['x', 'y', 'z'], rows),
+        }).to_csv(os.path.join(directory, f'in{i}.csv'), index=False)
+        task_list[f'R{i}'] = [f'D{i}']
+        task_list[f'D{i}'] = ['W']
+        properties[f'R{i}'] = {'task_name': 'read',
+                               'filename': f'in{i}.csv', 'sep': ','}
+        properties[f'D{i}'] = {'task_name': 'drop', 'column_name': f'c{i}'}
+    return {'task_list': task_list, 'property': properties}
+
+
+def measure(job, executor: str, max_workers=None) -> float:
+    start = time.perf_counter()
+    TaskWorker(job, executor=executor, max_workers=max_workers)()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--branches', type=int, default=8)
+    parser.add_argument('--rows', type=int, default=300_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        task_space.BASE_DIR = tmp
+        job = generate_job(tmp, args.branches, args.rows)
+
+        serial = measure(job, 'serial')
+        print(f'serial             {serial:6.2f}s')
+        workers = 1
+        while workers <= min(os.cpu_count(), args.branches):
+            elapsed = measure(job, 'process', workers)
+            print(f'process workers={workers:<3} {elapsed:6.2f}s '
+                  f'x{serial / elapsed:.1f}')
+            workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+실행 기록(run history) 벤치마크
+
+실행 기록을 추가하는 속도와, 기록이 많을 때 since 조회(sparse index로 위치 찾기)와
+파일 전체를 읽으면서 거르는 경우의 조회 시간을 비교한다.
+실행 기록은 임시 디렉토리에 생성한다.
+
+실행: python -m benchmark.bench_run_history [--runs 200000 --tasks 5]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from libs.resource_access import get_json_codec
+from utils.job_database.run_history import RunHistory
+
+
+def make_record(ended_at: float, tasks: int) -> dict:
+    return {
+        'job_id': 1, 'version': 1, 'started_at': ended_at - 0.5,
+        'ended_at': ended_at, 'status': 'ok', 'seconds': 0.5,
+        'rows': 1000, 'bytes': 64000, 'executor': 'serial',
+        'input_bytes': 100000, 'peak_frame_bytes': 250000,
+        'tasks': {f'task_{i}': {'seconds': 0.1, 'rows': 1000,
+                                'bytes': 64000} for i in range(tasks)},
+    }
+
+
+def scan(path: str, since: float, limit: int) -> list:
+    """
+    index 없이 파일 처음부터 읽으면서 거르기
+    """
+    codec, runs = get_json_codec(), []
+    with open(path, 'rb') as f:
+        for line in f:
+            record = codec.loads(line)
+            if record['ended_at'] >= since:
+                runs.append(record)
+                if len(runs) >= limit:
+                    break
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=200_000)
+    parser.add_argument('--tasks', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        history = RunHistory(os.path.join(tmp, 'runs'))
+        now = time.time() - args.runs
+        start = time.perf_counter()
+        for i in range(args.runs):
+            history.append(1, make_record(now + i, args.tasks))
+        seconds = time.perf_counter() - start
+        data_path, _, _ = history.get_paths(1)
+        print(f'append           {args.runs / seconds:10.0f} runs/s  '
+              f'({os.path.getsize(data_path) / 1e6:.1f}MB)')
+
+        for fraction in (0.5, 0.99):
+            since = now + int(args.runs * fraction)
+            start = time.perf_counter()
+            runs = history.query(1, since, limit=100)['runs']
+            indexed = time.perf_counter() - start
+            start = time.perf_counter()
+            assert scan(data_path, since, 100) == runs
+            full = time.perf_counter() - start
+            print(f'since {fraction:4.0%}       index {indexed * 1000:8.2f}ms  '
+                  f'scan {full * 1000:8.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
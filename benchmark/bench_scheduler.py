@@ -0,0 +1,59 @@
+"""
+실행 대기열 벤치마크
+
+한 클라이언트(heavy)가 요청을 한꺼번에 많이 보내는 동안
+다른 클라이언트(light)가 가끔 보내는 요청의 대기 시간을 측정한다.
+Job 실행은 sleep으로 대신한다.
+
+실행: python -m benchmark.bench_scheduler [--heavy 50 --light 5 --run-ms 20]
+"""
+import argparse
+import threading
+import time
+
+from utils.job_database.scheduler import RunScheduler
+
+
+def submit(scheduler, waits, client_id, run_seconds):
+    with scheduler.admit(0, 0, client_id) as admission:
+        waits.setdefault(client_id, []).append(admission['wait_seconds'])
+        time.sleep(run_seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--heavy', type=int, default=50)
+    parser.add_argument('--light', type=int, default=5)
+    parser.add_argument('--run-ms', type=float, default=20)
+    parser.add_argument('--max-running', type=int, default=1)
+    args = parser.parse_args()
+
+    scheduler = RunScheduler(max_running=args.max_running)
+    run_seconds = args.run_ms / 1000
+    waits, threads = dict(), []
+    for _ in range(args.heavy):
+        threads.append(threading.Thread(
+            target=submit, args=(scheduler, waits, 'heavy', run_seconds)))
+        threads[-1].start()
+    # heavy 요청이 모두 대기열에 들어간 다음 light 요청을 보낸다.
+    while scheduler.get_stats()['queue_depth'] + \
+            scheduler.get_stats()['running'] < args.heavy:
+        time.sleep(0.001)
+    for _ in range(args.light):
+        threads.append(threading.Thread(
+            target=submit, args=(scheduler, waits, 'light', run_seconds)))
+        threads[-1].start()
+        time.sleep(run_seconds * 2)
+    for thread in threads:
+        thread.join()
+
+    for client_id, values in sorted(waits.items()):
+        values.sort()
+        print(f'{client_id:6s} n={len(values):4d}  '
+              f'mean {sum(values) / len(values) * 1000:8.1f}ms  '
+              f'max {values[-1] * 1000:8.1f}ms')
+    print(f'fifo estimate for light: ~{args.heavy * args.run_ms:8.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+운영 서버(serve.py) Smoke 벤치마크
+
+서버를 실행한 다음 첫 응답까지 걸린 시간(startup)과
+여러 클라이언트가 Job 조회를 반복할 때의 처리량(steady-state)을 측정한다.
+측정에 사용한 Job은 마지막에 삭제한다.
+
+실행: python -m benchmark.bench_server_smoke --workers 4 --threads 8 --preload
+"""
+import argparse
+import http.client
+import json
+import subprocess
+import sys
+import threading
+import time
+
+example_job = {
+    'job_name': 'smoke',
+    'task_list': {'R': ['W'], 'W': []},
+    'property': {
+        'R': {'task_name': 'read', 'filename': 'a.csv', 'sep': ','},
+        'W': {'task_name': 'write', 'filename': 'smoke.csv', 'sep': ','},
+    }
+}
+
+
+def request(host, port, method, uri, body=None):
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    try:
+        headers = {'Content-Type': 'application/json'} if body else {}
+        conn.request(method, uri, body=body, headers=headers)
+        res = conn.getresponse()
+        return res.status, res.read()
+    finally:
+        conn.close()
+
+
+def wait_for_server(host, port, timeout: float) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            request(host, port, 'GET', '/api/jobs/0')
+            return time.perf_counter() - start
+        except OSError:
+            time.sleep(0.01)
+    raise TimeoutError('server did not start')
+
+
+def steady_state(host, port, uri, clients: int, duration: float):
+    counts, errors = [0] * clients, [0] * clients
+    deadline = time.perf_counter() + duration
+
+    def client(i):
+        conn = http.client.HTTPConnection(host, port, timeout=10)
+        while time.perf_counter() < deadline:
+            try:
+                conn.request('GET', uri)
+                res = conn.getresponse()
+                res.read()
+                if res.status == 200:
+                    counts[i] += 1
+                else:
+                    errors[i] += 1
+            except (OSError, http.client.HTTPException):
+                errors[i] += 1
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=10)
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(i,))
+               for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(counts) / duration, sum(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=18000)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--preload', action='store_true')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5.0)
+    args = parser.parse_args()
+
+    host = '127.0.0.1'
+    cmd = [sys.executable, 'serve.py', '--bind', f'{host}:{args.port}',
+           '--workers', str(args.workers), '--threads', str(args.threads)]
+    if args.preload:
+        cmd.append('--preload')
+
+    server = subprocess.Popen(cmd, stderr=subprocess.DEVNULL)
+    job_id = None
+    try:
+        startup = wait_for_server(host, args.port, timeout=30)
+        print(f'startup: {startup:.3f}s '
+              f'(workers={args.workers}, threads={args.threads}, '
+              f'preload={args.preload})')
+
+        status, raw = request(host, args.port, 'POST', '/api/jobs',
+                              json.dumps(example_job))
+        assert status == 201, raw
+        job_id = json.loads(raw)['job_id']
+
+        throughput, errors = steady_state(
+            host, args.port, f'/api/jobs/{job_id}',
+            args.clients, args.duration)
+        print(f'steady-state: {throughput:.0f} req/s, errors: {errors} '
+              f'({args.clients} clients, {args.duration:.0f}s)')
+    finally:
+        if job_id is not None:
+            request(host, args.port, 'DELETE', f'/api/jobs/{job_id}')
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+여러 파일(shard)로 나뉜 입력 읽기 벤치마크
+
+shard 파일을 하나씩 차례대로 읽어서 합친 시간과
+read Task(디렉토리 filename)가 thread pool에서 동시에 읽고 한번에 합친 시간을 비교한다.
+조건(filter pushdown)이 있을 때도 같이 측정한다.
+입력 파일은 임시 디렉토리에 생성한다.
+
+실행: python -m benchmark.bench_sharded_read [--shards 500 --rows 20000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.job_database.task import task_space
+from utils.job_database.task.task_space import TaskReadSpace
+
+
+def generate_shards(directory: str, shards: int, rows: int):
+    rng = np.random.default_rng(0)
+    os.makedirs(directory)
+    for i in range(shards):
+        pd.DataFrame({
+            'id': np.arange(i * rows, (i + 1) * rows),
+            'value': rng.random(rows),
+            'count': rng.integers(0, 1000, rows),
+            'label': rng.choice(['alpha', 'beta', 'gamma', 'delta'], rows),
+        }).to_csv(os.path.join(directory, f'events_{i:04d}.csv'), index=False)
+
+
+def read_sequential(directory: str, predicate: str = None) -> pd.DataFrame:
+    frames = []
+    for name in sorted(os.listdir(directory)):
+        frame = pd.read_csv(os.path.join(directory, name))
+        frames.append(frame if predicate is None else frame.query(predicate))
+    return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--shards', type=int, default=500)
+    parser.add_argument('--rows', type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        generate_shards(os.path.join(tmp, 'events'), args.shards, args.rows)
+        task_space.BASE_DIR = tmp
+        for predicate in (None, 'count < 100'):
+            start = time.perf_counter()
+            expected = read_sequential(os.path.join(tmp, 'events'), predicate)
+            sequential = time.perf_counter() - start
+
+            task = TaskReadSpace('R', 'events/', ',',
+                                 predicates=[predicate] if predicate else [])
+            start = time.perf_counter()
+            dataframe = task.read_dataframe()
+            sharded = time.perf_counter() - start
+            same = dataframe.reset_index(drop=True).equals(expected)
+            workers = task.tasklog_stack[-1][2]['workers']
+            print(f'{predicate or "no predicate":14} '
+                  f'sequential {sequential:6.2f}s  '
+                  f'shards(workers={workers}) {sharded:6.2f}s '
+                  f'(x{sequential / sharded:4.2f}, same={same})')
+
+
+if __name__ == '__main__':
+    main()
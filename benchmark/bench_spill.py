@@ -0,0 +1,70 @@
+"""
+buffer spill 벤치마크
+
+read Task 여러 개가 하나의 write Task로 모이는 넓은 DAG를
+메모리 제한 없이 실행한 경우와 제한(MB)별로 실행한 경우의
+실행 시간, buffer 최대 크기, spill 크기를 비교한다.
+입력 파일은 임시 디렉토리에 생성한다.
+
+실행: python -m benchmark.bench_spill [--branches 16 --rows 200000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.job_database.task import task_space
+from utils.job_database.task.task_worker import TaskWorker
+
+
+def generate_job(directory: str, branches: int, rows: int):
+    rng = np.random.default_rng(0)
+    task_list, properties = {'W': []}, {
+        'W': {'task_name': 'write', 'filename': 'out.csv', 'sep': ','}
+    }
+    for i in range(branches):
+        pd.DataFrame({
+            f'a{i}': rng.random(rows),
+            f'b{i}': rng.integers(0, 1000, rows),
+        }).to_csv(os.path.join(directory, f'in{i}.csv'), index=False)
+        task_list[f'R{i}'] = ['W']
+        properties[f'R{i}'] = {'task_name': 'read',
+                               'filename': f'in{i}.csv', 'sep': ','}
+    return {'task_list': task_list, 'property': properties}
+
+
+def measure(job, memory_budget, spill_dir):
+    worker = TaskWorker(job, memory_budget=memory_budget, spill_dir=spill_dir)
+    start = time.perf_counter()
+    worker()
+    return time.perf_counter() - start, worker.get_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--branches', type=int, default=16)
+    parser.add_argument('--rows', type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        task_space.BASE_DIR = tmp
+        job = generate_job(tmp, args.branches, args.rows)
+        spill_dir = os.path.join(tmp, 'spill')
+
+        elapsed, _ = measure(job, None, spill_dir)
+        print(f'no budget       {elapsed:6.2f}s')
+        _, stats = measure(job, 1 << 60, spill_dir)
+        peak = stats['peak_buffer_bytes'] >> 20
+        for budget in (peak // 2, peak // 4, 0):
+            elapsed, stats = measure(job, budget << 20, spill_dir)
+            print(f'budget {budget:5d}MB  {elapsed:6.2f}s  '
+                  f'peak {stats["peak_buffer_bytes"] >> 20:5d}MB  '
+                  f'spill {stats["spill_count"]:3d} / '
+                  f'{stats["spill_bytes"] >> 20:5d}MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,354 @@
+"""
+API 부하 테스트
+
+get_app()의 test client를 여러 thread(또는 fork된 process)에서 동시에 사용해서
+create/get/update/delete/run 요청을 섞어 보낸다.
+요청 종류별 latency(p50/p95/p99), 처리량, 오류 갯수를 출력하고
+끝난 다음 jobs.json이 각 client가 기대하는 상태와 같은지 확인한다.
+
+--rate를 지정하면 client마다 정해진 간격으로 요청을 보내고(open-loop),
+latency는 요청을 보내려던 시각부터 잰다. (앞 요청이 늦어져서 밀린 시간도 포함)
+
+실행: python -m benchmark.load_test --threads 8 --processes 2 --requests 200 \
+        --mix create=2,get=10,update=3,delete=1,run=1 [--rate 50]
+
+DEFAULT_MIX: 요청 종류별 비율
+LOAD_TEST_PREFIX: 부하 테스트가 만드는 Job 이름과 결과 파일 이름의 접두사
+"""
+import argparse
+import collections
+import json
+import multiprocessing
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_MIX = {'create': 2, 'get': 10, 'update': 3, 'delete': 1, 'run': 1}
+LOAD_TEST_PREFIX = 'load-test'
+API = '/api/jobs'
+
+
+def get_load_job(client: str, revision: int) -> Dict[str, Any]:
+    return {
+        'job_name': f'{LOAD_TEST_PREFIX}-{client}-{revision}',
+        'task_list': {'R': ['W'], 'W': []},
+        'property': {
+            'R': {'task_name': 'read', 'filename': 'a.csv', 'sep': ','},
+            'W': {'task_name': 'write',
+                  'filename': f'{LOAD_TEST_PREFIX}-{client}.csv', 'sep': ','},
+        }
+    }
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    mix = dict()
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        if name not in DEFAULT_MIX:
+            raise ValueError(f'unknown request type: {name}')
+        mix[name] = int(weight)
+    return mix
+
+
+class LoadClient:
+    """
+    부하 테스트 client 하나 (thread 하나)
+
+    client는 자기가 만든 Job만 조회/수정/삭제/실행하고, 기대하는 상태를 jobs에 기록한다.
+    다른 client의 요청과 겹쳐도 자기 Job의 상태는 항상 기대한 값과 같아야 한다.
+
+    :param jobs: 기대하는 Job 상태 {job_id: (version, job_name)}
+    :param deleted: 삭제한 Job ID
+    :param latencies: 요청 종류별 latency(초)
+    :param errors: 요청 종류별 기대하지 않은 응답 {종류: {status: 갯수}}
+    """
+    name: str
+    jobs: Dict[int, Tuple[int, str]]
+    deleted: List[int]
+    latencies: Dict[str, List[float]]
+    errors: Dict[str, Dict[int, int]]
+
+    def __init__(self, name: str, test_client, mix: Dict[str, int],
+                 seed: int):
+        self.name = name
+        self.api = test_client
+        self.jobs = dict()
+        self.deleted = []
+        self.latencies = collections.defaultdict(list)
+        self.errors = collections.defaultdict(collections.Counter)
+        self.__kinds = list(mix.keys())
+        self.__weights = list(mix.values())
+        self.__random = random.Random(seed)
+        self.__revision = 0
+
+    def __next_job(self) -> Dict[str, Any]:
+        self.__revision += 1
+        return get_load_job(self.name, self.__revision)
+
+    def __choose(self) -> str:
+        kind = self.__random.choices(self.__kinds, self.__weights)[0]
+        # 만든 Job이 없으면 만든다.
+        return kind if self.jobs or kind == 'create' else 'create'
+
+    def request(self, kind: str) -> int:
+        job_id = self.__random.choice(list(self.jobs)) if self.jobs else None
+        if kind == 'create':
+            job = self.__next_job()
+            res = self.api.post(API, data=json.dumps(job),
+                                content_type='application/json')
+            if res.status_code == 201:
+                self.jobs[res.get_json()['job_id']] = 1, job['job_name']
+            return res.status_code
+        if kind == 'get':
+            res = self.api.get(f'{API}/{job_id}')
+            if res.status_code == 200:
+                body = res.get_json()
+                if (body.get('version'), body.get('job_name')) \
+                        != self.jobs[job_id]:
+                    return -1
+            return res.status_code
+        if kind == 'update':
+            version, _ = self.jobs[job_id]
+            job = self.__next_job()
+            res = self.api.patch(f'{API}/{job_id}', data=json.dumps(job),
+                                 content_type='application/json',
+                                 headers={'If-Match': f'"{job_id}-{version}"'})
+            if res.status_code == 201:
+                self.jobs[job_id] = res.get_json()['version'], job['job_name']
+            return res.status_code
+        if kind == 'delete':
+            res = self.api.delete(f'{API}/{job_id}')
+            if res.status_code == 204:
+                del self.jobs[job_id]
+                self.deleted.append(job_id)
+            return res.status_code
+        res = self.api.get(f'{API}/{job_id}/run',
+                           headers={'X-Client-Id': self.name})
+        return res.status_code
+
+    def __call__(self, requests: int, rate: Optional[float]):
+        expected = {'create': 201, 'get': 200, 'update': 201,
+                    'delete': 204, 'run': 200}
+        start = time.perf_counter()
+        for i in range(requests):
+            kind = self.__choose()
+            scheduled = time.perf_counter()
+            if rate:
+                scheduled = start + i / rate
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            try:
+                status = self.request(kind)
+            except Exception:
+                status = 0
+            self.latencies[kind].append(time.perf_counter() - scheduled)
+            if status != expected[kind]:
+                self.errors[kind][status] += 1
+
+    def get_result(self) -> Dict[str, Any]:
+        return {'jobs': self.jobs, 'deleted': self.deleted,
+                'latencies': dict(self.latencies),
+                'errors': {k: dict(v) for k, v in self.errors.items()}}
+
+
+def run_clients(process: int, threads: int, requests: int,
+                mix: Dict[str, int], rate: Optional[float], seed: int) \
+        -> List[Dict[str, Any]]:
+    """
+    한 process 안에서 threads개의 client를 동시에 실행한다.
+    """
+    from api import get_app
+
+    app, _ = get_app()
+    clients = [LoadClient(f'p{process}t{i}', app.test_client(), mix,
+                          seed * 1000 + process * 100 + i)
+               for i in range(threads)]
+    workers = [threading.Thread(target=c, args=(requests, rate))
+               for c in clients]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return [c.get_result() for c in clients]
+
+
+def __run_forked(queue, *args):
+    # fork 이전의 Lock 상태를 물려받지 않도록 Engine을 새로 만든다. (serve.py의 post_fork와 같음)
+    from utils.job_database import JobDatabaseEngine
+
+    JobDatabaseEngine.discard_instance()
+    queue.put(run_clients(*args))
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def check_consistency(results: List[Dict[str, Any]],
+                      jobs_before: List[Dict[str, Any]]) -> List[str]:
+    """
+    jobs.json이 client들이 기대하는 상태와 같은지 확인한다.
+
+    * Job ID는 중복 없이 오름차순이어야 한다. (binary search로 찾는다.)
+    * 부하 테스트 전에 있던 Job은 그대로 남아있어야 한다.
+    * client가 만들고 삭제하지 않은 Job은 기대한 version, job_name으로 남아있어야 한다.
+    * 삭제한 Job과 기록되지 않은 Job은 없어야 한다. (응답을 받지 못한 요청이 저장된 경우 등)
+
+    :return: 문제 목록, 비어있으면 일관된 상태
+    """
+    from utils.job_database.io import JobDatabaseRead
+    from libs.resource_access import get_json_codec
+
+    with JobDatabaseRead() as r:
+        jobs = get_json_codec().load(r)['jobs']
+    problems = []
+    ids = [job['job_id'] for job in jobs]
+    if ids != sorted(set(ids)):
+        problems.append(f'job ids are not unique and sorted: {ids}')
+
+    stored = {job['job_id']: job for job in jobs}
+    for job in jobs_before:
+        if stored.get(job['job_id']) != job:
+            problems.append(f'job {job["job_id"]} changed during load test')
+    expected, deleted = dict(), set()
+    for result in results:
+        expected.update(result['jobs'])
+        deleted.update(result['deleted'])
+    for job_id, (version, job_name) in expected.items():
+        job = stored.get(job_id)
+        if job is None:
+            problems.append(f'job {job_id} is missing')
+        elif (job.get('version'), job['job_name']) != (version, job_name):
+            problems.append(f'job {job_id} is version {job.get("version")} '
+                            f'{job["job_name"]}, expected {version} '
+                            f'{job_name}')
+    for job_id in deleted & set(stored):
+        problems.append(f'deleted job {job_id} still exists')
+    known = expected.keys() | {job['job_id'] for job in jobs_before}
+    for job_id in set(stored) - known - deleted:
+        problems.append(f'unexpected job {job_id}')
+    return problems
+
+
+def cleanup(results: List[Dict[str, Any]]):
+    """
+    부하 테스트가 만든 Job과 결과 파일 삭제
+    """
+    import glob
+    import os
+
+    from utils.job_database import JobDatabaseEngine
+    from utils.job_database.engine import DATA_DIR
+
+    engine = JobDatabaseEngine()
+    for result in results:
+        for job_id in result['jobs']:
+            engine.remove(job_id)
+    for path in glob.glob(f'{DATA_DIR}/{LOAD_TEST_PREFIX}-*'):
+        os.remove(path)
+
+
+def run_load_test(threads: int = 4, processes: int = 1,
+                  requests: int = 100,
+                  mix: Optional[Dict[str, int]] = None,
+                  rate: Optional[float] = None, seed: int = 0,
+                  keep: bool = False) -> Dict[str, Any]:
+    """
+    부하 테스트 실행
+
+    :param threads: process마다 동시에 요청을 보내는 client(thread) 갯수
+    :param processes: 1보다 크면 process를 fork해서 각각 threads개의 client를 실행한다.
+    :param requests: client마다 보내는 요청 갯수
+    :param mix: 요청 종류별 비율, 기본값은 DEFAULT_MIX
+    :param rate: client마다 초당 요청 갯수, None이면 응답을 받는 대로 보낸다.
+    :param keep: True면 만든 Job을 삭제하지 않는다.
+    :return: {'seconds', 'requests', 'throughput', 'errors', 'latency', 'problems'}
+    """
+    from utils.job_database.io import JobDatabaseRead
+    from libs.resource_access import get_json_codec
+
+    mix = mix or DEFAULT_MIX
+    with JobDatabaseRead() as r:
+        jobs_before = get_json_codec().load(r)['jobs']
+
+    start = time.perf_counter()
+    if processes <= 1:
+        results = run_clients(0, threads, requests, mix, rate, seed)
+    else:
+        context = multiprocessing.get_context('fork')
+        queue = context.Queue()
+        children = [context.Process(target=__run_forked,
+                                    args=(queue, p, threads, requests, mix,
+                                          rate, seed))
+                    for p in range(processes)]
+        for child in children:
+            child.start()
+        results = [r for _ in children for r in queue.get()]
+        for child in children:
+            child.join()
+    seconds = time.perf_counter() - start
+
+    latencies = collections.defaultdict(list)
+    errors = collections.defaultdict(collections.Counter)
+    for result in results:
+        for kind, values in result['latencies'].items():
+            latencies[kind] += values
+        for kind, counts in result['errors'].items():
+            errors[kind].update(counts)
+    total = sum(len(v) for v in latencies.values())
+    report = {
+        'seconds': seconds,
+        'requests': total,
+        'throughput': total / seconds if seconds else 0.0,
+        'errors': {k: dict(v) for k, v in errors.items()},
+        'latency': {kind: {'count': len(values),
+                           'p50': percentile(values, 0.5),
+                           'p95': percentile(values, 0.95),
+                           'p99': percentile(values, 0.99)}
+                    for kind, values in sorted(latencies.items())},
+        'problems': check_consistency(results, jobs_before),
+    }
+    if not keep:
+        cleanup(results)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--requests', type=int, default=200,
+                        help='client마다 보내는 요청 갯수')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help='요청 종류별 비율 (예: create=2,get=10,run=1)')
+    parser.add_argument('--rate', type=float, default=None,
+                        help='client마다 초당 요청 갯수')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keep', action='store_true',
+                        help='만든 Job을 삭제하지 않는다')
+    args = parser.parse_args()
+
+    report = run_load_test(args.threads, args.processes, args.requests,
+                           args.mix, args.rate, args.seed, args.keep)
+    print(f'{report["requests"]} requests in {report["seconds"]:.2f}s  '
+          f'{report["throughput"]:.1f} req/s')
+    print(f'{"type":8} {"count":>7} {"p50(ms)":>9} {"p95(ms)":>9} '
+          f'{"p99(ms)":>9} errors')
+    for kind, lat in report['latency'].items():
+        print(f'{kind:8} {lat["count"]:7d} {lat["p50"] * 1000:9.2f} '
+              f'{lat["p95"] * 1000:9.2f} {lat["p99"] * 1000:9.2f} '
+              f'{report["errors"].get(kind, {})}')
+    for problem in report['problems']:
+        print(f'inconsistent: {problem}')
+    print('consistent' if not report['problems'] else 'INCONSISTENT')
+    sys.exit(1 if report['problems'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,3 @@
+from libs.async_api.request import *
+from libs.async_api.resource import *
+from libs.async_api.api import *
@@ -0,0 +1,141 @@
+import re
+import traceback
+from typing import Any, Callable, Dict, List, Pattern, Tuple, Type
+
+from libs.async_api.request import AsyncRequest
+from libs.async_api.resource import AsyncResource
+from libs.resource_access import get_json_codec
+
+"""
+uri 변수 변환기, flask의 <int:job_id> 와 같은 형식을 지원한다.
+"""
+URI_CONVERTERS = {
+    'int': (r'\d+', int),
+    'string': (r'[^/]+', str),
+}
+
+
+def compile_uri(uri: str) -> Tuple[Pattern, Dict[str, Callable]]:
+    """
+    '/api/jobs/<int:job_id>' 형태의 uri를 정규식으로 변환한다.
+    """
+    converters = {}
+    pattern, last = '', 0
+    for m in re.finditer(r'<(?:(\w+):)?(\w+)>', uri):
+        converter, name = m.group(1) or 'string', m.group(2)
+        if converter not in URI_CONVERTERS:
+            raise ValueError(f'unknown converter: {converter}')
+        regex, cast = URI_CONVERTERS[converter]
+        pattern += re.escape(uri[last:m.start()]) + f'(?P<{name}>{regex})'
+        converters[name] = cast
+        last = m.end()
+    pattern += re.escape(uri[last:])
+    return re.compile(f'^{pattern}$'), converters
+
+
+class AsyncApi:
+    """
+    외부 Framework 없이 구현된 최소한의 ASGI Application
+    flask_restful.Api 처럼 add_resource로 uri와 Resource를 연결한다.
+
+    :param routes: (uri 정규식, uri 변수 변환기, Resource class)
+    :param startup_handlers: lifespan startup 때 실행되는 함수
+    :param shutdown_handlers: lifespan shutdown 때 실행되는 함수
+    """
+    routes: List[Tuple[Pattern, Dict[str, Callable], Type[AsyncResource]]]
+    startup_handlers: List[Callable]
+    shutdown_handlers: List[Callable]
+
+    def __init__(self):
+        self.routes = []
+        self.startup_handlers = []
+        self.shutdown_handlers = []
+
+    def add_resource(self, resource: Type[AsyncResource], *uris: str):
+        for uri in uris:
+            pattern, converters = compile_uri(uri)
+            self.routes.append((pattern, converters, resource))
+
+    def on_startup(self, func: Callable):
+        self.startup_handlers.append(func)
+        return func
+
+    def on_shutdown(self, func: Callable):
+        self.shutdown_handlers.append(func)
+        return func
+
+    def match(self, path: str):
+        """
+        path에 해당하는 Resource와 uri 변수 찾기
+        """
+        for pattern, converters, resource in self.routes:
+            m = pattern.match(path)
+            if m:
+                kwargs = {k: converters[k](v)
+                          for k, v in m.groupdict().items()}
+                return resource, kwargs
+        return None, None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.__lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self.__http(scope, receive, send)
+
+    async def __lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                for func in self.startup_handlers:
+                    func()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                for func in self.shutdown_handlers:
+                    func()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def __http(self, scope, receive, send):
+        # Body 전부 읽기
+        body, more_body = b'', True
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+
+        request = AsyncRequest(scope, body)
+        resource, kwargs = self.match(request.path)
+        if not resource:
+            output = {'error': 'Not Found'}, 404
+        else:
+            handler = getattr(resource(), request.method.lower(), None)
+            if not handler:
+                output = {'error': 'Method Not Allowed'}, 405
+            else:
+                try:
+                    output = await handler(request, **kwargs)
+                except Exception:
+                    traceback.print_exc()
+                    output = {'error': 'server error'}, 500
+        await self.__send_response(send, *output)
+
+    async def __send_response(self, send, data: Any, code: int,
+                              headers: Dict[str, str] = None):
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        # 204, 304는 Body가 없어야 한다.
+        if data is None or code in (204, 304):
+            raw = b''
+        elif isinstance(data, bytes):
+            # bytes는 그대로 보낸다. (content-type 헤더로 형식을 지정한다.)
+            raw = data
+        else:
+            raw = get_json_codec().dumps(data).encode('utf-8')
+        content_type = headers.pop('content-type', 'application/json')
+        raw_headers = [(b'content-type', content_type.encode('latin-1')),
+                       (b'content-length', str(len(raw)).encode())]
+        for k, v in headers.items():
+            raw_headers.append((k.encode('latin-1'),
+                                str(v).encode('latin-1')))
+        await send({'type': 'http.response.start',
+                    'status': code, 'headers': raw_headers})
+        await send({'type': 'http.response.body', 'body': raw})
@@ -0,0 +1,43 @@
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs
+
+from libs.resource_access import get_json_codec
+
+
+class AsyncRequest:
+    """
+    ASGI HTTP 요청 데이터
+    Flask의 request와 비슷하게 사용할 수 있도록 구현했다.
+
+    :param method: HTTP Method (대문자)
+    :param path: 요청 경로
+    :param headers: 헤더 (key는 소문자)
+    :param args: Query String
+    :param body: Request Body
+    """
+    method: str
+    path: str
+    headers: Dict[str, str]
+    args: Dict[str, str]
+    body: bytes
+
+    def __init__(self, scope: Dict[str, Any], body: bytes):
+        self.method = scope['method'].upper()
+        self.path = scope['path']
+        self.headers = {
+            k.decode('latin-1').lower(): v.decode('latin-1')
+            for k, v in scope.get('headers', [])
+        }
+        self.args = {
+            k: v[-1] for k, v in
+            parse_qs(scope.get('query_string', b'').decode('latin-1')).items()
+        }
+        self.body = body
+
+    def get_json(self) -> Optional[Any]:
+        """
+        Body를 JSON으로 변환, Body가 없으면 None
+        """
+        if not self.body:
+            return None
+        return get_json_codec().loads(self.body)
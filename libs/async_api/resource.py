@@ -0,0 +1,18 @@
+from abc import ABCMeta
+
+
+class AsyncResource(metaclass=ABCMeta):
+    """
+    AsyncApi에 등록되는 Resource
+    flask_restful.Resource 처럼 HTTP Method 이름(get, post, ...)으로
+    coroutine 함수를 구현한다.
+
+    함수는 (data, status_code) 또는 (data, status_code, headers)를 리턴한다.
+    data가 bytes면 JSON으로 변환하지 않고 그대로 보낸다. (headers의 Content-Type 사용)
+
+    Example:
+        class HelloView(AsyncResource):
+            async def get(self, request):
+                return {'hello': 'world'}, 200
+    """
+    pass
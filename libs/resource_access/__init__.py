@@ -1,2 +1,4 @@
 from libs.resource_access.io import *
-from libs.resource_access.io_locker import *
\ No newline at end of file
+from libs.resource_access.io_locker import *
+from libs.resource_access.codec import *
+from libs.resource_access.compression import *
@@ -0,0 +1,116 @@
+import importlib
+import json
+from typing import Any, Optional, Union
+
+"""
+사용 가능한 JSON Backend 목록
+앞에 있을수록 우선순위가 높다.
+"""
+JSON_BACKENDS = ('orjson', 'ujson', 'json')
+
+
+def find_json_backend(backend: str = 'auto') -> str:
+    """
+    사용할 JSON Backend를 찾는다.
+    'auto'인 경우 설치되어 있는 Backend 중 가장 빠른 것을 선택하고
+    설치되어 있지 않으면 표준 라이브러리(json)를 사용한다.
+
+    :param backend: 'auto', 'orjson', 'ujson', 'json'
+    :return: 사용할 backend 이름
+    :exception ValueError: 지원하지 않는 backend
+    :exception ImportError: 지정한 backend가 설치되어 있지 않음
+    """
+    if backend == 'auto':
+        for candidate in JSON_BACKENDS:
+            try:
+                importlib.import_module(candidate)
+            except ImportError:
+                continue
+            return candidate
+    if backend not in JSON_BACKENDS:
+        raise ValueError(f"지원하지 않는 JSON backend 입니다: {backend}")
+    importlib.import_module(backend)
+    return backend
+
+
+class JsonCodec:
+    """
+    JSON 직렬화/역직렬화를 담당하는 클래스
+    파일 저장, API 응답 등 JSON을 다루는 곳에서 동일한 Codec을 사용한다.
+
+    :param backend: 실제 직렬화를 수행하는 라이브러리 (orjson/ujson/json)
+    :param compact: True면 공백 없이, False면 들여쓰기를 해서 출력한다.
+    """
+    backend: str
+    compact: bool
+
+    def __init__(self, backend: str = 'auto', compact: bool = True):
+        self.backend = find_json_backend(backend)
+        self.compact = compact
+        self.__module = importlib.import_module(self.backend)
+
+    def __repr__(self):
+        return f'JsonCodec(backend={self.backend!r}, compact={self.compact})'
+
+    def dumps(self, data: Any) -> str:
+        """
+        데이터를 JSON 문자열로 변환
+        """
+        if self.backend == 'orjson':
+            # orjson은 bytes를 출력하고 들여쓰기는 2칸만 지원한다.
+            option = self.__module.OPT_NON_STR_KEYS \
+                | self.__module.OPT_SERIALIZE_NUMPY
+            if not self.compact:
+                option |= self.__module.OPT_INDENT_2
+            return self.__module.dumps(data, option=option).decode('utf-8')
+        if self.backend == 'ujson':
+            return self.__module.dumps(
+                data, ensure_ascii=False, indent=0 if self.compact else 4)
+        if self.compact:
+            return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        return json.dumps(data, ensure_ascii=False, indent=4)
+
+    def loads(self, raw: Union[str, bytes]) -> Any:
+        """
+        JSON 문자열을 데이터로 변환
+        """
+        return self.__module.loads(raw)
+
+    def dump(self, data: Any, fd) -> None:
+        """
+        데이터를 파일에 JSON으로 작성
+        """
+        fd.write(self.dumps(data))
+
+    def load(self, fd) -> Any:
+        """
+        파일에서 JSON 데이터 읽기
+        """
+        return self.loads(fd.read())
+
+
+"""
+기본 Codec, get_json_codec/set_json_codec 으로 접근한다.
+"""
+__default_codec: Optional[JsonCodec] = None
+
+
+def get_json_codec() -> JsonCodec:
+    """
+    기본 JsonCodec 얻기
+    처음 호출할 때 가장 빠른 backend, compact 모드로 생성된다.
+    """
+    global __default_codec
+    if __default_codec is None:
+        __default_codec = JsonCodec()
+    return __default_codec
+
+
+def set_json_codec(codec: JsonCodec) -> None:
+    """
+    기본 JsonCodec 교체
+    """
+    global __default_codec
+    if not isinstance(codec, JsonCodec):
+        raise TypeError("codec must be JsonCodec")
+    __default_codec = codec
@@ -0,0 +1,108 @@
+import importlib.util
+import os
+from typing import Any, Dict, Optional
+
+"""
+압축 파일 설정
+COMPRESSION_EXTENSIONS: 확장자로 추정하는 압축 방식
+COMPRESSION_METHODS: 압축 방식으로 지정할 수 있는 값
+    infer: 확장자로 추정한다. (기본값)
+    none: 압축하지 않은 파일로 취급한다.
+"""
+COMPRESSION_EXTENSIONS = {
+    '.gz': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'xz',
+    '.zst': 'zstd',
+}
+COMPRESSION_METHODS = ('infer', 'none') + tuple(COMPRESSION_EXTENSIONS.values())
+
+"""
+COMPRESSION_LEVELS: 압축 방식별로 지정할 수 있는 압축 수준 범위 (최솟값, 최댓값)
+COMPRESSION_MODULES: 표준 라이브러리가 아닌 압축 라이브러리, 설치되어 있어야 사용할 수 있다.
+"""
+COMPRESSION_LEVELS = {
+    'gzip': (1, 9),
+    'bz2': (1, 9),
+    'xz': (0, 9),
+    'zstd': (1, 22),
+}
+COMPRESSION_MODULES = {
+    'zstd': 'zstandard',
+}
+
+
+def is_compression_available(method: Optional[str]) -> bool:
+    """
+    압축 방식을 사용할 수 있는지 여부 (압축 라이브러리 설치 여부)
+    라이브러리를 불러오지 않고 설치 여부만 확인한다.
+    """
+    module = COMPRESSION_MODULES.get(method)
+    return module is None or importlib.util.find_spec(module) is not None
+
+
+def is_compression_level(method: Optional[str], level: Any) -> bool:
+    """
+    압축 방식에 사용할 수 있는 압축 수준인지 여부
+    압축하지 않으면 압축 수준을 사용하지 않으므로 정수이기만 하면 된다.
+    """
+    if not isinstance(level, int) or isinstance(level, bool):
+        return False
+    if method is None:
+        return True
+    low, high = COMPRESSION_LEVELS[method]
+    return low <= level <= high
+
+
+def infer_compression(filename: str, compression: str = 'infer') \
+        -> Optional[str]:
+    """
+    파일의 압축 방식 찾기
+
+    :param filename: 파일 이름
+    :param compression: 지정한 압축 방식
+    :return: 압축 방식, 압축하지 않은 파일이면 None
+    """
+    if compression == 'none':
+        return None
+    if compression != 'infer':
+        return compression
+    _, extension = os.path.splitext(filename)
+    return COMPRESSION_EXTENSIONS.get(extension.lower())
+
+
+def get_compression_extension(method: Optional[str]) -> str:
+    """
+    압축 방식의 확장자, 압축하지 않으면 빈 문자열
+    """
+    for extension, m in COMPRESSION_EXTENSIONS.items():
+        if m == method:
+            return extension
+    return ''
+
+
+def get_compression_options(method: Optional[str],
+                            level: Optional[int] = None,
+                            threads: Optional[int] = None) \
+        -> Optional[Dict[str, Any]]:
+    """
+    압축 옵션(dict) 만들기, pandas의 compression 인자로 사용할 수 있다.
+    압축 라이브러리(gzip, bz2, lzma, zstandard)에 그대로 넘기므로 라이브러리마다 인자 이름이 다르다.
+
+    :param method: 압축 방식, None이면 압축하지 않는다.
+    :param level: 압축 수준 (gzip/bz2: 1~9, xz: 0~9, zstd: 1~22)
+    :param threads: 압축에 사용할 thread 갯수 (zstd만 지원)
+    """
+    if method is None:
+        return None
+    options: Dict[str, Any] = {'method': method}
+    if level is not None:
+        if method == 'xz':
+            options['preset'] = level
+        elif method == 'zstd':
+            options['level'] = level
+        else:
+            options['compresslevel'] = level
+    if threads is not None and method == 'zstd':
+        options['threads'] = threads
+    return options
@@ -1,4 +1,6 @@
 import _io
+import os
+import tempfile
 from abc import ABCMeta
 
 
@@ -15,7 +17,9 @@ class RawFileIO(metaclass=ABCMeta):
         self.fd = None
 
     def __enter__(self, mode: str):
-        self.fd = open(self.file_root, mode=mode)
+        # Text 파일은 플랫폼과 상관없이 utf-8로 다룬다.
+        encoding = None if 'b' in mode else 'utf-8'
+        self.fd = open(self.file_root, mode=mode, encoding=encoding)
         return self.fd
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -32,4 +36,124 @@ class RawFileRead(RawFileIO):
 class RawFileWrite(RawFileIO):
 
     def __enter__(self, mode: str = None):
-        return super().__enter__('wt')
\ No newline at end of file
+        return super().__enter__('wt')
+
+
+class RawFileAtomicWrite(RawFileIO):
+    """
+    원자적으로 파일을 쓰는 클래스
+
+    같은 디렉토리에 임시 파일을 만들어 작성한 다음, fsync 후 rename 한다.
+    작성 도중 Exception이 발생하거나 프로세스가 죽어도 기존 파일은 그대로 남는다.
+
+    :param binary: True면 binary 모드로 연다.
+    :param buffer_size: 쓰기 버퍼 크기(byte), -1이면 기본값을 사용한다.
+    :param fsync_directory: rename 이후 디렉토리까지 fsync 할 지 여부
+    :param newline: open()의 newline과 동일(text 모드만 사용)
+    """
+    temp_root: str
+    binary: bool
+    buffer_size: int
+    fsync_directory: bool
+    newline: str
+
+    def __init__(self, file_root: str,
+                 binary: bool = False,
+                 buffer_size: int = -1,
+                 fsync_directory: bool = False,
+                 newline: str = None):
+        super().__init__(file_root)
+        self.temp_root = None
+        self.binary = binary
+        self.buffer_size = buffer_size
+        self.fsync_directory = fsync_directory
+        self.newline = newline
+
+    def __enter__(self, mode: str = None):
+        directory, filename = os.path.split(os.path.abspath(self.file_root))
+        fd, self.temp_root = tempfile.mkstemp(
+            prefix=f'.{filename}.', suffix='.tmp', dir=directory)
+        try:
+            # mkstemp는 0600으로 생성하므로 기존 파일의 권한을 유지한다.
+            os.chmod(self.temp_root, self.__file_mode())
+            if self.binary:
+                self.fd = os.fdopen(fd, 'wb', buffering=self.buffer_size)
+            else:
+                self.fd = os.fdopen(fd, 'wt', buffering=self.buffer_size,
+                                    encoding='utf-8', newline=self.newline)
+        except Exception as e:
+            os.close(fd)
+            os.remove(self.temp_root)
+            raise e
+        return self.fd
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is None:
+                try:
+                    # 디스크에 완전히 기록된 다음 교체한다.
+                    self.fd.flush()
+                    os.fsync(self.fd.fileno())
+                except Exception:
+                    # 임시 파일을 지우기 전에 fd를 닫는다.
+                    self.__close_quietly()
+                    raise
+            self.fd.close()
+            if exc_type is not None:
+                # 작성 실패: 기존 파일은 건드리지 않는다.
+                os.remove(self.temp_root)
+                return
+            os.replace(self.temp_root, self.file_root)
+        except Exception as e:
+            if os.path.exists(self.temp_root):
+                os.remove(self.temp_root)
+            raise e
+        finally:
+            self.fd = None
+
+        if self.fsync_directory:
+            self.__fsync_directory()
+
+    def __close_quietly(self):
+        """
+        이미 실패한 경우 fd 닫기, close가 다시 flush 하다 실패해도 fd는 닫히므로 에러는 무시한다.
+        """
+        try:
+            self.fd.close()
+        except OSError:
+            pass
+
+    def __file_mode(self) -> int:
+        try:
+            return os.stat(self.file_root).st_mode & 0o777
+        except FileNotFoundError:
+            # os.umask()는 프로세스 전체에 영향을 주므로 일반적인 기본값을 사용한다.
+            return 0o644
+
+    def __fsync_directory(self):
+        """
+        rename 결과를 디스크에 반영하기 위해 디렉토리를 fsync 한다.
+        (디렉토리 fsync를 지원하지 않는 OS에서는 무시한다.)
+        """
+        directory = os.path.dirname(os.path.abspath(self.file_root))
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
+
+
+def is_path_inside(base_dir: str, filename: str) -> bool:
+    """
+    base_dir 기준의 filename이 base_dir 안을 가리키는지 확인한다.
+    절대 경로, '..', base_dir 밖을 가리키는 symbolic link는 밖으로 본다.
+    (glob 패턴은 문자 그대로 경로로 보고 확인한다.)
+    """
+    base = os.path.realpath(base_dir)
+    path = os.path.realpath(os.path.join(base, filename))
+    return os.path.commonpath([base, path]) == base
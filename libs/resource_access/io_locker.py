@@ -1,3 +1,5 @@
+import fcntl
+import os
 from threading import Lock
 
 
@@ -26,3 +28,46 @@ def lock_while_using_file(locker: Lock):
         return __wrapper
 
     return __lock_while_using_file
+
+
+class FileLock:
+    """
+    thread와 process 사이에서 모두 동작하는 Lock
+    같은 process 안에서는 threading.Lock으로, process 사이(fork된 worker 등)에서는
+    lock 파일의 flock으로 막는다. threading.Lock처럼 acquire/release를 사용한다.
+
+    flock은 열린 파일 단위로 걸리므로 fork된 process는 lock 파일을 다시 연다.
+
+    :param path: lock 파일 위치, 없으면 생성한다.
+    """
+    path: str
+
+    def __init__(self, path: str):
+        self.path = path
+        self.__lock = Lock()
+        self.__fd = None
+        self.__pid = None
+
+    def acquire(self) -> bool:
+        self.__lock.acquire()
+        try:
+            if self.__pid != os.getpid():
+                self.__fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                self.__pid = os.getpid()
+            fcntl.flock(self.__fd, fcntl.LOCK_EX)
+        except BaseException:
+            self.__lock.release()
+            raise
+        return True
+
+    def release(self):
+        try:
+            fcntl.flock(self.__fd, fcntl.LOCK_UN)
+        finally:
+            self.__lock.release()
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
@@ -0,0 +1,122 @@
+"""
+운영용 서버 실행 파일 (gunicorn)
+
+실행: python serve.py --bind 0.0.0.0:8000 --workers 4 --threads 8 --preload
+"""
+import argparse
+import multiprocessing
+
+from api import get_app
+from utils.job_database import JobDatabaseEngine
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Job API production server')
+    parser.add_argument('--bind', default='127.0.0.1:8000')
+    parser.add_argument('--workers', type=int,
+                        default=multiprocessing.cpu_count() * 2 + 1)
+    parser.add_argument('--threads', type=int, default=4,
+                        help='worker 하나가 동시에 처리하는 요청 수')
+    parser.add_argument('--preload', action='store_true',
+                        help='fork 전에 master에서 application을 불러온다')
+    parser.add_argument('--timeout', type=int, default=120,
+                        help='오래 걸리는 Job 실행을 위한 worker timeout(초)')
+    parser.add_argument('--task-executor', choices=('serial', 'process'),
+                        default='serial', help='Job 실행 시 Task 실행 방식')
+    parser.add_argument('--task-workers', type=int, default=None,
+                        help='process 실행 시 최대 process 갯수')
+    parser.add_argument('--memory-budget', type=int, default=None,
+                        help='Job 실행 한번당 buffer 메모리 제한(MB), '
+                             '넘으면 디스크에 내려둔다')
+    parser.add_argument('--spill-dir', default=None,
+                        help='spill 파일 디렉토리 (기본값: 시스템 임시 디렉토리)')
+    parser.add_argument('--max-running-jobs', type=int, default=1,
+                        help='worker 하나에서 동시에 실행할 수 있는 Job 갯수')
+    parser.add_argument('--node-memory-budget', type=int, default=None,
+                        help='서버(모든 worker) 전체에서 동시에 실행되는 Job의 '
+                             '예상 메모리 합 제한(MB), '
+                             'worker마다 worker 갯수로 나눈 만큼 사용한다')
+    parser.add_argument('--run-queue-limit', type=int, default=None,
+                        help='실행 대기열 최대 길이, 넘으면 503으로 응답한다')
+    parser.add_argument('--watch-inputs', action='store_true',
+                        help='subscribe_inputs Job의 입력 파일이 바뀌면 실행한다')
+    parser.add_argument('--watch-backend',
+                        choices=('auto', 'inotify', 'polling'), default='auto',
+                        help='입력 파일 감시 방식 (auto: inotify, 안되면 polling)')
+    parser.add_argument('--watch-debounce', type=float, default=None,
+                        help='마지막 변경 이후 기다리는 시간(초)')
+    return parser.parse_args(argv)
+
+
+def get_post_fork(args):
+
+    def post_fork(server, worker):
+        """
+        fork 이후 worker마다 Engine을 새로 만들고 캐시를 채운다.
+        (preload를 사용하면 master의 Engine과 Lock 상태가 그대로 복사되기 때문)
+        """
+        JobDatabaseEngine.discard_instance()
+        engine = JobDatabaseEngine()
+        engine.task_executor = args.task_executor
+        engine.task_workers = args.task_workers
+        if args.memory_budget is not None:
+            engine.memory_budget = args.memory_budget << 20
+        engine.spill_dir = args.spill_dir
+        engine.scheduler.max_running = args.max_running_jobs
+        engine.scheduler.queue_limit = args.run_queue_limit
+        if args.node_memory_budget is not None:
+            # Scheduler는 worker마다 따로 있으므로 서버 전체 제한을 worker끼리 나눈다.
+            engine.scheduler.memory_budget = \
+                (args.node_memory_budget << 20) // max(args.workers, 1)
+        if args.task_executor == 'process':
+            # 감시/요청 처리 thread가 생기기 전에 process pool을 만들어 둔다.
+            from utils.job_database.task import start_process_pool
+            start_process_pool(args.task_workers)
+        if args.watch_inputs:
+            # worker 중 하나만 감시하고 나머지는 그 worker가 종료되면 이어받는다.
+            engine.start_watcher(args.watch_backend, args.watch_debounce)
+        stats = engine.warm_up()
+        server.log.info('worker %s warmed up: %d jobs in %.3fs',
+                        worker.pid, stats['jobs'], stats['seconds'])
+
+    return post_fork
+
+
+def get_options(args):
+    return {
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread' if args.threads > 1 else 'sync',
+        'preload_app': args.preload,
+        'timeout': args.timeout,
+        'post_fork': get_post_fork(args),
+    }
+
+
+def main(argv=None):
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise SystemExit("운영 서버(gunicorn)가 필요합니다: pip install gunicorn")
+
+    class JobApplication(BaseApplication):
+
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            app, api = get_app()
+            return app
+
+    args = parse_args(argv)
+    JobApplication(get_options(args)).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+import asyncio
+import json
+
+import pytest
+from asgi import get_asgi_app
+from api import generate_jobdatabase_engine
+
+API = '/api/jobs'
+CREATE_API = '/api/jobs'
+
+example_job = {
+    'job_name': 'Job1',
+    'task_list': {
+        'R1': ['R2', 'W1'],
+        'R2': ['W1', 'W2'],
+        'W1': ['W2'],
+        'W2': [],
+    },
+    'property': {
+        'R1': {'task_name': 'read', 'filename': 'a.csv', 'sep': ','},
+        'R2': {'task_name': 'read', 'filename': '1.csv', 'sep': ','},
+        'W1': {'task_name': 'write', 'filename': 'b.csv', 'sep': ','},
+        'W2': {'task_name': 'write', 'filename': 'c.csv', 'sep': ','},
+    }
+}
+
+
+async def request(app, method, path, data=None):
+    """
+    ASGI Application에 직접 요청하기
+    :return: (status code, json data)
+    """
+    body = json.dumps(data).encode() if data is not None else b''
+    scope = {'type': 'http', 'method': method, 'path': path,
+             'query_string': b'', 'headers': []}
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    status = sent[0]['status']
+    raw = sent[1]['body']
+    return status, json.loads(raw) if raw else None
+
+
+def call(app, method, path, data=None):
+    return asyncio.run(request(app, method, path, data))
+
+
+@pytest.fixture
+def app():
+    yield get_asgi_app()
+
+    # 테스트 종료 후에 실행되는 코드
+    # Job.json에 있는 내용들을 전부 지운다.
+    generate_jobdatabase_engine().reset()
+
+
+def test_crud(app):
+    status, res = call(app, 'POST', CREATE_API, example_job)
+    assert status == 201
+    job_id = res['job_id']
+
+    status, res = call(app, 'GET', f'{API}/{job_id}')
+    assert status == 200
+    assert res['job_name'] == example_job['job_name']
+
+    status, _ = call(app, 'PATCH', f'{API}/{job_id}', example_job)
+    assert status == 201
+
+    status, _ = call(app, 'GET', f'{API}/{job_id}/run')
+    assert status == 200
+
+    status, _ = call(app, 'DELETE', f'{API}/{job_id}')
+    assert status == 204
+    status, _ = call(app, 'GET', f'{API}/{job_id}')
+    assert status == 404
+
+
+def test_bad_request(app):
+    assert call(app, 'POST', CREATE_API, {'job_name': 'x'})[0] == 400
+    assert call(app, 'GET', '/api/unknown')[0] == 404
+    assert call(app, 'PUT', f'{API}/1')[0] == 405
+
+
+def test_concurrent_requests(app):
+    """
+    여러 요청을 동시에 보내도 모두 정상적으로 처리되어야 한다.
+    """
+    status, res = call(app, 'POST', CREATE_API, example_job)
+    job_id = res['job_id']
+
+    async def burst():
+        requests = [request(app, 'GET', f'{API}/{job_id}')
+                    for _ in range(200)]
+        requests += [request(app, 'GET', f'{API}/{job_id}/run')
+                     for _ in range(5)]
+        return await asyncio.gather(*requests)
+
+    results = asyncio.run(burst())
+    assert all(status == 200 for status, _ in results)
@@ -0,0 +1,87 @@
+import importlib
+
+import pytest
+
+from libs.resource_access import codec
+from libs.resource_access.codec import JsonCodec, JSON_BACKENDS, \
+    find_json_backend, get_json_codec, set_json_codec
+
+
+def installed_backends():
+    backends = []
+    for backend in JSON_BACKENDS:
+        try:
+            importlib.import_module(backend)
+        except ImportError:
+            continue
+        backends.append(backend)
+    return backends
+
+
+@pytest.fixture
+def default_codec():
+    # 기본 Codec을 바꾸는 테스트가 끝나면 원래대로 되돌린다.
+    original = get_json_codec()
+    yield original
+    set_json_codec(original)
+
+
+def test_find_json_backend(monkeypatch):
+    """
+    auto는 설치된 backend 중 가장 앞에 있는 것을 고르고,
+    설치되지 않은 backend는 건너뛰고 표준 라이브러리(json)까지 내려간다.
+    """
+    assert find_json_backend() == installed_backends()[0]
+
+    import_module = importlib.import_module
+
+    def only_json(name, *args, **kwargs):
+        if name != 'json':
+            raise ImportError(name)
+        return import_module(name, *args, **kwargs)
+
+    monkeypatch.setattr(codec.importlib, 'import_module', only_json)
+    assert find_json_backend() == 'json'
+    assert JsonCodec().backend == 'json'
+    with pytest.raises(ImportError):
+        find_json_backend('orjson')
+    with pytest.raises(ValueError):
+        find_json_backend('simplejson')
+
+
+def test_set_json_codec(default_codec):
+    """
+    set_json_codec으로 기본 Codec을 바꾸면 get_json_codec이 바꾼 Codec을 돌려준다.
+    """
+    assert get_json_codec() is default_codec
+    assert default_codec.compact is True
+
+    replaced = JsonCodec('json', compact=False)
+    set_json_codec(replaced)
+    assert get_json_codec() is replaced
+    assert get_json_codec().dumps({'a': 1}) == '{\n    "a": 1\n}'
+    with pytest.raises(TypeError):
+        set_json_codec('json')
+    assert get_json_codec() is replaced
+
+
+@pytest.mark.parametrize('backend', installed_backends())
+@pytest.mark.parametrize('compact', [True, False])
+def test_json_codec_round_trip(backend, compact, tmp_path):
+    """
+    한글(비 ASCII)은 escape 하지 않고 그대로 작성하고, 다시 읽으면 같은 데이터가 된다.
+    """
+    json_codec = JsonCodec(backend, compact)
+    data = {'job_name': '매출 집계', 'task_list': {'읽기': ['쓰기'], '쓰기': []},
+            'property': {'읽기': {'filename': '매출.csv', 'sep': ','}},
+            'count': 3, 'ratio': 0.5, 'tags': None}
+    raw = json_codec.dumps(data)
+    assert '매출 집계' in raw
+    assert json_codec.loads(raw) == data
+    assert json_codec.loads(raw.encode('utf-8')) == data
+
+    path = tmp_path / 'job.json'
+    with open(path, 'w', encoding='utf-8') as f:
+        json_codec.dump(data, f)
+    with open(path, encoding='utf-8') as f:
+        assert json_codec.load(f) == data
@@ -0,0 +1,242 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api import get_app, generate_jobdatabase_engine
+from utils.algorithms import may_match
+from utils.job_database.column_stats import get_stats_path, \
+    load_column_stats
+from utils.job_database.task.task_output import INDEX_STRIDE, \
+    get_stats_kind
+
+API = '/api/jobs'
+STORAGE_ROOT = 'storage/data'
+
+
+@pytest.fixture
+def api():
+    app, api = get_app()
+    yield app.test_client()
+
+    generate_jobdatabase_engine().reset()
+
+
+def upload_job(job, api) -> int:
+    res = api.post(API, data=json.dumps(job),
+                   content_type='application/json')
+    assert res.status_code == 201
+    return res.get_json()['job_id']
+
+
+def write_job(input_file: str, output_file: str, **options):
+    return {
+        'job_name': 'stats',
+        'task_list': {'R': ['W'], 'W': []},
+        'property': {
+            'R': {'task_name': 'read', 'filename': input_file, 'sep': ','},
+            'W': {'task_name': 'write', 'filename': output_file, 'sep': ',',
+                  **options},
+        }
+    }
+
+
+def filter_job(input_file: str, expression: str, output_file: str):
+    return {
+        'job_name': 'skip',
+        'task_list': {'R': ['F'], 'F': ['W'], 'R2': ['W'], 'W': []},
+        'property': {
+            'R': {'task_name': 'read', 'filename': input_file, 'sep': ','},
+            'R2': {'task_name': 'read', 'filename': 'rate.csv', 'sep': ','},
+            'F': {'task_name': 'filter', 'expression': expression},
+            'W': {'task_name': 'write', 'filename': output_file, 'sep': ','},
+        }
+    }
+
+
+def test_may_match():
+    """
+    column 통계로 조건을 만족하는 행이 있을 수 있는지 판단한다.
+    """
+    stats = {'x': {'min': 10, 'max': 20, 'nulls': 0},
+             's': {'min': 'b', 'max': 'd', 'nulls': 3},
+             'e': {'min': None, 'max': None, 'nulls': 5}}
+    assert may_match('x == 15', stats)
+    assert not may_match('x > 20', stats)
+    assert not may_match('5 > x', stats)
+    assert not may_match('x < 10 or x > 20', stats)
+    assert may_match('x < 10 or x >= 20', stats)
+    assert not may_match('(x > 25) & (x < 11)', stats)
+    assert not may_match('21 < x < 30', stats)
+    assert not may_match('x in [1, 2, -3]', stats)
+    assert may_match('x not in [1, 2]', stats)
+    assert not may_match("s == 'a'", stats)
+    assert may_match("s in ['a', 'c']", stats)
+    # null이 있으면 != 조건은 항상 만족할 수 있다.
+    assert may_match("s != 'b'", stats)
+    assert not may_match('x != 10', {'x': {'min': 10, 'max': 10, 'nulls': 0}})
+    assert not may_match('e > 0', stats)
+    assert may_match('e != 0', stats)
+    # 판단할 수 없는 조건
+    assert may_match("x > 'a'", stats)
+    assert may_match('y > 100', stats)
+    assert may_match('not x > 20', stats)
+    assert may_match('x + 1 > 100', stats)
+
+
+def test_stats_kind():
+    """
+    다시 읽었을 때 dtype이 바뀌는 문자열 column은 통계를 사용하지 않는다.
+    """
+    assert get_stats_kind(pd.Series(['a', '1', None])) == 'string'
+    assert get_stats_kind(pd.Series(['1', '2.5', 'NA'])) is None
+    assert get_stats_kind(pd.Series(['True', 'False'])) is None
+    assert get_stats_kind(pd.Series(['a', 1])) is None
+    assert get_stats_kind(pd.Series([True, False])) == 'bool'
+    assert get_stats_kind(pd.Series([1.5, None])) == 'number'
+    assert get_stats_kind(pd.to_datetime(pd.Series(['2024-01-01']))) is None
+
+
+def test_column_stats_skip(api):
+    """
+    column 통계 파일이 있으면 조건을 만족할 수 없는 row group은 읽지 않는다.
+    결과는 통계 없이 읽었을 때와 같아야 한다.
+    """
+    rows = INDEX_STRIDE * 3 + 10
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({
+        'id': np.arange(rows),
+        'value': rng.random(rows),
+        'name': [f'n{i:06d}' if i % 5 else 'NA' for i in range(rows)],
+        'code': [str(i % 10) for i in range(rows)],
+    })
+    data.to_csv(f'{STORAGE_ROOT}/stats_in.csv', index=False)
+    pd.DataFrame({'rate': [0.1, 0.2, 0.3]}) \
+        .to_csv(f'{STORAGE_ROOT}/rate.csv', index=False)
+
+    job_id = upload_job(write_job('stats_in.csv', 'stats.csv',
+                                  column_stats=True), api)
+    assert api.get(f'{API}/{job_id}/run').status_code == 200
+    stats = load_column_stats(f'{STORAGE_ROOT}/stats.csv')
+    assert stats['rows'] == rows and len(stats['row_groups']) == 4
+    assert stats['columns']['id'] == {'min': 0, 'max': rows - 1, 'nulls': 0}
+    # 'NA'는 다시 읽을 때 NaN이다.
+    assert stats['columns']['name']['nulls'] == len(range(0, rows, 5))
+    assert stats['kinds'] == {'id': 'number', 'value': 'number',
+                              'name': 'string', 'code': 'number'}
+
+    # 통계 없이 같은 파일을 읽는 Job과 비교한다.
+    data_copy = pd.read_csv(f'{STORAGE_ROOT}/stats.csv')
+    data_copy.to_csv(f'{STORAGE_ROOT}/plain.csv', index=False)
+    expressions = [
+        f'id >= {INDEX_STRIDE * 2 + 5} and value > 0.5',
+        f"name == 'n{INDEX_STRIDE:06d}' or id < 2",
+        'id > 1000000',
+    ]
+    skip_ids = []
+    for i, expression in enumerate(expressions):
+        skip_id = upload_job(filter_job('stats.csv', expression,
+                                        f'skip{i}.csv'), api)
+        plain_id = upload_job(filter_job('plain.csv', expression,
+                                         f'plain{i}.csv'), api)
+        skip_ids.append(skip_id)
+        res = api.get(f'{API}/{skip_id}/run')
+        assert res.status_code == 200
+        trace = res.get_json()['trace']
+        assert api.get(f'{API}/{plain_id}/run').status_code == 200
+
+        output = pd.read_csv(f'{STORAGE_ROOT}/skip{i}.csv')
+        expected = pd.read_csv(f'{STORAGE_ROOT}/plain{i}.csv')
+        pd.testing.assert_frame_equal(output, expected)
+
+        skips = [t['log'] for t in trace['R'] if t['type'] == 'skip']
+        assert skips[0]['skipped_row_groups'] == {0: 2, 1: 2, 2: 4}[i]
+
+    # 비교할 수 없는 조건은 통계로 건너뛰지 않고, 거르지 않은 데이터를 넘기지도 않는다.
+    expression = "name > 5 and id > 1000000"
+    for filename in ('stats.csv', 'plain.csv'):
+        job_id = upload_job(filter_job(filename, expression, 'bad.csv'), api)
+        res = api.get(f'{API}/{job_id}/run')
+        assert res.status_code == 422
+        assert res.get_json()['filter']['expression'] == expression
+
+    # 실행 계획도 통계로 행 갯수를 계산한다.
+    plan = api.get(f'{API}/{skip_ids[2]}/plan').get_json()
+    info = plan['tasks']['R']['column_stats']
+    assert info['rows'] == rows and info['read_rows'] == 0
+    assert plan['tasks']['R']['file_rows'] == rows
+
+
+def test_column_stats_compressed(api):
+    """
+    압축 파일은 파일 전체 통계만 작성하고 파일 전체만 건너뛸 수 있다.
+    통계를 작성하지 않으면 예전 통계 파일은 삭제된다.
+    """
+    pd.DataFrame({'id': range(100)}) \
+        .to_csv(f'{STORAGE_ROOT}/small.csv', index=False)
+    pd.DataFrame({'rate': [0.1]}).to_csv(f'{STORAGE_ROOT}/rate.csv',
+                                         index=False)
+    job_id = upload_job(write_job('small.csv', 'small.csv.gz',
+                                  column_stats=True), api)
+    assert api.get(f'{API}/{job_id}/run').status_code == 200
+    stats = load_column_stats(f'{STORAGE_ROOT}/small.csv.gz')
+    assert len(stats['row_groups']) == 1
+    assert 'offset' not in stats['row_groups'][0]
+
+    skip_id = upload_job(filter_job('small.csv.gz', 'id >= 100',
+                                    'none.csv'), api)
+    trace = api.get(f'{API}/{skip_id}/run').get_json()['trace']
+    assert trace['R'][0]['log']['skipped_rows'] == 100
+    assert len(pd.read_csv(f'{STORAGE_ROOT}/none.csv')) == 1
+
+    job_id = upload_job(write_job('small.csv', 'small.csv.gz'), api)
+    assert api.get(f'{API}/{job_id}/run').status_code == 200
+    assert not os.path.exists(get_stats_path(f'{STORAGE_ROOT}/small.csv.gz'))
+
+
+def test_column_stats_validate(api):
+    job = write_job('a.csv', 'b.csv', column_stats='yes')
+    res = api.post(API, data=json.dumps(job), content_type='application/json')
+    assert res.status_code == 400
+
+
+def test_column_stats_skip_dtype(api):
+    """
+    건너뛴 row group에만 빈 값이 있어도 파일 전체를 읽었을 때와 dtype이 같다.
+    (정수 column은 빈 값이 있으면 float64)
+    """
+    rows = INDEX_STRIDE * 2 + 10
+    data = pd.DataFrame({'id': np.arange(rows),
+                         'count': pd.array(np.arange(rows), dtype='Int64')})
+    data.loc[3, 'count'] = pd.NA
+    data.to_csv(f'{STORAGE_ROOT}/nulls_in.csv', index=False)
+    job = write_job('nulls_in.csv', 'nulls.csv', column_stats=True)
+    job['property']['R']['dtype'] = {'count': 'Int64'}
+    job_id = upload_job(job, api)
+    assert api.get(f'{API}/{job_id}/run').status_code == 200
+    stats = load_column_stats(f'{STORAGE_ROOT}/nulls.csv')
+    assert stats['read_dtypes'] == {'id': 'int64', 'count': 'float64'}
+
+    # 통계 없이 같은 파일을 읽는 Job과 비교한다.
+    pd.read_csv(f'{STORAGE_ROOT}/nulls.csv') \
+        .to_csv(f'{STORAGE_ROOT}/nulls_plain.csv', index=False)
+    expression = f'id >= {INDEX_STRIDE * 2}'
+    jobs = []
+    for input_file, output_file in (('nulls.csv', 'nulls_skip.csv'),
+                                    ('nulls_plain.csv', 'nulls_expected.csv')):
+        job = filter_job(input_file, expression, output_file)
+        # 다른 파일과 병합하면 dtype이 바뀌므로 read Task 하나만 사용한다.
+        del job['task_list']['R2'], job['property']['R2']
+        jobs.append(upload_job(job, api))
+    skip_id, plain_id = jobs
+    res = api.get(f'{API}/{skip_id}/run')
+    assert res.status_code == 200
+    skips = [t['log'] for t in res.get_json()['trace']['R']
+             if t['type'] == 'skip']
+    assert skips[0]['skipped_row_groups'] == 2
+    assert api.get(f'{API}/{plain_id}/run').status_code == 200
+    with open(f'{STORAGE_ROOT}/nulls_skip.csv') as output, \
+            open(f'{STORAGE_ROOT}/nulls_expected.csv') as expected:
+        assert output.read() == expected.read()
@@ -0,0 +1,71 @@
+import pytest
+
+from utils.algorithms import CompactGraph, topological_sort
+from utils.job_database.task.task_space import TaskDropColumnSpace
+from utils.job_database.task.task_worker import TaskWorker
+
+graph = {
+    'R1': ['R2', 'W1'],
+    'R2': ['W1', 'W2'],
+    'W1': ['W2'],
+    'W2': [],
+}
+
+
+def test_compact_graph():
+    """
+    Task 이름은 task_list의 key 순서대로 정수 ID가 되고 간선은 CSR 배열에 들어간다.
+    """
+    g = CompactGraph(graph)
+    assert g.names == ['R1', 'R2', 'W1', 'W2']
+    assert list(g.offsets) == [0, 2, 4, 5, 5]
+    assert list(g.targets) == [1, 2, 2, 3, 3]
+    assert list(g.in_degree) == [0, 1, 2, 2]
+    assert list(g.children(1)) == [2, 3]
+    assert g.sinks() == [3]
+
+    parents = g.parents()
+    assert [list(parents.children(u)) for u in range(len(g))] \
+        == [[], [0], [0, 1], [1, 2]]
+    assert list(parents.in_degree) == [2, 2, 1, 0]
+
+
+def test_topological_sort():
+    assert topological_sort(graph) == ['R1', 'R2', 'W1', 'W2']
+    # 이전 Task가 없는 Task부터 들어온 순서대로 꺼낸다.
+    assert topological_sort({'A': ['C'], 'B': ['C'], 'C': []}) \
+        == ['A', 'B', 'C']
+
+
+@pytest.mark.parametrize('g, message', [
+    ({'A': ['B', 'B'], 'B': []}, '두개 이상'),
+    ({'A': [], 'B': []}, '최종 목적지'),
+    ({'A': ['B'], 'B': ['A', 'C'], 'C': []}, '순환'),
+    ({'A': ['X'], 'B': []}, '없습니다'),
+])
+def test_topological_sort_invalid(g, message):
+    with pytest.raises(ValueError, match=message):
+        topological_sort(g)
+
+
+def test_task_space_slots():
+    """
+    TaskSpace는 __slots__를 사용하므로 instance dict가 없다.
+    buffer(deque)는 처음 push할 때 만든다.
+    """
+    task_space = TaskDropColumnSpace('D', 'col0')
+    assert not hasattr(task_space, '__dict__')
+    assert task_space.dataframe_buffer is None
+    assert len(task_space.merge_dataframes_in_buffer()) == 0
+
+    worker = TaskWorker({
+        'task_list': graph,
+        'property': {
+            'R1': {'task_name': 'read', 'filename': 'a.csv', 'sep': ','},
+            'R2': {'task_name': 'read', 'filename': 'a.csv', 'sep': ','},
+            'W1': {'task_name': 'drop', 'column_name': 'col0'},
+            'W2': {'task_name': 'write', 'filename': 'b.csv', 'sep': ','},
+        }
+    })
+    assert worker.task_order == ['R1', 'R2', 'W1', 'W2']
+    assert [t.task_name for t in worker.task_spaces] == worker.compact.names
@@ -2,6 +2,8 @@ import pytest
 from api import get_app, generate_jobdatabase_engine
 import json
 
+from utils.algorithms import is_filter_expression
+
 # 이것만 사용한다.
 CREATE_API = '/api/jobs'
 
@@ -203,3 +205,122 @@ def test_success(api):
         }
     }
     check_only_status(api, job, 201)
+
+
+def test_property_read_options(api):
+    """
+    read의 선택 property는 형식이 맞아야 한다.
+    """
+    def job_with(options):
+        read = {'task_name': 'read', 'filename': 'a.csv', 'sep': ','}
+        read.update(options)
+        return {
+            'job_name': 'Job1',
+            'task_list': {'R1': ['W1'], 'W1': []},
+            'property': {
+                'R1': read,
+                'W1': {'task_name': 'write', 'filename': 'b.csv', 'sep': ','},
+            }
+        }
+
+    check_only_status(api, job_with({'auto_compact': True,
+                                     'dtype': {'col0': 'category'}}), 201)
+    check_only_status(api, job_with({'auto_compact': 'yes'}), 400)
+    check_only_status(api, job_with({'dtype': {'col0': 'no-such-type'}}), 400)
+    check_only_status(api, job_with({'dtype': {'col0': 'datetime64[ns]'}}),
+                      400)
+    check_only_status(api, job_with({'unknown_option': 1}), 400)
+    check_only_status(api, job_with({'compression': 'gzip'}), 201)
+    check_only_status(api, job_with({'compression': 'rar'}), 400)
+    check_only_status(api, job_with({'compression_level': 3}), 400)
+
+
+def test_property_write_compression(api, monkeypatch):
+    """
+    압축 수준은 압축 방식(지정하지 않으면 확장자로 추정)의 범위 안이어야 하고
+    압축 라이브러리가 없는 압축 방식은 사용할 수 없다.
+    """
+    from libs.resource_access import compression
+
+    def job_with(options):
+        write = {'task_name': 'write', 'filename': 'b.csv', 'sep': ','}
+        write.update(options)
+        return {
+            'job_name': 'Job1',
+            'task_list': {'R1': ['W1'], 'W1': []},
+            'property': {
+                'R1': {'task_name': 'read', 'filename': 'a.csv', 'sep': ','},
+                'W1': write,
+            }
+        }
+
+    for method, (low, high) in (('gzip', (1, 9)), ('bz2', (1, 9)),
+                                ('xz', (0, 9))):
+        for level, status in ((low - 1, 400), (low, 201), (high, 201),
+                              (high + 1, 400)):
+            check_only_status(api, job_with({'compression': method,
+                                              'compression_level': level}),
+                              status)
+    check_only_status(api, job_with({'filename': 'b.csv.gz',
+                                     'compression_level': 12}), 400)
+    check_only_status(api, job_with({'compression_level': '9'}), 400)
+
+    # zstandard가 설치된 경우
+    monkeypatch.setitem(compression.COMPRESSION_MODULES, 'zstd', 'json')
+    check_only_status(api, job_with({'compression': 'zstd',
+                                     'compression_level': 22}), 201)
+    check_only_status(api, job_with({'compression': 'zstd',
+                                     'compression_level': 0}), 400)
+    # zstandard가 설치되지 않은 경우
+    monkeypatch.setitem(compression.COMPRESSION_MODULES, 'zstd',
+                        'no_such_zstandard')
+    check_only_status(api, job_with({'compression': 'zstd'}), 400)
+    check_only_status(api, job_with({'filename': 'b.csv.zst'}), 400)
+
+
+def test_property_filter_expression(api):
+    """
+    filter의 expression은 허용된 문법만 사용해야 한다.
+    """
+    def job_with(expression):
+        return {
+            'job_name': 'Job1',
+            'task_list': {'R1': ['F1'], 'F1': ['W1'], 'W1': []},
+            'property': {
+                'R1': {'task_name': 'read', 'filename': 'a.csv', 'sep': ','},
+                'F1': {'task_name': 'filter', 'expression': expression},
+                'W1': {'task_name': 'write', 'filename': 'b.csv', 'sep': ','},
+            }
+        }
+
+    check_only_status(api, job_with("col0 == 'data00' or col1 != 'x'"), 201)
+    check_only_status(api, job_with("col0 =="), 400)
+    check_only_status(api, job_with("__import__('os').system('ls')"), 400)
+    check_only_status(api, job_with("col0.str.len() > 1"), 400)
+    check_only_status(api, job_with(1), 400)
+    # 상수 거듭제곱은 계산이 끝나지 않을 수 있다.
+    check_only_status(api, job_with("col0 == 9**9**9"), 400)
+    assert not is_filter_expression("col0 == 9**9**9")
+    assert not is_filter_expression("col0 ** 2 > 4")
+
+
+def test_property_aggregate(api):
+    """
+    aggregate는 group_by, aggregations 형식이 맞아야 한다.
+    """
+    def job_with(group_by, aggregations):
+        return {
+            'job_name': 'Job1',
+            'task_list': {'R1': ['A1'], 'A1': ['W1'], 'W1': []},
+            'property': {
+                'R1': {'task_name': 'read', 'filename': 'a.csv', 'sep': ','},
+                'A1': {'task_name': 'aggregate', 'group_by': group_by,
+                       'aggregations': aggregations},
+                'W1': {'task_name': 'write', 'filename': 'b.csv', 'sep': ','},
+            }
+        }
+
+    check_only_status(api, job_with(['col0'], {'col1': ['count', 'max']}), 201)
+    check_only_status(api, job_with([], {'col1': 'count'}), 400)
+    check_only_status(api, job_with(['col0'], {'col1': 'median'}), 400)
+    check_only_status(api, job_with(['col0'], {'col0': 'count'}), 400)
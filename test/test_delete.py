@@ -53,3 +53,16 @@ def test_remove_success(api):
 
 def test_not_found(api):
     assert api.delete(f'{API}/9999').status_code == 404
+
+
+def test_job_id_not_reused(api):
+    """
+    삭제된 Job의 ID는 다시 발급하지 않는다.
+    """
+    assert api.delete(f'{API}/1').status_code == 204
+    assert api.delete(f'{API}/3').status_code == 204
+    res = api.post(CREATE_API, data=json.dumps(example_job),
+                   content_type='application/json')
+    assert res.get_json()['job_id'] == 4
+    assert api.get(f'{API}/2').get_json()['job_id'] == 2
+    assert api.get(f'{API}/4').get_json()['job_id'] == 4
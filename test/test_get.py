@@ -47,9 +47,10 @@ def api():
 
 
 def test_success_to_get(api):
-    # job_id을 추가하면 예상 답안이 된다.
+    # job_id, version을 추가하면 예상 답안이 된다.
     answer = example_job.copy()
     answer['job_id'] = job_id
+    answer['version'] = 1
 
     res = api.get(f'{API}/{job_id}')
 
@@ -57,6 +58,27 @@ def test_success_to_get(api):
     assert res.get_json() == answer
 
 
+def test_not_modified(api):
+    """
+    ETag가 같으면 내용 없이 304, 수정된 다음에는 다시 200
+    """
+    res = api.get(f'{API}/{job_id}')
+    etag = res.headers['ETag']
+    assert etag == f'"{job_id}-1"'
+
+    res = api.get(f'{API}/{job_id}', headers={'If-None-Match': etag})
+    assert res.status_code == 304
+    assert res.data == b''
+    assert res.headers['ETag'] == etag
+
+    assert api.patch(f'{API}/{job_id}', data=json.dumps(example_job),
+                     content_type='application/json').status_code == 201
+    res = api.get(f'{API}/{job_id}', headers={'If-None-Match': etag})
+    assert res.status_code == 200
+    assert res.get_json()['version'] == 2
+    assert res.headers['ETag'] == f'"{job_id}-2"'
+
+
 def test_failed_to_get(api):
     """
     없는 Job_ID 면 찾기 불가
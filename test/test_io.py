@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+from libs.resource_access import RawFileAtomicWrite
+from libs.resource_access import io as io_module
+
+
+def test_atomic_write_failure_keeps_original(tmp_path, monkeypatch):
+    """
+    with 블록 안에서 Exception이 발생하거나 fsync에 실패하면 기존 파일은 그대로 남고 임시 파일은 삭제된다.
+    """
+    path = tmp_path / 'jobs.json'
+    path.write_text('{"jobs": []}', encoding='utf-8')
+
+    with pytest.raises(RuntimeError):
+        with RawFileAtomicWrite(str(path)) as w:
+            w.write('{"jobs": [{"job_id": 1')
+            raise RuntimeError('write failed')
+
+    assert path.read_text(encoding='utf-8') == '{"jobs": []}'
+    assert os.listdir(tmp_path) == ['jobs.json']
+
+    # fsync에 실패해도 임시 파일의 fd를 닫고 임시 파일을 삭제한다.
+    def fail_fsync(fd):
+        raise OSError('fsync failed')
+    monkeypatch.setattr(io_module.os, 'fsync', fail_fsync)
+    open_fds = len(os.listdir('/proc/self/fd'))
+    with pytest.raises(OSError):
+        with RawFileAtomicWrite(str(path)) as w:
+            w.write('{"jobs": [{"job_id": 1}]}')
+    assert len(os.listdir('/proc/self/fd')) == open_fds
+    assert path.read_text(encoding='utf-8') == '{"jobs": []}'
+    assert os.listdir(tmp_path) == ['jobs.json']
+
+
+def test_atomic_write_replaces_file(tmp_path):
+    """
+    작성을 마치면 임시 파일을 기존 파일 이름으로 바꾸고, 기존 파일의 권한을 유지한다.
+    """
+    path = tmp_path / 'out.csv'
+    path.write_bytes(b'old')
+    os.chmod(path, 0o640)
+
+    with RawFileAtomicWrite(str(path), binary=True,
+                            fsync_directory=True) as w:
+        w.write('한글,1\n'.encode('utf-8'))
+        # 작성하는 동안에는 기존 파일이 그대로 보인다.
+        assert path.read_bytes() == b'old'
+
+    assert path.read_bytes() == '한글,1\n'.encode('utf-8')
+    assert os.stat(path).st_mode & 0o777 == 0o640
+    assert os.listdir(tmp_path) == ['out.csv']
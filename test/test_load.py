@@ -0,0 +1,28 @@
+import pytest
+
+from api import generate_jobdatabase_engine
+from benchmark.load_test import run_load_test
+
+
+@pytest.fixture
+def engine():
+    yield generate_jobdatabase_engine()
+
+    generate_jobdatabase_engine().reset()
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_load_consistency(engine, processes):
+    """
+    여러 thread/process에서 create/get/update/delete/run 요청을 섞어 보내도
+    오류가 없고 jobs.json이 각 client가 기대한 상태와 같아야 한다.
+    """
+    report = run_load_test(threads=4, processes=processes, requests=40,
+                           seed=processes)
+    assert report['requests'] == 4 * processes * 40
+    assert report['errors'] == {}
+    assert report['problems'] == []
+    assert set(report['latency']) <= {'create', 'get', 'update', 'delete',
+                                      'run'}
+    # 만든 Job은 삭제된다.
+    assert engine.warm_up()['jobs'] == 0
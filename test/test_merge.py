@@ -0,0 +1,162 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.algorithms import MergeCheckError
+from utils.job_database.task.task_algorithms import merge_dataframes, \
+    DataFrameJoiner, merge_with_options, count_merge_rows, get_key_counts
+
+
+def merge_one_by_one(frames):
+    merged = pd.DataFrame()
+    for frame in frames:
+        merged, _ = merge_dataframes(merged, frame)
+    return merged
+
+
+def join_all(frames):
+    joiner = DataFrameJoiner()
+    strategies = [joiner.join(frame)['strategy'] for frame in frames]
+    return joiner.result(), strategies
+
+
+def test_joiner_equals_merge():
+    """
+    DataFrameJoiner의 결과는 merge_dataframes를 차례대로 호출한 결과와 같아야 한다.
+    """
+    rng = np.random.default_rng(0)
+    for trial in range(50):
+        keys = ['k1'] if trial % 2 else ['k1', 'k2']
+        frames = []
+        for i in range(4):
+            n = int(rng.integers(1, 40))
+            frame = pd.DataFrame({
+                'k1': rng.integers(0, 10, n),
+                'k2': rng.choice(['a', 'b', 'c'], n),
+                f'v{i}': rng.random(n),
+            })
+            frames.append(frame[keys + [f'v{i}']])
+        if trial % 5 == 0:
+            # 겹치는 column이 없는 데이터
+            frames.append(pd.DataFrame({'other': rng.random(5)}))
+
+        answer = merge_one_by_one(frames)
+        output, _ = join_all(frames)
+        assert output.equals(answer)
+
+
+def test_joiner_strategies():
+    sorted_frames = [
+        pd.DataFrame({'id': [1, 2, 3], 'a': ['a1', 'a2', 'a3']}),
+        pd.DataFrame({'id': [2, 3, 4], 'b': ['b2', 'b3', 'b4']}),
+        pd.DataFrame({'id': [4, 1, 3], 'c': ['c4', 'c1', 'c3']}),
+        pd.DataFrame({'id': [1.0, np.nan], 'd': ['d1', 'dn']}),
+    ]
+    output, strategies = join_all(sorted_frames)
+    assert strategies == ['concat', 'sort_merge', 'hash', 'merge']
+    assert output.equals(merge_one_by_one(sorted_frames))
+
+
+def test_joiner_sort_merge():
+    """
+    정렬된 key로 병합(sort_merge)해도 merge_dataframes와 결과(dtype 포함)가 같아야 한다.
+    """
+    frames = [
+        pd.DataFrame({'id': [1, 2, 4, 5], 'a': [10, 20, 40, 50],
+                      'name': ['a1', 'a2', 'a4', 'a5']}),
+        pd.DataFrame({'id': [2, 3, 3, 5], 'b': [0.5, 1.5, 2.5, 3.5],
+                      'n': pd.array([1, None, 3, 4], dtype='Int64')}),
+        pd.DataFrame({'id': [0, 3, 6], 'c': pd.Categorical(['x', 'y', 'x']),
+                      'flag': [True, False, True]}),
+        pd.DataFrame({'id': [0, 1, 2, 3, 4, 5, 6], 'd': range(7)}),
+    ]
+    output, strategies = join_all(frames)
+    assert strategies == ['concat'] + ['sort_merge'] * 3
+    answer = merge_one_by_one(frames)
+    assert output.equals(answer)
+    assert output.dtypes.equals(answer.dtypes)
+
+
+def test_joiner_key_dtypes():
+    """
+    key dtype이 다르거나 index로 바뀌는 dtype이어도 merge_dataframes와 key dtype이 같아야 한다.
+    """
+    cases = [
+        # 서로 다른 category, category와 문자열
+        [pd.DataFrame({'k': pd.Categorical(['a', 'b', 'c']), 'x': [1, 2, 3]}),
+         pd.DataFrame({'k': pd.Categorical(['b', 'c', 'd']), 'y': [4, 5, 6]}),
+         pd.DataFrame({'k': ['a', 'd', 'e'], 'z': [7, 8, 9]})],
+        # int와 float, int32
+        [pd.DataFrame({'k': [1, 2, 3], 'x': [1, 2, 3]}),
+         pd.DataFrame({'k': [2.0, 3.0, 4.0], 'y': [4, 5, 6]}),
+         pd.DataFrame({'k': np.array([3, 1, 5], dtype='int32'),
+                       'z': [7, 8, 9]})],
+        [pd.DataFrame({'k': np.array([1, 2, 3], dtype='int32'), 'x': [1, 2, 3]}),
+         pd.DataFrame({'k': np.array([3, 1, 5], dtype='int32'),
+                       'y': [4, 5, 6]})],
+    ]
+    for frames in cases:
+        output, _ = join_all(frames)
+        pd.testing.assert_frame_equal(output, merge_one_by_one(frames),
+                                      check_dtype=True)
+
+
+def test_merge_options():
+    """
+    병합 옵션이 있으면 on column으로 how 방식의 pd.merge를 한다.
+    """
+    left = pd.DataFrame({'id': [1, 2, 3], 'name': ['a', 'b', 'c']})
+    right = pd.DataFrame({'id': [2, 3, 4], 'name': ['B', 'C', 'D'],
+                          'score': [20, 30, 40]})
+    joiner = DataFrameJoiner({'how': 'inner', 'on': ['id']})
+    joiner.join(left)
+    log = joiner.join(right)
+    assert log['strategy'] == 'merge' and log['how'] == 'inner'
+    assert joiner.result().equals(
+        pd.merge(left, right, how='inner', on=['id']))
+
+    merged, keys = merge_dataframes(left, right, {'how': 'left'})
+    assert keys == ['id', 'name'] and len(merged) == 3
+    # 기본값과 같은 옵션은 기존 방식으로 병합한다.
+    assert DataFrameJoiner({'how': 'outer'}).options is None
+
+
+def test_merge_check():
+    """
+    key가 중복되거나 결과 행 갯수가 max_row_factor를 넘으면 병합하지 않고 실패한다.
+    """
+    left = pd.DataFrame({'k': [1, 1, 1, 2, np.nan], 'a': range(5)})
+    right = pd.DataFrame({'k': [1, 1, 2, 3, np.nan], 'b': range(5)})
+    rows, _ = count_merge_rows(get_key_counts(left, ['k']),
+                               get_key_counts(right, ['k']), ['k'], 'outer')
+    assert rows == len(pd.merge(left, right, how='outer', on='k'))
+    for how in ('inner', 'left', 'right'):
+        rows, _ = count_merge_rows(get_key_counts(left, ['k']),
+                                   get_key_counts(right, ['k']), ['k'], how)
+        assert rows == len(pd.merge(left, right, how=how, on='k'))
+
+    with pytest.raises(MergeCheckError) as e:
+        merge_with_options(left, right, {'validate': 'many_to_one'})
+    assert e.value.reason == 'validate'
+    assert e.value.details['side'] == 'right'
+    assert e.value.details['top_keys'] == [{'key': [1.0], 'rows': 2}]
+
+    with pytest.raises(MergeCheckError) as e:
+        merge_with_options(left, right, {'max_row_factor': 1.5})
+    assert e.value.reason == 'max_row_factor'
+    assert e.value.details['result_rows'] == 9
+    assert e.value.details['max_rows'] == 7
+    assert e.value.details['top_keys'][0] == \
+        {'key': [1.0], 'left': 3, 'right': 2, 'rows': 6}
+    merged, log = merge_with_options(left, right, {'max_row_factor': 2})
+    assert len(merged) == log['expected_rows'] == 9
+
+    with pytest.raises(MergeCheckError) as e:
+        merge_with_options(left, right, {'on': ['k', 'x']})
+    assert e.value.details['left_missing'] == ['x']
+
+    # process executor에서 전달할 수 있어야 한다.
+    error = pickle.loads(pickle.dumps(e.value))
+    assert error.to_dict() == e.value.to_dict()
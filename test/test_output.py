@@ -0,0 +1,157 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api import get_app, generate_jobdatabase_engine
+from utils.job_database.task.task_output import INDEX_STRIDE
+
+CREATE_API = '/api/jobs'
+API = '/api/jobs'
+STORAGE_ROOT = 'storage/data'
+
+
+@pytest.fixture
+def api():
+    app, api = get_app()
+    yield app.test_client()
+
+    generate_jobdatabase_engine().reset()
+
+
+def upload_job(job, api) -> int:
+    res = api.post(CREATE_API, data=json.dumps(job),
+                   content_type='application/json')
+    assert res.status_code == 201
+    return res.get_json()['job_id']
+
+
+def test_output_preview(api):
+    """
+    결과 파일의 일부만 읽는다. index가 있으면 가까운 위치로 바로 이동한다.
+    """
+    rows = INDEX_STRIDE * 2 + 100
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({'id': np.arange(rows), 'value': rng.random(rows),
+                         'name': [f'n{i}' if i % 7 else None
+                                  for i in range(rows)]})
+    data.to_csv(f'{STORAGE_ROOT}/preview_in.csv', index=False)
+    job_id = upload_job({
+        'job_name': 'preview',
+        'task_list': {'R': ['W'], 'W': ['Z'], 'Z': []},
+        'property': {
+            'R': {'task_name': 'read', 'filename': 'preview_in.csv',
+                  'sep': ','},
+            'W': {'task_name': 'write', 'filename': 'preview_out.csv',
+                  'sep': ','},
+            'Z': {'task_name': 'write', 'filename': 'preview_out.csv.gz',
+                  'sep': ','},
+        }
+    }, api)
+
+    # 실행 전에는 결과 파일이 없다.
+    assert api.get(f'{API}/{job_id}/output?task=W').status_code == 404
+    assert api.get(f'{API}/{job_id}/run').status_code == 200
+
+    offset = INDEX_STRIDE + 10
+    res = api.get(f'{API}/{job_id}/output?task=W&offset={offset}&limit=5'
+                  f'&columns=name,id')
+    assert res.status_code == 200
+    page = res.get_json()
+    expected = data.iloc[offset:offset + 5][['name', 'id']]
+    assert page['columns'] == ['name', 'id']
+    assert page['rows'] == expected.astype(object) \
+        .where(expected.notna(), None).values.tolist()
+    assert page['indexed'] and page['total_rows'] == rows
+    assert page['next_offset'] == offset + 5
+
+    # 마지막 페이지
+    page = api.get(f'{API}/{job_id}/output?task=W&offset={rows - 3}'
+                   f'&limit=10').get_json()
+    assert len(page['rows']) == 3 and page['next_offset'] is None
+
+    # csv 형식, 압축 파일(index 없음)
+    output = pd.read_csv(f'{STORAGE_ROOT}/preview_out.csv')
+    for task in ('W', 'Z'):
+        res = api.get(f'{API}/{job_id}/output?task={task}&offset=3&limit=4'
+                      f'&format=csv')
+        assert res.status_code == 200
+        assert res.headers['Content-Type'].startswith('text/csv')
+        assert res.headers['X-Next-Offset'] == '7'
+        preview = pd.read_csv(io.StringIO(res.get_data(as_text=True)))
+        assert preview.equals(output.iloc[3:7].reset_index(drop=True))
+
+
+def test_output_preview_options(api):
+    job_id = upload_job({
+        'job_name': 'preview',
+        'task_list': {'R': ['W'], 'W': []},
+        'property': {
+            'R': {'task_name': 'read', 'filename': 'a.csv', 'sep': ','},
+            'W': {'task_name': 'write', 'filename': 'preview_a.csv',
+                  'sep': ','},
+        }
+    }, api)
+    assert api.get(f'{API}/{job_id}/run').status_code == 200
+    # write Task가 하나면 task 생략 가능
+    assert api.get(f'{API}/{job_id}/output').status_code == 200
+    for query in ('limit=0', 'offset=-1', 'limit=abc', 'format=xml',
+                  'task=R', 'columns=nothing'):
+        assert api.get(f'{API}/{job_id}/output?{query}').status_code == 400
+    assert api.get(f'{API}/9999/output').status_code == 404
+
+
+def test_output_path_outside_data_dir(api, monkeypatch, tmp_path):
+    """
+    read/write Task의 filename은 data 디렉토리 밖을 가리킬 수 없다.
+    (이미 저장된 Job이어도 결과 미리보기는 data 디렉토리 밖의 파일을 읽지 않는다.)
+    """
+    import os
+    from utils.validator_logics import job_validator_logics
+
+    os.symlink(tmp_path, f'{STORAGE_ROOT}/outside_link')
+    try:
+        for filename in ('../preview.csv', '/etc/passwd', 'sub/../../x.csv',
+                         '../*.csv', 'outside_link/x.csv'):
+            for task in ('R', 'W'):
+                job = {
+                    'job_name': 'outside',
+                    'task_list': {'R': ['W'], 'W': []},
+                    'property': {
+                        'R': {'task_name': 'read', 'filename': 'a.csv',
+                              'sep': ','},
+                        'W': {'task_name': 'write', 'filename': 'out.csv',
+                              'sep': ','},
+                    }
+                }
+                job['property'][task]['filename'] = filename
+                res = api.post(CREATE_API, data=json.dumps(job),
+                               content_type='application/json')
+                assert res.status_code == 400
+    finally:
+        os.unlink(f'{STORAGE_ROOT}/outside_link')
+
+    # data 디렉토리 안의 하위 디렉토리, glob 패턴은 사용할 수 있다.
+    job = {
+        'job_name': 'inside',
+        'task_list': {'R': ['W'], 'W': []},
+        'property': {
+            'R': {'task_name': 'read', 'filename': 'sub/../shards/*.csv',
+                  'sep': ','},
+            'W': {'task_name': 'write', 'filename': 'sub/out.csv',
+                  'sep': ','},
+        }
+    }
+    upload_job(job, api)
+
+    # 검사 전에 저장된 Job
+    monkeypatch.setattr(job_validator_logics, 'is_path_inside',
+                        lambda base_dir, filename: True)
+    job['property']['W']['filename'] = '../../etc/passwd'
+    job_id = upload_job(job, api)
+    monkeypatch.undo()
+    res = api.get(f'{API}/{job_id}/output')
+    assert res.status_code == 400
+    assert 'outside' in res.get_json()['err']
@@ -0,0 +1,89 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api import get_app, generate_jobdatabase_engine
+
+CREATE_API = '/api/jobs'
+API = '/api/jobs'
+STORAGE_ROOT = 'storage/data'
+
+
+@pytest.fixture
+def api():
+    app, api = get_app()
+    yield app.test_client()
+
+    generate_jobdatabase_engine().reset()
+
+
+def upload_job(job, api) -> int:
+    res = api.post(CREATE_API, data=json.dumps(job),
+                   content_type='application/json')
+    assert res.status_code == 201
+    return res.get_json()['job_id']
+
+
+def test_plan_estimates(api):
+    """
+    실행하지 않고 행 갯수, 병합 방식, many-to-many 병합을 추정한다.
+    """
+    rows = 20000
+    rng = np.random.default_rng(0)
+    pd.DataFrame({'key': rng.integers(0, 100, rows),
+                  'left': rng.random(rows)}) \
+        .to_csv(f'{STORAGE_ROOT}/plan_left.csv', index=False)
+    pd.DataFrame({'key': rng.integers(0, 100, 500),
+                  'right': rng.random(500)}) \
+        .to_csv(f'{STORAGE_ROOT}/plan_right.csv', index=False)
+    pd.DataFrame({'name': [f'name{i}' for i in range(rows)]}) \
+        .to_csv(f'{STORAGE_ROOT}/plan_name.csv', index=False)
+
+    job_id = upload_job({
+        'job_name': 'plan',
+        'task_list': {'L': ['C'], 'N': ['C'], 'C': ['J'],
+                      'R': ['J'], 'J': ['W'], 'W': []},
+        'property': {
+            'L': {'task_name': 'read', 'filename': 'plan_left.csv',
+                  'sep': ','},
+            'N': {'task_name': 'read', 'filename': 'plan_name.csv',
+                  'sep': ','},
+            'C': {'task_name': 'drop', 'column_name': 'none'},
+            'R': {'task_name': 'read', 'filename': 'plan_right.csv',
+                  'sep': ','},
+            'J': {'task_name': 'drop', 'column_name': 'right'},
+            'W': {'task_name': 'write', 'filename': 'plan_out.csv',
+                  'sep': ','},
+        }
+    }, api)
+
+    res = api.get(f'{API}/{job_id}/plan')
+    assert res.status_code == 200
+    plan = res.get_json()
+    tasks = plan['tasks']
+    assert plan['order'][-1] == 'W'
+
+    # 파일 크기와 앞부분 sample로 추정한 행 갯수
+    assert abs(tasks['L']['file_rows'] - rows) < rows * 0.05
+    assert tasks['R']['file_rows'] == 500
+
+    # 겹치는 column이 없으면 concat, 있으면 key join
+    assert [m['type'] for m in tasks['C']['merges']] == ['concat']
+    join, = tasks['J']['merges']
+    assert join['type'] == 'join' and join['keys'] == ['key']
+    assert join['many_to_many']
+    assert {w['type'] for w in plan['warnings'] if w['task'] == 'J'} \
+        == {'many_to_many', 'row_growth'}
+    assert 'right' not in tasks['J']['columns']
+    assert plan['peak_memory'] >= tasks['J']['estimated_bytes'] > 0
+
+    # 실제 실행 결과와 비교 (양쪽 key가 모두 겹치므로 추정값과 비슷해야 한다.)
+    assert api.get(f'{API}/{job_id}/run').status_code == 200
+    actual = len(pd.read_csv(f'{STORAGE_ROOT}/plan_out.csv'))
+    assert abs(tasks['J']['rows'] - actual) < actual * 0.2
+
+
+def test_plan_not_found(api):
+    assert api.get(f'{API}/9999/plan').status_code == 404
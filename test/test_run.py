@@ -1,4 +1,5 @@
 import json
+import os
 from typing import List, Tuple, Dict, Any
 
 import pytest
@@ -185,4 +186,690 @@ def test_with_remove_column(api):
     assert set(output.columns.values.tolist()) == set(writed_profile[1])
 
     output = pd.read_csv(f'{STORAGE_ROOT}/{writed_sns[0]}')
-    assert set(output.columns.values.tolist()) == set(writed_sns[1])
\ No newline at end of file
+    assert set(output.columns.values.tolist()) == set(writed_sns[1])
+
+def test_read_with_auto_compact(api):
+    """
+    auto_compact로 읽어도 결과 데이터는 동일해야 하며
+    실행 기록에 행당 메모리 사용량이 남아야 한다.
+    """
+    input_file = 'compact.csv'
+    output_file = 'compact_out.csv'
+    input_data = pd.DataFrame({
+        'id': list(range(100)),
+        'city': ['Seoul', 'Busan'] * 50,
+        'score': [0.5, 1.5, 2.25, 3.0] * 25,
+    })
+    save_files([(input_file, input_data)])
+
+    job = {
+        'job_name': 'Compact',
+        'task_list': {'R': ['W'], 'W': []},
+        'property': {
+            'R': {'task_name': 'read', 'filename': input_file, 'sep': ',',
+                  'auto_compact': True, 'dtype': {'id': 'int64'}},
+            'W': {'task_name': 'write', 'filename': output_file, 'sep': ','},
+        }
+    }
+    upload_job(job, api)
+
+    res = api.get(f'{RUN_API}/1/run')
+    assert res.status_code == 200
+
+    log = res.get_json()['trace']['R'][0]['log']
+    assert log['dtypes']['city'] == 'category'
+    assert log['dtypes']['id'] == 'int64'
+    assert log['bytes_per_row_after'] < log['bytes_per_row_before']
+
+    output = pd.read_csv(f'{STORAGE_ROOT}/{output_file}')
+    assert output.equals(input_data) is True
+
+
+def test_process_executor(api):
+    """
+    process pool로 실행해도 serial로 실행한 결과와 같아야 한다.
+    """
+    engine = generate_jobdatabase_engine()
+    file_user = ('user.csv', pd.DataFrame({'name': ['n1', 'n2', 'n3']}))
+    file_profile = ('profile.csv', pd.DataFrame({
+        'name': ['n1', 'n2', 'n4'],
+        'age': [10, 20, 40],
+    }))
+    file_score = ('score.csv', pd.DataFrame({'score': [1.5, 2.5]}))
+    job = {
+        'job_name': 'Process',
+        'task_list': {
+            'R1': ['R2', 'D'],
+            'R2': ['W'],
+            'D': ['W'],
+            'R3': ['W'],
+            'W': [],
+        },
+        'property': {
+            'R1': {'task_name': 'read', 'filename': file_user[0], 'sep': ','},
+            'R2': {'task_name': 'read', 'filename': file_profile[0], 'sep': ','},
+            'R3': {'task_name': 'read', 'filename': file_score[0], 'sep': ','},
+            'D': {'task_name': 'drop', 'column_name': 'age'},
+            'W': {'task_name': 'write', 'filename': 'out.csv', 'sep': ','},
+        }
+    }
+    save_files([file_user, file_profile, file_score])
+    upload_job(job, api)
+
+    assert api.get(f'{RUN_API}/1/run').status_code == 200
+    answer = pd.read_csv(f'{STORAGE_ROOT}/out.csv')
+
+    engine.task_executor, engine.task_workers = 'process', 2
+    try:
+        res = api.get(f'{RUN_API}/1/run')
+    finally:
+        engine.task_executor, engine.task_workers = 'serial', None
+    assert res.status_code == 200
+    output = pd.read_csv(f'{STORAGE_ROOT}/out.csv')
+    assert output.equals(answer) is True
+
+    # 실행할 때마다 만들지 않고 같은 process pool을 사용한다.
+    from utils.job_database.task import start_process_pool
+    pool = start_process_pool(2)
+    engine.task_executor, engine.task_workers = 'process', 2
+    try:
+        assert api.get(f'{RUN_API}/1/run').status_code == 200
+    finally:
+        engine.task_executor, engine.task_workers = 'serial', None
+    assert start_process_pool(2) is pool
+
+
+def test_frame_transport():
+    """
+    SharedMemory로 넘긴 DataFrame은 dtype과 index까지 같아야 하고
+    숫자 column은 복사하지 않은 읽기 전용 배열이다.
+    """
+    import numpy as np
+    from utils.job_database.task.task_transport import export_frame, \
+        import_frame, release_frame, close_shared_memory
+
+    dataframe = pd.DataFrame({
+        'name': pd.Series(['가나', None, 'b', ''], dtype='str'),
+        'code': pd.Series(['x', 'y', 'z', 'w'], dtype=object),
+        'mixed': pd.Series(['a', 1, None, 'd'], dtype=object),
+        'value': [1.5, 2.5, 3.5, 4.5],
+        'city': pd.Categorical(['s', 'b', 's', 'b']),
+    }, index=[3, 3, 1, 0])
+    handle = export_frame(dataframe)
+    kinds = {spec[1]: spec[0] for spec in handle.columns}
+    assert kinds == {'name': 'string', 'code': 'string', 'mixed': 'pickled',
+                     'value': 'shared', 'city': 'category'}
+    try:
+        output, shm = import_frame(handle)
+        assert output.equals(dataframe)
+        assert output.dtypes.equals(dataframe.dtypes)
+        values = output['value'].to_numpy()
+        assert not values.flags.writeable
+        assert np.shares_memory(values, np.frombuffer(shm.buf, dtype=np.uint8))
+        del output, values
+        close_shared_memory(shm)
+    finally:
+        release_frame(handle)
+
+
+def test_parallel_read(api, monkeypatch):
+    """
+    파일을 나눠서 읽어도 한번에 읽은 결과와 같아야 한다.
+    """
+    from utils.job_database.task import task_reader
+    monkeypatch.setattr(task_reader, 'PARALLEL_MIN_CHUNK_BYTES', 16)
+
+    input_file, output_file = 'parallel.csv', 'parallel_out.csv'
+    input_data = pd.DataFrame({
+        'id': list(range(200)),
+        'name': [f'name{i}' if i > 120 else None for i in range(200)],
+    })
+    save_files([(input_file, input_data)])
+    job = {
+        'job_name': 'Parallel',
+        'task_list': {'R': ['W'], 'W': []},
+        'property': {
+            'R': {'task_name': 'read', 'filename': input_file, 'sep': ',',
+                  'parallel': 4},
+            'W': {'task_name': 'write', 'filename': output_file, 'sep': ','},
+        }
+    }
+    upload_job(job, api)
+    assert api.get(f'{RUN_API}/1/run').status_code == 200
+
+    output = pd.read_csv(f'{STORAGE_ROOT}/{output_file}')
+    assert output.equals(pd.read_csv(f'{STORAGE_ROOT}/{input_file}')) is True
+    _, ranges = task_reader.split_byte_ranges(f'{STORAGE_ROOT}/{input_file}', 4)
+    assert len(ranges) == 4
+
+
+def test_parallel_read_quoted_newline(monkeypatch, tmp_path):
+    """
+    파일 뒷부분(따옴표 확인 단위 이후)에만 따옴표로 감싼 줄바꿈이 있어도 나눠서 읽지 않는다.
+    """
+    from utils.job_database.task import task_reader
+    monkeypatch.setattr(task_reader, 'PARALLEL_MIN_CHUNK_BYTES', 16)
+
+    path = str(tmp_path / 'quoted.csv')
+    rows = task_reader.QUOTE_SCAN_BLOCK_BYTES // 10 + 100
+    with open(path, 'w') as f:
+        f.write('id,name\n')
+        f.writelines(f'{i},n{i}\n' for i in range(rows))
+        # 뒤쪽 절반은 줄바꿈이 들어간 값이라 byte 범위 경계가 값 중간에 생긴다.
+        f.writelines(f'{i},"{"x" * 60}\nsecond"\n'
+                     for i in range(rows, rows + rows // 5))
+    assert task_reader.has_quote_char(path)
+
+    _, output = task_reader.read_csv_with_rows(path, ',', 4)
+    assert output.equals(pd.read_csv(path)) is True
+    assert output['name'].iloc[-1] == 'x' * 60 + '\nsecond'
+
+
+def test_parallel_read_scans_once(monkeypatch, tmp_path):
+    """
+    나눠서 읽을 때 byte 범위(따옴표 확인, 줄바꿈 위치)는 한번만 구한다.
+    """
+    from utils.job_database.task import task_reader
+    monkeypatch.setattr(task_reader, 'PARALLEL_MIN_CHUNK_BYTES', 16)
+    calls = []
+    get_byte_ranges = task_reader.get_byte_ranges
+
+    def counting_get_byte_ranges(*args):
+        calls.append(args)
+        return get_byte_ranges(*args)
+    monkeypatch.setattr(task_reader, 'get_byte_ranges',
+                        counting_get_byte_ranges)
+
+    path = str(tmp_path / 'scan.csv')
+    pd.DataFrame({'id': range(200), 'v': range(200)}).to_csv(path, index=False)
+    for predicate in (None, 'id % 2 == 0'):
+        calls.clear()
+        rows, output = task_reader.read_csv_with_rows(path, ',', 4,
+                                                      predicate=predicate)
+        assert rows == 200 and len(calls) == 1
+        assert output.equals(pd.read_csv(path).query(predicate)
+                             if predicate else pd.read_csv(path)) is True
+
+
+def test_compressed_read_write(api):
+    """
+    압축 파일을 압축을 풀지 않고 읽고, 결과를 압축해서 작성한다.
+    """
+    input_file, output_file = 'compressed.csv.gz', 'compressed_out.csv.bz2'
+    input_data = pd.DataFrame({'id': [1, 2, 3], 'name': ['a', 'b', 'c']})
+    input_data.to_csv(f'{STORAGE_ROOT}/{input_file}', index=False)
+    job = {
+        'job_name': 'Compressed',
+        'task_list': {'R': ['W'], 'W': []},
+        'property': {
+            'R': {'task_name': 'read', 'filename': input_file, 'sep': ',',
+                  'parallel': 2},
+            'W': {'task_name': 'write', 'filename': output_file, 'sep': ',',
+                  'compression_level': 9},
+        }
+    }
+    upload_job(job, api)
+    assert api.get(f'{RUN_API}/1/run').status_code == 200
+
+    with open(f'{STORAGE_ROOT}/{output_file}', 'rb') as f:
+        assert f.read(3) == b'BZh'
+    output = pd.read_csv(f'{STORAGE_ROOT}/{output_file}')
+    assert output.equals(input_data) is True
+
+
+def test_filter_pushdown(api):
+    """
+    filter 조건은 read Task로 옮겨서 읽을 때 적용되고
+    조건을 옮기지 않은 결과와 같아야 한다.
+    """
+    file_sales = ('sales.csv', pd.DataFrame({
+        'id': [1, 2, 3, 4, 5, 6],
+        'kind': ['A', 'B', 'A', 'B', 'A', 'C'],
+        'price': [100, 250, 300, 50, 120, 500],
+    }))
+    file_rate = ('rate.csv', pd.DataFrame({'rate': [0.1, 0.2, 0.3]}))
+    job = {
+        'job_name': 'Filter',
+        'task_list': {'R1': ['D'], 'D': ['F'], 'F': ['W'],
+                      'R2': ['W'], 'W': []},
+        'property': {
+            'R1': {'task_name': 'read', 'filename': file_sales[0], 'sep': ','},
+            'R2': {'task_name': 'read', 'filename': file_rate[0], 'sep': ','},
+            'D': {'task_name': 'drop', 'column_name': 'id'},
+            'F': {'task_name': 'filter',
+                  'expression': "price > 100 and kind in ['A', 'B']"},
+            'W': {'task_name': 'write', 'filename': 'out.csv', 'sep': ','},
+        }
+    }
+    save_files([file_sales, file_rate])
+    upload_job(job, api)
+
+    res = api.get(f'{RUN_API}/1/run')
+    assert res.status_code == 200
+    trace = json.loads(res.data)['trace']
+    assert trace['R1'][0]['type'] == 'pushdown'
+    assert trace['R1'][0]['log']['rows'] == 3
+    assert trace['F'][0]['log'] == {'rows_before': 3, 'rows_after': 3}
+
+    expected = file_sales[1].drop(columns=['id']) \
+        .query("price > 100 and kind in ['A', 'B']")
+    expected = pd.concat([file_rate[1], expected], axis=1)
+    output = pd.read_csv(f'{STORAGE_ROOT}/out.csv')
+    assert output.equals(expected.reset_index(drop=True)) is True
+
+
+def test_filter_failure(api):
+    """
+    filter 조건을 적용하지 못하면 거르지 않은 데이터를 넘기지 않고 422로 실패한다.
+    (read Task로 옮긴 경우, filter Task에서 적용한 경우, aggregate Task와 합쳐진 경우)
+    """
+    import pickle
+    from utils.algorithms import FilterError
+
+    file_sales = ('sales.csv', pd.DataFrame({
+        'kind': ['A', 'B', 'A'], 'price': [100, 250, 300]}))
+    file_rate = ('rate.csv', pd.DataFrame({'rate': [0.1, 0.2, 0.3]}))
+    save_files([file_sales, file_rate])
+    expression = 'amount > 100'
+    jobs = [
+        # pushdown
+        {'task_list': {'R1': ['F'], 'F': ['W'], 'W': []}},
+        # 병합한 다음 filter
+        {'task_list': {'R1': ['F'], 'R2': ['F'], 'F': ['W'], 'W': []}},
+        # aggregate Task와 합쳐진 filter
+        {'task_list': {'R1': ['F'], 'F': ['A'], 'A': ['W'], 'W': []}},
+    ]
+    properties = {
+        'R1': {'task_name': 'read', 'filename': file_sales[0], 'sep': ','},
+        'R2': {'task_name': 'read', 'filename': file_rate[0], 'sep': ','},
+        'F': {'task_name': 'filter', 'expression': expression},
+        'A': {'task_name': 'aggregate', 'group_by': ['kind'],
+              'aggregations': {'price': 'sum'}},
+        'W': {'task_name': 'write', 'filename': 'out.csv', 'sep': ','},
+    }
+    for i, job in enumerate(jobs):
+        job['job_name'] = 'FilterFailure'
+        job['property'] = {name: properties[name]
+                           for name in job['task_list']}
+        upload_job(job, api)
+        res = api.get(f'{RUN_API}/{i + 1}/run')
+        assert res.status_code == 422
+        body = res.get_json()
+        assert body['err'] == 'filter failed'
+        assert body['filter']['expression'] == expression
+        assert body['filter']['task'] == ('F' if i == 1 else 'R1')
+        assert not os.path.exists(f'{STORAGE_ROOT}/out.csv')
+
+    # process executor에서 전달할 수 있어야 한다.
+    error = FilterError('F', expression, 'KeyError')
+    assert pickle.loads(pickle.dumps(error)).to_dict() == error.to_dict()
+
+
+def test_aggregate_failure(api):
+    """
+    집계하지 못하면 집계하지 않은 데이터를 넘기지 않고 422로 실패한다.
+    (aggregate Task에서 집계한 경우, read Task와 합쳐진 경우)
+    """
+    import pickle
+    from utils.algorithms import AggregateError
+
+    file_sales = ('sales.csv', pd.DataFrame({
+        'kind': ['A', 'B', 'A'], 'price': [100, 250, 300]}))
+    file_rate = ('rate.csv', pd.DataFrame({'rate': [0.1, 0.2, 0.3]}))
+    save_files([file_sales, file_rate])
+    task_lists = [
+        # read Task와 합쳐진 aggregate
+        {'R1': ['A'], 'A': ['W'], 'W': []},
+        # 병합한 다음 aggregate
+        {'R1': ['A'], 'R2': ['A'], 'A': ['W'], 'W': []},
+    ]
+    job_id = 0
+    for aggregations in ({'kind': 'mean'}, {'missing': 'sum'}):
+        for task_list in task_lists:
+            properties = {
+                'R1': {'task_name': 'read', 'filename': file_sales[0],
+                       'sep': ','},
+                'R2': {'task_name': 'read', 'filename': file_rate[0],
+                       'sep': ','},
+                'A': {'task_name': 'aggregate', 'group_by': ['price'],
+                      'aggregations': aggregations},
+                'W': {'task_name': 'write', 'filename': 'out.csv',
+                      'sep': ','},
+            }
+            upload_job({'job_name': 'AggregateFailure',
+                        'task_list': task_list,
+                        'property': {name: properties[name]
+                                     for name in task_list}}, api)
+            job_id += 1
+            res = api.get(f'{RUN_API}/{job_id}/run')
+            assert res.status_code == 422
+            body = res.get_json()
+            assert body['err'] == 'aggregate failed'
+            assert body['aggregate']['task'] == 'A'
+            assert body['aggregate']['aggregations'] == aggregations
+            assert not os.path.exists(f'{STORAGE_ROOT}/out.csv')
+
+    # process executor에서 전달할 수 있어야 한다.
+    error = AggregateError('A', ['kind'], {'v': 'mean'}, 'TypeError')
+    assert pickle.loads(pickle.dumps(error)).to_dict() == error.to_dict()
+
+
+def test_aggregate(api):
+    """
+    read -> filter -> aggregate 는 read Task에서 읽으면서 집계하고
+    다른 가지의 aggregate는 받은 데이터로 집계한다.
+    """
+    file_sales = ('sales.csv', pd.DataFrame({
+        'kind': ['A', 'B', 'A', 'B', 'A', 'C'],
+        'price': [100, 250, 300, 50, 120, 500],
+    }))
+    file_extra = ('extra.csv', pd.DataFrame({
+        'kind': ['C', 'C'],
+        'price': [10, 20],
+    }))
+    job = {
+        'job_name': 'Aggregate',
+        'task_list': {'R1': ['F'], 'F': ['A1'], 'A1': ['W'],
+                      'R2': ['R3'], 'R3': ['A2'], 'A2': ['W'], 'W': []},
+        'property': {
+            'R1': {'task_name': 'read', 'filename': file_sales[0], 'sep': ','},
+            'R2': {'task_name': 'read', 'filename': file_sales[0], 'sep': ','},
+            'R3': {'task_name': 'read', 'filename': file_extra[0], 'sep': ','},
+            'F': {'task_name': 'filter', 'expression': 'price >= 100'},
+            'A1': {'task_name': 'aggregate', 'group_by': ['kind'],
+                   'aggregations': {'price': ['sum', 'mean', 'count']}},
+            'A2': {'task_name': 'aggregate', 'group_by': ['kind'],
+                   'aggregations': {'price': 'max'}},
+            'W': {'task_name': 'write', 'filename': 'out.csv', 'sep': ','},
+        }
+    }
+    save_files([file_sales, file_extra])
+    upload_job(job, api)
+
+    res = api.get(f'{RUN_API}/1/run')
+    assert res.status_code == 200
+    trace = json.loads(res.data)['trace']
+    assert trace['R1'][0]['type'] == 'aggregate'
+    assert trace['R1'][0]['log']['groups'] == 3
+    assert trace['A1'][0] == {'type': 'fused', 'prev_task': 'R1', 'log': None}
+
+    output = pd.read_csv(f'{STORAGE_ROOT}/out.csv')
+    assert output['kind'].tolist() == ['A', 'B', 'C']
+    assert output['price_sum'].tolist() == [520, 250, 500]
+    assert output['price_mean'].round(2).tolist() == [173.33, 250.0, 500.0]
+    assert output['price_count'].tolist() == [3, 1, 1]
+    assert output['price_max'].tolist() == [300, 250, 500]
+
+
+def test_spill_under_memory_budget(api):
+    """
+    buffer 메모리 제한을 넘으면 디스크에 내려두고 병합할 때 다시 읽는다.
+    결과는 제한이 없을 때와 같아야 한다.
+    """
+    files = [(f'part{i}.csv', pd.DataFrame({
+        'id': list(range(100)),
+        f'value{i}': [i * 1000 + j for j in range(100)],
+    })) for i in range(4)]
+    job = {
+        'job_name': 'Spill',
+        'task_list': dict({f'R{i}': ['W'] for i in range(4)}, W=[]),
+        'property': dict({
+            f'R{i}': {'task_name': 'read', 'filename': files[i][0], 'sep': ','}
+            for i in range(4)
+        }, W={'task_name': 'write', 'filename': 'out.csv', 'sep': ','}),
+    }
+    save_files(files)
+    upload_job(job, api)
+
+    res = api.get(f'{RUN_API}/1/run')
+    assert res.status_code == 200
+    assert json.loads(res.data)['stats']['spill_count'] == 0
+    expected = pd.read_csv(f'{STORAGE_ROOT}/out.csv')
+
+    engine = generate_jobdatabase_engine()
+    engine.memory_budget = 4096
+    try:
+        res = api.get(f'{RUN_API}/1/run')
+    finally:
+        engine.memory_budget = None
+    assert res.status_code == 200
+    stats = json.loads(res.data)['stats']
+    assert stats['spill_count'] > 0
+    assert stats['spill_bytes'] > 0
+    assert stats['reload_count'] == stats['spill_count']
+    assert pd.read_csv(f'{STORAGE_ROOT}/out.csv').equals(expected) is True
+
+
+def test_merge_options(api):
+    """
+    Task의 병합 옵션(merge)으로 join 방식과 key를 정하고,
+    결과 행 갯수가 max_row_factor를 넘으면 병합하지 않고 422와 진단 정보를 보낸다.
+    """
+    engine = generate_jobdatabase_engine()
+    orders = ('orders.csv', pd.DataFrame({
+        'user': [1, 1, 1, 2], 'item': ['a', 'b', 'c', 'd']}))
+    users = ('users.csv', pd.DataFrame({
+        'user': [1, 1, 2, 3], 'item': ['x', 'y', 'z', 'w']}))
+    save_files([orders, users])
+
+    def make_job(merge):
+        return {
+            'job_name': 'Merge',
+            'task_list': {'R1': ['W'], 'R2': ['W'], 'W': []},
+            'property': {
+                'R1': {'task_name': 'read', 'filename': orders[0], 'sep': ','},
+                'R2': {'task_name': 'read', 'filename': users[0], 'sep': ','},
+                'W': {'task_name': 'write', 'filename': 'merged.csv',
+                      'sep': ',', 'merge': merge},
+            }
+        }
+
+    # 잘못된 옵션은 저장하지 않는다.
+    for merge in ({'how': 'cross'}, {'on': []}, {'validate': 'x'},
+                  {'max_row_factor': 0.5}, {'unknown': 1}):
+        res = api.post(CREATE_API, data=json.dumps(make_job(merge)),
+                       content_type='application/json')
+        assert res.status_code == 400
+
+    upload_job(make_job({'how': 'inner', 'on': ['user']}), api)
+    assert api.get(f'{RUN_API}/1/run').status_code == 200
+    output = pd.read_csv(f'{STORAGE_ROOT}/merged.csv')
+    assert list(output.columns) == ['user', 'item_x', 'item_y']
+    assert len(output) == 7
+
+    upload_job(make_job({'on': ['user'], 'max_row_factor': 1.2}), api)
+    plan = api.get(f'{RUN_API}/2/plan').get_json()
+    assert 'max_row_factor' in {w['type'] for w in plan['warnings']}
+    for executor in ('serial', 'process'):
+        engine.task_executor = executor
+        try:
+            res = api.get(f'{RUN_API}/2/run')
+        finally:
+            engine.task_executor = 'serial'
+        assert res.status_code == 422
+        merge = res.get_json()['merge']
+        assert merge['reason'] == 'max_row_factor'
+        assert merge['task'] == 'W' and merge['prev_task'] == 'R2'
+        assert merge['result_rows'] == 8 and merge['max_rows'] == 4
+        assert merge['top_keys'][0] == \
+            {'key': [1], 'left': 3, 'right': 2, 'rows': 6}
+
+    upload_job(make_job({'on': ['user'], 'validate': 'one_to_many'}), api)
+    res = api.get(f'{RUN_API}/3/run')
+    assert res.status_code == 422
+    assert res.get_json()['merge']['side'] == 'left'
+    runs = api.get(f'{RUN_API}/3/runs').get_json()['runs']
+    assert runs[0]['status'] == 'error'
+
+
+def test_sharded_read(api):
+    """
+    filename이 디렉토리나 glob 패턴이면 해당하는 파일을 이름 순서대로 모두 읽어서 합친다.
+    부가 파일(column 통계, 임시 파일, manifest)은 읽지 않고,
+    읽지 못한 파일이 있으면 일부만 합치지 않고 422와 파일별 에러를 보낸다.
+    """
+    import os
+    os.makedirs(f'{STORAGE_ROOT}/events/day=2')
+    shards = [pd.DataFrame({'id': list(range(i * 10, i * 10 + 10)),
+                            'kind': ['A', 'B'] * 5}) for i in range(4)]
+    save_files([('events/events_0002.csv', shards[1]),
+                ('events/events_0001.csv', shards[0]),
+                ('events/day=2/events_0004.csv', shards[3])])
+    shards[2].to_csv(f'{STORAGE_ROOT}/events/events_0003.csv.gz', index=False)
+    for sidecar in ('events_0001.csv.stats.json', '.events_0001.csv.tmp',
+                    '_manifest.json'):
+        with open(f'{STORAGE_ROOT}/events/{sidecar}', 'w') as f:
+            f.write('{')
+
+    def make_job(filename, task=None):
+        """
+        R -> (task) -> W
+        """
+        task_list = {'R': ['T'], 'T': ['W'], 'W': []} if task \
+            else {'R': ['W'], 'W': []}
+        properties = {
+            'R': {'task_name': 'read', 'filename': filename, 'sep': ','},
+            'W': {'task_name': 'write', 'filename': 'out.csv', 'sep': ','},
+        }
+        if task:
+            properties['T'] = task
+        return {'job_name': 'Shards', 'task_list': task_list,
+                'property': properties}
+
+    # 파일 순서: day=2/events_0004.csv, events_0001.csv, events_0002.csv, events_0003.csv.gz
+    expected = pd.concat([shards[3], shards[0], shards[1], shards[2]],
+                         ignore_index=True)
+    upload_job(make_job('events/'), api)
+    res = api.get(f'{RUN_API}/1/run')
+    assert res.status_code == 200
+    log = res.get_json()['trace']['R'][0]
+    assert log['type'] == 'shards'
+    assert log['log']['shards'] == 4 and log['log']['rows'] == 40
+    assert log['log']['errors'] == []
+    assert pd.read_csv(f'{STORAGE_ROOT}/out.csv').equals(expected) is True
+
+    # 조건을 옮겨서 읽어도 index는 이어붙인 파일에서의 행 번호다.
+    upload_job(make_job('events/**/events_*.csv*', {
+        'task_name': 'filter', 'expression': "kind == 'A'"}), api)
+    plan = api.get(f'{RUN_API}/2/plan').get_json()
+    assert plan['tasks']['R']['shards'] == 4
+    assert api.get(f'{RUN_API}/2/run').status_code == 200
+    output = pd.read_csv(f'{STORAGE_ROOT}/out.csv')
+    assert output.equals(expected.query("kind == 'A'")
+                         .reset_index(drop=True)) is True
+
+    upload_job(make_job('events/events_000[12].csv', {
+        'task_name': 'aggregate', 'group_by': ['kind'],
+        'aggregations': {'id': 'sum'}}), api)
+    res = api.get(f'{RUN_API}/3/run')
+    assert res.get_json()['trace']['R'][0]['log']['shards'] == 2
+    output = pd.read_csv(f'{STORAGE_ROOT}/out.csv')
+    assert output['id_sum'].tolist() == [90, 100]
+
+    # column이 다른 파일
+    pd.DataFrame({'other': [1]}).to_csv(
+        f'{STORAGE_ROOT}/events/events_0005.csv', index=False)
+    res = api.get(f'{RUN_API}/1/run')
+    assert res.status_code == 422
+    shards_error = res.get_json()['shards']
+    assert shards_error['filename'] == 'events/'
+    assert shards_error['shards'] == 5
+    assert [e['shard'] for e in shards_error['errors']] == \
+        [os.path.join('events', 'events_0005.csv')]
+    runs = api.get(f'{RUN_API}/1/runs').get_json()['runs']
+    assert runs[-1]['status'] == 'error'
+
+    # 해당하는 파일이 없으면 빈 결과를 넘기지 않고 실패한다. (집계를 합친 read Task도 같다)
+    upload_job(make_job('missing/*.csv'), api)
+    upload_job(make_job('missing/', {
+        'task_name': 'aggregate', 'group_by': ['kind'],
+        'aggregations': {'id': 'sum'}}), api)
+    os.makedirs(f'{STORAGE_ROOT}/missing')
+    for job_id, filename in ((4, 'missing/*.csv'), (5, 'missing/')):
+        res = api.get(f'{RUN_API}/{job_id}/run')
+        assert res.status_code == 422
+        assert res.get_json()['shards'] == {'filename': filename,
+                                            'shards': 0, 'errors': []}
+
+
+def test_partitioned_write(api):
+    """
+    partition_by가 있으면 값별로 나눠서 hive 형식 디렉토리(<column>=<값>/)에 작성하고
+    파일별 행 갯수를 manifest에 기록한다. 다시 실행하면 예전 partition은 남지 않는다.
+    """
+    import os
+    sales = pd.DataFrame({
+        'day': ['2024-01-02', '2024-01-01', '2024-01-02', None, '2024-01-01'],
+        'kind': ['A', 'B/C', 'A', 'A', 'B/C'],
+        'price': [100, 250, 300, 50, 120],
+    })
+    save_files([('sales.csv', sales)])
+
+    def make_job(partition_by):
+        return {
+            'job_name': 'Partition',
+            'task_list': {'R': ['W'], 'W': []},
+            'property': {
+                'R': {'task_name': 'read', 'filename': 'sales.csv', 'sep': ','},
+                'W': {'task_name': 'write', 'filename': 'sales_by_day',
+                      'sep': ',', 'partition_by': partition_by},
+            }
+        }
+
+    for partition_by in ([], ['day', 'day'], 'day'):
+        res = api.post(CREATE_API, data=json.dumps(make_job(partition_by)),
+                       content_type='application/json')
+        assert res.status_code == 400
+
+    upload_job(make_job(['day', 'kind']), api)
+    res = api.get(f'{RUN_API}/1/run')
+    assert res.status_code == 200
+    assert res.get_json()['trace']['W'][0]['log']['partitions'] == 3
+
+    directory = f'{STORAGE_ROOT}/sales_by_day'
+    with open(f'{directory}/_manifest.json') as f:
+        manifest = json.load(f)
+    assert manifest['partition_by'] == ['day', 'kind']
+    assert manifest['rows'] == 5
+    assert [(f['path'], f['values'], f['rows']) for f in manifest['files']] \
+        == [('day=2024-01-01/kind=B%2FC/part.csv',
+             {'day': '2024-01-01', 'kind': 'B/C'}, 2),
+            ('day=2024-01-02/kind=A/part.csv',
+             {'day': '2024-01-02', 'kind': 'A'}, 2),
+            ('day=__HIVE_DEFAULT_PARTITION__/kind=A/part.csv',
+             {'day': None, 'kind': 'A'}, 1)]
+    for f in manifest['files']:
+        part = pd.read_csv(f'{directory}/{f["path"]}')
+        assert len(part) == f['rows']
+        assert os.path.getsize(f'{directory}/{f["path"]}') == f['bytes']
+
+    # 결과 디렉토리는 다른 Job에서 디렉토리 filename으로 다시 읽을 수 있다. (manifest 제외)
+    upload_job({
+        'job_name': 'Reread',
+        'task_list': {'R': ['W'], 'W': []},
+        'property': {
+            'R': {'task_name': 'read', 'filename': 'sales_by_day/', 'sep': ','},
+            'W': {'task_name': 'write', 'filename': 'reread.csv', 'sep': ','},
+        }
+    }, api)
+    assert api.get(f'{RUN_API}/2/run').status_code == 200
+    output = pd.read_csv(f'{STORAGE_ROOT}/reread.csv')
+    expected = sales.iloc[[1, 4, 0, 2, 3]].reset_index(drop=True)
+    assert output.equals(expected) is True
+
+    save_files([('sales.csv', sales[sales['kind'] == 'A'])])
+    assert api.get(f'{RUN_API}/1/run').status_code == 200
+    assert sorted(os.listdir(directory)) == \
+        ['_manifest.json', 'day=2024-01-02', 'day=__HIVE_DEFAULT_PARTITION__']
+    assert api.get(f'{RUN_API}/1/output').status_code == 400
+
+    upload_job(make_job(['region']), api)
+    plan = api.get(f'{RUN_API}/3/plan').get_json()
+    assert 'partition_by' in {w['type'] for w in plan['warnings']}
+    res = api.get(f'{RUN_API}/3/run')
+    assert res.status_code == 422
+    assert res.get_json()['partition'] == {
+        'task': 'W', 'missing': ['region'],
+        'columns': ['day', 'kind', 'price']}
+    assert api.get(f'{RUN_API}/1/plan').get_json()['tasks']['W'][
+        'partitions'] == 2
@@ -0,0 +1,201 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from api import get_app, generate_jobdatabase_engine
+from utils.job_database.run_history import RunHistory, RUN_INDEX_STRIDE, \
+    RUN_SUMMARY_PERIOD
+
+API = '/api/jobs'
+
+example_job = {
+    'job_name': 'history',
+    'task_list': {'R': ['W'], 'W': []},
+    'property': {
+        'R': {'task_name': 'read', 'filename': 'a.csv', 'sep': ','},
+        'W': {'task_name': 'write', 'filename': 'history.csv', 'sep': ','},
+    }
+}
+
+
+@pytest.fixture
+def api():
+    app, api = get_app()
+    yield app.test_client()
+
+    generate_jobdatabase_engine().reset()
+
+
+def upload_job(job, api) -> int:
+    res = api.post(API, data=json.dumps(job),
+                   content_type='application/json')
+    assert res.status_code == 201
+    return res.get_json()['job_id']
+
+
+def make_record(ended_at: float, seconds: float = 1.0,
+                status: str = 'ok') -> dict:
+    return {'ended_at': ended_at, 'started_at': ended_at - seconds,
+            'seconds': seconds, 'status': status, 'peak_frame_bytes': 10,
+            'tasks': {'R': {'seconds': seconds, 'rows': 2, 'bytes': 10}},
+            'padding': 'x' * 200}
+
+
+def test_run_history_api(api):
+    """
+    실행이 끝날 때마다 실행 기록을 추가하고 since로 조회한다.
+    """
+    job_id = upload_job(example_job, api)
+    for _ in range(3):
+        assert api.get(f'{API}/{job_id}/run').status_code == 200
+
+    res = api.get(f'{API}/{job_id}/runs')
+    assert res.status_code == 200
+    runs = res.get_json()['runs']
+    assert len(runs) == 3
+    run = runs[0]
+    assert run['job_id'] == job_id and run['version'] == 1
+    assert run['status'] == 'ok' and run['rows'] == 2
+    assert set(run['tasks']) == {'R', 'W'}
+    assert run['tasks']['R']['rows'] == 2
+    assert run['started_at'] <= run['ended_at']
+
+    res = api.get(f'{API}/{job_id}/runs?limit=2')
+    assert len(res.get_json()['runs']) == 2
+    next_since = res.get_json()['next_since']
+    assert next_since == runs[2]['ended_at']
+    assert res.get_json()['next_offset'] == 0
+    res = api.get(f'{API}/{job_id}/runs?since={next_since}&offset=0')
+    assert res.get_json()['runs'] == runs[2:]
+    assert res.get_json()['next_since'] is None
+
+    assert api.get(f'{API}/{job_id}/runs?since=abc').status_code == 400
+    assert api.get(f'{API}/{job_id}/runs?offset=-1').status_code == 400
+    assert api.get(f'{API}/{job_id}/runs?limit=0').status_code == 400
+    assert api.get(f'{API}/{job_id + 1}/runs').status_code == 404
+
+    # Job을 삭제하면 실행 기록도 삭제한다.
+    api.delete(f'{API}/{job_id}')
+    paths = generate_jobdatabase_engine().run_history.get_paths(job_id)
+    assert not any(os.path.exists(path) for path in paths)
+
+
+def test_run_history_memory_ratio(api):
+    """
+    Scheduler에 메모리 비율이 없으면 실행 기록으로 채운다. (서버 재시작, 다른 worker)
+    """
+    engine = generate_jobdatabase_engine()
+    job_id = upload_job(example_job, api)
+    assert api.get(f'{API}/{job_id}/run').status_code == 200
+    ratio = engine.scheduler.memory_ratio.pop(job_id)
+    assert api.get(f'{API}/{job_id}/run').status_code == 200
+    runs = api.get(f'{API}/{job_id}/runs').get_json()['runs']
+    assert runs[1]['estimated_memory'] == int(runs[1]['input_bytes'] * ratio)
+
+
+def test_run_history_index(tmp_path):
+    """
+    sparse index로 since 위치를 찾아도 처음부터 읽은 결과와 같다.
+    """
+    history = RunHistory(str(tmp_path / 'runs'))
+    now = time.time()
+    count = RUN_INDEX_STRIDE // 100
+    for i in range(count):
+        history.append(1, make_record(now + i))
+    _, index_path, _ = history.get_paths(1)
+    with open(index_path) as f:
+        assert len(f.readlines()) > 1
+
+    everything = history.query(1, limit=count)['runs']
+    assert len(everything) == count
+    for since in (now - 1, now + 1.5, now + count - 10, now + count):
+        expected = [r for r in everything if r['ended_at'] >= since][:5]
+        assert history.query(1, since, limit=5)['runs'] == expected
+    assert history.query(1, now + 3, now + 5)['runs'] == everything[3:5]
+    assert history.get_last_runs(1, 3) == everything[-3:]
+    assert history.get_last_runs(2, 3) == []
+
+
+def test_run_history_compaction(tmp_path):
+    """
+    보관 기간이 지났거나 파일이 max_bytes를 넘으면 오래된 기록부터 요약한다.
+    """
+    history = RunHistory(str(tmp_path / 'runs'), retention_seconds=3600,
+                         max_bytes=1 << 20)
+    now = RUN_SUMMARY_PERIOD * 1_000_000
+    for i in range(10):
+        history.append(1, make_record(now - 7200 + i, seconds=i,
+                                      status='error' if i == 0 else 'ok'))
+    for i in range(5):
+        history.append(1, make_record(now + i))
+
+    assert history.compact(1, now=now) == {'summarized': 10, 'kept': 5}
+    result = history.query(1)
+    assert [r['ended_at'] for r in result['runs']] == \
+        [now + i for i in range(5)]
+    summary, = result['summaries']
+    assert summary['period_start'] == now - 2 * RUN_SUMMARY_PERIOD
+    assert summary['runs'] == 10
+    assert summary['status'] == {'error': 1, 'ok': 9}
+    assert summary['seconds_total'] == sum(range(10))
+    assert summary['seconds_max'] == 9
+    assert summary['tasks']['R']['rows_total'] == 20
+    assert history.query(1, since=now)['summaries'] == []
+    assert history.query(1, since=now + 3)['runs'][0]['ended_at'] == now + 3
+
+    # 크기 제한: 남은 기록이 max_bytes의 절반 이하가 되도록 요약한다.
+    history.max_bytes = 1000
+    history.append(1, make_record(now + 5))
+    data_path, _, _ = history.get_paths(1)
+    assert os.path.getsize(data_path) <= 500
+    result = history.query(1)
+    assert result['runs'][-1]['ended_at'] == now + 5
+    assert sum(s['runs'] for s in result['summaries']) + \
+        len(result['runs']) == 16
+
+    history.clear()
+    assert history.query(1) == {'runs': [], 'summaries': [],
+                                'next_since': None, 'next_offset': None}
+
+
+def test_run_history_same_ended_at(tmp_path):
+    """
+    끝난 시각이 같은 기록이 많아도 (since, offset)으로 이어서 조회하면 빠지거나 중복되지 않는다.
+    """
+    history = RunHistory(str(tmp_path / 'runs'))
+    now = time.time()
+    for i, ended_at in enumerate([now] * 5 + [now + 1] * 3 + [now + 2]):
+        history.append(1, dict(make_record(ended_at), run=i))
+
+    runs, since, offset = [], None, 0
+    while True:
+        result = history.query(1, since, limit=2, offset=offset)
+        runs += [r['run'] for r in result['runs']]
+        if result['next_since'] is None:
+            break
+        since, offset = result['next_since'], result['next_offset']
+    assert runs == list(range(9))
+    result = history.query(1, now, limit=2, offset=4)
+    assert [r['run'] for r in result['runs']] == [4, 5]
+    assert (result['next_since'], result['next_offset']) == (now + 1, 1)
+
+
+def test_run_history_append_order(tmp_path):
+    """
+    끝난 시각을 주지 않으면 잠근 다음에 기록하므로 동시에 추가해도 파일 안에서 시각 순서가 유지된다.
+    """
+    history = RunHistory(str(tmp_path / 'runs'))
+
+    def __append():
+        for _ in range(50):
+            history.append(1, dict(make_record(0), ended_at=None))
+    threads = [threading.Thread(target=__append) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    ended = [r['ended_at'] for r in history.query(1, limit=1000)['runs']]
+    assert len(ended) == 200 and ended == sorted(ended)
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from api import get_app, generate_jobdatabase_engine
+from utils.job_database.scheduler import RunScheduler, RunQueueFull
+
+
+@pytest.fixture
+def api():
+    app, api = get_app()
+    yield app.test_client()
+    generate_jobdatabase_engine().reset()
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def submit(scheduler, order, name, client_id, priority=0, memory=0):
+    def __run():
+        with scheduler.admit(0, memory, client_id, priority):
+            order.append(name)
+    thread = threading.Thread(target=__run)
+    thread.start()
+    return thread
+
+
+def hold_first_run(scheduler, memory=0):
+    """
+    첫번째 실행을 멈춰두고 대기열을 채운 다음 풀어준다.
+    """
+    started, release = threading.Event(), threading.Event()
+
+    def __run():
+        with scheduler.admit(0, memory, 'holder'):
+            started.set()
+            release.wait()
+    thread = threading.Thread(target=__run)
+    thread.start()
+    started.wait()
+    return thread, release
+
+
+def test_fair_and_priority_order():
+    """
+    같은 우선순위에서는 클라이언트별로 번갈아 실행하고
+    우선순위가 높은 요청은 먼저 실행한다.
+    """
+    scheduler = RunScheduler(max_running=1)
+    holder, release = hold_first_run(scheduler)
+    order, threads = [], []
+    for name, client_id, priority in [('a1', 'a', 0), ('a2', 'a', 0),
+                                      ('a3', 'a', 0), ('b1', 'b', 0),
+                                      ('c1', 'c', 5)]:
+        threads.append(submit(scheduler, order, name, client_id, priority))
+        wait_until(lambda: scheduler.get_stats()['queue_depth'] == len(threads))
+    assert scheduler.get_stats()['queued_by_client'] == {'a': 3, 'b': 1, 'c': 1}
+
+    release.set()
+    for thread in threads + [holder]:
+        thread.join()
+    assert order == ['c1', 'a1', 'b1', 'a2', 'a3']
+    stats = scheduler.get_stats()
+    assert stats['admitted'] == 6 and stats['queue_depth'] == 0
+
+
+def test_memory_budget_and_queue_limit():
+    """
+    예상 메모리 합이 제한을 넘으면 기다리고, 대기열이 가득 차면 거절한다.
+    """
+    scheduler = RunScheduler(memory_budget=100, max_running=4, queue_limit=1)
+    holder, release = hold_first_run(scheduler, memory=60)
+
+    order = []
+    waiting = submit(scheduler, order, 'big', 'a', memory=50)
+    wait_until(lambda: scheduler.get_stats()['queue_depth'] == 1)
+    assert scheduler.get_stats()['running_memory'] == 60
+    with pytest.raises(RunQueueFull):
+        with scheduler.admit(0, 10, 'b'):
+            pass
+    assert order == []
+
+    release.set()
+    holder.join()
+    waiting.join()
+    assert order == ['big']
+    assert scheduler.get_stats()['rejected'] == 1
+
+
+def test_scheduler_api(api):
+    assert api.get('/api/jobs/1/run?priority=high').status_code == 400
+    assert api.get('/api/jobs/1/run?priority=1000').status_code == 400
+    res = api.get('/api/scheduler')
+    assert res.status_code == 200
+    stats = json.loads(res.data)
+    assert stats['queue_depth'] == 0 and stats['running'] == 0
+
+
+def test_admit_async():
+    """
+    Event Loop에서 기다리는 요청도 thread에서 기다리는 요청과 같은 순서로 실행하고
+    취소된 요청은 대기열에서 빠진다.
+    """
+    scheduler = RunScheduler(max_running=1)
+    holder, release = hold_first_run(scheduler)
+    order = []
+
+    async def __run(name, client_id, priority=0):
+        async with scheduler.admit_async(0, 0, client_id, priority):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    async def __main():
+        tasks = []
+        for name, client_id, priority in [('a1', 'a', 0), ('a2', 'a', 0),
+                                          ('b1', 'b', 0), ('c1', 'c', 5)]:
+            tasks.append(asyncio.create_task(__run(name, client_id, priority)))
+            while scheduler.get_stats()['queue_depth'] < len(tasks):
+                await asyncio.sleep(0.005)
+        cancelled = asyncio.create_task(__run('x', 'x', 1))
+        while scheduler.get_stats()['queue_depth'] < len(tasks) + 1:
+            await asyncio.sleep(0.005)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        assert scheduler.get_stats()['queue_depth'] == len(tasks)
+
+        release.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(__main())
+    holder.join()
+    assert order == ['c1', 'a1', 'b1', 'a2']
+    stats = scheduler.get_stats()
+    assert stats['admitted'] == 5 and stats['queue_depth'] == 0
+    assert stats['running'] == 0
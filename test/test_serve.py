@@ -0,0 +1,186 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+
+import pytest
+
+from serve import parse_args, get_options, get_post_fork
+from utils.job_database import JobDatabaseEngine
+
+example_job = {
+    'job_name': 'serve',
+    'task_list': {'R': ['W'], 'W': []},
+    'property': {
+        'R': {'task_name': 'read', 'filename': 'a.csv', 'sep': ','},
+        'W': {'task_name': 'write', 'filename': 'serve.csv', 'sep': ','},
+    }
+}
+
+
+class FakeLog:
+
+    def __init__(self):
+        self.messages = []
+
+    def info(self, message, *args):
+        self.messages.append(message % args)
+
+
+class FakeServer:
+
+    def __init__(self):
+        self.log = FakeLog()
+
+
+class FakeWorker:
+    pid = 1234
+
+
+@pytest.fixture
+def engine():
+    JobDatabaseEngine().reset()
+    yield JobDatabaseEngine()
+
+    # post_fork가 설정을 바꾼 Engine 대신 기본 설정의 Engine을 다시 만든다.
+    JobDatabaseEngine().reset()
+    JobDatabaseEngine.discard_instance()
+    JobDatabaseEngine()
+
+
+def save_jobs(count: int, queue):
+    # fork된 worker와 같이 부모의 Engine을 버리고 새로 만든다.
+    JobDatabaseEngine.discard_instance()
+    engine = JobDatabaseEngine()
+    queue.put([engine.save(dict(example_job)) for _ in range(count)])
+
+
+def test_launcher_options():
+    """
+    thread가 2개 이상이면 gthread worker, 1개면 sync worker를 사용한다.
+    """
+    args = parse_args([])
+    assert args.workers == multiprocessing.cpu_count() * 2 + 1
+    assert args.task_executor == 'serial'
+    options = get_options(args)
+    assert options['worker_class'] == 'gthread'
+    assert options['bind'] == '127.0.0.1:8000'
+    assert callable(options['post_fork'])
+
+    args = parse_args(['--workers', '2', '--threads', '1', '--preload',
+                       '--timeout', '30'])
+    options = get_options(args)
+    assert options['worker_class'] == 'sync'
+    assert (options['workers'], options['preload_app'],
+            options['timeout']) == (2, True, 30)
+
+
+def test_post_fork_warm_up(engine):
+    """
+    post_fork는 Engine을 새로 만들고 실행 옵션을 적용한 다음 캐시를 채운다.
+    """
+    engine.save(dict(example_job))
+    args = parse_args(['--task-executor', 'process', '--task-workers', '2',
+                       '--memory-budget', '64', '--max-running-jobs', '3',
+                       '--node-memory-budget', '512', '--workers', '4',
+                       '--run-queue-limit', '10'])
+    server = FakeServer()
+    get_post_fork(args)(server, FakeWorker())
+
+    worker_engine = JobDatabaseEngine()
+    assert worker_engine is not engine
+    assert worker_engine.mutex is not engine.mutex
+    assert (worker_engine.task_executor, worker_engine.task_workers) == \
+        ('process', 2)
+    assert worker_engine.memory_budget == 64 << 20
+    assert worker_engine.scheduler.max_running == 3
+    # 서버 전체 제한을 worker끼리 나눈다.
+    assert worker_engine.scheduler.memory_budget == 128 << 20
+    assert worker_engine.scheduler.queue_limit == 10
+    assert worker_engine.storage_cache is not None
+    assert len(worker_engine.plan_cache) == 1
+    message, = server.log.messages
+    assert message.startswith('worker 1234 warmed up: 1 jobs')
+
+
+def test_storage_cache_invalidation(engine):
+    """
+    다른 worker process가 jobs.json을 바꾸면 캐시를 버리고 다시 읽는다.
+    """
+    job_id = engine.save(dict(example_job))
+    engine.warm_up()
+    cached = engine.storage_cache
+
+    ctx = multiprocessing.get_context('fork')
+    queue = ctx.Queue()
+    process = ctx.Process(target=save_jobs, args=(1, queue))
+    process.start()
+    new_job_id, = queue.get(timeout=30)
+    process.join()
+
+    assert engine.storage_cache is cached
+    assert engine.get_item(new_job_id)['job_id'] == new_job_id
+    assert engine.storage_cache is not cached
+    assert new_job_id == job_id + 1
+
+
+def test_stale_cache_does_not_lose_updates(engine, monkeypatch):
+    """
+    다른 worker가 바꾼 jobs.json의 파일 상태가 캐시와 같아 보여도(inode 재사용 등)
+    수정할 때는 다시 읽으므로 다른 worker의 수정이 사라지지 않는다.
+    get_item은 복사본을 돌려주므로 바꿔도 캐시에 영향이 없다.
+    """
+    job_id = engine.save(dict(example_job))
+    engine.warm_up()
+    signature = engine.storage_cache[0]
+
+    ctx = multiprocessing.get_context('fork')
+    queue = ctx.Queue()
+    process = ctx.Process(target=save_jobs, args=(1, queue))
+    process.start()
+    other_job_id, = queue.get(timeout=30)
+    process.join()
+
+    # 바뀐 파일이 캐시와 같은 상태로 보이는 경우
+    monkeypatch.setattr(JobDatabaseEngine,
+                        '_JobDatabaseEngine__get_file_signature',
+                        staticmethod(lambda: signature))
+    new_job_id = engine.save(dict(example_job))
+    monkeypatch.undo()
+    assert new_job_id == other_job_id + 1
+    assert engine.get_item(other_job_id)['job_id'] == other_job_id
+
+    job = engine.get_item(job_id)
+    job['property']['R']['filename'] = 'changed.csv'
+    assert engine.get_item(job_id)['property']['R']['filename'] == 'a.csv'
+
+
+def test_save_across_worker_processes(engine):
+    """
+    여러 worker process가 동시에 Job을 만들어도 ID가 겹치거나 Job이 사라지지 않는다.
+    """
+    ctx = multiprocessing.get_context('fork')
+    queue = ctx.Queue()
+    processes = [ctx.Process(target=save_jobs, args=(10, queue))
+                 for _ in range(4)]
+    for process in processes:
+        process.start()
+    job_ids = [job_id for _ in processes
+               for job_id in queue.get(timeout=60)]
+    for process in processes:
+        process.join()
+
+    job_ids.sort()
+    assert job_ids == list(range(job_ids[0], job_ids[0] + 40))
+    assert all(engine.get_item(job_id) for job_id in job_ids)
+
+
+def test_lazy_import():
+    """
+    서버 진입 모듈(api, asgi, serve)만 불러와서는 pandas를 불러오지 않는다. (Job 실행 시점까지 미룸)
+    """
+    code = "import api, asgi, serve, sys; print('pandas' in sys.modules)"
+    res = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                         text=True, check=True,
+                         cwd=os.path.dirname(os.path.dirname(__file__)))
+    assert res.stdout.strip() == 'False'
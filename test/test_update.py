@@ -56,8 +56,49 @@ def test_not_found(api):
                      content_type='application/json').status_code == 404
 
 
+def test_not_found_before_validate(api):
+    """
+    없는 Job이면 내용이 잘못되었어도 404
+    """
+    modified_data = example_job.copy()
+    modified_data['property'] = dict(example_job['property'],
+                                     ZA={'task_name': 'aaaa'})
+    assert api.patch(f'{API}/9999', data=json.dumps(modified_data),
+                     content_type='application/json').status_code == 404
+
+
+def test_version_conflict(api):
+    """
+    If-Match의 version이 현재 version과 다르면 412, 같으면 수정하고 version 증가
+    """
+    etag = api.get(f'{API}/1').headers['ETag']
+    res = api.patch(f'{API}/1', data=json.dumps(example_job),
+                    content_type='application/json',
+                    headers={'If-Match': etag})
+    assert res.status_code == 201
+    assert res.get_json()['version'] == 2
+    assert res.headers['ETag'] == '"1-2"'
+
+    # 이전 ETag로는 수정할 수 없다.
+    res = api.patch(f'{API}/1', data=json.dumps(example_job),
+                    content_type='application/json',
+                    headers={'If-Match': etag})
+    assert res.status_code == 412
+    assert res.get_json()['version'] == 2
+    assert api.get(f'{API}/1').get_json()['version'] == 2
+
+    # body의 version은 무시한다.
+    data = dict(example_job, version=100)
+    res = api.patch(f'{API}/1', data=json.dumps(data),
+                    content_type='application/json',
+                    headers={'If-Match': '"1-2"'})
+    assert res.status_code == 201
+    assert res.get_json()['version'] == 3
+
+
 def test_modified_data_validate_failed(api):
     modified_data = example_job.copy()
     modified_data['property']['ZA'] = {'task_name': 'aaaa'}
     assert api.patch(f'{API}/1', data=json.dumps(modified_data),
                      content_type='application/json').status_code == 400
+
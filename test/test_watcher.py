@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+import time
+
+import pytest
+
+from api import get_app, generate_jobdatabase_engine
+from utils.job_database.watcher import InputWatcher
+
+CREATE_API = '/api/jobs'
+API = '/api/jobs'
+
+example_job = {
+    'job_name': 'Watched',
+    'subscribe_inputs': True,
+    'task_list': {
+        'R1': ['W1'],
+        'W1': [],
+    },
+    'property': {
+        'R1': {'task_name': 'read', 'filename': 'a.csv', 'sep': ','},
+        'W1': {'task_name': 'write', 'filename': 'watched.csv', 'sep': ','},
+    }
+}
+
+
+@pytest.fixture
+def api():
+    app, api = get_app()
+    yield app.test_client()
+    engine = generate_jobdatabase_engine()
+    engine.stop_watcher()
+    engine.reset()
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def write(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+@pytest.mark.parametrize('backend', ['inotify', 'polling'])
+def test_watcher_debounce_and_hash(backend):
+    """
+    여러번 연속으로 바뀌어도 한번만 실행하고,
+    내용이 같으면(수정 시간만 바뀌면) 실행하지 않는다.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        write(os.path.join(tmp, 'in.csv'), 'a\n1\n')
+        runs = []
+        watcher = InputWatcher(
+            tmp, lambda: {'in.csv': [1, 2], 'new.csv': [3]},
+            lambda job_id, filenames: runs.append((job_id, filenames)),
+            debounce=0.2, poll_interval=0.05, backend=backend)
+        watcher.start()
+        try:
+            wait_until(lambda: watcher.get_stats()['watched_files'] == 2)
+            for i in range(5):
+                write(os.path.join(tmp, 'in.csv'), f'a\n{i}\n')
+                time.sleep(0.02)
+            wait_until(lambda: watcher.get_stats()['runs'] == 2)
+            assert sorted(runs) == [(1, ['in.csv']), (2, ['in.csv'])]
+
+            # 같은 내용으로 다시 작성
+            write(os.path.join(tmp, 'in.csv'), 'a\n4\n')
+            wait_until(lambda: watcher.get_stats()['unchanged'] == 1)
+            # 새로 생긴 파일
+            write(os.path.join(tmp, 'new.csv'), 'b\n1\n')
+            wait_until(lambda: watcher.get_stats()['runs'] == 3)
+            assert runs[-1] == (3, ['new.csv'])
+            assert watcher.get_stats()['backend'] == backend
+        finally:
+            watcher.stop()
+
+
+def test_subscribed_job_runs_on_change(api):
+    engine = generate_jobdatabase_engine()
+    write('storage/data/a.csv', 'col0,col1\n1,2\n')
+    res = api.post(CREATE_API, data=json.dumps(example_job),
+                   content_type='application/json')
+    assert res.status_code == 201
+    other = dict(example_job, subscribe_inputs=False)
+    assert api.post(CREATE_API, data=json.dumps(other),
+                    content_type='application/json').status_code == 201
+    assert engine.get_subscriptions() == {'a.csv': [res.get_json()['job_id']]}
+
+    watcher = engine.start_watcher(debounce=0.1, poll_interval=0.05,
+                                   lock_path=None)
+    wait_until(lambda: watcher.get_stats()['watched_files'] == 1)
+    write('storage/data/a.csv', 'col0,col1\n3,4\n')
+    wait_until(lambda: watcher.get_stats()['runs'] == 1)
+    with open('storage/data/watched.csv') as f:
+        assert f.read().splitlines() == ['col0,col1', '3,4']
+
+
+def test_subscribe_inputs_validate(api):
+    data = dict(example_job, subscribe_inputs='yes')
+    assert api.post(CREATE_API, data=json.dumps(data),
+                    content_type='application/json').status_code == 400
@@ -1 +1,12 @@
-from utils.algorithms.topological_sort import topological_sort
\ No newline at end of file
+from utils.algorithms.topological_sort import topological_sort, \
+    topological_sort_compact
+from utils.algorithms.compact_graph import CompactGraph
+from utils.algorithms.filter_expression import FilterError, \
+    parse_filter_expression, is_filter_expression, get_expression_columns, \
+    may_match
+from utils.algorithms.aggregation import AGGREGATE_FUNCTIONS, \
+    AggregateError, normalize_aggregations, get_aggregate_column_name, \
+    is_group_by, is_aggregations
+from utils.algorithms.merge_options import MERGE_HOWS, MERGE_VALIDATES, \
+    MergeCheckError, is_merge_options, normalize_merge_options, \
+    is_default_merge
@@ -0,0 +1,81 @@
+from typing import Any, Dict, List, Union
+
+"""
+aggregate Task에서 사용할 수 있는 집계 함수
+"""
+AGGREGATE_FUNCTIONS = ('sum', 'count', 'min', 'max', 'mean')
+
+
+class AggregateError(Exception):
+    """
+    group by 집계를 하지 못함 (없는 column, 집계할 수 없는 타입 등)
+    집계하지 않은 데이터를 넘기지 않고 Task(Job 실행)가 실패한다.
+
+    :param task: 집계한 Task (aggregate Task, 합쳐진 경우에도 aggregate Task)
+    :param group_by: group key column
+    :param aggregations: 집계 함수
+    :param error: 에러 내용
+    """
+    task: str
+    group_by: List[str]
+    aggregations: Dict[str, Any]
+    error: str
+
+    def __init__(self, task: str, group_by: List[str],
+                 aggregations: Dict[str, Any], error: str):
+        super().__init__(task, group_by, aggregations, error)
+        self.task = task
+        self.group_by = group_by
+        self.aggregations = aggregations
+        self.error = error
+
+    def __str__(self):
+        return f'aggregate failed in {self.task}: {self.error}'
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'task': self.task, 'group_by': self.group_by,
+                'aggregations': self.aggregations, 'error': self.error}
+
+
+def normalize_aggregations(aggregations: Dict[str, Union[str, List[str]]]) \
+        -> Dict[str, List[str]]:
+    """
+    {column: 집계 함수 또는 집계 함수 list} 를 {column: [집계 함수, ...]} 로 바꾼다.
+    """
+    return {
+        col: [funcs] if isinstance(funcs, str) else list(funcs)
+        for col, funcs in aggregations.items()
+    }
+
+
+def get_aggregate_column_name(column: str, func: str) -> str:
+    """
+    집계 결과의 column 이름 (예: price, sum -> price_sum)
+    """
+    return f'{column}_{func}'
+
+
+def is_group_by(v: Any) -> bool:
+    """
+    group_by는 중복이 없는 column 이름 list여야 한다.
+    """
+    return isinstance(v, list) and len(v) > 0 \
+        and all(isinstance(col, str) for col in v) and len(set(v)) == len(v)
+
+
+def is_aggregations(v: Any) -> bool:
+    """
+    aggregations는 {column: 집계 함수 또는 집계 함수 list} 형태여야 한다.
+    """
+    if not isinstance(v, dict) or not v:
+        return False
+    for col, funcs in v.items():
+        if not isinstance(col, str):
+            return False
+        funcs = [funcs] if isinstance(funcs, str) else funcs
+        if not isinstance(funcs, list) or not funcs \
+                or len(set(funcs)) != len(funcs):
+            return False
+        if not all(f in AGGREGATE_FUNCTIONS for f in funcs):
+            return False
+    return True
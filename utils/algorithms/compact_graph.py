@@ -0,0 +1,131 @@
+from array import array
+from typing import Dict, Iterator, List, Tuple
+
+"""
+정수 ID와 CSR(Compressed Sparse Row) 배열로 저장한 그래프
+
+Task 이름(문자열)을 0부터 시작하는 정수 ID로 바꾸고(intern)
+간선은 offsets, targets 두 개의 정수 배열에 저장한다.
+정점 u의 다음 정점은 targets[offsets[u]:offsets[u + 1]] 이다.
+Task가 많은 Job(10,000개 이상)에서 dict/list 대신 배열을 사용해서 메모리와 시간을 줄인다.
+
+GRAPH_INDEX_TYPECODE: 배열 원소 타입 ('l': C long)
+"""
+GRAPH_INDEX_TYPECODE = 'l'
+
+
+class CompactGraph:
+    """
+    task_list를 정수 ID와 CSR 배열로 바꾼 그래프
+
+    정점 ID는 task_list의 key 순서이고, 다음 정점 순서도 task_list와 같다.
+    (위상 정렬 결과와 병합 순서가 dict 그래프와 같다.)
+
+    :param names: ID별 Task 이름
+    :param ids: Task 이름별 ID
+    :param offsets: 정점별 간선 시작 위치 (길이: 정점 갯수 + 1)
+    :param targets: 간선의 도착 정점 ID
+    :param in_degree: 정점별 이전 정점 갯수
+    """
+    __slots__ = ('names', 'ids', 'offsets', 'targets', 'in_degree')
+    names: List[str]
+    ids: Dict[str, int]
+    offsets: array
+    targets: array
+    in_degree: array
+
+    def __init__(self, g: Dict[str, List[str]]):
+        """
+        :exception ValueError: task_list에 없는 Task로 가는 간선이 있음
+        """
+        self.names = list(g)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.offsets = array(GRAPH_INDEX_TYPECODE, [0])
+        self.targets = array(GRAPH_INDEX_TYPECODE)
+        self.in_degree = array(GRAPH_INDEX_TYPECODE, [0]) * len(self.names)
+        ids = self.ids
+        for u in self.names:
+            for v in g[u]:
+                i = ids.get(v)
+                if i is None:
+                    raise ValueError(f'{u} 에서 가는 {v} 가 없습니다.')
+                self.targets.append(i)
+                self.in_degree[i] += 1
+            self.offsets.append(len(self.targets))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def children(self, u: int) -> array:
+        """
+        u의 다음 정점 ID
+        """
+        return self.targets[self.offsets[u]:self.offsets[u + 1]]
+
+    def out_degree(self, u: int) -> int:
+        return self.offsets[u + 1] - self.offsets[u]
+
+    def parents(self) -> 'CompactGraph':
+        """
+        간선 방향을 뒤집은 그래프, 같은 ID를 사용한다.
+        이전 정점은 ID 순서로 들어있다.
+        """
+        n = len(self.names)
+        reverse = CompactGraph.__new__(CompactGraph)
+        reverse.names, reverse.ids = self.names, self.ids
+        reverse.offsets = array(GRAPH_INDEX_TYPECODE, [0]) * (n + 1)
+        for u in range(n):
+            reverse.offsets[u + 1] = reverse.offsets[u] + self.in_degree[u]
+        reverse.targets = array(GRAPH_INDEX_TYPECODE, [0]) * len(self.targets)
+        reverse.in_degree = array(GRAPH_INDEX_TYPECODE,
+                                  (self.out_degree(u) for u in range(n)))
+        position = reverse.offsets[:-1]
+        for u in range(n):
+            for v in self.children(u):
+                reverse.targets[position[v]] = u
+                position[v] += 1
+        return reverse
+
+    def find_double_edge(self) -> Iterator[Tuple[int, int]]:
+        """
+        같은 정점으로 가는 간선이 두 개 이상인 정점 (u, v)
+        """
+        for u in range(len(self.names)):
+            children = self.children(u)
+            if len(children) > 1 and len(set(children)) < len(children):
+                seen = set()
+                for v in children:
+                    if v in seen:
+                        yield u, v
+                        break
+                    seen.add(v)
+
+    def sinks(self) -> List[int]:
+        """
+        다음 정점이 없는 정점 ID
+        """
+        offsets = self.offsets
+        return [u for u in range(len(self.names))
+                if offsets[u] == offsets[u + 1]]
+
+    def topological_order(self) -> array:
+        """
+        위상 정렬 (Kahn), 이전 정점이 없는 정점부터 들어온 순서대로(FIFO) 꺼낸다.
+
+        :return: 정렬된 정점 ID, 사이클이 있으면 정점 갯수보다 짧다.
+        """
+        remaining = array(GRAPH_INDEX_TYPECODE, self.in_degree)
+        offsets, targets = self.offsets, self.targets
+        order = array(GRAPH_INDEX_TYPECODE,
+                      (u for u in range(len(self.names))
+                       if remaining[u] == 0))
+        head = 0
+        while head < len(order):
+            u = order[head]
+            head += 1
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                remaining[v] -= 1
+                if remaining[v] == 0:
+                    order.append(v)
+        return order
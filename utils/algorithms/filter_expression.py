@@ -0,0 +1,191 @@
+import ast
+from typing import Any, Dict, Set, Tuple
+
+"""
+filter Task의 expression에 사용할 수 있는 문법
+column 이름, 상수(숫자/문자열/bool/None), 상수 list/tuple과
+비교/논리/산술 연산만 허용한다. (함수 호출, 속성 접근, 지역 변수(@) 등은 허용하지 않는다.)
+거듭제곱(**)은 상수만으로도(9**9**9) 계산이 끝나지 않을 수 있어서 허용하지 않는다.
+"""
+FILTER_EXPRESSION_NODES = (
+    ast.Expression, ast.Name, ast.Load, ast.Constant, ast.List, ast.Tuple,
+    ast.BoolOp, ast.And, ast.Or,
+    ast.UnaryOp, ast.Not, ast.Invert, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.BitAnd, ast.BitOr,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+    ast.In, ast.NotIn,
+)
+# 문자열 상수를 포함해 너무 긴 expression은 허용하지 않는다.
+FILTER_EXPRESSION_MAX_LENGTH = 4096
+
+
+class FilterError(Exception):
+    """
+    filter 조건을 데이터에 적용하지 못함 (없는 column, 비교할 수 없는 타입 등)
+    거르지 않은 데이터를 넘기지 않고 Task(Job 실행)가 실패한다.
+
+    :param task: 조건을 적용한 Task (filter Task 또는 조건을 옮겨온 read Task)
+    :param expression: 적용하지 못한 조건
+    :param error: 에러 내용
+    """
+    task: str
+    expression: str
+    error: str
+
+    def __init__(self, task: str, expression: str, error: str):
+        super().__init__(task, expression, error)
+        self.task = task
+        self.expression = expression
+        self.error = error
+
+    def __str__(self):
+        return f'filter failed in {self.task}: {self.expression} ' \
+               f'({self.error})'
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'task': self.task, 'expression': self.expression,
+                'error': self.error}
+
+
+def parse_filter_expression(expression: str) -> ast.Expression:
+    """
+    filter expression을 파싱하고 허용된 문법만 사용했는지 확인한다.
+
+    :exception ValueError: 문법이 틀렸거나 허용되지 않은 문법을 사용한 경우
+    """
+    if not isinstance(expression, str) or not expression.strip() \
+            or len(expression) > FILTER_EXPRESSION_MAX_LENGTH:
+        raise ValueError("expression must be non-empty string")
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"invalid expression: {e.msg}")
+    for node in ast.walk(tree):
+        if not isinstance(node, FILTER_EXPRESSION_NODES):
+            raise ValueError(
+                f"not allowed in expression: {type(node).__name__}")
+        if isinstance(node, ast.Constant) and not isinstance(
+                node.value, (int, float, str, bool, type(None))):
+            raise ValueError("not allowed constant in expression")
+    return tree
+
+
+def is_filter_expression(expression: str) -> bool:
+    """
+    filter expression으로 사용할 수 있는지 판단하는 함수
+    """
+    try:
+        parse_filter_expression(expression)
+    except ValueError:
+        return False
+    return True
+
+
+def get_expression_columns(expression: str) -> Set[str]:
+    """
+    filter expression에서 사용하는 column 이름
+    """
+    return {
+        node.id for node in ast.walk(parse_filter_expression(expression))
+        if isinstance(node, ast.Name)
+    }
+
+
+def __compare_range(op: ast.cmpop, stats: Dict[str, Any], value: Any) \
+        -> bool:
+    """
+    column 값이 [min, max] 범위일 때 'column op value'를 만족하는 값이 있을 수 있는지
+    """
+    low, high, nulls = stats.get('min'), stats.get('max'), stats.get('nulls')
+    if isinstance(op, (ast.NotEq, ast.NotIn)):
+        # NaN != value는 항상 참이다.
+        if nulls or low is None or low != high:
+            return True
+        values = value if isinstance(op, ast.NotIn) else [value]
+        return low not in values
+    if low is None or high is None:
+        # 모두 NaN이면 비교 결과는 항상 거짓이다.
+        return nulls is None
+    if isinstance(op, ast.Eq):
+        return low <= value <= high
+    if isinstance(op, ast.In):
+        return any(low <= v <= high for v in value)
+    if isinstance(op, ast.Lt):
+        return low < value
+    if isinstance(op, ast.LtE):
+        return low <= value
+    if isinstance(op, ast.Gt):
+        return high > value
+    if isinstance(op, ast.GtE):
+        return high >= value
+    return True
+
+
+FLIPPED_OPERATORS = {ast.Lt: ast.Gt, ast.LtE: ast.GtE,
+                     ast.Gt: ast.Lt, ast.GtE: ast.LtE,
+                     ast.Eq: ast.Eq, ast.NotEq: ast.NotEq}
+
+
+def __get_constant(node: ast.AST) -> Tuple[bool, Any]:
+    if isinstance(node, ast.Constant):
+        return True, node.value
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub) \
+            and isinstance(node.operand, ast.Constant) \
+            and isinstance(node.operand.value, (int, float)):
+        return True, -node.operand.value
+    if isinstance(node, (ast.List, ast.Tuple)):
+        values = [__get_constant(e) for e in node.elts]
+        if all(ok for ok, _ in values):
+            return True, [v for _, v in values]
+    return False, None
+
+
+def __may_match(node: ast.AST, column_stats: Dict[str, Dict[str, Any]]) \
+        -> bool:
+    if isinstance(node, ast.Expression):
+        return __may_match(node.body, column_stats)
+    if isinstance(node, ast.BoolOp):
+        results = (__may_match(v, column_stats) for v in node.values)
+        return all(results) if isinstance(node.op, ast.And) else any(results)
+    if isinstance(node, ast.BinOp) and isinstance(node.op,
+                                                  (ast.BitAnd, ast.BitOr)):
+        left = __may_match(node.left, column_stats)
+        right = __may_match(node.right, column_stats)
+        return left and right if isinstance(node.op, ast.BitAnd) \
+            else left or right
+    if not isinstance(node, ast.Compare):
+        return True
+
+    operands = [node.left] + node.comparators
+    for op, left, right in zip(node.ops, operands, operands[1:]):
+        # column op 상수 형태로 바꾼다.
+        if isinstance(right, ast.Name) and not isinstance(left, ast.Name) \
+                and type(op) in FLIPPED_OPERATORS:
+            left, right, op = right, left, FLIPPED_OPERATORS[type(op)]()
+        is_constant, value = __get_constant(right)
+        if not isinstance(left, ast.Name) or not is_constant \
+                or left.id not in column_stats:
+            continue
+        if isinstance(op, (ast.In, ast.NotIn)) != isinstance(value, list):
+            continue
+        try:
+            if not __compare_range(op, column_stats[left.id], value):
+                return False
+        except TypeError:
+            # 비교할 수 없는 타입(문자열 column과 숫자 등)이면 판단하지 않는다.
+            continue
+    return True
+
+
+def may_match(expression: str, column_stats: Dict[str, Dict[str, Any]]) \
+        -> bool:
+    """
+    column별 통계(min, max, nulls)로 expression을 만족하는 행이 있을 수 있는지 판단한다.
+    False면 조건을 만족하는 행이 확실히 없다. (판단할 수 없는 조건은 True)
+
+    'column 비교 상수', 'column in [상수, ...]' 와 and/or(&, |)로 묶인 조건만 판단한다.
+
+    :param column_stats: {column: {'min', 'max', 'nulls'}}, min/max가 None이면 모두 NaN
+    """
+    return __may_match(parse_filter_expression(expression), column_stats)
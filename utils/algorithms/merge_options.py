@@ -0,0 +1,98 @@
+from typing import Any, Dict, List, Optional
+
+"""
+Task의 이전 Task 결과 병합 옵션 (property의 merge)
+
+MERGE_HOWS: join 방식, 왼쪽은 먼저 병합된 결과, 오른쪽은 새로 병합하는 결과이다.
+MERGE_VALIDATES: key 검사 방식별 (왼쪽 key가 고유해야 하는지, 오른쪽 key가 고유해야 하는지)
+                 pandas.merge의 validate와 이름이 같다.
+DEFAULT_MERGE_OPTIONS: 옵션이 없을 때, 겹치는 모든 column으로 outer join 한다.
+MERGE_DIAGNOSTIC_KEYS: 실패 진단 정보에 넣는 key 갯수 (행이 많이 늘어나는 순서)
+"""
+MERGE_HOWS = ('outer', 'inner', 'left', 'right')
+MERGE_VALIDATES = {
+    'one_to_one': (True, True), '1:1': (True, True),
+    'one_to_many': (True, False), '1:m': (True, False),
+    'many_to_one': (False, True), 'm:1': (False, True),
+    'many_to_many': (False, False), 'm:m': (False, False),
+}
+DEFAULT_MERGE_OPTIONS = {'how': 'outer', 'on': None, 'validate': None,
+                         'max_row_factor': None}
+MERGE_DIAGNOSTIC_KEYS = 5
+
+
+class MergeCheckError(Exception):
+    """
+    병합 전에 검사한 조건(key column, validate, max_row_factor)을 만족하지 않음
+    병합하지 않고 바로 실패한다.
+
+    :param reason: missing_keys(key column 없음), validate(key 중복), max_row_factor(행 갯수 초과)
+    :param details: 진단 정보 (task, prev_task, keys, 행 갯수, 많이 늘어나는 key 등)
+    """
+    reason: str
+    details: Dict[str, Any]
+
+    def __init__(self, reason: str, details: Dict[str, Any]):
+        super().__init__(reason, details)
+        self.reason = reason
+        self.details = details
+
+    def __str__(self):
+        where = f'{self.details.get("prev_task")} -> ' \
+                f'{self.details.get("task")}'
+        return f'merge check failed ({self.reason}): {where} ' \
+               f'on {self.details.get("keys")}'
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'reason': self.reason, **self.details}
+
+
+def is_merge_options(v: Any) -> bool:
+    """
+    merge는 {'how', 'on', 'validate', 'max_row_factor'} 중 일부를 가진 dict여야 한다.
+    on은 중복이 없는 column 이름 list, max_row_factor는 1 이상의 숫자이다.
+    """
+    if not isinstance(v, dict) or not set(v) <= set(DEFAULT_MERGE_OPTIONS):
+        return False
+    if 'how' in v and v['how'] not in MERGE_HOWS:
+        return False
+    on = v.get('on')
+    if on is not None and not (
+            isinstance(on, list) and on and len(set(on)) == len(on)
+            and all(isinstance(col, str) for col in on)):
+        return False
+    if v.get('validate') is not None \
+            and v['validate'] not in MERGE_VALIDATES:
+        return False
+    factor = v.get('max_row_factor')
+    if factor is not None and (
+            isinstance(factor, bool) or not isinstance(factor, (int, float))
+            or not factor >= 1):
+        return False
+    return True
+
+
+def normalize_merge_options(v: Optional[Dict[str, Any]]) \
+        -> Dict[str, Any]:
+    """
+    없는 옵션을 기본값으로 채운다.
+    """
+    return {**DEFAULT_MERGE_OPTIONS, **(v or {})}
+
+
+def is_default_merge(options: Optional[Dict[str, Any]]) -> bool:
+    """
+    기본 병합(겹치는 모든 column으로 outer join, 검사 없음)인지 여부
+    """
+    return normalize_merge_options(options) == DEFAULT_MERGE_OPTIONS
+
+
+def get_merge_keys(options: Dict[str, Any], left_columns: List[str],
+                   right_columns: List[str]) -> List[str]:
+    """
+    병합 key, on이 없으면 겹치는 column (왼쪽 column 순서)
+    """
+    if options.get('on'):
+        return list(options['on'])
+    right = set(right_columns)
+    return [col for col in left_columns if col in right]
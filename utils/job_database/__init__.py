@@ -1 +1,6 @@
-from utils.job_database.engine import *
\ No newline at end of file
+from utils.job_database.engine import *
+from utils.job_database.scheduler import RunScheduler, RunQueueFull
+from utils.job_database.run_history import RunHistory
+from utils.job_database.input_shards import ShardReadError, \
+    ShardNotFoundError, resolve_shards
+from utils.job_database.output_partitions import PartitionColumnError
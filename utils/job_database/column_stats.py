@@ -0,0 +1,72 @@
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.algorithms import may_match
+
+"""
+write Task 결과 파일의 column 통계
+
+write Task에 'column_stats': true 를 주면 결과 파일과 같이 <파일 이름>.stats.json 을 작성한다.
+행 갯수, schema hash, column별 min/max/null 갯수를 파일 전체와 row group(INDEX_STRIDE 행)마다 기록한다.
+다음 Job이 이 파일을 filter 조건과 같이 읽으면 조건을 만족할 수 없는 파일이나 row group은 읽지 않는다.
+
+STATS_SUFFIX: 통계 파일 이름 뒤에 붙는 문자열
+"""
+STATS_SUFFIX = '.stats.json'
+
+
+def get_stats_path(path: str) -> str:
+    return path + STATS_SUFFIX
+
+
+def load_column_stats(path: str) -> Optional[Dict[str, Any]]:
+    """
+    결과 파일의 column 통계, 없거나 결과 파일이 바뀌었으면 None
+
+    :return: {'rows', 'schema', 'schema_hash', 'kinds', 'read_dtypes', 'columns', 'row_groups', 'size', 'mtime_ns'}
+    """
+    try:
+        with open(get_stats_path(path)) as f:
+            stats = json.load(f)
+        st = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    if stats.get('size') != st.st_size \
+            or stats.get('mtime_ns') != st.st_mtime_ns:
+        return None
+    return stats
+
+
+def remove_column_stats(path: str):
+    try:
+        os.remove(get_stats_path(path))
+    except FileNotFoundError:
+        pass
+
+
+def __usable_stats(column_stats: Dict[str, Dict[str, Any]],
+                   exclude: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    # 읽을 때 dtype을 바꾸는 column은 작성할 때의 통계와 비교 결과가 다를 수 있다.
+    exclude = set(exclude)
+    return {col: s for col, s in column_stats.items() if col not in exclude}
+
+
+def may_match_file(stats: Dict[str, Any], predicates: List[str],
+                   exclude: Iterable[str] = ()) -> bool:
+    """
+    파일 전체 통계로 판단했을 때 모든 조건을 만족하는 행이 있을 수 있는지
+    """
+    column_stats = __usable_stats(stats['columns'], exclude)
+    return all(may_match(p, column_stats) for p in predicates)
+
+
+def select_row_groups(stats: Dict[str, Any], predicates: List[str],
+                      exclude: Iterable[str] = ()) -> List[int]:
+    """
+    모든 조건을 만족하는 행이 있을 수 있는 row group 번호
+    """
+    exclude = list(exclude)
+    return [i for i, group in enumerate(stats.get('row_groups', []))
+            if all(may_match(p, __usable_stats(group['columns'], exclude))
+                   for p in predicates)]
@@ -1,34 +1,137 @@
-from threading import Lock
-from typing import Dict, Any, Optional
-import json
+from typing import Dict, Any, List, Optional, Set, Tuple
+import copy
 import os
-import pandas as pd
+import shutil
+import time
 
 from libs.validator import ValidatorChain
-from libs.resource_access import lock_while_using_file
+from libs.resource_access import lock_while_using_file, get_json_codec, \
+    infer_compression, is_path_inside, FileLock
+from utils.algorithms import topological_sort
 from utils.algorithms.job_searcher import search_job_by_binary_search
-from utils.job_database.io import JobDatabaseRead, JobDatabaseWrite
-from utils.job_database.task import TaskWorker
+from utils.job_database.io import JobDatabaseRead, JobDatabaseWrite, \
+    JOB_DATABASE_ROOT, JOB_DATABASE_LOCK_PATH
+from utils.job_database.scheduler import RunScheduler
+from utils.job_database.run_history import RunHistory
+from utils.job_database.input_shards import resolve_shards
+from utils.job_database.watcher import InputWatcher
+from utils.job_database.plan_estimator import explain_job
 from utils.validator_chains import get_job_validator_chain
 
 
+"""
+실행 예상 메모리 추정
+DATA_DIR: read Task가 읽는 파일 위치
+DEFAULT_MEMORY_RATIO: 실행 기록이 없을 때 (예상 메모리 사용량 / 입력 파일 크기)
+COMPRESSED_INPUT_RATIO: 압축 파일의 (압축을 푼 크기 / 파일 크기) 추정값
+"""
+DATA_DIR = 'storage/data'
+DEFAULT_MEMORY_RATIO = 3.0
+COMPRESSED_INPUT_RATIO = 5
+
+"""
+실행 기록
+MEMORY_HISTORY_RUNS: Scheduler에 메모리 비율이 없는 Job(서버 재시작, 다른 worker)은 최근 실행 기록 몇 개로 채운다.
+"""
+MEMORY_HISTORY_RUNS = 5
+
+"""
+입력 파일 감시
+WATCHER_LOCK_PATH: 여러 worker 중 하나만 감시하도록 잠그는 파일
+WATCHER_CLIENT_ID: 입력 파일이 바뀌어서 실행한 Job의 client_id
+"""
+WATCHER_LOCK_PATH = 'storage/input-watcher.lock'
+WATCHER_CLIENT_ID = 'input-watcher'
+
+
+class JobVersionConflict(Exception):
+    """
+    수정하려는 Job의 version이 요청한 version과 다름 (그 사이에 다른 요청이 수정함)
+
+    :param version: 현재 저장된 Job의 version
+    """
+    version: int
+
+    def __init__(self, version: int):
+        super().__init__(f'job version conflict (current: {version})')
+        self.version = version
+
+
+def get_job_version(job: Dict[str, Any]) -> int:
+    """
+    Job의 version, 저장된 이후 수정될 때마다 1씩 증가한다.
+    version이 없는 이전 데이터는 1로 취급한다.
+    """
+    return job.get('version', 1)
+
+
 class JobDatabaseEngine:
     """
     Job.json을 관리하는 일종의 데이터베이스 엔진
+
+    pandas와 Task 실행 모듈은 불러오는 데 오래 걸리기 때문에
+    Job을 실제로 실행할 때(run, reset) 불러온다.
     """
 
     """
     파일 접근은 한번에 하나의 클라이언트가 들어간다.
     파이썬에서는 동시에 접근할 경우 Error가 발생하기 때문에
     파일 접근을 시도할 때 먼저 Lock을 걸어둔다.
+    여러 worker process가 같은 파일을 읽고 쓰므로 process 사이에서도 잠근다. (FileLock)
+    """
+    mutex: FileLock
+
+    """
+    Job 실행(Task 수행)은 오래 걸리기 때문에 jobs.json 접근과 별도로 Scheduler가 관리한다.
+    실행 중에도 다른 클라이언트가 Job 정보를 조회/수정 할 수 있다.
+    예상 메모리 사용량이 제한을 넘지 않을 때만 실행하고 나머지는 대기열에서 기다린다.
+    (기본값은 한번에 하나의 Job만 실행한다.)
     """
-    mutex: Lock
+    scheduler: RunScheduler
 
     """
     Job 데이터 상태가 유효한지를 파악하기 위한 Validator
     """
     validator: ValidatorChain
 
+    """
+    jobs.json 캐시
+    파일 상태(inode, 수정 시간, 크기)가 바뀌지 않았으면 파일을 다시 파싱하지 않는다.
+    다른 프로세스(worker)가 파일을 바꾸면 상태가 달라지므로 다시 읽게 된다.
+    (inode 재사용, 수정 시간 단위, 같은 크기로 인해 바뀐 파일이 같아 보일 수 있으므로
+     수정(읽고-바꾸고-쓰기)할 때는 캐시를 사용하지 않고 Lock 안에서 다시 읽는다.)
+    캐시된 데이터는 밖으로 넘기지 않는다. (get_item은 복사본을 돌려준다)
+    """
+    storage_cache: Optional[Tuple[Tuple[int, int, int], Dict[str, Any]]]
+
+    """
+    실행 계획 캐시: job_id -> (task_list, 위상 정렬 결과)
+    """
+    plan_cache: Dict[int, Tuple[Dict[str, List[str]], List[str]]]
+
+    """
+    Task 실행 방식(serial/process)과 process 실행 시 최대 process 갯수
+    """
+    task_executor: str
+    task_workers: Optional[int]
+
+    """
+    Job 실행 한번당 buffer 메모리 제한(byte)과 spill 파일 디렉토리
+    """
+    memory_budget: Optional[int]
+    spill_dir: Optional[str]
+
+    """
+    입력 파일 감시, subscribe_inputs가 true인 Job은 read Task의 파일이 바뀌면 실행한다.
+    start_watcher()를 호출해야 감시를 시작한다.
+    """
+    watcher: Optional[InputWatcher]
+
+    """
+    Job 실행 기록(run history), Job 실행이 끝날 때마다 추가한다.
+    """
+    run_history: RunHistory
+
     def __new__(cls):
         """
         많은 트래픽으로 인한 Instance 남발을 줄이기 위해
@@ -39,44 +142,181 @@ class JobDatabaseEngine:
                 super(JobDatabaseEngine, cls).__new__(cls)
         return cls.jobdatabase_instance
 
-    def __read_from_database(self) -> Dict[str, Any]:
+    @staticmethod
+    def __get_file_signature() -> Tuple[int, int, int]:
+        st = os.stat(JOB_DATABASE_ROOT)
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def __read_from_database(self, reload: bool = False) -> Dict[str, Any]:
         """
         Json으로부터 데이터 불러오기
+        파일이 바뀌지 않았으면 캐시된 데이터를 사용한다.
+
+        :param reload: True면 캐시를 사용하지 않고 파일을 다시 읽는다. (수정할 때)
         """
+        signature = self.__get_file_signature()
+        if not reload and self.storage_cache \
+                and self.storage_cache[0] == signature:
+            return self.storage_cache[1]
+
         raw_storage = None
         with JobDatabaseRead() as r:
-            raw_storage = json.load(r)
+            raw_storage = get_json_codec().load(r)
+        self.storage_cache = signature, raw_storage
         return raw_storage
 
     def __write_to_database(self, data: Dict[str, Any]):
         """
         Json File에 갱신하기
         """
-        with JobDatabaseWrite() as w:
-            json.dump(data, w, indent=4)
+        try:
+            with JobDatabaseWrite() as w:
+                get_json_codec().dump(data, w)
+        except Exception as e:
+            # 캐시된 데이터가 이미 수정되었을 수 있으므로 캐시를 버린다.
+            self.storage_cache = None
+            raise e
+        self.storage_cache = self.__get_file_signature(), data
 
     def __init__(self):
-        self.mutex = Lock()
+        """
+        Singletone이므로 JobDatabaseEngine()을 호출할 때마다 __init__이 실행된다.
+        Lock이 교체되면 동시 접근을 막을 수 없으므로 처음 한번만 초기화한다.
+        """
+        if hasattr(self, 'mutex'):
+            return
+        self.mutex = FileLock(JOB_DATABASE_LOCK_PATH)
+        self.scheduler = RunScheduler()
         self.validator = get_job_validator_chain()
+        self.storage_cache = None
+        self.plan_cache = dict()
+        self.task_executor = 'serial'
+        self.task_workers = None
+        self.memory_budget = None
+        self.spill_dir = None
+        self.watcher = None
+        self.run_history = RunHistory()
+
+    @classmethod
+    def discard_instance(cls):
+        """
+        Singletone Instance 버리기
+        fork 이후의 worker process는 부모의 Lock 상태까지 복사하므로
+        새로운 Instance를 생성해야 한다.
+        """
+        if hasattr(cls, 'jobdatabase_instance'):
+            del cls.jobdatabase_instance
+
+    def get_plan(self, job: Dict[str, Any]) -> List[str]:
+        """
+        Job의 실행 순서(위상 정렬 결과) 얻기
+        task_list가 바뀌지 않았으면 캐시된 결과를 사용한다.
+        """
+        job_id, task_list = job.get('job_id'), job['task_list']
+        cached = self.plan_cache.get(job_id)
+        if cached and cached[0] == task_list:
+            return cached[1]
+        plan = topological_sort(task_list)
+        if job_id is not None:
+            self.plan_cache[job_id] = task_list, plan
+        return plan
+
+    def warm_up(self) -> Dict[str, Any]:
+        """
+        요청을 받기 전에 jobs.json 캐시와 실행 계획 캐시를 미리 채워둔다.
+
+        :return: 불러온 job 갯수와 걸린 시간
+        """
+        start = time.perf_counter()
+
+        @lock_while_using_file(self.mutex)
+        def __load_jobs() -> int:
+            # 캐시된 목록은 Lock 안에서만 사용한다.
+            jobs = self.__read_from_database()['jobs']
+            for job in jobs:
+                self.get_plan(job)
+            return len(jobs)
+
+        count = __load_jobs()
+        return {'jobs': count, 'seconds': time.perf_counter() - start}
+
+    def get_subscriptions(self) -> Dict[str, List[int]]:
+        """
+        subscribe_inputs가 true인 Job이 읽는 파일 목록
+        Job이 직접 작성하는 파일은 제외한다. (자기 자신의 실행 결과로 다시 실행되지 않도록)
+
+        :return: {파일 이름: [job_id, ...]}
+        """
+
+        @lock_while_using_file(self.mutex)
+        def __load_subscriptions() -> Dict[str, List[int]]:
+            # 캐시된 목록은 Lock 안에서만 사용한다.
+            subscriptions: Dict[str, List[int]] = dict()
+            for job in self.__read_from_database()['jobs']:
+                if not job.get('subscribe_inputs'):
+                    continue
+                properties = job['property'].values()
+                read = {v['filename'] for v in properties
+                        if v['task_name'] == 'read'}
+                written = {v['filename'] for v in properties
+                           if v['task_name'] == 'write'}
+                for filename in read - written:
+                    subscriptions.setdefault(filename, []) \
+                        .append(job['job_id'])
+            return subscriptions
+
+        return __load_subscriptions()
+
+    def start_watcher(self, backend: str = 'auto',
+                      debounce: Optional[float] = None,
+                      poll_interval: Optional[float] = None,
+                      lock_path: Optional[str] = WATCHER_LOCK_PATH) \
+            -> InputWatcher:
+        """
+        입력 파일 감시 시작, 바뀐 파일을 구독한 Job을 Scheduler를 통해 실행한다.
+        여러 worker에서 호출해도 lock_path를 먼저 잠근 worker 하나만 감시한다.
+        """
+        if self.watcher is not None:
+            return self.watcher
+        options = {'debounce': debounce, 'poll_interval': poll_interval}
+        self.watcher = InputWatcher(
+            DATA_DIR, self.get_subscriptions,
+            lambda job_id, filenames: self.run(job_id, WATCHER_CLIENT_ID),
+            backend=backend, lock_path=lock_path,
+            **{k: v for k, v in options.items() if v is not None})
+        self.watcher.start()
+        return self.watcher
+
+    def stop_watcher(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
 
     def reset(self):
         """
         Job.json 초기화, storage 초기화
         테스트 할 때만 사용
         """
+        import pandas as pd
+
         self.__write_to_database({'jobs': []})
+        self.plan_cache.clear()
+        self.scheduler.memory_ratio.clear()
+        self.run_history.clear()
 
-        # 모든 csv 파일을 삭제하고
-        BASE_DIR = 'storage/data'
-        for f in os.scandir(BASE_DIR):
-            os.remove(f.path)
+        # 모든 csv 파일(여러 파일로 나뉜 입력 디렉토리 포함)을 삭제하고
+        for f in os.scandir(DATA_DIR):
+            if f.is_dir(follow_symlinks=False):
+                shutil.rmtree(f.path)
+            else:
+                os.remove(f.path)
 
         # a.csv 초기화
         df = pd.DataFrame({
             'col0': ['data00', 'data01'],
             'col1': ['data10', 'data11']
         })
-        df.to_csv(f'{BASE_DIR}/a.csv', index=False)
+        df.to_csv(f'{DATA_DIR}/a.csv', index=False)
 
     def save(self, job: Dict[str, Any]) \
         -> int:
@@ -88,8 +328,13 @@ class JobDatabaseEngine:
         :exception ValieError: 추가하려는 데이터가 잘못된 경우
         """
 
-        def __set_job_id(job_list_size: int):
-            return 1 if job_list_size == 0 else job_list_size + 1
+        def __set_job_id(storage: Dict[str, Any]) -> int:
+            # 삭제된 Job의 ID는 다시 사용하지 않는다. (ID 순서로 정렬되어 있어야 한다.)
+            jobs = storage['jobs']
+            last_job_id = max(storage.get('last_job_id', 0),
+                              jobs[-1]['job_id'] if jobs else 0)
+            storage['last_job_id'] = last_job_id + 1
+            return last_job_id + 1
 
         @lock_while_using_file(self.mutex)
         def __save() -> int:
@@ -99,12 +344,13 @@ class JobDatabaseEngine:
 
             :return: 생성된 Job의 고유 아이디
             """
-            # 데이터 가져오기
-            storage = self.__read_from_database()
+            # 데이터 가져오기 (수정하므로 캐시를 사용하지 않는다)
+            storage = self.__read_from_database(reload=True)
             # job id 발급
-            new_job_id = __set_job_id(len(storage['jobs']))
-            # job_id를 job에 추가 및 storage에 추가
+            new_job_id = __set_job_id(storage)
+            # job_id, version을 job에 추가 및 storage에 추가
             job['job_id'] = new_job_id
+            job['version'] = 1
             storage['jobs'].append(job)
             # 파일에 작성
             self.__write_to_database(storage)
@@ -120,37 +366,52 @@ class JobDatabaseEngine:
         # 에러 발생 시 바로 보냄
         return __save()
 
-    def update(self, job_id: int, updated_data: Dict[str, Any]) \
-            -> bool:
+    def update(self, job_id: int, updated_data: Dict[str, Any],
+               if_match: Optional[Set[int]] = None) \
+            -> Optional[int]:
         """
         해당 JOB_ID 에 대한 정보를 변경한다.
 
+        Job이 있는지 먼저 확인한다. (없는 Job이면 내용이 잘못되었어도 ValueError)
+        검증은 Lock 밖에서 먼저 하고, Lock 안에서는 저장된 version을 비교한 다음 바로 교체한다.(compare-and-swap)
+        검증하는 동안 다른 요청이 Job을 수정했으면 if_match에 현재 version이 없으므로 JobVersionConflict가 발생한다.
+
         :param job_id: 변경하고자 하는 데이터의 고유 ID
         :param updated_data: 변경 내용
-        :return: (성공 여부, 에러 내용(없으면  None))
+        :param if_match: 수정을 허용할 version 목록, None이면 version과 상관없이 수정한다.
+        :return: 수정된 Job의 version, 검증에 실패하면 None
+        :exception ValueError: 데이터 없음
+        :exception JobVersionConflict: 저장된 version이 if_match에 없음
         """
 
         @lock_while_using_file(self.mutex)
-        def __update():
-            all_data = self.__read_from_database()
+        def __update() -> int:
+            all_data = self.__read_from_database(reload=True)
             storage = all_data['jobs']
             # search data
             is_exists, idx = search_job_by_binary_search(storage, job_id)
             if not is_exists:
                 raise ValueError('Data Not Found')
-            # validate data
-            is_valid, err = self.validator(updated_data)
-            if not is_valid:
-                return False
-            if err:
-                raise err
+            # compare version
+            version = get_job_version(storage[idx])
+            if if_match is not None and version not in if_match:
+                raise JobVersionConflict(version)
             # update
             updated_data['job_id'] = job_id
+            updated_data['version'] = version + 1
             all_data['jobs'][idx] = updated_data
             # save
             self.__write_to_database(all_data)
-            return True
-
+            return version + 1
+
+        # check existence (검증하는 동안 삭제되면 __update에서 ValueError)
+        self.get_item(job_id)
+        # validate data
+        is_valid, err = self.validator(updated_data)
+        if not is_valid:
+            return None
+        if err:
+            raise err
         return __update()
 
     def get_item(self, job_id: int) -> Dict[str, Any]:
@@ -159,7 +420,7 @@ class JobDatabaseEngine:
 
         :param job_id: 찾고자 하는 Job의 ID
 
-        :return:  job id에 데한 정보
+        :return:  job id에 데한 정보 (복사본)
 
         :exception ValueError: 찾고자 하는 데이터가 없음
         :exception Exception: 주로 job.json파일이 없어서 발생하는 에러
@@ -174,7 +435,8 @@ class JobDatabaseEngine:
             storage = self.__read_from_database()['jobs']
             # idx -> job_id의 데이터가 위치해 있는 인덱스 값
             is_exists, idx = search_job_by_binary_search(storage, job_id)
-            return storage[idx] if is_exists else None
+            # 캐시된 데이터를 바꾸지 않도록 복사본을 넘긴다.
+            return copy.deepcopy(storage[idx]) if is_exists else None
 
         # 파일에 접근해서 데이터 찾기
         # 에러 발생은 View에서처리
@@ -194,8 +456,8 @@ class JobDatabaseEngine:
 
         @lock_while_using_file(self.mutex)
         def __remove() -> bool:
-            # Json에서 데이터 가져오기
-            all_data = self.__read_from_database()
+            # Json에서 데이터 가져오기 (수정하므로 캐시를 사용하지 않는다)
+            all_data = self.__read_from_database(reload=True)
             storage = all_data['jobs']
             # 삭제할 데이터 검색
             is_exists, idx = search_job_by_binary_search(storage, job_id)
@@ -205,20 +467,240 @@ class JobDatabaseEngine:
             del storage[idx]
             all_data['jobs'] = storage
             self.__write_to_database(all_data)
+            self.plan_cache.pop(job_id, None)
+            self.scheduler.memory_ratio.pop(job_id, None)
+            self.run_history.remove(job_id)
             return True
 
         # 에러는 view에서 처리
         success = __remove()
         return True if success else False
 
-    def run(self, job_id: int):
+    def get_input_bytes(self, job: Dict[str, Any]) -> int:
+        """
+        Job의 read Task가 읽는 파일 크기의 합
+        압축 파일은 압축을 풀었을 때의 크기를 COMPRESSED_INPUT_RATIO 배로 추정한다.
+        여러 파일을 읽는 read Task(glob 패턴, 디렉토리)는 해당하는 파일 크기를 모두 더한다.
+        """
+        total = 0
+        for v in job['property'].values():
+            if v['task_name'] != 'read':
+                continue
+            shards = resolve_shards(DATA_DIR, v['filename'])
+            for path in shards if shards is not None \
+                    else [f'{DATA_DIR}/{v["filename"]}']:
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+                if infer_compression(path, v.get('compression', 'infer')):
+                    size *= COMPRESSED_INPUT_RATIO
+                total += size
+        return total
+
+    def explain(self, job_id: int) -> Dict[str, Any]:
+        """
+        job_id에 대한 Job을 실행하지 않고 실행 계획과 비용 추정값 얻기
+        (pushdown 계획을 위해 Task 실행 모듈을 불러온다.)
 
-        @lock_while_using_file(self.mutex)
-        def __run(job_data):
-            TaskWorker(job_data)()
+        :return: {'job_id', 'order', 'tasks', 'peak_memory', 'warnings', 'scheduler'}
+        :exception ValueError: Job이 없음
+        """
+        from utils.job_database.task.task_planner import plan_pushdown
+
+        job = self.get_item(job_id)
+        plan = explain_job(job, self.get_plan(job), DATA_DIR,
+                           plan_pushdown(job['task_list'], job['property']),
+                           COMPRESSED_INPUT_RATIO,
+                           self.scheduler.memory_budget)
+        input_bytes = self.get_input_bytes(job)
+        # Scheduler가 실행 허가에 사용하는 예상 메모리 (이전 실행 기록 기준)
+        plan['scheduler'] = {
+            'input_bytes': input_bytes,
+            'estimated_memory': self.scheduler.estimate_memory(
+                job_id, input_bytes, DEFAULT_MEMORY_RATIO),
+        }
+        return {'job_id': job_id, **plan}
+
+    def preview_output(self, job_id: int, task_name: Optional[str] = None,
+                       offset: int = 0, limit: int = 100,
+                       columns: Optional[List[str]] = None) \
+            -> Tuple[Any, Dict[str, Any]]:
+        """
+        write Task 결과 파일의 일부(offset번째 행부터 limit개)만 읽기
+        작성할 때 만든 행 위치 index가 있으면 필요한 부분만 읽는다.
+
+        :param task_name: write Task 이름, None이면 Job의 유일한 write Task
+        :return: (읽은 DataFrame, {'task', 'filename', 'sep', 'total_rows', 'indexed'})
+        :exception ValueError: Job이 없음
+        :exception KeyError: write Task가 아니거나 없는 column, partition_by로 나눠서 작성하는 Task,
+                             결과 파일이 data 디렉토리 밖에 있음
+        :exception FileNotFoundError: 결과 파일이 아직 없음
+        """
+        from utils.job_database.task.task_output import read_csv_slice
+
+        job = self.get_item(job_id)
+        writes = [name for name, v in job['property'].items()
+                  if v['task_name'] == 'write']
+        if task_name is None:
+            if len(writes) != 1:
+                raise KeyError(f'task is required: {writes}')
+            task_name = writes[0]
+        if task_name not in writes:
+            raise KeyError(f'not a write task: {task_name}')
+        v = job['property'][task_name]
+        if v.get('partition_by'):
+            raise KeyError(f'partitioned output cannot be previewed: '
+                           f'{task_name}')
+        if not is_path_inside(DATA_DIR, v['filename']):
+            raise KeyError(f'output is outside the data directory: '
+                           f'{v["filename"]}')
+        dataframe, total_rows, indexed = read_csv_slice(
+            f'{DATA_DIR}/{v["filename"]}', v['sep'], offset, limit, columns,
+            infer_compression(v['filename'], v.get('compression', 'infer')))
+        return dataframe, {'task': task_name, 'filename': v['filename'],
+                           'sep': v['sep'], 'total_rows': total_rows,
+                           'indexed': indexed}
+
+    def get_runs(self, job_id: int, since: Optional[float] = None,
+                 until: Optional[float] = None, limit: int = 100,
+                 offset: int = 0) -> Dict[str, Any]:
+        """
+        job_id에 대한 실행 기록 조회 (RunHistory.query)
+
+        :exception ValueError: Job이 없음
+        """
+        self.get_item(job_id)
+        return {'job_id': job_id,
+                **self.run_history.query(job_id, since, until, limit,
+                                         offset)}
 
+    def __load_memory_history(self, job_id: int):
+        """
+        Scheduler에 메모리 비율이 없으면 최근 실행 기록으로 채운다.
+        """
+        if job_id in self.scheduler.memory_ratio:
+            return
+        try:
+            runs = self.run_history.get_last_runs(job_id, MEMORY_HISTORY_RUNS)
+        except OSError:
+            return
+        for record in runs:
+            self.scheduler.record_memory(job_id, record.get('input_bytes'),
+                                         record.get('peak_frame_bytes'))
+
+    def __record_run(self, job: Dict[str, Any], started_at: float,
+                     stats: Dict[str, Any], error: Optional[Exception] = None):
+        """
+        실행 기록 추가
+        기록하지 못해도(디스크 오류 등) Job 실행 결과는 그대로 돌려준다.
+        """
+        tasks = stats.get('tasks') or {}
+        # 다음 Task가 없는 Task(write 등)의 결과를 Job의 결과로 본다.
+        outputs = [tasks[name] for name, children in job['task_list'].items()
+                   if not children and name in tasks]
+        record = {
+            'job_id': job['job_id'],
+            'version': get_job_version(job),
+            'started_at': started_at,
+            # 끝난 시각은 RunHistory가 잠근 다음에 기록한다. (파일 안의 시각 순서 유지)
+            'ended_at': None,
+            'status': 'ok' if error is None else 'error',
+            'seconds': stats.get('seconds'),
+            'rows': sum(t['rows'] for t in outputs),
+            'bytes': sum(t['bytes'] for t in outputs),
+            'tasks': tasks,
+        }
+        if error is not None:
+            record['error'] = f'{type(error).__name__}: {error}'
+        for key in ('executor', 'client_id', 'priority', 'wait_seconds',
+                    'input_bytes', 'estimated_memory', 'peak_frame_bytes',
+                    'spill_count', 'spill_bytes'):
+            if key in stats:
+                record[key] = stats[key]
         try:
-            job_data = self.get_item(job_id)
-        except ValueError as e:
+            self.run_history.append(job['job_id'], record)
+        except OSError:
+            pass
+
+    def run(self, job_id: int, client_id: str = 'anonymous',
+            priority: int = 0) -> Dict[str, Any]:
+        """
+        job_id에 대한 Job 실행
+        Scheduler에서 실행 허가를 받을 때까지 기다린다.
+        실행이 끝나면(실패해도) 실행 기록을 추가한다.
+
+        :param job_id: 실행할 Job의 ID
+        :param client_id: 요청한 클라이언트 (같은 우선순위에서 클라이언트별로 번갈아 실행한다.)
+        :param priority: 우선순위, 클수록 먼저 실행된다.
+        :return: {'trace': Task별 실행 기록, 'stats': 실행 통계}
+        :exception ValueError: Job이 없음
+        :exception RunQueueFull: 대기열이 가득 참
+        """
+        prepared = self.prepare_run(job_id)
+        with self.scheduler.admit(job_id, prepared['memory'], client_id,
+                                  priority) as admission:
+            return self.execute_run(prepared, admission, client_id, priority)
+
+    def prepare_run(self, job_id: int) -> Dict[str, Any]:
+        """
+        Job 실행 준비 (Scheduler에 넘길 예상 메모리 사용량 계산)
+        ASGI에서는 Event Loop에서 실행 허가(admit_async)를 받은 다음 execute_run을 Executor에서 실행한다.
+
+        :return: {'job': Job 데이터, 'input_bytes': 입력 파일 크기, 'memory': 예상 메모리 사용량}
+        :exception ValueError: Job이 없음
+        """
+        job_data = self.get_item(job_id)
+        self.__load_memory_history(job_id)
+        input_bytes = self.get_input_bytes(job_data)
+        memory = self.scheduler.estimate_memory(job_id, input_bytes,
+                                                DEFAULT_MEMORY_RATIO)
+        return {'job': job_data, 'input_bytes': input_bytes,
+                'memory': memory}
+
+    def execute_run(self, prepared: Dict[str, Any],
+                    admission: Dict[str, Any],
+                    client_id: str = 'anonymous',
+                    priority: int = 0) -> Dict[str, Any]:
+        """
+        실행 허가를 받은 Job 실행 (Scheduler의 admit/admit_async 안에서 호출한다.)
+        실행이 끝나면(실패해도) 실행 기록을 추가한다.
+
+        :param prepared: prepare_run의 결과
+        :param admission: admit/admit_async의 결과
+        :return: {'trace': Task별 실행 기록, 'stats': 실행 통계}
+        """
+        from utils.job_database.task import TaskWorker
+
+        job_data = prepared['job']
+        input_bytes, memory = prepared['input_bytes'], prepared['memory']
+        context = {
+            'client_id': client_id,
+            'priority': priority,
+            'input_bytes': input_bytes,
+            'estimated_memory': memory,
+            'wait_seconds': admission['wait_seconds'],
+        }
+        started_at = time.time()
+        worker = None
+        try:
+            worker = TaskWorker(job_data, self.get_plan(job_data),
+                                self.task_executor, self.task_workers,
+                                memory_budget=self.memory_budget,
+                                spill_dir=self.spill_dir)
+            trace = worker()
+        except Exception as e:
+            stats = worker.get_stats() if worker is not None else {}
+            self.__record_run(job_data, started_at,
+                              {**stats, **context}, e)
             raise e
-        __run(job_data)
\ No newline at end of file
+        stats = worker.get_stats()
+        self.scheduler.record_memory(job_data['job_id'], input_bytes,
+                                     stats.get('peak_frame_bytes'))
+        stats.update({
+            'input_bytes': input_bytes,
+            'estimated_memory': memory,
+            'wait_seconds': admission['wait_seconds'],
+        })
+        self.__record_run(job_data, started_at, {**stats, **context})
+        return {'trace': trace, 'stats': stats}
\ No newline at end of file
@@ -0,0 +1,126 @@
+import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.job_database.column_stats import STATS_SUFFIX
+
+"""
+여러 파일(shard)로 나뉜 입력
+
+read Task의 filename이 glob 패턴(예: events_*.csv)이거나 디렉토리(예: events/)이면
+해당하는 파일을 모두 읽어서 하나로 합친다.
+파일 순서는 (data 디렉토리 기준) 경로 이름 순이다. 숫자는 자릿수를 맞춰야(0001, 0002, ...) 숫자 순서가 된다.
+디렉토리는 하위 디렉토리(partition 디렉토리 등)까지 찾는다.
+
+SHARD_PATTERN_CHARS: filename에 하나라도 있으면 glob 패턴으로 본다.
+SHARD_SIDECAR_SUFFIXES: 같이 작성되는 부가 파일(column 통계, 행 위치 index)은 읽지 않는다.
+                        행 위치 index는 task_output.INDEX_SUFFIX와 같다. (pandas를 import하지 않기 위해 값만 둔다)
+SHARD_READ_WORKERS: 파일을 동시에 읽는 최대 thread 갯수 (read Task의 parallel이 더 크면 parallel)
+"""
+SHARD_PATTERN_CHARS = '*?['
+SHARD_SIDECAR_SUFFIXES = (STATS_SUFFIX, '.index.json')
+SHARD_READ_WORKERS = min(8, os.cpu_count() or 1)
+
+
+class ShardReadError(Exception):
+    """
+    여러 파일로 나뉜 입력 중 일부 파일을 읽지 못함
+    일부만 합친 결과를 넘기지 않고 read Task(Job 실행)가 실패한다.
+
+    :param filename: read Task의 filename (glob 패턴 또는 디렉토리)
+    :param errors: 읽지 못한 파일별 에러 [{'shard': 파일 이름, 'error': 에러 내용}, ...]
+    :param shards: 전체 파일 갯수
+    """
+    filename: str
+    errors: List[Dict[str, str]]
+    shards: int
+
+    def __init__(self, filename: str, errors: List[Dict[str, str]],
+                 shards: int):
+        super().__init__(filename, errors, shards)
+        self.filename = filename
+        self.errors = errors
+        self.shards = shards
+
+    def __str__(self):
+        return f'failed to read {len(self.errors)} of {self.shards} ' \
+               f'shards: {self.filename}'
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'filename': self.filename, 'shards': self.shards,
+                'errors': self.errors}
+
+
+class ShardNotFoundError(ShardReadError):
+    """
+    glob 패턴이나 디렉토리에 해당하는 파일이 하나도 없음
+    빈 결과를 넘기지 않고 읽지 못한 파일이 있는 경우와 같이 read Task(Job 실행)가 실패한다.
+
+    :param filename: read Task의 filename (glob 패턴 또는 디렉토리)
+    """
+
+    def __init__(self, filename: str):
+        super().__init__(filename, [], 0)
+        # pickle(process executor)로 다시 만들 때 사용하는 인자
+        self.args = (filename,)
+
+    def __str__(self):
+        return f'no files match: {self.filename}'
+
+
+def is_shard_file(name: str) -> bool:
+    """
+    읽을 파일인지 여부
+    숨김 파일(원자적 쓰기 중인 임시 파일 등), _로 시작하는 파일(manifest 등), 부가 파일은 제외한다.
+    """
+    return not name.startswith(('.', '_')) \
+        and not name.endswith(SHARD_SIDECAR_SUFFIXES)
+
+
+def resolve_shards(data_dir: str, filename: str) -> Optional[List[str]]:
+    """
+    filename에 해당하는 파일 경로 list (경로 이름 순)
+
+    :return: glob 패턴이나 디렉토리가 아니면(파일 하나) None
+    """
+    root = os.path.join(data_dir, filename)
+    if any(c in filename for c in SHARD_PATTERN_CHARS):
+        paths = [p for p in glob.glob(root, recursive=True)
+                 if os.path.isfile(p)
+                 and is_shard_file(os.path.basename(p))]
+    elif os.path.isdir(root):
+        paths = []
+        for directory, dirs, files in os.walk(root):
+            dirs[:] = [d for d in dirs if not d.startswith(('.', '_'))]
+            paths += [os.path.join(directory, f) for f in files
+                      if is_shard_file(f)]
+    else:
+        return None
+    return sorted(paths, key=lambda p: os.path.relpath(p, data_dir))
+
+
+def map_shards(func: Callable[[str], Any], paths: List[str], workers: int) \
+        -> Tuple[List[Any], List[Tuple[str, Exception]]]:
+    """
+    파일마다 func을 thread pool에서 동시에 실행한다.
+    실패한 파일이 있어도 나머지 파일은 끝까지 실행해서 모든 에러를 모은다.
+
+    :return: (파일 순서대로 결과(실패한 파일은 None), [(실패한 파일 경로, 에러), ...])
+    """
+    def __call(path: str) -> Tuple[Any, Optional[Exception]]:
+        try:
+            return func(path), None
+        except Exception as e:
+            return None, e
+
+    workers = max(1, min(workers, len(paths)))
+    if workers == 1:
+        outcomes = [__call(path) for path in paths]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(__call, paths))
+    results = [result for result, _ in outcomes]
+    errors = [(path, e) for path, (_, e) in zip(paths, outcomes)
+              if e is not None]
+    return results, errors
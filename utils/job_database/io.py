@@ -1,6 +1,10 @@
-from libs.resource_access import RawFileRead, RawFileWrite
+from libs.resource_access import RawFileRead, RawFileAtomicWrite
 
 JOB_DATABASE_ROOT = 'storage/jobs.json'
+# 여러 process에서 jobs.json에 접근할 때 잠그는 파일
+JOB_DATABASE_LOCK_PATH = 'storage/jobs.json.lock'
+# jobs.json 쓰기 버퍼 크기(byte)
+JOB_DATABASE_WRITE_BUFFER_SIZE = 1 << 20
 
 
 class JobDatabaseRead(RawFileRead):
@@ -9,7 +13,12 @@ class JobDatabaseRead(RawFileRead):
         super().__init__(JOB_DATABASE_ROOT)
 
 
-class JobDatabaseWrite(RawFileWrite):
+class JobDatabaseWrite(RawFileAtomicWrite):
+    """
+    jobs.json은 작성 도중 실패해도 깨지면 안되므로 원자적으로 작성한다.
+    """
 
     def __init__(self):
-        super().__init__(JOB_DATABASE_ROOT)
+        super().__init__(JOB_DATABASE_ROOT,
+                         buffer_size=JOB_DATABASE_WRITE_BUFFER_SIZE,
+                         fsync_directory=True)
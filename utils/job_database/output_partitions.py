@@ -0,0 +1,35 @@
+from typing import Any, Dict, List
+
+"""
+값별로 나눠서 작성하는 결과 (write Task의 partition_by)
+
+작성은 task_output.write_partitions가 한다.
+View에서도 사용하는 에러는 pandas를 import하지 않도록 여기에 둔다.
+"""
+
+
+class PartitionColumnError(Exception):
+    """
+    partition_by column이 write Task에 들어온 데이터에 없음
+    값별로 나눌 수 없으므로 결과를 작성하지 않고 write Task(Job 실행)가 실패한다.
+
+    :param task: write Task
+    :param missing: 없는 partition_by column
+    :param columns: 들어온 데이터의 column
+    """
+    task: str
+    missing: List[str]
+    columns: List[str]
+
+    def __init__(self, task: str, missing: List[str], columns: List[str]):
+        super().__init__(task, missing, columns)
+        self.task = task
+        self.missing = missing
+        self.columns = columns
+
+    def __str__(self):
+        return f'partition columns not found in {self.task}: {self.missing}'
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'task': self.task, 'missing': self.missing,
+                'columns': self.columns}
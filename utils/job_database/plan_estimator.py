@@ -0,0 +1,513 @@
+import bz2
+import csv
+import gzip
+import io
+import lzma
+import os
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+from libs.resource_access import infer_compression
+from utils.algorithms.aggregation import normalize_aggregations, \
+    get_aggregate_column_name
+from utils.algorithms.filter_expression import get_expression_columns
+from utils.algorithms.merge_options import MERGE_VALIDATES, \
+    normalize_merge_options, get_merge_keys
+from utils.job_database.column_stats import load_column_stats, \
+    may_match_file, select_row_groups
+from utils.job_database.input_shards import resolve_shards
+
+"""
+Job 실행 계획과 비용 추정 (실행하지 않고 파일 크기와 앞부분 sample만 사용한다.)
+
+PLAN_SAMPLE_BYTES: 행 갯수와 column 크기를 추정하기 위해 읽는 파일 앞부분 크기(byte)
+PLAN_SAMPLE_ROWS: Task 결과마다 유지하는 sample 행 갯수
+PLAN_ROW_GROWTH_WARNING: 병합 결과가 양쪽 행 갯수 합의 몇 배를 넘으면 경고할지
+OBJECT_CELL_BYTES: 문자열 값 하나의 고정 크기(byte) (object 포인터 + str 객체), 실제 크기는 길이를 더한다.
+DTYPE_BYTES: dtype을 지정한 column의 값 하나 크기(byte)
+"""
+PLAN_SAMPLE_BYTES = 1 << 16
+PLAN_SAMPLE_ROWS = 1000
+PLAN_ROW_GROWTH_WARNING = 2
+OBJECT_CELL_BYTES = 8 + 49
+DTYPE_BYTES = {
+    'int8': 1, 'uint8': 1, 'Int8': 2, 'UInt8': 2, 'bool': 1, 'boolean': 2,
+    'int16': 2, 'uint16': 2, 'Int16': 3, 'UInt16': 3, 'float16': 2,
+    'int32': 4, 'uint32': 4, 'Int32': 5, 'UInt32': 5,
+    'float32': 4, 'Float32': 5,
+    'int64': 8, 'uint64': 8, 'Int64': 9, 'UInt64': 9,
+    'float64': 8, 'Float64': 9, 'datetime64[ns]': 8, 'category': 4,
+}
+DECOMPRESSORS = {'gzip': gzip.open, 'bz2': bz2.open, 'xz': lzma.open}
+
+
+class FrameEstimate:
+    """
+    Task 결과 DataFrame의 추정값
+
+    :param columns: column 이름
+    :param rows: 행 갯수
+    :param cell_bytes: column별 값 하나의 평균 크기(byte)
+    :param sample: 앞부분 sample 행 (columns 순서)
+    """
+    columns: List[str]
+    rows: int
+    cell_bytes: Dict[str, float]
+    sample: List[Tuple[Any, ...]]
+
+    def __init__(self, columns: List[str], rows: int,
+                 cell_bytes: Dict[str, float],
+                 sample: List[Tuple[Any, ...]]):
+        self.columns = columns
+        self.rows = rows
+        self.cell_bytes = cell_bytes
+        self.sample = sample
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.rows * sum(self.cell_bytes.get(col, 8)
+                                   for col in self.columns))
+
+    def project(self, columns: List[str]) -> List[Tuple[Any, ...]]:
+        idx = [self.columns.index(col) for col in columns]
+        return [tuple(row[i] for i in idx) for row in self.sample]
+
+    @classmethod
+    def empty(cls) -> 'FrameEstimate':
+        return cls([], 0, {}, [])
+
+
+def get_cell_bytes(values: List[str], dtype: Optional[str] = None) -> float:
+    """
+    sample 값으로 추정한 column 값 하나의 크기(byte)
+    숫자로 읽히는 column은 8, 문자열 column은 길이에 따라 달라진다.
+    """
+    if dtype in DTYPE_BYTES:
+        return DTYPE_BYTES[dtype]
+    if dtype is None:
+        try:
+            for value in values:
+                if value != '':
+                    float(value)
+            return 8
+        except ValueError:
+            pass
+    if not values:
+        return OBJECT_CELL_BYTES
+    return OBJECT_CELL_BYTES + sum(map(len, values)) / len(values)
+
+
+def get_uncompressed_size(path: str, compression: Optional[str],
+                          compressed_ratio: float) -> int:
+    """
+    압축을 풀었을 때의 크기, gzip은 파일 끝의 원본 크기(ISIZE)를 사용한다.
+    """
+    size = os.path.getsize(path)
+    if compression is None:
+        return size
+    if compression == 'gzip' and size >= 4:
+        with open(path, 'rb') as f:
+            f.seek(-4, os.SEEK_END)
+            isize, = struct.unpack('<I', f.read(4))
+        # 4GB 이상이면 ISIZE가 넘치므로 비율로 추정한다.
+        if isize >= size:
+            return isize
+    return int(size * compressed_ratio)
+
+
+def sample_csv(path: str, sep: str, compression: Optional[str] = None,
+               dtype: Optional[Dict[str, str]] = None,
+               compressed_ratio: float = 5) -> FrameEstimate:
+    """
+    파일 앞부분을 읽어서 행 갯수와 column 크기를 추정한다.
+
+    :exception OSError: 파일을 읽을 수 없음
+    :exception ValueError: 압축 방식을 지원하지 않음
+    """
+    total = get_uncompressed_size(path, compression, compressed_ratio)
+    if compression is None:
+        opener = open
+    elif compression in DECOMPRESSORS:
+        opener = DECOMPRESSORS[compression]
+    else:
+        raise ValueError(f'cannot sample {compression} file')
+    with opener(path, 'rb') as f:
+        raw = f.read(PLAN_SAMPLE_BYTES + 1)
+    complete = len(raw) <= PLAN_SAMPLE_BYTES
+    if not complete:
+        # 마지막 줄은 잘렸을 수 있으므로 버린다.
+        raw = raw[:raw.rfind(b'\n') + 1]
+    lines = raw.decode('utf-8', errors='replace').splitlines()
+    if not lines:
+        return FrameEstimate.empty()
+
+    if len(sep) == 1:
+        rows = list(csv.reader(io.StringIO('\n'.join(lines)), delimiter=sep))
+    else:
+        rows = [line.split(sep) for line in lines]
+    columns, sample = rows[0], [tuple(r) for r in rows[1:] if r]
+    if complete:
+        n_rows = len(sample)
+    else:
+        header_bytes = len(lines[0].encode()) + 1
+        line_bytes = (len(raw) - header_bytes) / max(len(sample), 1)
+        n_rows = int((total - header_bytes) / line_bytes) if line_bytes else 0
+
+    dtype = dtype or {}
+    cell_bytes = {
+        col: get_cell_bytes([r[i] for r in sample if i < len(r)],
+                            dtype.get(col))
+        for i, col in enumerate(columns)
+    }
+    return FrameEstimate(columns, n_rows, cell_bytes,
+                         sample[:PLAN_SAMPLE_ROWS])
+
+
+def sample_shards(paths: List[str], sep: str, compression: str = 'infer',
+                  dtype: Optional[Dict[str, str]] = None,
+                  compressed_ratio: float = 5) -> FrameEstimate:
+    """
+    여러 파일(shard)로 나뉜 입력의 행 갯수와 column 크기 추정
+    첫번째 파일을 sample로 읽고, 행 갯수는 (압축을 풀었을 때의) 전체 크기 비율로 늘린다.
+
+    :param compression: read Task에 지정한 압축 방식, 파일마다 확장자로 추정한다.
+    :exception OSError: 파일이 없거나 읽을 수 없음
+    :exception ValueError: 압축 방식을 지원하지 않음
+    """
+    if not paths:
+        raise FileNotFoundError('no files match')
+    sizes = [get_uncompressed_size(path, infer_compression(path, compression),
+                                   compressed_ratio) for path in paths]
+    first = sample_csv(paths[0], sep, infer_compression(paths[0], compression),
+                       dtype, compressed_ratio)
+    if sizes[0]:
+        first.rows = int(first.rows * sum(sizes) / sizes[0])
+    return first
+
+
+def estimate_groups(rows: int, keys: List[Tuple[Any, ...]]) -> int:
+    """
+    sample key로 추정한 전체 고유 key 갯수
+    sample 안에서 key가 충분히 반복되면(고유값이 sample의 절반 이하) 전체 고유 key 갯수도 비슷하다고 보고,
+    그렇지 않으면 고유값 비율만큼 늘어난다고 본다.
+    """
+    if not keys or not rows:
+        return min(rows, 1)
+    distinct = len(set(keys))
+    if distinct * 2 <= len(keys):
+        return min(distinct, rows)
+    return max(1, int(rows * distinct / len(keys)))
+
+
+def estimate_merge(left: FrameEstimate, right: FrameEstimate,
+                   options: Optional[Dict[str, Any]] = None) \
+        -> Tuple[FrameEstimate, Dict[str, Any]]:
+    """
+    merge_dataframes(DataFrameJoiner)와 같은 방식으로 병합 방식을 정하고 결과를 추정한다.
+    겹치는 column이 없으면 column을 이어붙이고(concat), 있으면 그 column으로 outer join 한다.
+    병합 옵션(merge)이 있으면 on column으로 how 방식의 join을 한다.
+
+    join 결과의 행 갯수는 양쪽 key가 최대한 많이 겹친다고 가정한 값이다.
+    (key당 행 갯수가 양쪽 모두 1보다 크면(many-to-many) 겹치는 key마다 곱만큼 늘어난다.)
+    key당 행 갯수는 estimate_groups로 추정한 고유 key 갯수로 계산한다.
+
+    :param options: Task의 병합 옵션 (property의 merge)
+    :return: (병합 결과, 병합 정보)
+    """
+    if not left.columns:
+        return right, {'type': 'concat', 'keys': [], 'rows': right.rows}
+    options = normalize_merge_options(options)
+    keys = get_merge_keys(options, left.columns, right.columns)
+    missing = [k for k in keys
+               if k not in left.columns or k not in right.columns]
+    if missing:
+        # 실행하면 MergeCheckError로 실패한다. 다음 Task 추정을 위해 이어붙인다고 본다.
+        keys = []
+    cell_bytes = {**left.cell_bytes, **right.cell_bytes}
+    if not keys:
+        columns = left.columns + right.columns
+        rows = max(left.rows, right.rows)
+        n = min(len(left.sample), len(right.sample))
+        sample = [l + r for l, r in zip(left.sample[:n], right.sample[:n])]
+        info = {'type': 'concat', 'keys': [], 'rows': rows}
+        if missing:
+            info['missing_keys'] = missing
+        return FrameEstimate(columns, rows, cell_bytes, sample), info
+
+    left_keys, right_keys = left.project(keys), right.project(keys)
+    left_groups = estimate_groups(left.rows, left_keys)
+    right_groups = estimate_groups(right.rows, right_keys)
+    left_dup = left.rows / left_groups if left_groups else 1.0
+    right_dup = right.rows / right_groups if right_groups else 1.0
+    matched = min(left_groups, right_groups)
+    how = options['how']
+    rows = matched * left_dup * right_dup
+    if how in ('outer', 'left'):
+        rows += (left_groups - matched) * left_dup
+    if how in ('outer', 'right'):
+        rows += (right_groups - matched) * right_dup
+    rows = int(rows)
+
+    # sample끼리 join 해서 다음 병합에 사용할 sample을 만든다.
+    # key가 아닌 겹치는 column은 pd.merge처럼 _x, _y를 붙인다.
+    others = [i for i, col in enumerate(right.columns) if col not in keys]
+    overlap = {right.columns[i] for i in others} & set(left.columns)
+    if overlap:
+        cell_bytes.update(
+            {f'{col}_x': left.cell_bytes.get(col, 8) for col in overlap})
+        cell_bytes.update(
+            {f'{col}_y': right.cell_bytes.get(col, 8) for col in overlap})
+    index: Dict[Tuple[Any, ...], List[Tuple[Any, ...]]] = {}
+    for key, row in zip(right_keys, right.sample):
+        index.setdefault(key, []).append(tuple(row[i] for i in others))
+    sample = []
+    for key, row in zip(left_keys, left.sample):
+        for match in index.get(key, [tuple('' for _ in others)]):
+            sample.append(row + match)
+        if len(sample) >= PLAN_SAMPLE_ROWS:
+            break
+    columns = [f'{col}_x' if col in overlap else col for col in left.columns] \
+        + [f'{right.columns[i]}_y' if right.columns[i] in overlap
+           else right.columns[i] for i in others]
+    return FrameEstimate(columns, rows, cell_bytes,
+                         sample[:PLAN_SAMPLE_ROWS]), {
+        'type': 'join', 'keys': keys, 'how': how, 'rows': rows,
+        'left_rows_per_key': round(left_dup, 3),
+        'right_rows_per_key': round(right_dup, 3),
+        'many_to_many': left_dup > 1 and right_dup > 1,
+    }
+
+
+def estimate_aggregate(frame: FrameEstimate, group_by: List[str],
+                       aggregations: Dict[str, Any]) -> FrameEstimate:
+    """
+    aggregate Task 결과 추정
+    """
+    group_by = [col for col in group_by if col in frame.columns]
+    keys = frame.project(group_by)
+    groups = estimate_groups(frame.rows, keys)
+    columns = list(group_by)
+    cell_bytes = {col: frame.cell_bytes.get(col, 8) for col in group_by}
+    for col, funcs in normalize_aggregations(aggregations).items():
+        for func in funcs:
+            name = get_aggregate_column_name(col, func)
+            columns.append(name)
+            cell_bytes[name] = 8
+    return FrameEstimate(columns, groups, cell_bytes,
+                         [k + (0,) * (len(columns) - len(group_by))
+                          for k in list(dict.fromkeys(keys))])
+
+
+def get_merge_warnings(task_name: str, prev: str, merge: Dict[str, Any],
+                       left_rows: int, right_rows: int,
+                       options: Optional[Dict[str, Any]] = None) \
+        -> List[Dict[str, Any]]:
+    """
+    병합 결과가 크게 늘어나는 경우와 병합 옵션 검사에 실패할 수 있는 경우의 경고
+    """
+    options = normalize_merge_options(options)
+    warnings = []
+    if merge.get('missing_keys'):
+        warnings.append({
+            'task': task_name, 'type': 'merge_keys',
+            'message': f'merge keys {merge["missing_keys"]} are missing '
+                       f'in {prev} or previous inputs'})
+    if merge['type'] == 'join' and options['validate'] is not None:
+        unique = MERGE_VALIDATES[options['validate']]
+        for side, must_be_unique in zip(('left', 'right'), unique):
+            if must_be_unique and merge[f'{side}_rows_per_key'] > 1:
+                warnings.append({
+                    'task': task_name, 'type': 'merge_validate',
+                    'message': f'{side} keys of join with {prev} may be '
+                               f'duplicated ({options["validate"]})'})
+    factor = options['max_row_factor']
+    if merge['type'] == 'join' and factor is not None and \
+            merge['rows'] > factor * max(left_rows, right_rows, 1):
+        warnings.append({
+            'task': task_name, 'type': 'max_row_factor',
+            'message': f'join with {prev} may produce {merge["rows"]} rows, '
+                       f'more than {factor} x max({left_rows}, '
+                       f'{right_rows})'})
+    if merge.get('many_to_many'):
+        warnings.append({
+            'task': task_name, 'type': 'many_to_many',
+            'message': f'many-to-many join with {prev} on {merge["keys"]}'})
+    if merge['type'] == 'join' and \
+            merge['rows'] > PLAN_ROW_GROWTH_WARNING * (left_rows + right_rows):
+        warnings.append({
+            'task': task_name, 'type': 'row_growth',
+            'message': f'join with {prev} may produce {merge["rows"]} rows '
+                       f'from {left_rows} + {right_rows}'})
+    return warnings
+
+
+def estimate_stats_rows(v: Dict[str, Any], stats: Dict[str, Any],
+                        compression: Optional[str],
+                        predicates: List[str]) -> Dict[str, Any]:
+    """
+    column 통계 파일로 계산한 행 갯수와 건너뛸 row group
+    (TaskReadSpace.read_with_column_stats와 같은 조건으로 건너뛴다.)
+
+    :return: {'rows', 'schema_hash', 'row_groups', 'skipped_row_groups', 'read_rows'}
+    """
+    row_groups = stats['row_groups']
+    groups = list(range(len(row_groups)))
+    header = {col for col, _ in stats['schema']}
+    usable = predicates and not v.get('auto_compact', False) and all(
+        get_expression_columns(p) <= header for p in predicates)
+    if usable:
+        exclude = (v.get('dtype') or {}).keys()
+        if not may_match_file(stats, predicates, exclude):
+            groups = []
+        elif compression is None:
+            groups = select_row_groups(stats, predicates, exclude)
+    return {
+        'rows': stats['rows'],
+        'schema_hash': stats['schema_hash'],
+        'row_groups': len(row_groups),
+        'skipped_row_groups': len(row_groups) - len(groups),
+        'read_rows': sum(row_groups[i]['rows'] for i in groups),
+    }
+
+
+def explain_job(job: Dict[str, Any], order: List[str], data_dir: str,
+                pushdown: Optional[Dict[str, Dict[str, Any]]] = None,
+                compressed_ratio: float = 5,
+                memory_limit: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Job 실행 계획과 Task별 비용 추정
+
+    Task마다 입력 크기/행 갯수, 이전 Task 결과의 병합 방식, 결과 크기를 추정하고
+    serial 실행과 같은 순서로 메모리에 남아있는 DataFrame 크기를 더해서 최대 메모리를 추정한다.
+    (다음 Task마다 결과를 복사해서 넘기므로 다음 Task 갯수만큼 더한다.)
+    filter 조건은 행 갯수를 줄이지 않는다고 가정한다.(최댓값 추정)
+    column 통계 파일이 있는 read Task는 정확한 행 갯수를 사용하고 건너뛸 row group의 행은 제외한다.
+    aggregate Task와 합쳐진 read Task는 집계 결과 크기만 계산한다. (조각 단위로 읽는 메모리는 제외)
+    partition_by가 있는 write Task는 partition 갯수를 추정하고, partition column이 없으면 경고한다.
+
+    :param order: 실행 순서(위상 정렬 결과)
+    :param pushdown: Task별 pushdown 계획 (plan_pushdown)
+    :param memory_limit: 최대 메모리 추정값이 넘으면 경고할 크기(byte)
+    :return: {'order', 'tasks', 'peak_memory', 'warnings'}
+    """
+    graph, properties = job['task_list'], job['property']
+    pushdown = pushdown or {}
+    parents: Dict[str, List[str]] = {task_name: [] for task_name in graph}
+    for u in order:
+        for v in graph[u]:
+            parents[v].append(u)
+
+    results: Dict[str, FrameEstimate] = {}
+    tasks: Dict[str, Dict[str, Any]] = {}
+    warnings: List[Dict[str, Any]] = []
+    live = peak = 0
+    for task_name in order:
+        v = properties[task_name]
+        plan = pushdown.get(task_name, {})
+        info: Dict[str, Any] = {'task_name': v['task_name'],
+                                'inputs': parents[task_name]}
+
+        # 이전 Task 결과 병합 (buffer에 들어온 순서대로)
+        frame, merges = FrameEstimate.empty(), []
+        for prev in parents[task_name]:
+            left_rows = frame.rows
+            frame, merge = estimate_merge(frame, results[prev], v.get('merge'))
+            if left_rows or merge['keys']:
+                merges.append({'prev_task': prev, **merge})
+            warnings += get_merge_warnings(task_name, prev, merge,
+                                           left_rows, results[prev].rows,
+                                           v.get('merge'))
+        info['input_bytes'] = sum(results[p].nbytes
+                                  for p in parents[task_name])
+        info['input_rows'] = frame.rows
+
+        if v['task_name'] == 'read':
+            path = os.path.join(data_dir, v['filename'])
+            compression = infer_compression(v['filename'],
+                                            v.get('compression', 'infer'))
+            shards = resolve_shards(data_dir, v['filename'])
+            try:
+                if shards is None:
+                    info['file_bytes'] = os.path.getsize(path)
+                    read = sample_csv(path, v['sep'], compression,
+                                      v.get('dtype'), compressed_ratio)
+                else:
+                    info['shards'] = len(shards)
+                    info['file_bytes'] = sum(map(os.path.getsize, shards))
+                    read = sample_shards(shards, v['sep'],
+                                         v.get('compression', 'infer'),
+                                         v.get('dtype'), compressed_ratio)
+            except (OSError, ValueError) as e:
+                read = FrameEstimate.empty()
+                warnings.append({'task': task_name, 'type': 'not_sampled',
+                                 'message': str(e)})
+            # 여러 파일로 나뉜 입력은 column 통계를 사용하지 않는다.
+            stats = load_column_stats(path) if shards is None else None
+            if stats is not None:
+                info['column_stats'] = estimate_stats_rows(
+                    v, stats, compression,
+                    [] if plan.get('aggregate')
+                    else plan.get('predicates', []))
+                read.rows = info['column_stats']['read_rows']
+            info['file_rows'] = stats['rows'] if stats is not None \
+                else read.rows
+            if plan.get('predicates'):
+                info['pushdown'] = {'predicates': plan['predicates']}
+            if plan.get('aggregate'):
+                aggregate = plan['aggregate']
+                info['pushdown'] = {**info.get('pushdown', {}),
+                                    'aggregate': aggregate['task_name']}
+                read = estimate_aggregate(read, aggregate['group_by'],
+                                          aggregate['aggregations'])
+            if frame.columns:
+                left_rows = frame.rows
+                right_rows = read.rows
+                read, merge = estimate_merge(frame, read, v.get('merge'))
+                merges.append({'prev_task': None, **merge})
+                warnings += get_merge_warnings(task_name, v['filename'],
+                                               merge, left_rows, right_rows,
+                                               v.get('merge'))
+            frame = read
+        elif plan.get('fused_into'):
+            info['fused_into'] = plan['fused_into']
+        elif v['task_name'] == 'drop':
+            if v['column_name'] in frame.columns:
+                i = frame.columns.index(v['column_name'])
+                frame = FrameEstimate(
+                    frame.columns[:i] + frame.columns[i + 1:], frame.rows,
+                    frame.cell_bytes,
+                    [row[:i] + row[i + 1:] for row in frame.sample])
+        elif v['task_name'] == 'aggregate':
+            frame = estimate_aggregate(frame, v['group_by'],
+                                       v['aggregations'])
+        elif v['task_name'] == 'write' and v.get('partition_by') \
+                and frame.columns:
+            keys = v['partition_by']
+            missing = [k for k in keys if k not in frame.columns]
+            if missing:
+                # 실행하면 partition column이 없어서 실패한다.
+                warnings.append({'task': task_name, 'type': 'partition_by',
+                                 'message': f'partition columns not found: '
+                                            f'{missing}'})
+            else:
+                idx = [frame.columns.index(k) for k in keys]
+                info['partitions'] = estimate_groups(
+                    frame.rows, [tuple(row[i] for i in idx)
+                                 for row in frame.sample])
+
+        results[task_name] = frame
+        size = frame.nbytes
+        info.update({'merges': merges, 'rows': frame.rows,
+                     'columns': frame.columns, 'estimated_bytes': size,
+                     'peak_memory': live + size})
+        tasks[task_name] = info
+        peak = max(peak, live + size)
+        live -= info['input_bytes']
+        live += size * len(graph[task_name])
+
+    if memory_limit is not None and peak > memory_limit:
+        warnings.append({'task': None, 'type': 'memory',
+                         'message': f'estimated peak memory {peak} bytes '
+                                    f'exceeds {memory_limit} bytes'})
+    return {'order': order, 'tasks': tasks, 'peak_memory': peak,
+            'warnings': warnings}
@@ -0,0 +1,361 @@
+import bisect
+import os
+import shutil
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from libs.resource_access import FileLock, RawFileAtomicWrite, \
+    get_json_codec
+
+"""
+Job 실행 기록 (run history)
+
+Job마다 실행이 끝날 때 한 줄씩 추가하는(append-only) JSON Lines 파일에 기록한다.
+    <job_id>.jsonl: 실행 기록, 끝난 시각(ended_at) 순서로 들어있다.
+    <job_id>.index: sparse index, RUN_INDEX_STRIDE byte마다 '<ended_at> <byte 위치>' 한 줄
+    <job_id>.summary.jsonl: 오래된 실행 기록을 RUN_SUMMARY_PERIOD 단위로 요약한 행
+
+RUN_HISTORY_DIR: 실행 기록 디렉토리, 잠금 파일은 '<디렉토리>.lock' 이다.
+RUN_INDEX_STRIDE: index에 위치를 기록하는 간격(byte)
+RUN_HISTORY_RETENTION_SECONDS: 실행 기록을 그대로 보관하는 기간, 지나면 요약한다.
+RUN_HISTORY_MAX_BYTES: Job별 실행 기록 파일 최대 크기, 넘으면 오래된 기록부터 요약한다.
+RUN_HISTORY_COMPACT_RATIO: 크기 때문에 요약할 때 남기는 크기 (max_bytes 비율)
+RUN_HISTORY_COMPACT_INTERVAL: 기간이 지난 기록을 모아서 요약하는 간격(초), 기록할 때마다 요약하지 않도록 한다.
+RUN_SUMMARY_PERIOD: 요약 단위(초)
+RUN_SUMMARY_RETENTION_SECONDS: 요약 보관 기간
+"""
+RUN_HISTORY_DIR = 'storage/runs'
+RUN_INDEX_STRIDE = 1 << 16
+RUN_HISTORY_RETENTION_SECONDS = 30 * 24 * 3600
+RUN_HISTORY_MAX_BYTES = 256 << 20
+RUN_HISTORY_COMPACT_RATIO = 0.5
+RUN_HISTORY_COMPACT_INTERVAL = 3600
+RUN_SUMMARY_PERIOD = 3600
+RUN_SUMMARY_RETENTION_SECONDS = 365 * 24 * 3600
+
+
+class RunHistory:
+    """
+    Job 실행 기록 저장소
+
+    기록 추가와 요약(compaction)은 잠금 파일로 process 사이에서도 한번에 하나만 실행한다.
+    조회는 잠근 상태에서 파일만 열고, 읽는 동안에는 잠그지 않는다.
+    (요약은 새 파일로 교체하므로 이미 열린 파일은 바뀌지 않는다.)
+
+    since 조회는 sparse index에서 since보다 먼저 끝난 위치를 이진 탐색으로 찾아서 그 위치부터 읽는다.
+    기록이 많아도 index 간격만큼만 더 읽는다.
+    끝난 시각(ended_at)은 잠근 다음에 기록하므로 여러 thread/process에서 추가해도 파일 안에서 시각 순서가 유지된다.
+
+    :param root: 실행 기록 디렉토리
+    :param retention_seconds: 실행 기록을 그대로 보관하는 기간(초)
+    :param max_bytes: Job별 실행 기록 파일 최대 크기(byte)
+    :param summary_retention_seconds: 요약 보관 기간(초)
+    """
+    root: str
+    retention_seconds: float
+    max_bytes: int
+    summary_retention_seconds: float
+    mutex: FileLock
+
+    def __init__(self, root: str = RUN_HISTORY_DIR,
+                 retention_seconds: float = RUN_HISTORY_RETENTION_SECONDS,
+                 max_bytes: int = RUN_HISTORY_MAX_BYTES,
+                 summary_retention_seconds: float =
+                 RUN_SUMMARY_RETENTION_SECONDS):
+        self.root = root
+        self.retention_seconds = retention_seconds
+        self.max_bytes = max_bytes
+        self.summary_retention_seconds = summary_retention_seconds
+        self.mutex = FileLock(root.rstrip('/') + '.lock')
+
+    def get_paths(self, job_id: int) -> Tuple[str, str, str]:
+        """
+        (실행 기록, sparse index, 요약) 파일 위치
+        """
+        base = os.path.join(self.root, str(job_id))
+        return f'{base}.jsonl', f'{base}.index', f'{base}.summary.jsonl'
+
+    @staticmethod
+    def __load_index(path: str) -> Tuple[List[float], List[int]]:
+        """
+        sparse index의 (ended_at 목록, byte 위치 목록)
+        """
+        keys, offsets = [], []
+        try:
+            with open(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    parts = line.split()
+                    # 작성 도중 끝난 줄은 건너뛴다.
+                    if len(parts) == 2 and line.endswith('\n'):
+                        keys.append(float(parts[0]))
+                        offsets.append(int(parts[1]))
+        except FileNotFoundError:
+            pass
+        return keys, offsets
+
+    @staticmethod
+    def __read_index_bounds(path: str) \
+            -> Tuple[Optional[float], Optional[int]]:
+        """
+        sparse index의 (첫 번째 ended_at, 마지막 byte 위치), 파일 전체를 읽지 않는다.
+        """
+        try:
+            with open(path, 'rb') as f:
+                first = f.readline().split()
+                size = f.seek(0, os.SEEK_END)
+                f.seek(max(0, size - 128))
+                last = f.read().splitlines()[-1].split()
+        except (FileNotFoundError, IndexError):
+            return None, None
+        if len(first) != 2 or len(last) != 2:
+            return None, None
+        return float(first[0]), int(last[1])
+
+    @staticmethod
+    def __load_summaries(path: str) -> List[Dict[str, Any]]:
+        try:
+            with open(path, 'rb') as f:
+                return [get_json_codec().loads(line) for line in f
+                        if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def append(self, job_id: int, record: Dict[str, Any]):
+        """
+        실행 기록 추가
+        record의 ended_at(실행이 끝난 시각, epoch 초)이 없으면(None) 잠근 다음 현재 시각으로 채운다.
+        잠그기 전에 시각을 정하면 먼저 끝난 실행이 나중에 추가되어 파일의 시각 순서가 바뀔 수 있다.
+        파일이 max_bytes를 넘거나 보관 기간이 지난 기록이 있으면 요약한다.
+        """
+        data_path, index_path, _ = self.get_paths(job_id)
+        os.makedirs(self.root, exist_ok=True)
+        with self.mutex:
+            if record.get('ended_at') is None:
+                record['ended_at'] = time.time()
+            line = (get_json_codec().dumps(record) + '\n').encode('utf-8')
+            first_key, last_offset = self.__read_index_bounds(index_path)
+            fd = os.open(data_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+                         0o644)
+            try:
+                offset = os.fstat(fd).st_size
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+            if offset == 0 or last_offset is None \
+                    or offset - last_offset >= RUN_INDEX_STRIDE:
+                # 새 파일이면 남아있던 index도 새로 작성한다.
+                with open(index_path, 'wt' if offset == 0 else 'at',
+                          encoding='utf-8') as f:
+                    f.write(f'{record["ended_at"]!r} {offset}\n')
+                if offset == 0 or first_key is None:
+                    first_key = record['ended_at']
+            expire = time.time() - self.retention_seconds \
+                - RUN_HISTORY_COMPACT_INTERVAL
+            if offset + len(line) > self.max_bytes or first_key < expire:
+                self.__compact(job_id)
+
+    @staticmethod
+    def __add_to_summary(summaries: Dict[int, Dict[str, Any]],
+                         record: Dict[str, Any]):
+        """
+        실행 기록을 끝난 시각의 요약 행에 더한다.
+        """
+        start = int(record['ended_at'] // RUN_SUMMARY_PERIOD) \
+            * RUN_SUMMARY_PERIOD
+        summary = summaries.setdefault(start, {
+            'period_start': start,
+            'period_end': start + RUN_SUMMARY_PERIOD,
+            'runs': 0,
+            'status': {},
+            'seconds_total': 0.0,
+            'seconds_max': 0.0,
+            'peak_frame_bytes_max': None,
+            'tasks': {},
+        })
+        seconds = record.get('seconds') or 0.0
+        summary['runs'] += 1
+        status = record.get('status', 'ok')
+        summary['status'][status] = summary['status'].get(status, 0) + 1
+        summary['seconds_total'] += seconds
+        summary['seconds_max'] = max(summary['seconds_max'], seconds)
+        peak = record.get('peak_frame_bytes')
+        if peak is not None:
+            summary['peak_frame_bytes_max'] = max(
+                summary['peak_frame_bytes_max'] or 0, peak)
+        for name, task in (record.get('tasks') or {}).items():
+            total = summary['tasks'].setdefault(name, {
+                'runs': 0, 'seconds_total': 0.0, 'seconds_max': 0.0,
+                'rows_total': 0})
+            total['runs'] += 1
+            total['seconds_total'] += task.get('seconds') or 0.0
+            total['seconds_max'] = max(total['seconds_max'],
+                                       task.get('seconds') or 0.0)
+            total['rows_total'] += task.get('rows') or 0
+
+    def compact(self, job_id: int, now: Optional[float] = None) \
+            -> Dict[str, int]:
+        """
+        보관 기간이 지났거나 max_bytes를 넘는 오래된 실행 기록을 요약한다.
+
+        :param now: 기준 시각 (기본값: 현재 시각)
+        :return: {'summarized': 요약한 실행 기록 수, 'kept': 남은 실행 기록 수}
+        """
+        with self.mutex:
+            return self.__compact(job_id, now)
+
+    def __compact(self, job_id: int, now: Optional[float] = None) \
+            -> Dict[str, int]:
+        """
+        요약한 기록을 뺀 나머지로 실행 기록과 index를 새로 작성해서 교체한다.
+        """
+        now = time.time() if now is None else now
+        data_path, index_path, summary_path = self.get_paths(job_id)
+        try:
+            remaining = os.path.getsize(data_path)
+        except FileNotFoundError:
+            return {'summarized': 0, 'kept': 0}
+        cutoff = now - self.retention_seconds
+        target = int(self.max_bytes * RUN_HISTORY_COMPACT_RATIO)
+        codec = get_json_codec()
+        summaries = {s['period_start']: s
+                     for s in self.__load_summaries(summary_path)}
+        summarized = kept = 0
+        index_lines = []
+        with open(data_path, 'rb') as src, \
+                RawFileAtomicWrite(data_path, binary=True) as dst:
+            offset = 0
+            for line in src:
+                try:
+                    record = codec.loads(line)
+                except ValueError:
+                    # 작성 도중 끝난 줄
+                    remaining -= len(line)
+                    continue
+                if record['ended_at'] < cutoff or remaining > target:
+                    self.__add_to_summary(summaries, record)
+                    remaining -= len(line)
+                    summarized += 1
+                    continue
+                if not index_lines \
+                        or offset - index_lines[-1][1] >= RUN_INDEX_STRIDE:
+                    index_lines.append((record['ended_at'], offset))
+                dst.write(line)
+                offset += len(line)
+                kept += 1
+        with RawFileAtomicWrite(index_path) as f:
+            for key, position in index_lines:
+                f.write(f'{key!r} {position}\n')
+
+        expire = now - self.summary_retention_seconds
+        with RawFileAtomicWrite(summary_path) as f:
+            for start in sorted(summaries):
+                if summaries[start]['period_end'] > expire:
+                    f.write(codec.dumps(summaries[start]) + '\n')
+        return {'summarized': summarized, 'kept': kept}
+
+    def query(self, job_id: int, since: Optional[float] = None,
+              until: Optional[float] = None, limit: int = 100,
+              offset: int = 0) -> Dict[str, Any]:
+        """
+        실행이 끝난 시각(ended_at)이 since 이상, until 미만인 실행 기록 (오래된 순서)
+        끝난 시각이 같은 기록이 여러 개일 수 있으므로 이어서 조회할 때는 (since, offset)을 같이 사용한다.
+
+        :param limit: 최대 실행 기록 수
+        :param offset: 끝난 시각이 since와 같은 기록 중 건너뛸 기록 수 (이전 조회의 next_offset)
+        :return: {'runs': 실행 기록, 'summaries': 기간이 겹치는 요약 행,
+                  'next_since': 더 남은 기록이 있으면 다음 조회에 사용할 since,
+                  'next_offset': 다음 조회에 사용할 offset}
+        """
+        data_path, index_path, summary_path = self.get_paths(job_id)
+        with self.mutex:
+            keys, offsets = self.__load_index(index_path)
+            summaries = self.__load_summaries(summary_path)
+            try:
+                src = open(data_path, 'rb')
+            except FileNotFoundError:
+                src = None
+
+        runs, next_since, next_offset = [], None, None
+        skip = offset if since is not None else 0
+        # 마지막으로 읽은 끝난 시각과 그 시각에 끝난 기록 수 (건너뛴 기록 포함)
+        last_key, same = None, 0
+        if src is not None:
+            codec = get_json_codec()
+            with src:
+                if since is not None:
+                    # since보다 먼저 끝난 마지막 index 위치부터 읽는다.
+                    i = bisect.bisect_left(keys, since) - 1
+                    if i >= 0:
+                        src.seek(offsets[i])
+                for line in src:
+                    try:
+                        record = codec.loads(line)
+                    except ValueError:
+                        continue
+                    ended_at = record['ended_at']
+                    if since is not None and ended_at < since:
+                        continue
+                    if until is not None and ended_at >= until:
+                        break
+                    if skip and ended_at == since:
+                        skip -= 1
+                    elif len(runs) >= limit:
+                        next_since = ended_at
+                        next_offset = same if ended_at == last_key else 0
+                        break
+                    else:
+                        runs.append(record)
+                    same = same + 1 if ended_at == last_key else 1
+                    last_key = ended_at
+
+        summaries = [s for s in summaries
+                     if (since is None or s['period_end'] > since)
+                     and (until is None or s['period_start'] < until)]
+        return {'runs': runs, 'summaries': summaries,
+                'next_since': next_since, 'next_offset': next_offset}
+
+    def get_last_runs(self, job_id: int, count: int) \
+            -> List[Dict[str, Any]]:
+        """
+        마지막 count개의 실행 기록, 파일 끝의 index 간격 몇 개만 읽는다.
+        """
+        data_path, index_path, _ = self.get_paths(job_id)
+        with self.mutex:
+            _, offsets = self.__load_index(index_path)
+            try:
+                src = open(data_path, 'rb')
+            except FileNotFoundError:
+                return []
+
+        codec = get_json_codec()
+        runs = []
+        with src:
+            i = len(offsets) - 1
+            while True:
+                src.seek(offsets[i] if i > 0 else 0)
+                runs = []
+                for line in src:
+                    try:
+                        runs.append(codec.loads(line))
+                    except ValueError:
+                        continue
+                if len(runs) >= count or i <= 0:
+                    break
+                i = max(0, i - max(1, len(offsets) - i))
+        return runs[-count:] if count else []
+
+    def remove(self, job_id: int):
+        """
+        Job의 실행 기록 삭제
+        """
+        with self.mutex:
+            for path in self.get_paths(job_id):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def clear(self):
+        """
+        모든 실행 기록 삭제
+        """
+        with self.mutex:
+            shutil.rmtree(self.root, ignore_errors=True)
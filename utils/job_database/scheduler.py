@@ -0,0 +1,293 @@
+import asyncio
+import collections
+import contextlib
+import itertools
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterator, \
+    List, Optional
+
+"""
+Job 실행 Admission Control
+
+RUN_WAIT_SAMPLES: 대기 시간 통계에 사용하는 최근 실행 갯수
+MEMORY_HISTORY_WEIGHT: 이전 실행 기록으로 메모리 비율을 갱신할 때 새 기록의 가중치
+"""
+RUN_WAIT_SAMPLES = 1000
+MEMORY_HISTORY_WEIGHT = 0.5
+
+
+class RunQueueFull(Exception):
+    """
+    대기열이 가득 차서 실행 요청을 받을 수 없음
+    """
+    pass
+
+
+class RunTicket:
+    """
+    실행 대기 중인 요청
+
+    :param job_id: 실행할 Job ID
+    :param client_id: 요청한 클라이언트
+    :param priority: 우선순위, 클수록 먼저 실행된다.
+    :param memory: 예상 메모리 사용량(byte)
+    :param start_tag: 클라이언트 사이의 공정성을 위한 가상 시작 시간 (Start-time Fair Queuing)
+    :param seq: 요청 순서
+    :param on_admit: 실행 허가를 받으면 호출할 함수(대기 시간), 기다리는 thread가 없는 요청(admit_async)만 있다.
+    """
+    job_id: int
+    client_id: str
+    priority: int
+    memory: int
+    start_tag: int
+    seq: int
+    submitted_at: float
+    on_admit: Optional[Callable[[float], None]]
+
+    def __init__(self, job_id, client_id, priority, memory, start_tag, seq,
+                 on_admit=None):
+        self.job_id = job_id
+        self.client_id = client_id
+        self.priority = priority
+        self.memory = memory
+        self.start_tag = start_tag
+        self.seq = seq
+        self.submitted_at = time.monotonic()
+        self.on_admit = on_admit
+
+    def sort_key(self):
+        return -self.priority, self.start_tag, self.seq
+
+
+class RunScheduler:
+    """
+    Job 실행 요청을 예상 메모리 사용량에 맞춰 실행시키는 클래스
+
+    실행 중인 Job의 예상 메모리 합이 memory_budget을 넘지 않고
+    실행 중인 Job이 max_running개 보다 적을 때만 다음 요청을 실행한다.
+    (실행 중인 Job이 없으면 memory_budget보다 큰 요청도 실행한다.)
+
+    대기 중인 요청은 우선순위가 높은 순서로, 같은 우선순위에서는 클라이언트별로 번갈아 가면서 실행한다.
+    한 클라이언트가 요청을 많이 보내도 다른 클라이언트의 요청이 뒤로 밀리지 않는다.
+    큰 요청이 계속 밀리지 않도록 맨 앞의 요청이 실행될 때까지 뒤의 요청은 기다린다.
+    thread에서 기다리는 요청(admit)과 Event Loop에서 기다리는 요청(admit_async)은 같은 대기열을 사용한다.
+
+    :param memory_budget: 동시에 실행되는 Job의 예상 메모리 합 제한(byte), None이면 제한하지 않는다.
+    :param max_running: 동시에 실행할 수 있는 Job 갯수
+    :param queue_limit: 대기열 최대 길이, 넘으면 RunQueueFull, None이면 제한하지 않는다.
+    :param memory_ratio: Job별 (실행 중 최대 DataFrame 크기 / 입력 파일 크기), 이전 실행 기록으로 갱신한다.
+    """
+    memory_budget: Optional[int]
+    max_running: int
+    queue_limit: Optional[int]
+    memory_ratio: Dict[int, float]
+
+    def __init__(self, memory_budget: Optional[int] = None,
+                 max_running: int = 1,
+                 queue_limit: Optional[int] = None):
+        self.memory_budget = memory_budget
+        self.max_running = max_running
+        self.queue_limit = queue_limit
+        self.memory_ratio = dict()
+
+        self.__condition = threading.Condition()
+        self.__waiting: List[RunTicket] = []
+        self.__running: Dict[int, RunTicket] = dict()
+        self.__running_memory = 0
+        self.__seq = itertools.count()
+        # 가상 시간(마지막으로 실행된 요청의 start_tag)과 클라이언트별 마지막 finish tag
+        self.__virtual_time = 0
+        self.__finish_tags: Dict[str, int] = dict()
+        self.__waits: Deque[float] = collections.deque(maxlen=RUN_WAIT_SAMPLES)
+        self.__admitted = 0
+        self.__rejected = 0
+
+    def estimate_memory(self, job_id: Optional[int], input_bytes: int,
+                        default_ratio: float) -> int:
+        """
+        Job의 예상 메모리 사용량
+        이전 실행 기록이 있으면 그 비율을, 없으면 default_ratio를 입력 파일 크기에 곱한다.
+        """
+        ratio = self.memory_ratio.get(job_id, default_ratio)
+        return int(input_bytes * ratio)
+
+    def record_memory(self, job_id: Optional[int], input_bytes: int,
+                      peak_bytes: Optional[int]):
+        """
+        실행이 끝난 Job의 실제 메모리 사용량으로 비율 갱신
+        """
+        if job_id is None or not input_bytes or peak_bytes is None:
+            return
+        observed = peak_bytes / input_bytes
+        prev = self.memory_ratio.get(job_id)
+        self.memory_ratio[job_id] = observed if prev is None else \
+            prev + MEMORY_HISTORY_WEIGHT * (observed - prev)
+
+    def __can_admit(self, ticket: RunTicket) -> bool:
+        if min(self.__waiting, key=RunTicket.sort_key) is not ticket:
+            return False
+        if not self.__running:
+            return True
+        if len(self.__running) >= self.max_running:
+            return False
+        return self.memory_budget is None or \
+            self.__running_memory + ticket.memory <= self.memory_budget
+
+    def __enqueue(self, job_id: int, memory: int, client_id: str,
+                  priority: int,
+                  on_admit: Optional[Callable[[float], None]] = None) \
+            -> RunTicket:
+        """
+        대기열에 요청 추가 (__condition을 잡은 상태에서 호출한다.)
+
+        :exception RunQueueFull: 대기열이 가득 참
+        """
+        if self.queue_limit is not None \
+                and len(self.__waiting) >= self.queue_limit:
+            self.__rejected += 1
+            raise RunQueueFull(f'run queue is full ({self.queue_limit})')
+        start_tag = max(self.__virtual_time,
+                        self.__finish_tags.get(client_id, 0))
+        self.__finish_tags[client_id] = start_tag + 1
+        ticket = RunTicket(job_id, client_id, priority, memory,
+                           start_tag, next(self.__seq), on_admit)
+        self.__waiting.append(ticket)
+        return ticket
+
+    def __start(self, ticket: RunTicket) -> float:
+        """
+        대기열의 요청을 실행 중으로 옮긴다. (__condition을 잡은 상태에서 호출한다.)
+
+        :return: 대기 시간
+        """
+        self.__waiting.remove(ticket)
+        self.__running[ticket.seq] = ticket
+        self.__running_memory += ticket.memory
+        self.__virtual_time = max(self.__virtual_time, ticket.start_tag)
+        wait = time.monotonic() - ticket.submitted_at
+        self.__waits.append(wait)
+        self.__admitted += 1
+        return wait
+
+    def __notify(self):
+        """
+        대기열이 바뀌었음을 알린다. (__condition을 잡은 상태에서 호출한다.)
+        맨 앞의 요청이 기다리는 thread가 없는 요청(admit_async)이면 여기서 실행 허가를 준다.
+        """
+        while self.__waiting:
+            ticket = min(self.__waiting, key=RunTicket.sort_key)
+            if ticket.on_admit is None or not self.__can_admit(ticket):
+                break
+            ticket.on_admit(self.__start(ticket))
+        self.__condition.notify_all()
+
+    def __cancel(self, ticket: RunTicket):
+        """
+        대기 중이면 대기열에서 빼고, 실행 중이면 실행을 끝낸다.
+        """
+        with self.__condition:
+            if ticket in self.__waiting:
+                self.__waiting.remove(ticket)
+            elif self.__running.pop(ticket.seq, None) is not None:
+                self.__running_memory -= ticket.memory
+            self.__notify()
+
+    @contextlib.contextmanager
+    def admit(self, job_id: int, memory: int,
+              client_id: str = 'anonymous',
+              priority: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        실행 허가를 받을 때까지 기다렸다가 실행한다.
+
+            with scheduler.admit(job_id, memory, client_id) as admission:
+                ...
+
+        :return: {'wait_seconds': 대기 시간, 'memory': 예상 메모리 사용량}
+        :exception RunQueueFull: 대기열이 가득 참
+        """
+        with self.__condition:
+            ticket = self.__enqueue(job_id, memory, client_id, priority)
+            try:
+                self.__condition.wait_for(lambda: self.__can_admit(ticket))
+            except BaseException:
+                self.__waiting.remove(ticket)
+                self.__notify()
+                raise
+            wait = self.__start(ticket)
+            # 다음 요청도 같이 실행할 수 있는지 확인한다.
+            self.__notify()
+        try:
+            yield {'wait_seconds': wait, 'memory': memory}
+        finally:
+            self.__cancel(ticket)
+
+    @contextlib.asynccontextmanager
+    async def admit_async(self, job_id: int, memory: int,
+                          client_id: str = 'anonymous',
+                          priority: int = 0) \
+            -> AsyncIterator[Dict[str, Any]]:
+        """
+        admit과 같지만 thread를 잡지 않고 Event Loop에서 기다린다.
+        실행 허가를 받은 다음에 Executor로 넘겨야 Executor의 대기 순서(FIFO)가 아니라
+        Scheduler의 순서(우선순위, 클라이언트별 번갈아 실행)대로 실행된다.
+
+            async with scheduler.admit_async(job_id, memory, client_id) as admission:
+                await run_in_executor(...)
+
+        :exception RunQueueFull: 대기열이 가득 참
+        """
+        loop = asyncio.get_running_loop()
+        admitted: asyncio.Future = loop.create_future()
+
+        def __set_wait(wait: float):
+            if not admitted.done():
+                admitted.set_result(wait)
+
+        def __on_admit(wait: float):
+            # 실행 허가는 다른 thread(실행이 끝난 Job)에서 줄 수도 있다.
+            loop.call_soon_threadsafe(__set_wait, wait)
+
+        with self.__condition:
+            ticket = self.__enqueue(job_id, memory, client_id, priority,
+                                    __on_admit)
+            self.__notify()
+        try:
+            wait = await admitted
+        except BaseException:
+            self.__cancel(ticket)
+            raise
+        try:
+            yield {'wait_seconds': wait, 'memory': memory}
+        finally:
+            self.__cancel(ticket)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        대기열 상태와 대기 시간 통계
+        """
+        with self.__condition:
+            waits = sorted(self.__waits)
+            now = time.monotonic()
+            queued_by_client = collections.Counter(
+                t.client_id for t in self.__waiting)
+            return {
+                'memory_budget': self.memory_budget,
+                'max_running': self.max_running,
+                'queue_limit': self.queue_limit,
+                'running': len(self.__running),
+                'running_memory': self.__running_memory,
+                'queue_depth': len(self.__waiting),
+                'queued_by_client': dict(queued_by_client),
+                'oldest_wait_seconds': max(
+                    (now - t.submitted_at for t in self.__waiting),
+                    default=0.0),
+                'admitted': self.__admitted,
+                'rejected': self.__rejected,
+                'wait_seconds': {
+                    'mean': sum(waits) / len(waits) if waits else 0.0,
+                    'p50': waits[len(waits) // 2] if waits else 0.0,
+                    'p95': waits[int(len(waits) * 0.95)] if waits else 0.0,
+                    'max': waits[-1] if waits else 0.0,
+                },
+            }
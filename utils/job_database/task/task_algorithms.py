@@ -1,22 +1,491 @@
-
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
 import pandas as pd
+from pandas.api.extensions import take
+
+from utils.algorithms.aggregation import AggregateError, \
+    normalize_aggregations, get_aggregate_column_name
+from utils.algorithms.filter_expression import FilterError
+from utils.algorithms.merge_options import MERGE_VALIDATES, \
+    MERGE_DIAGNOSTIC_KEYS, MergeCheckError, normalize_merge_options, \
+    is_default_merge, get_merge_keys
+
+
+def get_common_columns(left_frame: pd.DataFrame, right_frame: pd.DataFrame) \
+        -> List[str]:
+    """
+    두 데이터 프레임의 겹치는 column (왼쪽 데이터 프레임의 column 순서)
+    """
+    right_cols = set(right_frame.columns.values)
+    return [col for col in left_frame.columns.values if col in right_cols]
 
 
-def merge_dataframes(left_frame: pd.DataFrame, right_frame: pd.DataFrame):
+def get_key_counts(frame: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """
+    key별 행 갯수 (key column + rows column), NaN key도 하나의 key로 센다. (pd.merge와 같다.)
+    """
+    return frame.groupby(keys, dropna=False, sort=False, observed=True) \
+        .size().rename('rows').reset_index()
+
+
+def get_diagnostic_keys(counts: pd.DataFrame, keys: List[str],
+                        column: str) -> List[Dict[str, Any]]:
+    """
+    column 값이 큰 key MERGE_DIAGNOSTIC_KEYS개 (진단 정보)
+    """
+    top = counts.nlargest(MERGE_DIAGNOSTIC_KEYS, column)
+    top = top.astype(object).where(top.notna(), None)
+    return [{'key': [row[k] for k in keys],
+             **{col: row[col] for col in counts.columns if col not in keys}}
+            for row in top.to_dict('records')]
+
+
+def count_merge_rows(left_counts: pd.DataFrame, right_counts: pd.DataFrame,
+                     keys: List[str], how: str) -> Tuple[int, pd.DataFrame]:
+    """
+    병합하지 않고 key별 행 갯수만으로 계산한 병합 결과의 행 갯수
+
+    :return: (결과 행 갯수, 양쪽에 모두 있는 key별 행 갯수 (left, right, rows))
+    """
+    matched = pd.merge(left_counts, right_counts, how='inner', on=keys,
+                       suffixes=('_left', '_right')) \
+        .rename(columns={'rows_left': 'left', 'rows_right': 'right'})
+    matched['rows'] = matched['left'] * matched['right']
+    rows = int(matched['rows'].sum())
+    if how in ('outer', 'left'):
+        rows += int(left_counts['rows'].sum() - matched['left'].sum())
+    if how in ('outer', 'right'):
+        rows += int(right_counts['rows'].sum() - matched['right'].sum())
+    return rows, matched
+
+
+def check_merge(left_frame: pd.DataFrame, right_frame: pd.DataFrame,
+                keys: List[str], options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    병합하기 전에 key column, validate, max_row_factor 조건을 검사한다.
+    key별 행 갯수만 세므로 병합 결과가 아주 커지는 경우에도 메모리를 거의 사용하지 않는다.
+
+    :return: 검사 기록 (계산한 결과 행 갯수 등)
+    :exception MergeCheckError: 조건을 만족하지 않음
+    """
+    details = {'keys': keys, 'how': options['how'],
+               'left_rows': len(left_frame), 'right_rows': len(right_frame)}
+    left_missing = [k for k in keys if k not in left_frame.columns]
+    right_missing = [k for k in keys if k not in right_frame.columns]
+    if left_missing or right_missing:
+        raise MergeCheckError('missing_keys', {
+            **details, 'left_missing': left_missing,
+            'right_missing': right_missing})
+    if options['validate'] is None and options['max_row_factor'] is None:
+        return {}
+
+    left_counts = get_key_counts(left_frame, keys)
+    right_counts = get_key_counts(right_frame, keys)
+    if options['validate'] is not None:
+        unique = MERGE_VALIDATES[options['validate']]
+        for side, counts, must_be_unique in \
+                (('left', left_counts, unique[0]),
+                 ('right', right_counts, unique[1])):
+            duplicated = counts[counts['rows'] > 1]
+            if must_be_unique and len(duplicated):
+                raise MergeCheckError('validate', {
+                    **details, 'validate': options['validate'],
+                    'side': side, 'duplicate_keys': len(duplicated),
+                    'top_keys': get_diagnostic_keys(duplicated, keys,
+                                                    'rows')})
+
+    log = {}
+    if options['max_row_factor'] is not None:
+        rows, matched = count_merge_rows(left_counts, right_counts, keys,
+                                         options['how'])
+        max_rows = int(options['max_row_factor']
+                       * max(len(left_frame), len(right_frame), 1))
+        if rows > max_rows:
+            raise MergeCheckError('max_row_factor', {
+                **details, 'result_rows': rows, 'max_rows': max_rows,
+                'max_row_factor': options['max_row_factor'],
+                'top_keys': get_diagnostic_keys(matched, keys, 'rows')})
+        log['expected_rows'] = rows
+    return log
+
+
+def merge_with_options(left_frame: pd.DataFrame, right_frame: pd.DataFrame,
+                       options: Dict[str, Any]) \
+        -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    병합 옵션(how, on, validate, max_row_factor)을 적용해서 병합한다.
+    on이 없으면 겹치는 column으로 병합하고, 겹치는 column이 없으면 이어붙인다.
+    on에 없는 겹치는 column은 pd.merge처럼 _x, _y를 붙인다.
+
+    :return: (병합 결과, 병합 기록)
+    :exception MergeCheckError: 조건을 만족하지 않음
+    """
+    options = normalize_merge_options(options)
+    if len(left_frame.columns) == 0:
+        return right_frame, {'keys': [], 'strategy': 'concat'}
+    keys = get_merge_keys(options, list(left_frame.columns.values),
+                          list(right_frame.columns.values))
+    if not keys:
+        return pd.concat([left_frame, right_frame], axis=1), \
+            {'keys': [], 'strategy': 'concat'}
+    log = check_merge(left_frame, right_frame, keys, options)
+    merged = pd.merge(left_frame, right_frame, how=options['how'], on=keys)
+    return merged, {'keys': keys, 'strategy': 'merge', 'how': options['how'],
+                    'rows': len(merged), **log}
+
+
+def merge_dataframes(left_frame: pd.DataFrame, right_frame: pd.DataFrame,
+                     options: Optional[Dict[str, Any]] = None):
     """
     두 개의 데이터 프레임을 병합하는 단일 함수
 
     겹치는 Column이 없으면 그냥 이어붙이고
     하나라도 있는 경우 해당 Column을 중심으로 병합한다.
+    병합 옵션이 있으면 merge_with_options로 병합한다.
     """
-    left_cols, right_cols = \
-        set(left_frame.columns.values), set(right_frame.columns.values)
-    
+    if not is_default_merge(options):
+        merged, log = merge_with_options(left_frame, right_frame, options)
+        return merged, log['keys']
     # 겹치는 colum 확인
-    common_cols = left_cols & right_cols
+    common_cols = get_common_columns(left_frame, right_frame)
     if common_cols:
         # 동일한 column이 존재하는 경우 동일 column대로 병합
-        return pd.merge(left_frame, right_frame, how='outer', 
-            on=list(common_cols)), list(common_cols)
+        return pd.merge(left_frame, right_frame, how='outer',
+            on=common_cols), common_cols
     # 없는 경우 그냥 column을 합친다.
     return pd.concat([left_frame, right_frame], axis=1), []
+
+
+class DataFrameJoiner:
+    """
+    여러 개의 데이터 프레임을 차례대로 병합하는 클래스
+
+    merge_dataframes를 차례대로 호출한 것과 결과는 같지만,
+    연속해서 같은 key column으로 병합하는 경우(여러 Task가 한 Task로 모이는 경우)
+    병합 결과를 key index 상태로 유지하여 매번 key를 다시 hashing 하지 않는다.
+
+    join 방식
+        concat: 겹치는 column이 없으면 column을 이어붙인다.
+        sort_merge: 양쪽 key index가 모두 정렬되어 있고 한쪽 key에 중복이 없으면
+                    두 index를 한번씩 훑어서(Index.join) 행 위치를 구한 다음 column별로 가져온다.
+                    (outer join 결과는 key 순으로 정렬되므로 다음 병합부터는 왼쪽이 항상 정렬되어 있다.)
+        hash: 그 외에는 DataFrame.join(key를 hashing 해서 행을 찾는다)을 한다.
+        merge: key가 여러 개면 MultiIndex join이 pd.merge보다 느리고,
+               key에 NaN이 있으면 index join과 행 순서가 달라지므로 pd.merge를 사용한다.
+               양쪽 key의 dtype이 다르면(int와 float, 서로 다른 category 등)
+               pd.merge가 정하는 key dtype과 index join의 dtype이 달라지므로 pd.merge를 사용한다.
+               병합 옵션(merge_with_options)이 있어도 pd.merge를 사용한다.
+
+    :param frame: 병합 중인 데이터 프레임, keys가 있으면 keys가 index로 설정되어 있다.
+    :param keys: frame의 index로 설정된 key column
+    :param key_dtypes: index로 설정하기 전 key column의 dtype
+                       (Index는 int32를 int64로 바꾸는 등 dtype이 달라질 수 있어 column으로 돌려놓을 때 되돌린다.)
+    :param columns: 병합 결과의 column 순서
+    :param options: 병합 옵션, 기본 병합이면 None
+    """
+    frame: pd.DataFrame
+    keys: Optional[List[str]]
+    key_dtypes: Dict[str, Any]
+    columns: List[str]
+    options: Optional[Dict[str, Any]]
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None):
+        self.frame = pd.DataFrame()
+        self.keys = None
+        self.key_dtypes = {}
+        self.columns = []
+        self.options = None if is_default_merge(options) \
+            else normalize_merge_options(options)
+
+    def __materialize(self) -> pd.DataFrame:
+        """
+        key index를 다시 column으로 돌려놓는다.
+        """
+        if self.keys:
+            self.frame = self.frame.reset_index() \
+                .astype(self.key_dtypes)[self.columns]
+            self.keys = None
+        return self.frame
+
+    def __set_keys(self, keys: List[str]) -> bool:
+        """
+        frame의 index를 keys로 설정한다.
+        :return: key에 NaN이 있어 설정할 수 없으면 False
+        """
+        if self.keys == keys:
+            return True
+        frame = self.__materialize()
+        if frame[keys].isna().any(axis=None):
+            return False
+        self.key_dtypes = dict(frame[keys].dtypes)
+        self.frame = frame.set_index(keys)
+        self.keys = keys
+        return True
+
+    def __sort_merge(self, right_indexed: pd.DataFrame) -> pd.DataFrame:
+        """
+        정렬된 두 key index를 병합한다. (sort_merge)
+        한쪽에 없는 key의 행은 NaN으로 채운다. (DataFrame.join과 같은 dtype)
+        """
+        index, left_indexer, right_indexer = self.frame.index.join(
+            right_indexed.index, how='outer', return_indexers=True)
+
+        def __take(frame: pd.DataFrame, indexer: Optional[np.ndarray]) \
+                -> Dict[str, Any]:
+            if indexer is None:
+                return {col: frame[col].array for col in frame.columns}
+            return {col: take(frame[col].array, indexer, allow_fill=True)
+                    for col in frame.columns}
+
+        return pd.DataFrame({**__take(self.frame, left_indexer),
+                             **__take(right_indexed, right_indexer)},
+                            index=index)
+
+    def join(self, right_frame: pd.DataFrame) -> Dict[str, Any]:
+        """
+        right_frame을 병합한다.
+        :return: 병합 기록 (key column, join 방식)
+        :exception MergeCheckError: 병합 옵션의 조건을 만족하지 않음
+        """
+        if self.options is not None:
+            self.frame, log = merge_with_options(self.__materialize(),
+                                                 right_frame, self.options)
+            self.columns = list(self.frame.columns.values)
+            return log
+
+        common_cols = [col for col in self.columns
+                       if col in set(right_frame.columns.values)]
+        if not common_cols:
+            self.frame = pd.concat([self.__materialize(), right_frame], axis=1)
+            self.columns = list(self.frame.columns.values)
+            return {'keys': [], 'strategy': 'concat'}
+
+        if len(common_cols) > 1 or \
+                right_frame[common_cols].isna().any(axis=None) or \
+                not self.__set_keys(common_cols) or \
+                list(self.key_dtypes.values()) != \
+                list(right_frame[common_cols].dtypes):
+            self.frame = pd.merge(self.__materialize(), right_frame,
+                                  how='outer', on=common_cols)
+            self.columns = list(self.frame.columns.values)
+            return {'keys': common_cols, 'strategy': 'merge'}
+
+        right_indexed = right_frame.set_index(common_cols)
+        if self.frame.index.is_monotonic_increasing \
+                and right_indexed.index.is_monotonic_increasing \
+                and (self.frame.index.is_unique
+                     or right_indexed.index.is_unique):
+            strategy = 'sort_merge'
+            self.frame = self.__sort_merge(right_indexed)
+        else:
+            strategy = 'hash'
+            self.frame = self.frame.join(right_indexed, how='outer')
+        self.columns += [col for col in right_frame.columns.values
+                         if col not in common_cols]
+        return {'keys': common_cols, 'strategy': strategy}
+
+    def result(self) -> pd.DataFrame:
+        """
+        병합 결과
+        """
+        return self.__materialize()
+
+
+def query_dataframe(dataframe: pd.DataFrame, expression: str,
+                    task_name: str) -> pd.DataFrame:
+    """
+    filter 조건으로 행 거르기
+
+    :exception FilterError: 조건을 적용하지 못함 (없는 column, 비교할 수 없는 타입 등)
+    """
+    try:
+        return dataframe.query(expression)
+    except Exception as e:
+        raise FilterError(task_name, expression, f'{type(e).__name__}: {e}')
+
+
+"""
+auto_compact 설정
+COMPACT_SAMPLE_ROWS: dtype을 추정하기 위해 먼저 읽는 행의 갯수
+CATEGORY_MAX_RATIO: (고유값 갯수 / 행 갯수)가 이 값 이하인 문자열 column은 category로 변환한다.
+"""
+COMPACT_SAMPLE_ROWS = 10000
+CATEGORY_MAX_RATIO = 0.5
+
+
+def infer_compact_dtypes(sample: pd.DataFrame) -> Dict[str, str]:
+    """
+    sample 데이터를 보고 반복되는 값이 많은 문자열 column을 찾아
+    category dtype으로 지정한다.
+    """
+    dtypes = {}
+    for col in sample.columns:
+        series = sample[col]
+        if len(series) == 0 or not pd.api.types.is_string_dtype(series):
+            continue
+        if series.nunique(dropna=True) / len(series) <= CATEGORY_MAX_RATIO:
+            dtypes[col] = 'category'
+    return dtypes
+
+
+def downcast_numeric_columns(dataframe: pd.DataFrame,
+                             exclude: Iterable[str] = ()) -> pd.DataFrame:
+    """
+    숫자 column을 값을 잃지 않는 가장 작은 dtype으로 변환한다.
+    정수는 범위에 맞게 줄이고, 실수는 float32로 바꿔도 값이 같은 경우에만 줄인다.
+    exclude에 있는 column(사용자가 dtype을 지정한 column 등)은 건드리지 않는다.
+    """
+    exclude = set(exclude)
+    for col in dataframe.columns:
+        if col in exclude:
+            continue
+        series = dataframe[col]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series):
+            downcast = 'unsigned' if len(series) and series.min() >= 0 \
+                else 'integer'
+            dataframe[col] = pd.to_numeric(series, downcast=downcast)
+        elif pd.api.types.is_float_dtype(series):
+            downcasted = pd.to_numeric(series, downcast='float')
+            if downcasted.dtype != series.dtype and \
+                    downcasted.astype(series.dtype).equals(series):
+                dataframe[col] = downcasted
+    return dataframe
+
+
+def get_bytes_per_row(dataframe: pd.DataFrame) -> float:
+    """
+    행 하나당 메모리 사용량(byte)
+    """
+    if len(dataframe) == 0:
+        return 0.0
+    return float(dataframe.memory_usage(deep=True).sum()) / len(dataframe)
+
+
+"""
+group by 집계 설정
+PARTIAL_FUNCTIONS: 집계 함수별로 조각마다 계산해 둘 부분 집계
+COMBINE_FUNCTIONS: 부분 집계를 다시 합칠 때 사용하는 함수
+AGGREGATE_COMBINE_ROWS: 모아둔 부분 집계의 행 갯수가 이 값을 넘으면 하나로 합친다.
+"""
+PARTIAL_FUNCTIONS = {
+    'sum': ('sum',),
+    'count': ('count',),
+    'min': ('min',),
+    'max': ('max',),
+    'mean': ('sum', 'count'),
+}
+COMBINE_FUNCTIONS = {'sum': 'sum', 'count': 'sum', 'min': 'min', 'max': 'max'}
+AGGREGATE_COMBINE_ROWS = 1 << 16
+
+
+class GroupAggregator:
+    """
+    데이터 프레임을 조각 단위로 받아서 group by 집계를 하는 클래스
+
+    조각마다 부분 집계(sum, count, min, max)를 계산해 두고 (partial)
+    모아둔 부분 집계가 커지면 다시 하나로 합친다. (combine)
+    mean은 sum/count로 계산하므로 메모리 사용량은 행 갯수가 아니라 group 갯수에 비례한다.
+    group key가 NaN인 행도 하나의 group으로 집계한다.
+
+    :param group_by: group key column
+    :param aggregations: {column: [집계 함수, ...]}
+    :param partials: 아직 합치지 않은 부분 집계
+    """
+    group_by: List[str]
+    aggregations: Dict[str, List[str]]
+    partials: List[pd.DataFrame]
+
+    def __init__(self, group_by: List[str],
+                 aggregations: Dict[str, Any]):
+        self.group_by = list(group_by)
+        self.aggregations = normalize_aggregations(aggregations)
+        self.partials = []
+        self.__partial_spec = {
+            col: sorted({p for f in funcs for p in PARTIAL_FUNCTIONS[f]})
+            for col, funcs in self.aggregations.items()
+        }
+        self.__partial_rows = 0
+
+    def partial(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        """
+        조각 하나의 부분 집계, 상태를 바꾸지 않으므로 여러 thread에서 호출할 수 있다.
+        """
+        return dataframe.groupby(self.group_by, dropna=False, sort=False,
+                                 observed=True).agg(self.__partial_spec)
+
+    def add(self, partial: pd.DataFrame):
+        """
+        부분 집계 추가
+        """
+        self.partials.append(partial)
+        self.__partial_rows += len(partial)
+        if len(self.partials) > 1 \
+                and self.__partial_rows > AGGREGATE_COMBINE_ROWS:
+            self.__combine()
+
+    def update(self, dataframe: pd.DataFrame):
+        """
+        조각 하나를 집계에 추가
+        """
+        self.add(self.partial(dataframe))
+
+    def __combine(self) -> pd.DataFrame:
+        if not self.partials:
+            return pd.DataFrame()
+        if len(self.partials) > 1:
+            merged = pd.concat(self.partials)
+            combined = merged.groupby(
+                level=list(range(len(self.group_by))),
+                dropna=False, sort=False,
+            ).agg({col: COMBINE_FUNCTIONS[col[1]] for col in merged.columns})
+            self.partials = [combined]
+        self.__partial_rows = len(self.partials[0])
+        return self.partials[0]
+
+    def result(self) -> pd.DataFrame:
+        """
+        집계 결과, group key 순으로 정렬하고 key column은 일반 column이 된다.
+        결과 column 이름은 <column>_<집계 함수> 이다.
+        """
+        columns = [get_aggregate_column_name(col, f)
+                   for col, funcs in self.aggregations.items()
+                   for f in funcs]
+        combined = self.__combine()
+        if len(combined.index) == 0:
+            return pd.DataFrame(columns=self.group_by + columns)
+
+        data = {}
+        for col, funcs in self.aggregations.items():
+            for f in funcs:
+                if f == 'mean':
+                    data[get_aggregate_column_name(col, f)] = \
+                        combined[(col, 'sum')] / combined[(col, 'count')]
+                else:
+                    data[get_aggregate_column_name(col, f)] = \
+                        combined[(col, f)]
+        return pd.DataFrame(data, index=combined.index) \
+            .sort_index().reset_index()
+
+    def aggregate(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        """
+        데이터 프레임 전체를 한번에 집계
+        """
+        self.update(dataframe)
+        return self.result()
+
+
+def aggregate_dataframe(dataframe: pd.DataFrame, group_by: List[str],
+                        aggregations: Dict[str, Any],
+                        task_name: str) -> pd.DataFrame:
+    """
+    데이터 프레임 전체를 group by 집계
+
+    :exception AggregateError: 집계하지 못함 (없는 column, 집계할 수 없는 타입 등)
+    """
+    try:
+        return GroupAggregator(group_by, aggregations).aggregate(dataframe)
+    except Exception as e:
+        raise AggregateError(task_name, group_by, aggregations,
+                             f'{type(e).__name__}: {e}')
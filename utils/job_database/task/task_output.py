@@ -0,0 +1,493 @@
+import hashlib
+import json
+import math
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+from libs.resource_access import RawFileAtomicWrite
+from utils.job_database.column_stats import get_stats_path, \
+    remove_column_stats
+from utils.job_database.output_partitions import PartitionColumnError
+
+"""
+write Task 결과 파일의 행 위치 index
+
+결과 파일을 작성할 때 INDEX_STRIDE 행마다 그 행이 시작하는 byte 위치를 기록해서
+<파일 이름>.index.json 에 같이 저장한다.
+결과 일부만 볼 때(preview) 처음부터 읽지 않고 가장 가까운 위치로 바로 이동한다.
+
+INDEX_STRIDE: 위치를 기록하는 행 간격
+INDEX_SUFFIX: index 파일 이름 뒤에 붙는 문자열
+"""
+INDEX_STRIDE = 1 << 14
+INDEX_SUFFIX = '.index.json'
+
+"""
+column 통계 (column_stats.py)
+
+READ_NA_STRINGS: read_csv가 NaN으로 읽는 문자열, 통계에서도 null로 센다.
+STATS_PROBE_ROWS: 통계를 사용하기 전에 먼저 확인하는 앞부분 행 갯수
+"""
+READ_NA_STRINGS = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a',
+    'nan', 'null'])
+STATS_PROBE_ROWS = 100
+
+"""
+값별로 나눠서 작성하는 결과 (write Task의 partition_by)
+
+결과 디렉토리 아래에 hive 형식(<column>=<값>/)의 디렉토리를 만들고 partition마다 파일 하나를 작성한다.
+디렉토리 이름의 값은 URL 인코딩(%XX) 한다.
+
+PARTITION_MANIFEST: 작성한 파일과 행 갯수 목록 파일 이름 (_로 시작하므로 디렉토리를 읽을 때 제외된다)
+PARTITION_NULL: 값이 비어있는(NaN) partition의 디렉토리 이름에 사용하는 값
+PARTITION_FILE: partition 디렉토리 안의 파일 이름, 압축 방식의 확장자를 붙인다.
+PARTITION_WRITE_WORKERS: 동시에 작성하는 최대 thread 갯수
+"""
+PARTITION_MANIFEST = '_manifest.json'
+PARTITION_NULL = '__HIVE_DEFAULT_PARTITION__'
+PARTITION_FILE = 'part.csv'
+PARTITION_WRITE_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def get_index_path(path: str) -> str:
+    return path + INDEX_SUFFIX
+
+
+def __to_stats_value(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    return None
+
+
+def get_stats_kind(column: pd.Series) -> Optional[str]:
+    """
+    csv로 작성한 다음 다시 읽었을 때도 통계가 맞는 column 종류
+    ('number', 'bool', 'string', 통계를 사용할 수 없으면 None)
+
+    문자열 column은 모두 숫자나 True/False 처럼 보이면 다시 읽을 때 다른 dtype이 되므로 제외한다.
+    """
+    if pd.api.types.is_bool_dtype(column):
+        return 'bool'
+    if pd.api.types.is_numeric_dtype(column):
+        return 'number'
+    if not (pd.api.types.is_object_dtype(column)
+            or pd.api.types.is_string_dtype(column)):
+        return None
+    values = column[column.notna()]
+    values = values[~values.isin(READ_NA_STRINGS)]
+    if pd.api.types.infer_dtype(values, skipna=True) != 'string':
+        return None
+    # 대부분 앞부분에서 숫자가 아닌 값이 나오므로 앞부분을 먼저 확인한다.
+    for part in (values.iloc[:STATS_PROBE_ROWS], values):
+        if not (part.isin(['True', 'False']).all()
+                or pd.to_numeric(part, errors='coerce').notna().all()):
+            return 'string'
+    return None
+
+
+def get_column_stats(dataframe: pd.DataFrame,
+                     kinds: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+    """
+    column별 {'min', 'max', 'nulls'}, kinds에 있는 column만 계산한다.
+    """
+    stats = dict()
+    dataframe = dataframe.set_axis(
+        [str(col) for col in dataframe.columns], axis=1)
+    for col, kind in kinds.items():
+        column = dataframe[col]
+        if kind == 'string':
+            column = column.mask(column.isin(READ_NA_STRINGS))
+        values = column.dropna()
+        stats[col] = {
+            'min': __to_stats_value(values.min()) if len(values) else None,
+            'max': __to_stats_value(values.max()) if len(values) else None,
+            'nulls': int(len(column) - len(values)),
+        }
+    return stats
+
+
+def merge_column_stats(groups: List[Dict[str, Dict[str, Any]]]) \
+        -> Dict[str, Dict[str, Any]]:
+    """
+    row group 통계를 합친 파일 전체 통계
+    """
+    merged = dict()
+    for group in groups:
+        for col, s in group.items():
+            m = merged.setdefault(col, {'min': None, 'max': None, 'nulls': 0})
+            if s['min'] is not None:
+                m['min'] = s['min'] if m['min'] is None \
+                    else min(m['min'], s['min'])
+                m['max'] = s['max'] if m['max'] is None \
+                    else max(m['max'], s['max'])
+            m['nulls'] += s['nulls']
+    return merged
+
+
+def get_schema(dataframe: pd.DataFrame) -> Tuple[List[List[str]], str]:
+    """
+    (column 이름과 dtype 목록, schema hash)
+    """
+    schema = [[str(col), str(t)] for col, t in dataframe.dtypes.items()]
+    digest = hashlib.blake2b(json.dumps(schema).encode('utf-8'),
+                             digest_size=8).hexdigest()
+    return schema, digest
+
+
+def get_read_dtypes(dataframe: pd.DataFrame, kinds: Dict[str, str],
+                    columns: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """
+    파일 전체를 read_csv로 읽었을 때의 dtype (숫자, bool column만)
+    row group 일부만 읽으면 읽은 조각만 보고 dtype을 추정하므로,
+    건너뛴 row group에만 빈 값이 있는 정수 column은 float64가 아니라 int64로 읽힌다.
+
+    :param columns: 파일 전체 column 통계 (merge_column_stats)
+    """
+    read_dtypes = dict()
+    dtypes = {str(col): t for col, t in dataframe.dtypes.items()}
+    for col, kind in kinds.items():
+        dtype, nulls = dtypes[col], columns[col]['nulls']
+        if kind == 'number' and pd.api.types.is_integer_dtype(dtype):
+            if nulls:
+                read_dtypes[col] = 'float64'
+            elif columns[col]['max'] is not None \
+                    and columns[col]['max'] > np.iinfo(np.int64).max:
+                read_dtypes[col] = 'uint64'
+            else:
+                read_dtypes[col] = 'int64'
+        elif kind == 'number' and pd.api.types.is_float_dtype(dtype):
+            read_dtypes[col] = 'float64'
+        elif kind == 'bool' and not nulls:
+            read_dtypes[col] = 'bool'
+    return read_dtypes
+
+
+def write_column_stats(dataframe: pd.DataFrame, path: str,
+                       kinds: Dict[str, str],
+                       groups: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    <파일 이름>.stats.json 작성
+
+    :param kinds: 통계를 계산한 column과 종류 (get_stats_kinds)
+    :param groups: row group 목록 ({'first_row', 'rows', 'columns', 'offset', 'end'},
+                   압축 파일은 offset/end 없이 파일 전체가 하나의 row group)
+    """
+    schema, schema_hash = get_schema(dataframe)
+    columns = merge_column_stats([g['columns'] for g in groups])
+    st = os.stat(path)
+    stats = {
+        'rows': len(dataframe),
+        'schema': schema,
+        'schema_hash': schema_hash,
+        'kinds': kinds,
+        'read_dtypes': get_read_dtypes(dataframe, kinds, columns),
+        'columns': columns,
+        'row_groups': groups,
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+    }
+    with RawFileAtomicWrite(get_stats_path(path)) as w:
+        json.dump(stats, w)
+    return stats
+
+
+def get_stats_kinds(dataframe: pd.DataFrame) -> Dict[str, str]:
+    """
+    통계를 계산할 column과 종류, 이름이 중복된 column은 제외한다.
+    """
+    kinds = dict()
+    names = [str(col) for col in dataframe.columns]
+    for i, col in enumerate(names):
+        if names.count(col) > 1:
+            continue
+        kind = get_stats_kind(dataframe.iloc[:, i])
+        if kind is not None:
+            kinds[col] = kind
+    return kinds
+
+
+def write_csv_with_index(dataframe: pd.DataFrame, path: str, sep: str,
+                         buffer_size: int = -1,
+                         column_stats: bool = False) -> Dict[str, Any]:
+    """
+    DataFrame을 csv로 작성하면서 행 위치 index를 만든다.
+    to_csv를 INDEX_STRIDE 행씩 나눠서 호출하므로 한번에 작성한 파일과 내용이 같다.
+    column_stats면 같은 조각 단위(row group)로 column 통계도 같이 작성한다.
+
+    :return: index ({'columns', 'rows', 'stride', 'offsets', 'size', 'mtime_ns'})
+    """
+    offsets = []
+    groups = []
+    kinds = get_stats_kinds(dataframe) if column_stats else {}
+    with RawFileAtomicWrite(path, binary=True, buffer_size=buffer_size) as w:
+        position = w.write(dataframe.iloc[:0].to_csv(
+            None, sep=sep, index=False).encode('utf-8'))
+        for start in range(0, len(dataframe), INDEX_STRIDE):
+            offsets.append(position)
+            chunk = dataframe.iloc[start:start + INDEX_STRIDE]
+            position += w.write(chunk.to_csv(
+                None, sep=sep, index=False, header=False).encode('utf-8'))
+            if column_stats:
+                groups.append({
+                    'first_row': start, 'rows': len(chunk),
+                    'offset': offsets[-1], 'end': position,
+                    'columns': get_column_stats(chunk, kinds),
+                })
+
+    # 결과 파일이 바뀌면 index를 사용하지 않도록 파일 크기와 수정 시간을 같이 기록한다.
+    st = os.stat(path)
+    index = {
+        'columns': [str(col) for col in dataframe.columns],
+        'rows': len(dataframe),
+        'stride': INDEX_STRIDE,
+        'offsets': offsets,
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+    }
+    with RawFileAtomicWrite(get_index_path(path)) as w:
+        json.dump(index, w)
+    if column_stats:
+        write_column_stats(dataframe, path, kinds, groups)
+    else:
+        remove_column_stats(path)
+    return index
+
+
+def remove_index(path: str):
+    """
+    압축 파일처럼 index 없이 작성한 경우 예전 index 삭제
+    """
+    try:
+        os.remove(get_index_path(path))
+    except FileNotFoundError:
+        pass
+
+
+def load_index(path: str) -> Optional[Dict[str, Any]]:
+    """
+    결과 파일의 index, 없거나 결과 파일이 바뀌었으면 None
+    """
+    try:
+        with open(get_index_path(path)) as f:
+            index = json.load(f)
+        st = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    if index.get('size') != st.st_size \
+            or index.get('mtime_ns') != st.st_mtime_ns:
+        return None
+    return index
+
+
+def read_csv_slice(path: str, sep: str, offset: int, limit: int,
+                   columns: Optional[List[str]] = None,
+                   compression: Optional[str] = None) \
+        -> Tuple[pd.DataFrame, Optional[int], bool]:
+    """
+    csv 파일의 offset번째 행부터 limit개의 행만 읽는다.
+    index가 있으면 가장 가까운 위치로 이동해서 읽고,
+    없으면 처음부터 offset개의 행을 건너뛰면서 읽는다.
+
+    :param columns: 읽을 column, None이면 전부
+    :return: (읽은 DataFrame, 전체 행 갯수(모르면 None), index 사용 여부)
+    :exception KeyError: 없는 column
+    """
+    index = load_index(path) if compression is None else None
+    header = index['columns'] if index else list(pd.read_csv(
+        path, sep=sep, nrows=0, compression=compression).columns)
+    missing = [col for col in columns or [] if col not in header]
+    if missing:
+        raise KeyError(f'unknown columns: {missing}')
+    usecols = columns or None
+
+    if index is None:
+        # header는 이미 읽었으므로 header 행까지 갯수(int)로 건너뛴다.
+        # (행 번호 목록(range)을 넘기면 offset만큼 큰 set을 만든다.)
+        dataframe = pd.read_csv(path, sep=sep, compression=compression,
+                                header=None, names=header,
+                                skiprows=offset + 1, nrows=limit,
+                                usecols=usecols)
+    else:
+        block = offset // index['stride']
+        if block >= len(index['offsets']):
+            dataframe = pd.DataFrame(columns=usecols or header)
+        else:
+            with open(path, 'rb') as f:
+                f.seek(index['offsets'][block])
+                dataframe = pd.read_csv(
+                    f, sep=sep, header=None, names=header,
+                    skiprows=offset - block * index['stride'],
+                    nrows=limit, usecols=usecols)
+    if columns:
+        dataframe = dataframe[columns]
+    return dataframe, index['rows'] if index else None, index is not None
+
+
+def get_stats_dtype(stats: Dict[str, Any],
+                    dtype: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    row group을 나눠서 읽을 때 사용할 dtype
+    조각마다 dtype을 추정하면 파일 전체를 읽었을 때와 달라질 수 있으므로
+    문자열 column은 str로, 숫자/bool column은 파일 전체를 읽었을 때의 dtype(read_dtypes)으로 지정한다.
+    사용자가 지정한 dtype이 우선이다.
+    """
+    read_dtypes = dict(stats.get('read_dtypes', {}))
+    read_dtypes.update({col: 'str' for col, kind in stats['kinds'].items()
+                        if kind == 'string'})
+    read_dtypes.update(dtype or {})
+    return read_dtypes
+
+
+def read_row_groups(path: str, sep: str, stats: Dict[str, Any],
+                    groups: List[int],
+                    dtype: Optional[Dict[str, str]] = None,
+                    predicate: Optional[str] = None) -> pd.DataFrame:
+    """
+    통계 파일의 row group 중 groups 번호만 읽는다. 연속된 row group은 한번에 읽는다.
+    행 번호(index)는 파일 전체를 읽었을 때와 같다.
+
+    :param predicate: 읽은 행에 적용할 조건
+    """
+    header = [col for col, _ in stats['schema']]
+    dtype = get_stats_dtype(stats, dtype)
+    row_groups = stats['row_groups']
+    runs = []
+    for i in groups:
+        if runs and runs[-1][-1] == i - 1:
+            runs[-1].append(i)
+        else:
+            runs.append([i])
+
+    frames = []
+    with open(path, 'rb') as f:
+        for run in runs:
+            first = row_groups[run[0]]
+            f.seek(first['offset'])
+            frame = pd.read_csv(f, sep=sep, header=None, names=header,
+                                dtype=dtype,
+                                nrows=sum(row_groups[i]['rows'] for i in run))
+            frame.index = pd.RangeIndex(first['first_row'],
+                                        first['first_row'] + len(frame))
+            if predicate is not None:
+                frame = frame.query(predicate)
+            frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=header)
+    return pd.concat(frames) if len(frames) > 1 else frames[0]
+
+
+def get_partition_value(value: Any) -> Any:
+    """
+    manifest에 기록할 partition 값, 비어있으면 None
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if pd.isna(value):
+        return None
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def get_partition_dir(keys: List[str], values: Tuple[Any, ...]) -> str:
+    """
+    partition 디렉토리 (예: date=2024-01-01/kind=A)
+    """
+    parts = []
+    for key, value in zip(keys, values):
+        value = get_partition_value(value)
+        text = PARTITION_NULL if value is None else quote(str(value), safe='')
+        parts.append(f'{quote(key, safe="")}={text}')
+    return '/'.join(parts)
+
+
+def replace_directory(source: str, path: str):
+    """
+    작성을 마친 임시 디렉토리(source)를 결과 디렉토리(path)로 바꾼다.
+    예전 결과는 이름을 바꿔두고 새 결과로 바꾼 다음 삭제한다. (예전 partition 파일이 남지 않는다)
+    예전 결과가 파일이면 index, column 통계 파일도 같이 삭제한다.
+    """
+    old = None
+    if os.path.isdir(path):
+        old = f'{source}.old'
+        os.rename(path, old)
+    elif os.path.exists(path):
+        os.remove(path)
+        remove_index(path)
+        remove_column_stats(path)
+    os.rename(source, path)
+    if old is not None:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def write_partitions(dataframe: pd.DataFrame, path: str,
+                     partition_by: List[str],
+                     write_file: Callable[[pd.DataFrame, str], Any],
+                     task_name: str, extension: str = '') -> Dict[str, Any]:
+    """
+    DataFrame을 partition_by column 값별로 나눠서 partition마다 파일 하나씩 작성한다.
+
+    group은 한번만 나누고(행 위치만 구한다) partition을 thread pool에서 동시에 작성한다.
+    (to_csv의 행 formatting은 GIL을 잡고 실행되므로 압축하지 않으면 thread를 늘려도 거의 빨라지지 않는다.
+     gzip/bz2/xz/zstd 압축과 파일 쓰기는 GIL을 놓으므로 압축하는 partition끼리는 겹쳐서 실행된다.)
+    임시 디렉토리에 모두 작성한 다음 manifest를 작성하고 결과 디렉토리로 바꾸므로
+    작성 도중 실패해도 예전 결과가 깨지지 않는다.
+    partition column은 파일에도 그대로 남긴다. (파일 하나만 읽어도 값을 알 수 있다)
+
+    :param path: 결과 디렉토리
+    :param write_file: (partition DataFrame, 파일 경로)로 파일 하나를 작성하는 함수
+    :param task_name: 작성하는 write Task (에러에 사용)
+    :param extension: partition 파일 이름(PARTITION_FILE) 뒤에 붙일 압축 확장자
+    :return: manifest ({'partition_by', 'rows', 'files': [{'path', 'values', 'rows', 'bytes'}, ...]})
+    :exception PartitionColumnError: partition_by column이 없음
+    """
+    missing = [key for key in partition_by if key not in dataframe.columns]
+    if missing:
+        raise PartitionColumnError(task_name, missing,
+                                   [str(col) for col in dataframe.columns])
+    groups = list(dataframe.groupby(partition_by, sort=True, dropna=False,
+                                    observed=True).indices.items())
+    parent, name = os.path.split(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    temp = tempfile.mkdtemp(prefix=f'.{name}.', suffix='.tmp', dir=parent)
+
+    def __write(group: Tuple[Any, Any]) -> Dict[str, Any]:
+        values, positions = group
+        if len(partition_by) == 1:
+            values = (values,)
+        relative = f'{get_partition_dir(partition_by, values)}/' \
+                   f'{PARTITION_FILE}{extension}'
+        file_path = os.path.join(temp, relative)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        write_file(dataframe.take(positions), file_path)
+        return {'path': relative,
+                'values': {key: get_partition_value(value)
+                           for key, value in zip(partition_by, values)},
+                'rows': len(positions),
+                'bytes': os.path.getsize(file_path)}
+
+    try:
+        workers = max(1, min(PARTITION_WRITE_WORKERS, len(groups)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            files = list(pool.map(__write, groups))
+        manifest = {'partition_by': list(partition_by),
+                    'rows': len(dataframe), 'files': files}
+        with RawFileAtomicWrite(os.path.join(temp, PARTITION_MANIFEST)) as w:
+            json.dump(manifest, w)
+        replace_directory(temp, path)
+    finally:
+        shutil.rmtree(temp, ignore_errors=True)
+    return manifest
@@ -0,0 +1,144 @@
+from typing import Any, Dict, List, Optional
+
+from utils.algorithms.filter_expression import get_expression_columns
+
+"""
+실행 계획 최적화
+
+filter Task의 조건(predicate)을 가능한 앞쪽의 read Task로 옮겨서(pushdown)
+파일을 읽을 때 조건에 맞지 않는 행을 미리 버린다.
+aggregate Task는 read Task와 합쳐서(fuse) 파일을 조각 단위로 읽으면서 집계한다.
+"""
+
+
+def get_parents(graph: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """
+    Task별 이전 Task 목록
+    """
+    parents = {task_name: [] for task_name in graph}
+    for u, vs in graph.items():
+        for v in vs:
+            parents[v].append(u)
+    return parents
+
+
+def find_pushdown_source(task_name: str,
+                         graph: Dict[str, List[str]],
+                         parents: Dict[str, List[str]],
+                         properties: Dict[str, Dict[str, Any]],
+                         columns: set) -> Optional[str]:
+    """
+    task_name의 조건을 옮길 수 있는 read Task 찾기
+
+    read -> (drop/filter ...) -> task_name 처럼 한 줄로 이어진 경우만 옮긴다.
+    * 중간 Task는 이전 Task와 다음 Task가 하나씩만 있어야 한다.
+      (다음 Task가 여러 개면 다른 Task도 걸러진 데이터를 받게 된다.)
+    * 중간 drop Task는 조건에 사용하는 column을 삭제하면 안된다.
+    * read Task는 이전 Task가 없어야 한다. (병합 이후의 행은 파일의 행과 다르다.)
+
+    :param columns: 조건에서 사용하는 column 이름
+    :return: read Task 이름, 옮길 수 없으면 None
+    """
+    current = task_name
+    while len(parents[current]) == 1:
+        prev = parents[current][0]
+        if len(graph[prev]) != 1:
+            return None
+        task_type = properties[prev]['task_name']
+        if task_type == 'read':
+            return prev if not parents[prev] else None
+        if task_type == 'drop' and properties[prev]['column_name'] in columns:
+            return None
+        if task_type not in ('drop', 'filter'):
+            return None
+        current = prev
+    return None
+
+
+def push_down_filters(graph: Dict[str, List[str]],
+                      properties: Dict[str, Dict[str, Any]]) \
+        -> Dict[str, List[str]]:
+    """
+    filter Task의 조건을 read Task로 옮긴다.
+    filter Task는 그대로 실행되므로(같은 조건을 다시 적용해도 결과는 같다)
+    read Task에서 조건을 적용하지 못해도 결과는 달라지지 않는다.
+
+    :return: {read Task 이름: [조건, ...]}
+    """
+    parents = get_parents(graph)
+    predicates: Dict[str, List[str]] = {}
+    for task_name, v in properties.items():
+        if v['task_name'] != 'filter':
+            continue
+        source = find_pushdown_source(
+            task_name, graph, parents, properties,
+            get_expression_columns(v['expression']))
+        if source is not None:
+            predicates.setdefault(source, []).append(v['expression'])
+    return predicates
+
+
+def find_aggregate_source(task_name: str,
+                          graph: Dict[str, List[str]],
+                          parents: Dict[str, List[str]],
+                          properties: Dict[str, Dict[str, Any]]) \
+        -> Optional[List[str]]:
+    """
+    aggregate Task와 합칠 수 있는 read Task 찾기
+
+    read -> (filter ...) -> task_name 처럼 filter Task로만 한 줄로 이어진 경우만 합친다.
+    중간 filter Task의 조건은 push_down_filters에서 이미 read Task로 옮겨진다.
+
+    :return: [read Task, 중간 filter Task, ...], 합칠 수 없으면 None
+    """
+    chain = []
+    current = task_name
+    while len(parents[current]) == 1:
+        prev = parents[current][0]
+        if len(graph[prev]) != 1:
+            return None
+        task_type = properties[prev]['task_name']
+        if task_type == 'read':
+            return [prev] + chain[::-1] if not parents[prev] else None
+        if task_type != 'filter':
+            return None
+        chain.append(prev)
+        current = prev
+    return None
+
+
+def plan_pushdown(graph: Dict[str, List[str]],
+                  properties: Dict[str, Dict[str, Any]]) \
+        -> Dict[str, Dict[str, Any]]:
+    """
+    Task별 pushdown 계획
+
+    read Task
+        predicates: 옮겨온 filter 조건
+        aggregate: 합친 aggregate Task ({'task_name', 'group_by', 'aggregations', 'filters'})
+    read Task와 합쳐진 filter/aggregate Task
+        fused_into: 합쳐진 read Task 이름, 받은 데이터를 그대로 넘긴다.
+
+    :return: {Task 이름: 계획}
+    """
+    plan: Dict[str, Dict[str, Any]] = {}
+    for source, predicates in push_down_filters(graph, properties).items():
+        plan.setdefault(source, {})['predicates'] = predicates
+
+    parents = get_parents(graph)
+    for task_name, v in properties.items():
+        if v['task_name'] != 'aggregate':
+            continue
+        chain = find_aggregate_source(task_name, graph, parents, properties)
+        if chain is None:
+            continue
+        source, filters = chain[0], chain[1:]
+        plan.setdefault(source, {})['aggregate'] = {
+            'task_name': task_name,
+            'group_by': v['group_by'],
+            'aggregations': v['aggregations'],
+            'filters': [properties[f]['expression'] for f in filters],
+        }
+        for fused in filters + [task_name]:
+            plan.setdefault(fused, {})['fused_into'] = source
+    return plan
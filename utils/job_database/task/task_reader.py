@@ -0,0 +1,226 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+"""
+병렬 읽기 설정
+PARALLEL_MIN_CHUNK_BYTES: byte 범위 하나의 최소 크기, 파일이 작으면 나누지 않는다.
+QUOTE_SCAN_BLOCK_BYTES: 따옴표 사용 여부를 확인할 때 한번에 읽는 크기
+"""
+PARALLEL_MIN_CHUNK_BYTES = 4 << 20
+QUOTE_SCAN_BLOCK_BYTES = 1 << 20
+# 조건(predicate)이 있을 때 한번에 읽는 행 갯수
+READ_CHUNK_ROWS = 1 << 18
+
+
+def split_byte_ranges(path: str, workers: int,
+                      min_chunk_bytes: Optional[int] = None) \
+        -> Tuple[bytes, List[Tuple[int, int]]]:
+    """
+    파일을 줄바꿈 위치에 맞춰 workers개 이하의 byte 범위로 나눈다.
+
+    :param min_chunk_bytes: byte 범위 하나의 최소 크기, None이면 PARALLEL_MIN_CHUNK_BYTES
+    :return: (header 줄, [(시작 위치, 끝 위치), ...])
+    """
+    if min_chunk_bytes is None:
+        min_chunk_bytes = PARALLEL_MIN_CHUNK_BYTES
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        start = f.tell()
+        n = max(1, min(workers, (size - start) // max(min_chunk_bytes, 1)))
+        step = (size - start) // n
+
+        bounds = [start]
+        for i in range(1, n):
+            f.seek(max(start + step * i, bounds[-1]))
+            # 줄 중간이면 다음 줄의 처음으로 이동
+            f.readline()
+            bounds.append(min(f.tell(), size))
+        bounds.append(size)
+    ranges = [(a, b) for a, b in zip(bounds, bounds[1:]) if a < b]
+    return header, ranges
+
+
+def has_quote_char(path: str, quotechar: bytes = b'"') -> bool:
+    """
+    파일에 따옴표가 있는지 확인한다. (찾을 때까지 파일 전체를 확인한다.)
+    따옴표로 감싼 값에는 줄바꿈이 들어갈 수 있어 줄 단위로 나누면 안된다.
+    """
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(QUOTE_SCAN_BLOCK_BYTES)
+            if not block:
+                return False
+            if quotechar in block:
+                return True
+
+
+def __read_byte_range(path: str, byte_range: Tuple[int, int],
+                      sep: str, names: List[str],
+                      dtype: Optional[Dict[str, str]]) -> pd.DataFrame:
+    start, end = byte_range
+    with open(path, 'rb') as f:
+        f.seek(start)
+        raw = f.read(end - start)
+    return pd.read_csv(io.BytesIO(raw), sep=sep, header=None,
+                       names=names, dtype=dtype)
+
+
+def concat_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    나눠서 읽은 데이터 프레임을 순서대로 합친다.
+
+    column의 dtype이 조각마다 다르게 추정된 경우(예: 한 조각에서는 값이 전부 비어있는 문자열 column)
+    한번에 읽었을 때와 같은 dtype이 되도록 object로 합친 다음 다시 추정한다.
+    index는 각 조각의 index를 그대로 사용한다.
+    """
+    if len(chunks) == 1:
+        return chunks[0]
+    mixed = [
+        col for col in chunks[0].columns
+        if len({str(chunk[col].dtype) for chunk in chunks}) > 1
+        and not all(pd.api.types.is_numeric_dtype(chunk[col])
+                    and not pd.api.types.is_bool_dtype(chunk[col])
+                    for chunk in chunks)
+    ]
+    if mixed:
+        chunks = [chunk.astype({col: object for col in mixed})
+                  for chunk in chunks]
+    dataframe = pd.concat(chunks)
+    if mixed:
+        dataframe[mixed] = dataframe[mixed].infer_objects()
+    return dataframe
+
+
+def split_dtype(dtype: Optional[Dict[str, str]]) \
+        -> Tuple[Optional[Dict[str, str]], List[str]]:
+    """
+    조각 단위로 읽을 때 사용할 dtype과 합친 다음에 변환할 category column으로 나눈다.
+    category는 조각마다 category가 달라지므로 합친 다음에 변환한다.
+    """
+    categories = [col for col, t in (dtype or {}).items() if t == 'category']
+    chunk_dtype = {col: t for col, t in (dtype or {}).items()
+                   if t != 'category'} or None
+    return chunk_dtype, categories
+
+
+def get_byte_ranges(path: str, workers: int, compression: Optional[str]) \
+        -> Tuple[bytes, List[Tuple[int, int]]]:
+    """
+    byte 범위로 나눠서 읽을 수 있으면 (header, 범위 list), 아니면 (b'', [])
+    압축 파일과 따옴표를 사용하는 파일은 나눌 수 없다.
+    """
+    if workers > 1 and compression is None and not has_quote_char(path):
+        header, ranges = split_byte_ranges(path, workers)
+        if len(ranges) > 1:
+            return header, ranges
+    return b'', []
+
+
+def iter_csv_chunks(path: str, sep: str, workers: int,
+                    dtype: Optional[Dict[str, str]] = None,
+                    compression: Optional[str] = None,
+                    transform: Optional[Callable[[pd.DataFrame], Any]] = None,
+                    byte_ranges: Optional[Tuple[bytes, List[Tuple[int, int]]]]
+                    = None) -> Iterator[Tuple[int, Any]]:
+    """
+    파일을 조각 단위로 읽어서 순서대로 돌려준다.
+    byte 범위로 나눌 수 있으면 thread pool에서 동시에 읽고,
+    아니면 READ_CHUNK_ROWS 행씩 읽는다. (파일 전체를 한번에 메모리에 올리지 않는다.)
+
+    transform이 있으면 조각을 읽은 곳(thread)에서 바로 적용한다.
+    조각의 index는 0부터 시작한다.
+
+    :param dtype: category를 제외한 dtype (split_dtype)
+    :param transform: 조각마다 적용할 함수 (조건으로 거르기, 부분 집계 등)
+    :param byte_ranges: 이미 구한 get_byte_ranges 결과, None이면 여기서 구한다.
+                        (byte 범위를 구하려면 파일을 훑어야 하므로 두번 구하지 않는다.)
+    :return: (조각의 행 갯수, transform 결과) iterator
+    """
+    def __apply(chunk: pd.DataFrame) -> Tuple[int, Any]:
+        return len(chunk), transform(chunk) if transform else chunk
+
+    header, ranges = byte_ranges if byte_ranges is not None \
+        else get_byte_ranges(path, workers, compression)
+    if not ranges:
+        empty = True
+        with pd.read_csv(path, sep=sep, dtype=dtype, compression=compression,
+                         chunksize=READ_CHUNK_ROWS) as reader:
+            for chunk in reader:
+                empty = False
+                chunk.index = pd.RangeIndex(len(chunk))
+                yield __apply(chunk)
+        if empty:
+            yield __apply(pd.read_csv(path, sep=sep, dtype=dtype,
+                                      compression=compression, nrows=0))
+        return
+
+    names = pd.read_csv(io.BytesIO(header), sep=sep).columns.tolist()
+
+    def __read(byte_range: Tuple[int, int]) -> Tuple[int, Any]:
+        return __apply(__read_byte_range(path, byte_range, sep, names, dtype))
+
+    with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+        yield from pool.map(__read, ranges)
+
+
+def read_csv_with_rows(path: str, sep: str, workers: int,
+                       dtype: Optional[Dict[str, str]] = None,
+                       compression: Optional[str] = None,
+                       predicate: Optional[str] = None) \
+        -> Tuple[int, pd.DataFrame]:
+    """
+    하나의 큰 csv 파일을 줄바꿈 위치에 맞춰 byte 범위로 나눈 다음
+    thread pool에서 동시에 파싱하고 순서대로 합친다.
+    (pandas의 C parser는 파싱하는 동안 GIL을 놓기 때문에 thread로도 여러 core를 사용한다.)
+
+    파일이 작거나, 따옴표를 사용하는 파일은 나누지 않고 한번에 읽는다.
+    압축 파일은 byte 위치로 나눌 수 없으므로 한번에 읽으면서 압축을 푼다.
+    category dtype은 조각마다 category가 달라지므로 합친 다음에 변환한다.
+
+    조건(predicate)이 있으면 조각마다(각 thread에서) 조건에 맞는 행만 남기고 합친다.
+    남은 행의 index는 파일에서의 행 번호다. (한번에 읽고 걸렀을 때와 같다.)
+
+    :param compression: 압축 방식, None이면 압축하지 않은 파일
+    :param predicate: DataFrame.query에 사용할 조건
+    :return: (파일의 행 갯수, 읽은 DataFrame)
+    """
+    byte_ranges = get_byte_ranges(path, workers, compression)
+    if predicate is None and not byte_ranges[1]:
+        dataframe = pd.read_csv(path, sep=sep, dtype=dtype,
+                                compression=compression)
+        return len(dataframe), dataframe
+
+    chunk_dtype, categories = split_dtype(dtype)
+    transform = None
+    if predicate is not None:
+        def transform(chunk: pd.DataFrame) -> pd.DataFrame:
+            return chunk.query(predicate)
+
+    # 조각의 index를 파일에서의 행 번호로 바꾼다.
+    chunks, start = [], 0
+    for rows, chunk in iter_csv_chunks(path, sep, workers, chunk_dtype,
+                                       compression, transform, byte_ranges):
+        chunk.index = chunk.index + start
+        chunks.append(chunk)
+        start += rows
+
+    dataframe = concat_chunks(chunks)
+    if categories:
+        dataframe = dataframe.astype({col: 'category' for col in categories})
+    return start, dataframe
+
+
+def read_csv_parallel(path: str, sep: str, workers: int,
+                      dtype: Optional[Dict[str, str]] = None,
+                      compression: Optional[str] = None,
+                      predicate: Optional[str] = None) -> pd.DataFrame:
+    """
+    read_csv_with_rows와 같지만 읽은 DataFrame만 돌려준다.
+    """
+    return read_csv_with_rows(path, sep, workers, dtype, compression,
+                              predicate)[1]
@@ -1,10 +1,34 @@
 from abc import ABCMeta, abstractmethod
 import pandas as pd
 import collections
-from typing import List, Dict, Deque, Tuple, Any
+import itertools
+import os
+from typing import List, Dict, Deque, Tuple, Any, Optional, Union
 
-from utils.job_database.task.task_algorithms import merge_dataframes
+from libs.resource_access import RawFileAtomicWrite, infer_compression, \
+    get_compression_options, get_compression_extension
+from utils.job_database.task.task_algorithms import merge_dataframes, \
+    DataFrameJoiner, \
+    infer_compact_dtypes, downcast_numeric_columns, get_bytes_per_row, \
+    COMPACT_SAMPLE_ROWS, GroupAggregator, query_dataframe, \
+    aggregate_dataframe
+from utils.job_database.task.task_reader import read_csv_with_rows, \
+    iter_csv_chunks, split_dtype, concat_chunks
+from utils.algorithms.filter_expression import FilterError, \
+    get_expression_columns
+from utils.algorithms.aggregation import AggregateError
+from utils.algorithms.merge_options import MergeCheckError
+from utils.job_database.task.task_spill import MemoryBudget, SpilledFrame
+from utils.job_database.task.task_output import write_csv_with_index, \
+    remove_index, get_stats_kinds, get_column_stats, write_column_stats, \
+    get_stats_dtype, read_row_groups, write_partitions, STATS_PROBE_ROWS
+from utils.job_database.column_stats import load_column_stats, \
+    remove_column_stats, may_match_file, select_row_groups
+from utils.job_database.input_shards import resolve_shards, map_shards, \
+    ShardReadError, ShardNotFoundError, SHARD_READ_WORKERS
 BASE_DIR = 'storage/data'
+# 결과 파일 쓰기 버퍼 크기(byte)
+WRITE_BUFFER_SIZE = 1 << 20
 
 class TaskSpace(metaclass=ABCMeta):
     """
@@ -13,39 +37,82 @@ class TaskSpace(metaclass=ABCMeta):
     :param task_name: Task 이름
     :param tasklog_stack: 수행한 작업(병합, 기타 작업 등..)의 내용을 보관(Rollback에 사용)
     :param dataframe_buffer: 이전 Task의 결과 dataframe을 모아서 Task실행 때 한꺼번에 병합하는 데 사용한다.
+                             메모리 제한을 넘으면 dataframe 대신 SpilledFrame이 들어있다.
+                             빈 deque도 크기가 커서(Task가 많은 Job) 처음 push할 때 만든다.
+    :param memory_budget: buffer 메모리 제한, None이면 제한하지 않는다.
+    :param run_order: Task 실행 순서, 메모리 제한을 넘으면 늦게 실행되는 Task의 buffer부터 spill 한다.
+    :param merge_options: 이전 Task 결과 병합 옵션 (property의 merge), None이면 기본 병합
     """
+    __slots__ = ('task_name', 'tasklog_stack', 'dataframe_buffer',
+                 'memory_budget', 'run_order', 'merge_options')
     task_name: str
     tasklog_stack: List[Tuple[str, Any]]
-    dataframe_buffer: Deque[Tuple[str, str, pd.DataFrame]]
-    
+    dataframe_buffer: Optional[
+        Deque[Tuple[str, Union[pd.DataFrame, SpilledFrame]]]]
+    memory_budget: Optional[MemoryBudget]
+    run_order: int
+    merge_options: Optional[Dict[str, Any]]
+
     def __init__(self, task_name: str):
         self.task_name = task_name
         self.tasklog_stack = []
-        self.dataframe_buffer = collections.deque()
+        self.dataframe_buffer = None
+        self.memory_budget = None
+        self.run_order = 0
+        self.merge_options = None
 
     def __str__(self):
         return self.task_name
 
-    def __write_log(self, task_type: str, prev_task_name: str, log: Any):
+    def write_log(self, task_type: str, prev_task_name: str, log: Any):
         self.tasklog_stack.append((task_type, prev_task_name, log))
 
     def merge_dataframes_in_buffer(self):
         """
         dataframe_buffer에 들어있는 모든 dataframe을 병합한다.
+        같은 key로 여러번 병합하는 경우 key index를 재사용한다. (DataFrameJoiner)
+
+        :exception MergeCheckError: 병합 옵션의 조건을 만족하지 않음 (Task 실행 실패)
         """
-        merged_dataframe = pd.DataFrame()
+        joiner = DataFrameJoiner(self.merge_options)
         while self.dataframe_buffer:
             prev_name, prev_buffer = self.dataframe_buffer.pop()
-            merged_dataframe, common_columns = merge_dataframes(merged_dataframe, prev_buffer)
-        return merged_dataframe
+            if self.memory_budget is not None:
+                # spill 되어 있으면 이때 다시 읽는다.
+                prev_buffer = self.memory_budget.take(prev_buffer)
+            try:
+                log = joiner.join(prev_buffer)
+            except MergeCheckError as e:
+                e.details.update(task=self.task_name, prev_task=prev_name)
+                raise e
+            if log['keys']:
+                self.write_log('merge', prev_name, log)
+        return joiner.result()
 
-    def input_dataframe(self, task_name: str, dataframe: pd.DataFrame):
+    def input_dataframe(self, task_name: str, dataframe: pd.DataFrame,
+                        copy: bool = True):
         """
         dataframe_buffer에 dataframe을 push할 때 사용
+        copy가 False면 복사하지 않는다. (process 실행에서 SharedMemory에 있는 읽기 전용 DataFrame)
+        """
+        if copy:
+            dataframe = pd.DataFrame.copy(dataframe)
+        if self.dataframe_buffer is None:
+            self.dataframe_buffer = collections.deque()
+        self.dataframe_buffer.appendleft((task_name, dataframe))
+        if self.memory_budget is not None:
+            self.memory_budget.add(self, dataframe, self.run_order)
+
+    def spill_buffer(self, frame_id: int, memory_budget: MemoryBudget):
+        """
+        buffer에 있는 dataframe(id가 frame_id)을 디스크에 내려둔다.
         """
-        self.dataframe_buffer.appendleft(
-            (task_name, pd.DataFrame.copy(dataframe))
-        )
+        for i, (prev_name, prev_buffer) in \
+                enumerate(self.dataframe_buffer or ()):
+            if id(prev_buffer) == frame_id:
+                self.dataframe_buffer[i] = \
+                    prev_name, memory_budget.spill(prev_buffer)
+                return
     
     @abstractmethod
     def run(self):
@@ -65,21 +132,380 @@ class TaskReadSpace(TaskSpace):
     """
     Read Task
 
-    :params filename: 읽기 대상의 filename
+    :params filename: 읽기 대상의 filename, glob 패턴이나 디렉토리이면 해당하는 파일을 모두 읽어서 합친다.
     :params sep: 읽기 대상의 구분자
+    :params dtype: column별 dtype 지정 (선택)
+    :params auto_compact: True면 dtype을 추정해서 메모리를 적게 쓰는 dtype으로 읽는다. (선택)
+    :params parallel: 1보다 크면 파일을 나눠서 parallel개의 thread로 동시에 읽는다. (선택)
+    :params compression: 압축 방식, 기본값(infer)은 확장자로 추정한다. (선택)
+    :params compression_option: 지정한 압축 방식, 여러 파일을 읽을 때 파일마다 압축 방식을 추정하는 데 사용한다.
+    :params predicates: 다음 filter Task에서 옮겨온 조건, 읽으면서 조건에 맞지 않는 행을 버린다.
+    :params aggregate: 합쳐진 aggregate Task, 읽으면서 집계한다. ({'task_name', 'group_by', 'aggregations', 'filters'})
     """
+    __slots__ = ('filename', 'sep', 'dtype', 'auto_compact', 'parallel',
+                 'compression', 'compression_option', 'predicates',
+                 'aggregate')
     filename: str
     sep: str
-    def __init__(self, task_name: str, filename: str, sep: str):
+    dtype: Optional[Dict[str, str]]
+    auto_compact: bool
+    parallel: int
+    compression: Optional[str]
+    compression_option: str
+    predicates: List[str]
+    aggregate: Optional[Dict[str, Any]]
+    def __init__(self, task_name: str, filename: str, sep: str,
+                 dtype: Optional[Dict[str, str]] = None,
+                 auto_compact: bool = False,
+                 parallel: int = 1,
+                 compression: str = 'infer',
+                 predicates: Optional[List[str]] = None,
+                 aggregate: Optional[Dict[str, Any]] = None):
         super().__init__(task_name)
         self.filename = filename
         self.sep = sep
+        self.dtype = dtype
+        self.auto_compact = auto_compact
+        self.parallel = parallel
+        self.compression = infer_compression(filename, compression)
+        self.compression_option = compression
+        self.predicates = list(predicates or [])
+        self.aggregate = aggregate
+
+    def get_predicate(self) -> Optional[str]:
+        """
+        옮겨온 조건을 하나로 합친 조건
+        """
+        if not self.predicates:
+            return None
+        return ' and '.join(f'({p})' for p in self.predicates)
+
+    def read_dataframe(self) -> pd.DataFrame:
+        """
+        파일 읽기
+
+        auto_compact인 경우 먼저 일부 행을 읽어 반복되는 문자열 column을 category로 지정하고
+        전체를 읽은 다음 숫자 column을 downcast 한다.
+        변환 전/후의 행당 메모리 사용량은 log에 남긴다.
+        압축 파일은 압축을 풀면서 바로 읽는다.
+        옮겨온 조건이 있으면 조각 단위로 읽으면서 조건에 맞지 않는 행을 버린다.
+        column 통계 파일이 있으면 조건을 만족할 수 없는 row group은 읽지 않는다.
+        auto_compact인 경우 변환한 다음에 조건을 적용한다. (filter Task와 같은 dtype으로 비교)
+        filename이 glob 패턴이나 디렉토리이면 해당하는 파일을 모두 읽는다. (read_shards)
+        """
+        shards = resolve_shards(BASE_DIR, self.filename)
+        if shards is not None:
+            return self.read_shards(shards)
+        path = f'{BASE_DIR}/{self.filename}'
+        predicate = self.get_predicate()
+        if not self.auto_compact:
+            return self.read_file(path, self.compression, self.parallel,
+                                  self.dtype, predicate)[1]
+
+        sample, dtype = self.sample_compact_dtype(path, self.compression)
+        _, dataframe = read_csv_with_rows(path, self.sep, self.parallel,
+                                          dtype, self.compression)
+        return self.compact_dataframe(dataframe, sample, dtype, predicate)
+
+    def read_file(self, path: str, compression: Optional[str], workers: int,
+                  dtype: Optional[Dict[str, str]],
+                  predicate: Optional[str]) -> Tuple[int, pd.DataFrame]:
+        """
+        파일 하나를 조건을 적용해서 읽기 (auto_compact 제외)
+
+        :return: (파일의 행 갯수, 읽은 DataFrame), index는 파일에서의 행 번호다.
+        """
+        stats = load_column_stats(path) if predicate is not None else None
+        if stats is not None:
+            dataframe = self.read_with_column_stats(path, stats, predicate,
+                                                    compression, dtype)
+            if dataframe is not None:
+                return stats['rows'], dataframe
+        return read_csv_with_rows(path, self.sep, workers, dtype,
+                                  compression, predicate)
+
+    def sample_compact_dtype(self, path: str, compression: Optional[str]) \
+            -> Tuple[pd.DataFrame, Dict[str, str]]:
+        """
+        앞부분 행으로 메모리를 적게 쓰는 dtype 추정 (auto_compact)
+
+        :return: (앞부분 행, dtype), 사용자가 지정한 dtype이 우선이다.
+        """
+        sample = pd.read_csv(path, sep=self.sep, dtype=self.dtype,
+                             nrows=COMPACT_SAMPLE_ROWS,
+                             compression=compression)
+        return sample, dict(infer_compact_dtypes(sample), **(self.dtype or {}))
+
+    def compact_dataframe(self, dataframe: pd.DataFrame, sample: pd.DataFrame,
+                          dtype: Dict[str, str],
+                          predicate: Optional[str]) -> pd.DataFrame:
+        """
+        숫자 column을 downcast 하고 변환 결과를 log에 남긴 다음 조건을 적용한다. (auto_compact)
+        변환 전/후의 행당 메모리 사용량은 같은 행(앞부분 행)으로 비교한다.
+        """
+        exclude = (self.dtype or {}).keys()
+        dataframe = downcast_numeric_columns(dataframe, exclude=exclude)
+        compacted = downcast_numeric_columns(
+            sample.astype({col: t for col, t in dtype.items()
+                           if col in sample.columns}), exclude=exclude)
+        self.write_log('compact', None, {
+            'rows': len(dataframe),
+            'bytes_per_row_before': get_bytes_per_row(sample),
+            'bytes_per_row_after': get_bytes_per_row(compacted),
+            'dtypes': {col: str(t) for col, t in dataframe.dtypes.items()},
+        })
+        if predicate is not None:
+            dataframe = dataframe.query(predicate)
+        return dataframe
+
+    def get_shard_workers(self, shards: int) -> Tuple[int, int]:
+        """
+        여러 파일을 읽을 때 (동시에 읽는 파일 갯수, 파일 하나를 읽는 thread 갯수)
+        parallel이 파일 갯수보다 크면 남는 thread로 파일을 나눠서 읽는다.
+        """
+        return max(self.parallel, SHARD_READ_WORKERS), \
+            max(1, self.parallel // max(shards, 1))
+
+    def read_shards(self, shards: List[str]) -> pd.DataFrame:
+        """
+        여러 파일(shard)을 thread pool에서 동시에 읽고 파일 순서대로 한번에 합친다.
+
+        index는 파일을 순서대로 이어붙인 하나의 파일에서의 행 번호다. (조건으로 걸러도 같다)
+        압축 방식은 파일마다 확장자로 추정한다.
+        category 변환과 auto_compact의 downcast는 합친 다음에 한다. (파일마다 category가 달라지므로)
+        auto_compact의 dtype은 첫번째 파일의 앞부분으로 추정한다.
+        column이 다른 파일과 다른 파일은 읽지 못한 것으로 본다.
+        파일 갯수, 행 갯수와 파일별 에러는 log에 남긴다.
+
+        :exception ShardNotFoundError: 해당하는 파일이 없음
+        :exception ShardReadError: 읽지 못한 파일이 있음
+        """
+        if not shards:
+            raise ShardNotFoundError(self.filename)
+        predicate = self.get_predicate()
+        dtype, sample = self.dtype, None
+        if self.auto_compact:
+            sample, dtype = self.sample_compact_dtype(
+                shards[0], infer_compression(shards[0],
+                                             self.compression_option))
+        chunk_dtype, categories = split_dtype(dtype)
+        workers, file_workers = self.get_shard_workers(len(shards))
+
+        def __read(path: str) -> Tuple[int, pd.DataFrame]:
+            compression = infer_compression(path, self.compression_option)
+            if self.auto_compact:
+                return read_csv_with_rows(path, self.sep, file_workers,
+                                          chunk_dtype, compression)
+            return self.read_file(path, compression, file_workers,
+                                  chunk_dtype, predicate)
+
+        results, errors = map_shards(__read, shards, workers)
+        failed = dict(errors)
+        columns, first = None, None
+        for path, result in zip(shards, results):
+            if result is None:
+                continue
+            if columns is None:
+                columns, first = list(result[1].columns), path
+            elif list(result[1].columns) != columns:
+                failed[path] = ValueError(
+                    f'columns differ from {os.path.relpath(first, BASE_DIR)}')
+        shard_errors = [
+            {'shard': os.path.relpath(path, BASE_DIR),
+             'error': f'{type(failed[path]).__name__}: {failed[path]}'}
+            for path in shards if path in failed]
+        self.write_log('shards', None, {
+            'shards': len(shards), 'workers': min(workers, len(shards)),
+            'rows': sum(result[0] for result in results
+                        if result is not None),
+            'errors': shard_errors})
+        if shard_errors:
+            raise ShardReadError(self.filename, shard_errors, len(shards))
+
+        # 파일의 행 번호를 이어붙인 파일에서의 행 번호로 바꾼다.
+        frames, start = [], 0
+        for rows, frame in results:
+            frame.index = frame.index + start
+            frames.append(frame)
+            start += rows
+        dataframe = concat_chunks(frames)
+        if categories:
+            dataframe = dataframe.astype({col: 'category' for col in categories})
+        if self.auto_compact:
+            dataframe = self.compact_dataframe(dataframe, sample, dtype,
+                                               predicate)
+        return dataframe
+
+    def read_with_column_stats(self, path: str, stats: Dict[str, Any],
+                               predicate: str, compression: Optional[str],
+                               dtype: Optional[Dict[str, str]]) \
+            -> Optional[pd.DataFrame]:
+        """
+        column 통계로 조건을 만족할 수 없는 파일이나 row group을 건너뛰고 읽는다.
+        압축 파일은 파일 전체만 건너뛸 수 있다.
+
+        파일에 없는 column을 사용하거나 앞부분 행에 조건을 적용해 보고 실패하면 통계를 사용하지 않는다.
+        (통계 없이 읽으면서 조건을 적용하지 못한 것으로 처리된다.)
+        dtype을 지정한 column의 통계는 사용하지 않는다.
+
+        :return: 읽은 DataFrame, 건너뛸 row group이 없거나 통계를 사용할 수 없으면 None
+        """
+        header = [col for col, _ in stats['schema']]
+        if not get_expression_columns(predicate) <= set(header):
+            return None
+        exclude = (self.dtype or {}).keys()
+        row_groups = stats['row_groups']
+        if not may_match_file(stats, self.predicates, exclude):
+            groups = []
+        elif compression is None:
+            groups = select_row_groups(stats, self.predicates, exclude)
+        else:
+            return None
+        if len(groups) == len(row_groups):
+            return None
+        try:
+            pd.read_csv(path, sep=self.sep, nrows=STATS_PROBE_ROWS,
+                        dtype=get_stats_dtype(stats, dtype),
+                        compression=compression).query(predicate)
+        except Exception:
+            return None
+
+        dataframe = read_row_groups(path, self.sep, stats, groups, dtype,
+                                    predicate)
+        self.write_log('skip', None, {
+            'row_groups': len(row_groups),
+            'skipped_row_groups': len(row_groups) - len(groups),
+            'skipped_rows': stats['rows'] - sum(row_groups[i]['rows']
+                                                for i in groups),
+        })
+        return dataframe
+
+    def read_dataframe_with_pushdown(self) -> pd.DataFrame:
+        """
+        옮겨온 조건을 적용해서 파일 읽기
+        읽으면서 조건을 적용하지 못하면 조건 없이 다시 읽은 다음 전체 데이터에 조건을 적용한다.
+        그래도 적용할 수 없으면(column이 없는 경우 등) filter Task와 같이 실패한다.
+
+        :exception FilterError: 조건을 적용하지 못함
+        """
+        if not self.predicates:
+            return self.read_dataframe()
+        try:
+            dataframe = self.read_dataframe()
+        except Exception as e:
+            self.write_log('pushdown', None, {
+                'predicates': self.predicates, 'error': str(e)})
+            predicates, self.predicates = self.predicates, []
+            try:
+                dataframe = self.read_dataframe()
+            finally:
+                self.predicates = predicates
+            for predicate in predicates:
+                dataframe = query_dataframe(dataframe, predicate,
+                                            self.task_name)
+            return dataframe
+        self.write_log('pushdown', None, {
+            'predicates': self.predicates, 'rows': len(dataframe)})
+        return dataframe
+
+    def read_aggregated(self) -> pd.DataFrame:
+        """
+        합쳐진 aggregate Task의 결과 읽기
+        파일을 조각 단위로 읽으면서(parallel이면 각 thread에서) 조건으로 거르고 부분 집계를 한다.
+        메모리 사용량은 파일의 행 갯수가 아니라 group 갯수에 비례한다.
+
+        파일에 없는 column을 사용하는 조건이 있으면 filter Task와 같이 실패한다.
+        조각 단위로 처리하지 못하면 파일 전체를 읽은 다음 filter, aggregate Task와 같은 방식으로 처리한다.
+        그래도 집계하지 못하면 aggregate Task와 같이 AggregateError로 실패한다.
+        (auto_compact는 category 변환만 적용하고 숫자 column은 downcast 하지 않는다.)
+        여러 파일을 읽는 경우 파일마다 thread pool에서 부분 집계를 하고, header와 dtype은 첫번째 파일로 정한다.
+        """
+        shards = resolve_shards(BASE_DIR, self.filename)
+        if shards == []:
+            raise ShardNotFoundError(self.filename)
+        path = shards[0] if shards else f'{BASE_DIR}/{self.filename}'
+        compression = infer_compression(path, self.compression_option) \
+            if shards else self.compression
+        aggregate = self.aggregate
+        aggregator = GroupAggregator(aggregate['group_by'],
+                                     aggregate['aggregations'])
+        header = pd.read_csv(path, sep=self.sep, nrows=0,
+                             compression=compression).columns
+        filters = aggregate['filters']
+        for f in filters:
+            missing = get_expression_columns(f) - set(header)
+            if missing:
+                raise FilterError(self.task_name, f,
+                                  f'columns not found: {sorted(missing)}')
+        predicate = ' and '.join(f'({f})' for f in filters) or None
+        dtype = self.dtype
+        if self.auto_compact:
+            _, dtype = self.sample_compact_dtype(path, compression)
+        # category는 조각마다 category가 달라지므로 group key로 사용할 때는 의미가 없다.
+        chunk_dtype, _ = split_dtype(dtype)
+
+        def __partial(chunk: pd.DataFrame) -> pd.DataFrame:
+            if predicate is not None:
+                chunk = chunk.query(predicate)
+            return aggregator.partial(chunk)
+
+        def __read_shard(shard: str) -> List[Tuple[int, pd.DataFrame]]:
+            return list(iter_csv_chunks(
+                shard, self.sep, file_workers, chunk_dtype,
+                infer_compression(shard, self.compression_option), __partial))
+
+        try:
+            if shards is None:
+                partials = iter_csv_chunks(path, self.sep, self.parallel,
+                                           chunk_dtype, compression, __partial)
+            else:
+                workers, file_workers = self.get_shard_workers(len(shards))
+                results, errors = map_shards(__read_shard, shards, workers)
+                if errors:
+                    # 전체를 다시 읽으면서(read_shards) 파일별 에러를 남긴다.
+                    raise errors[0][1]
+                partials = itertools.chain.from_iterable(results)
+            rows = chunks = 0
+            for n, partial in partials:
+                aggregator.add(partial)
+                rows, chunks = rows + n, chunks + 1
+            dataframe = aggregator.result()
+            log = {'rows': rows, 'chunks': chunks, 'groups': len(dataframe),
+                   'filters': filters}
+            if shards is not None:
+                log['shards'] = len(shards)
+            self.write_log('aggregate', aggregate['task_name'], log)
+            return dataframe
+        except Exception as e:
+            self.write_log('aggregate', aggregate['task_name'],
+                           {'error': str(e)})
+
+        predicates, self.predicates = self.predicates, []
+        try:
+            dataframe = self.read_dataframe()
+        finally:
+            self.predicates = predicates
+        for f in filters:
+            dataframe = query_dataframe(dataframe, f, self.task_name)
+        return aggregate_dataframe(dataframe, aggregate['group_by'],
+                                   aggregate['aggregations'],
+                                   aggregate['task_name'])
 
     def run(self):
         dataframe = self.merge_dataframes_in_buffer()
         try:
-            new_data = pd.read_csv(f'{BASE_DIR}/{self.filename}', sep=self.sep)
-            dataframe, _ = merge_dataframes(dataframe, new_data)
+            new_data = self.read_aggregated() if self.aggregate \
+                else self.read_dataframe_with_pushdown()
+            dataframe, _ = merge_dataframes(dataframe, new_data,
+                                            self.merge_options)
+        except MergeCheckError as e:
+            # 병합 옵션 검사 실패는 읽기 실패와 달리 Job 실행을 멈춘다.
+            e.details.update(task=self.task_name, prev_task=None,
+                             filename=self.filename)
+            raise e
+        except (ShardReadError, FilterError, AggregateError) as e:
+            # 일부 파일만 합친 결과나 거르지/집계하지 않은 결과를 넘기지 않도록 Job 실행을 멈춘다.
+            raise e
         except Exception:
             pass
         return dataframe
@@ -93,20 +519,76 @@ class TaskWriteSpace(TaskSpace):
 
     :params filename: 읽기 대상의 filename
     :params sep: 읽기 대상의 구분자
+    :params compression: 압축 방식, 기본값(infer)은 확장자로 추정한다. (선택)
+    :params compression_level: 압축 수준 (선택)
+    :params compression_threads: 압축에 사용할 thread 갯수, zstd만 지원 (선택)
+    :params column_stats: True면 column 통계 파일(<파일 이름>.stats.json)을 같이 작성한다. (선택)
+    :params partition_by: 있으면 filename을 디렉토리로 보고 column 값별로 나눠서 작성한다. (선택)
     """
+    __slots__ = ('filename', 'sep', 'compression', 'column_stats',
+                 'partition_by')
     filename: str
     sep: str
-    def __init__(self, task_name: str, filename: str, sep: str):
+    compression: Optional[Dict[str, Any]]
+    column_stats: bool
+    partition_by: Optional[List[str]]
+    def __init__(self, task_name: str, filename: str, sep: str,
+                 compression: str = 'infer',
+                 compression_level: Optional[int] = None,
+                 compression_threads: Optional[int] = None,
+                 column_stats: bool = False,
+                 partition_by: Optional[List[str]] = None):
         super().__init__(task_name)
         self.filename = filename
         self.sep = sep
+        self.compression = get_compression_options(
+            infer_compression(filename, compression),
+            compression_level, compression_threads)
+        self.column_stats = column_stats
+        self.partition_by = partition_by
 
     def run(self):
         dataframe = self.merge_dataframes_in_buffer()
-        dataframe.to_csv(f'{BASE_DIR}/{self.filename}', 
-            sep=self.sep, index=False, index_label=False)
+        path = f'{BASE_DIR}/{self.filename}'
+        if not self.partition_by:
+            self.write_file(dataframe, path)
+            return dataframe
+
+        manifest = write_partitions(
+            dataframe, path, self.partition_by, self.write_file,
+            self.task_name,
+            get_compression_extension((self.compression or {}).get('method')))
+        self.write_log('partition', None, {
+            'partitions': len(manifest['files']), 'rows': manifest['rows'],
+            'bytes': sum(f['bytes'] for f in manifest['files'])})
         return dataframe
 
+    def write_file(self, dataframe: pd.DataFrame, path: str):
+        """
+        결과 파일 하나 작성
+        작성 도중 실패해도 기존 파일이 깨지지 않도록 원자적으로 작성한다.
+        """
+        if self.compression is None:
+            # 결과 일부만 볼 때 사용할 행 위치 index를 같이 작성한다.
+            write_csv_with_index(dataframe, path, self.sep, WRITE_BUFFER_SIZE,
+                                 self.column_stats)
+            return
+
+        # 압축 파일은 binary 모드로 열고 작성하면서 바로 압축한다.
+        remove_index(path)
+        with RawFileAtomicWrite(path, binary=True,
+                                buffer_size=WRITE_BUFFER_SIZE) as w:
+            dataframe.to_csv(w, sep=self.sep, index=False, index_label=False,
+                             encoding='utf-8', compression=self.compression)
+        if self.column_stats:
+            # 위치를 알 수 없으므로 파일 전체가 하나의 row group이다.
+            kinds = get_stats_kinds(dataframe)
+            write_column_stats(dataframe, path, kinds, [{
+                'first_row': 0, 'rows': len(dataframe),
+                'columns': get_column_stats(dataframe, kinds)}])
+        else:
+            remove_column_stats(path)
+
     def rollback(self):
         raise NotImplemented()
 
@@ -116,6 +598,7 @@ class TaskDropColumnSpace(TaskSpace):
 
     :params column_name: 삭제 대상의 Column
     """
+    __slots__ = ('column_name',)
     column_name: str
     def __init__(self, task_name: str, column_name: str):
         super().__init__(task_name)
@@ -130,4 +613,80 @@ class TaskDropColumnSpace(TaskSpace):
         return dataframe
 
     def rollback(self):
-        raise NotImplemented()
\ No newline at end of file
+        raise NotImplemented()
+
+class TaskFilterSpace(TaskSpace):
+    """
+    Row filter Task
+
+    :params expression: 남길 행의 조건 (DataFrame.query 문법, 예: "price > 100 and kind == 'A'")
+                        조건을 적용하지 못하면 FilterError로 실패한다.
+    :params fused_into: 이 Task를 대신 실행하는 read Task, 있으면 받은 데이터를 그대로 넘긴다.
+    """
+    __slots__ = ('expression', 'fused_into')
+    expression: str
+    fused_into: Optional[str]
+    def __init__(self, task_name: str, expression: str,
+                 fused_into: Optional[str] = None):
+        super().__init__(task_name)
+        self.expression = expression
+        self.fused_into = fused_into
+
+    def run(self):
+        dataframe = self.merge_dataframes_in_buffer()
+        if self.fused_into:
+            self.write_log('fused', self.fused_into, None)
+            return dataframe
+        rows = len(dataframe)
+        try:
+            dataframe = query_dataframe(dataframe, self.expression,
+                                        self.task_name)
+        except FilterError as e:
+            self.write_log('filter', None, {'rows_before': rows,
+                                            'error': e.error})
+            raise e
+        self.write_log('filter', None, {
+            'rows_before': rows, 'rows_after': len(dataframe)})
+        return dataframe
+
+    def rollback(self):
+        raise NotImplemented()
+
+class TaskAggregateSpace(TaskSpace):
+    """
+    group by 집계 Task
+
+    :params group_by: group key column
+    :params aggregations: {column: 집계 함수 또는 집계 함수 list} (sum/count/min/max/mean)
+                          집계하지 못하면 AggregateError로 실패한다.
+    :params fused_into: 이 Task를 대신 실행하는 read Task, 있으면 받은 데이터를 그대로 넘긴다.
+    """
+    __slots__ = ('group_by', 'aggregations', 'fused_into')
+    group_by: List[str]
+    aggregations: Dict[str, Any]
+    fused_into: Optional[str]
+    def __init__(self, task_name: str, group_by: List[str],
+                 aggregations: Dict[str, Any],
+                 fused_into: Optional[str] = None):
+        super().__init__(task_name)
+        self.group_by = group_by
+        self.aggregations = aggregations
+        self.fused_into = fused_into
+
+    def run(self):
+        dataframe = self.merge_dataframes_in_buffer()
+        if self.fused_into:
+            self.write_log('fused', self.fused_into, None)
+            return dataframe
+        rows = len(dataframe)
+        try:
+            dataframe = aggregate_dataframe(dataframe, self.group_by,
+                                            self.aggregations, self.task_name)
+        except AggregateError as e:
+            self.write_log('aggregate', None, {'rows_before': rows,
+                                               'error': e.error})
+            raise e
+        return dataframe
+
+    def rollback(self):
+        raise NotImplemented()
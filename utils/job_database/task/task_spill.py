@@ -0,0 +1,161 @@
+import os
+import pickle
+import shutil
+import tempfile
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+"""
+buffer 메모리 제한
+
+Task 결과(DataFrame)는 다음 Task가 실행될 때까지 다음 Task의 dataframe_buffer에 남아있다.
+buffer에 남아있는 DataFrame의 메모리 사용량 합이 제한을 넘으면
+가장 늦게 사용될 DataFrame부터 디스크에 내려두고(spill) 사용할 때 다시 읽는다.
+
+SPILL_BUFFER_SIZE: spill 파일 쓰기/읽기 버퍼 크기(byte)
+"""
+SPILL_BUFFER_SIZE = 1 << 20
+
+
+class SpilledFrame:
+    """
+    디스크에 내려둔 DataFrame
+
+    :param path: spill 파일 위치
+    :param nbytes: 메모리에 있을 때의 크기(byte)
+    :param file_bytes: spill 파일 크기(byte)
+    """
+    path: str
+    nbytes: int
+    file_bytes: int
+
+    def __init__(self, path: str, nbytes: int, file_bytes: int):
+        self.path = path
+        self.nbytes = nbytes
+        self.file_bytes = file_bytes
+
+    def load(self) -> pd.DataFrame:
+        """
+        DataFrame을 다시 읽고 spill 파일을 삭제한다.
+        """
+        try:
+            with open(self.path, 'rb', buffering=SPILL_BUFFER_SIZE) as f:
+                return pickle.load(f)
+        finally:
+            self.remove()
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def get_frame_bytes(dataframe: pd.DataFrame) -> int:
+    """
+    DataFrame의 메모리 사용량(byte), 문자열 column도 실제 크기로 계산한다.
+    """
+    return int(dataframe.memory_usage(deep=True, index=True).sum())
+
+
+class MemoryBudget:
+    """
+    한번의 Job 실행 동안 buffer에 남아있는 DataFrame의 메모리 사용량을 제한하는 클래스
+
+    DataFrame마다 사용될 순서(priority, 다음 Task의 실행 순서)를 같이 받아서
+    제한을 넘으면 가장 늦게 사용될 DataFrame부터 spill 한다.
+    spill 파일은 pickle(protocol 5)로 작성한다. 별도의 변환 없이 column 배열을 그대로 쓰고 읽는다.
+
+    :param limit: 메모리 제한(byte), None이면 제한하지 않는다.
+    :param spill_dir: spill 파일을 만들 디렉토리, None이면 시스템 임시 디렉토리
+    :param resident: 메모리에 남아있는 DataFrame {id: (priority, TaskSpace, DataFrame 크기)}
+    :param resident_bytes: 메모리에 남아있는 DataFrame 크기의 합
+    """
+    limit: Optional[int]
+    spill_dir: Optional[str]
+    resident: Dict[int, Tuple[int, Any, int]]
+    resident_bytes: int
+    peak_bytes: int
+    spill_count: int
+    spill_bytes: int
+    reload_count: int
+
+    def __init__(self, limit: Optional[int] = None,
+                 spill_dir: Optional[str] = None):
+        self.limit = limit
+        self.spill_dir = spill_dir
+        self.resident = dict()
+        self.resident_bytes = 0
+        self.peak_bytes = 0
+        self.spill_count = 0
+        self.spill_bytes = 0
+        self.reload_count = 0
+        self.__run_dir = None
+
+    def __get_run_dir(self) -> str:
+        if self.__run_dir is None:
+            if self.spill_dir:
+                os.makedirs(self.spill_dir, exist_ok=True)
+            self.__run_dir = tempfile.mkdtemp(prefix='job-spill-',
+                                              dir=self.spill_dir)
+        return self.__run_dir
+
+    def add(self, task_space, dataframe: pd.DataFrame, priority: int):
+        """
+        task_space의 buffer에 들어간 DataFrame 등록
+        제한을 넘으면 가장 늦게 사용될 DataFrame부터 spill 한다.
+        """
+        if self.limit is None:
+            return
+        nbytes = get_frame_bytes(dataframe)
+        self.resident[id(dataframe)] = priority, task_space, nbytes
+        self.resident_bytes += nbytes
+        self.peak_bytes = max(self.peak_bytes, self.resident_bytes)
+        while self.resident_bytes > self.limit and self.resident:
+            key = max(self.resident, key=lambda k: self.resident[k][0])
+            _, owner, _ = self.resident[key]
+            owner.spill_buffer(key, self)
+
+    def spill(self, dataframe: pd.DataFrame) -> SpilledFrame:
+        """
+        DataFrame을 디스크에 작성하고 등록을 해제한다.
+        """
+        _, _, nbytes = self.resident.pop(id(dataframe))
+        self.resident_bytes -= nbytes
+        fd, path = tempfile.mkstemp(suffix='.pkl', dir=self.__get_run_dir())
+        with os.fdopen(fd, 'wb', buffering=SPILL_BUFFER_SIZE) as f:
+            pickle.dump(dataframe, f, protocol=5)
+        spilled = SpilledFrame(path, nbytes, os.path.getsize(path))
+        self.spill_count += 1
+        self.spill_bytes += spilled.file_bytes
+        return spilled
+
+    def take(self, entry) -> pd.DataFrame:
+        """
+        buffer에서 꺼낸 DataFrame 등록 해제, spill 되어있으면 다시 읽는다.
+        """
+        if isinstance(entry, SpilledFrame):
+            self.reload_count += 1
+            return entry.load()
+        registered = self.resident.pop(id(entry), None)
+        if registered is not None:
+            self.resident_bytes -= registered[2]
+        return entry
+
+    def close(self):
+        """
+        남아있는 spill 파일 정리
+        """
+        if self.__run_dir is not None:
+            shutil.rmtree(self.__run_dir, ignore_errors=True)
+            self.__run_dir = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'memory_budget': self.limit,
+            'peak_buffer_bytes': self.peak_bytes,
+            'spill_count': self.spill_count,
+            'spill_bytes': self.spill_bytes,
+            'reload_count': self.reload_count,
+        }
@@ -0,0 +1,266 @@
+import pickle
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+"""
+Process 사이에서 DataFrame을 주고 받기 위한 모듈
+
+숫자/bool/datetime column과 category의 code는 하나의 SharedMemory 블록에 담아서 넘기고
+받는 쪽은 블록을 그대로 numpy 배열로 사용한다. (pickle로 직렬화하지 않는다.)
+받는 쪽의 배열은 읽기 전용이다. (같은 결과를 여러 Task가 동시에 사용한다.)
+문자열 column은 모든 값을 이어붙인 UTF-8 데이터와 값별 글자 수를 같은 블록에 담아서 넘긴다.
+그 외(문자열이 아닌 값이 섞인 object column, nullable 정수 등)와 index만 pickle로 넘긴다.
+"""
+
+# SharedMemory 블록 안에서 column 배열의 정렬 단위(byte)
+ALIGNMENT = 64
+# SharedMemory로 넘길 수 있는 numpy dtype 종류
+SHARED_KINDS = set('biufcmM')
+
+
+class FrameHandle:
+    """
+    SharedMemory에 올라간 DataFrame의 위치 정보
+    크기가 작기 때문에 process 사이에서 pickle로 전달된다.
+
+    :param shm_name: SharedMemory 이름, 공유할 column이 없으면 None
+    :param length: 행 갯수
+    :param columns: column별 정보
+        ('shared', 이름, dtype, offset)
+        ('category', 이름, code dtype, offset, categories, ordered)
+        ('string', 이름, dtype, 값 갯수, 글자 수 offset, 값 위치 offset, 데이터 offset, 데이터 크기)
+        ('pickled', 이름, pickle 데이터)
+    :param index: pickle된 index, RangeIndex(0..length)면 None
+    :param nbytes: SharedMemory 크기
+    """
+    shm_name: Optional[str]
+    length: int
+    columns: List[Tuple]
+    index: Optional[bytes]
+    nbytes: int
+
+    def __init__(self, shm_name, length, columns, index, nbytes):
+        self.shm_name = shm_name
+        self.length = length
+        self.columns = columns
+        self.index = index
+        self.nbytes = nbytes
+
+
+def start_resource_tracker() -> None:
+    """
+    process pool을 만들기 전에 호출한다.
+    worker들이 부모의 resource tracker를 공유해야 worker가 만든 SharedMemory를
+    부모가 해제(unlink)했을 때 정상적으로 등록이 해제된다.
+    """
+    resource_tracker.ensure_running()
+
+
+def attach_shared_memory(name: str) -> SharedMemory:
+    """
+    이미 만들어진 SharedMemory에 연결한다.
+    연결만 하는 쪽은 resource tracker에 등록하지 않는다. (해제는 release_frame에서 한다.)
+    """
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python 3.12 이하는 track 옵션이 없어 다시 등록되지만
+        # tracker는 이름을 set으로 관리하므로 중복 등록은 문제가 없다.
+        return SharedMemory(name=name)
+
+
+def __aligned(n: int) -> int:
+    return (n + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def is_string_column(series: pd.Series) -> bool:
+    """
+    문자열 column인지 여부
+    string dtype이거나, 빈 값 없이 모두 문자열인 object column이다.
+    """
+    if isinstance(series.dtype, pd.StringDtype):
+        return True
+    return series.dtype == object and \
+        pd.api.types.infer_dtype(series, skipna=False) == 'string'
+
+
+def encode_strings(series: pd.Series) \
+        -> Tuple[np.ndarray, np.ndarray, bytes]:
+    """
+    문자열 column을 (빈 값이 아닌 값의 행 위치, 값별 글자 수, 이어붙인 UTF-8 데이터)로 바꾼다.
+    """
+    values = series.to_numpy(dtype=object)
+    positions = np.flatnonzero(~pd.isna(values))
+    if len(positions) < len(values):
+        values = values[positions]
+    lengths = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+    return positions, lengths, \
+        ''.join(values).encode('utf-8', 'surrogatepass')
+
+
+def decode_strings(length: int, positions: np.ndarray, lengths: np.ndarray,
+                   data: bytes) -> np.ndarray:
+    """
+    encode_strings의 결과를 object 배열로 되돌린다. 빈 값은 None이다.
+    """
+    text = data.decode('utf-8', 'surrogatepass')
+    ends = np.cumsum(lengths).tolist()
+    starts = [0] + ends[:-1]
+    strings = [text[a:b] for a, b in zip(starts, ends)]
+    if len(positions) == length:
+        return np.array(strings, dtype=object)
+    values = np.full(length, None, dtype=object)
+    values[positions] = strings
+    return values
+
+
+def export_frame(dataframe: pd.DataFrame) -> FrameHandle:
+    """
+    DataFrame을 SharedMemory에 올린다.
+    """
+    length = len(dataframe)
+    layout, offset = [], 0
+    for name in dataframe.columns:
+        series = dataframe[name]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            values = series.cat.codes.to_numpy()
+            layout.append(('category', name, values, offset,
+                           series.cat.categories, series.cat.ordered))
+        elif isinstance(series.dtype, np.dtype) and \
+                series.dtype.kind in SHARED_KINDS:
+            values = series.to_numpy()
+            layout.append(('shared', name, values, offset))
+        elif is_string_column(series):
+            positions, lengths, data = encode_strings(series)
+            position_offset = offset + __aligned(lengths.nbytes)
+            data_offset = position_offset + __aligned(positions.nbytes)
+            layout.append(('string', name, series.dtype, lengths, offset,
+                           positions, position_offset, data, data_offset))
+            offset = data_offset + __aligned(len(data))
+            continue
+        else:
+            layout.append(('pickled', name, series))
+            continue
+        offset += __aligned(values.nbytes)
+
+    shared = any(spec[0] != 'pickled' for spec in layout)
+    shm = SharedMemory(create=True, size=max(offset, 1)) if shared else None
+    columns = []
+    for spec in layout:
+        if spec[0] == 'pickled':
+            # dtype(문자열, nullable 정수 등)을 유지하기 위해 array 그대로 넘긴다.
+            columns.append(('pickled', spec[1],
+                            pickle.dumps(spec[2].array,
+                                         protocol=pickle.HIGHEST_PROTOCOL)))
+            continue
+        if spec[0] == 'string':
+            _, name, dtype, lengths, lengths_offset, positions, \
+                position_offset, data, data_offset = spec
+            for values, position in ((lengths, lengths_offset),
+                                     (positions, position_offset)):
+                np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf,
+                           offset=position)[:] = values
+            shm.buf[data_offset:data_offset + len(data)] = data
+            columns.append(('string', name, dtype, len(lengths),
+                            lengths_offset, position_offset, data_offset,
+                            len(data)))
+            continue
+        kind, name, values, position = spec[:4]
+        target = np.ndarray(values.shape, dtype=values.dtype,
+                            buffer=shm.buf, offset=position)
+        target[:] = values
+        del target
+        if kind == 'category':
+            columns.append(('category', name, values.dtype.str, position,
+                            spec[4], spec[5]))
+        else:
+            columns.append(('shared', name, values.dtype.str, position))
+
+    index = None
+    if not dataframe.index.equals(pd.RangeIndex(length)):
+        index = pickle.dumps(dataframe.index, protocol=pickle.HIGHEST_PROTOCOL)
+
+    handle = FrameHandle(shm.name if shm else None, length, columns,
+                         index, shm.size if shm else 0)
+    if shm:
+        shm.close()
+    return handle
+
+
+def import_frame(handle: FrameHandle) \
+        -> Tuple[pd.DataFrame, Optional[SharedMemory]]:
+    """
+    SharedMemory에 올라간 DataFrame을 복사하지 않고 불러온다. (문자열 column은 새로 만든다.)
+    리턴된 DataFrame을 다 사용한 다음 SharedMemory.close()를 호출해야 한다.
+
+    :return: (DataFrame, 연결된 SharedMemory)
+    """
+    shm = attach_shared_memory(handle.shm_name) if handle.shm_name else None
+    index = pickle.loads(handle.index) if handle.index else None
+    data: Dict[Any, Any] = {}
+    for spec in handle.columns:
+        kind, name = spec[0], spec[1]
+        if kind == 'pickled':
+            data[name] = pickle.loads(spec[2])
+            continue
+        if kind == 'string':
+            dtype, count, lengths_offset, position_offset, data_offset, \
+                nbytes = spec[2:]
+            lengths = np.ndarray((count,), dtype=np.int64, buffer=shm.buf,
+                                 offset=lengths_offset)
+            positions = np.ndarray((count,), dtype=np.intp, buffer=shm.buf,
+                                   offset=position_offset)
+            values = decode_strings(
+                handle.length, positions, lengths,
+                bytes(shm.buf[data_offset:data_offset + nbytes]))
+            del lengths, positions
+            # object 배열을 그대로 넘기면 str dtype으로 추론되므로 dtype을 지정한다.
+            data[name] = pd.Series(
+                values, dtype=dtype, copy=False,
+                index=index if index is not None
+                else pd.RangeIndex(handle.length))
+            continue
+        values = np.ndarray((handle.length,), dtype=np.dtype(spec[2]),
+                            buffer=shm.buf, offset=spec[3])
+        values.flags.writeable = False
+        if kind == 'category':
+            data[name] = pd.Categorical.from_codes(
+                values, categories=spec[4], ordered=spec[5])
+        else:
+            data[name] = values
+    dataframe = pd.DataFrame(data, index=index, copy=False)
+    if not data:
+        dataframe = pd.DataFrame(index=index if index is not None
+                                 else pd.RangeIndex(handle.length))
+    return dataframe, shm
+
+
+def release_frame(handle: FrameHandle) -> None:
+    """
+    더 이상 사용하지 않는 SharedMemory를 해제한다.
+    """
+    if not handle.shm_name:
+        return
+    try:
+        shm = SharedMemory(name=handle.shm_name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+
+def close_shared_memory(shm: Optional[SharedMemory]) -> None:
+    """
+    import_frame으로 연결한 SharedMemory 닫기
+    아직 배열이 남아있으면(BufferError) process가 끝날 때 정리된다.
+    """
+    if shm is None:
+        return
+    try:
+        shm.close()
+    except BufferError:
+        pass
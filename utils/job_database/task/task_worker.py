@@ -1,8 +1,162 @@
-import collections
-from typing import Any, Deque, Dict
-from utils.algorithms.topological_sort import topological_sort
+import time
+from array import array
+from concurrent.futures import FIRST_COMPLETED, Future, \
+    ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+from utils.algorithms.compact_graph import CompactGraph, \
+    GRAPH_INDEX_TYPECODE
+from utils.algorithms.topological_sort import topological_sort_compact
 
-from utils.job_database.task.task_space import TaskDropColumnSpace, TaskReadSpace, TaskSpace, TaskWriteSpace
+from utils.job_database.task.task_space import TaskDropColumnSpace, TaskReadSpace, TaskSpace, TaskWriteSpace, \
+    TaskFilterSpace, TaskAggregateSpace
+from utils.job_database.task.task_planner import plan_pushdown
+from utils.job_database.task.task_spill import MemoryBudget, get_frame_bytes
+from utils.job_database.task.task_transport import FrameHandle, \
+    export_frame, import_frame, release_frame, close_shared_memory, \
+    start_resource_tracker
+
+"""
+Task 실행 방식
+serial: 하나의 process에서 위상 정렬 순서대로 실행한다.
+process: 실행 가능한(이전 Task가 모두 끝난) Task를 process pool에서 동시에 실행한다.
+         Task 사이의 DataFrame은 SharedMemory로 전달한다.
+"""
+TASK_EXECUTORS = ('serial', 'process')
+
+"""
+process 실행에 사용하는 process pool
+Job을 실행할 때마다 만들지 않고 한번 만든 pool을 계속 사용한다.
+thread가 있는 process에서 fork하면 다른 thread가 잡고 있던 Lock까지 복사되므로
+요청을 처리하는 thread가 생기기 전에(serve.py의 post_fork) start_process_pool()로 만들어 둔다.
+만들어 둔 pool이 없으면 처음 process 실행을 할 때 만든다.
+"""
+__process_pool: Optional[ProcessPoolExecutor] = None
+__process_pool_workers: Optional[int] = None
+__process_pool_lock = Lock()
+
+
+def __warm_up_process() -> None:
+    pass
+
+
+def start_process_pool(max_workers: Optional[int] = None) \
+        -> ProcessPoolExecutor:
+    """
+    process pool을 만들고 worker process를 모두 띄워둔다.
+    이미 같은 크기의 pool이 있으면 그대로 사용한다.
+    """
+    global __process_pool, __process_pool_workers
+    with __process_pool_lock:
+        if __process_pool is not None and \
+                __process_pool_workers == max_workers:
+            return __process_pool
+        if __process_pool is not None:
+            __process_pool.shutdown(wait=True)
+        start_resource_tracker()
+        pool = ProcessPoolExecutor(max_workers=max_workers)
+        # fork 방식은 처음 submit 할 때 worker process를 모두 만든다.
+        pool.submit(__warm_up_process).result()
+        __process_pool, __process_pool_workers = pool, max_workers
+        return pool
+
+
+def shutdown_process_pool(pool: Optional[ProcessPoolExecutor] = None) -> None:
+    """
+    process pool 정리
+    pool을 지정하면 그 pool이 현재 pool인 경우에만 정리한다. (worker가 죽어서 망가진 pool)
+    """
+    global __process_pool, __process_pool_workers
+    with __process_pool_lock:
+        if __process_pool is None or \
+                (pool is not None and pool is not __process_pool):
+            return
+        __process_pool.shutdown(wait=False, cancel_futures=True)
+        __process_pool, __process_pool_workers = None, None
+
+
+def generate_task_space(task_name: str, v: Dict[str, Any],
+                        pushdown: Optional[Dict[str, Any]] = None) \
+        -> TaskSpace:
+    """
+    Task Property로 TaskSpace 생성
+
+    :param pushdown: Task의 pushdown 계획 (plan_pushdown)
+    """
+    task_type = v['task_name']
+    task_space = None
+    pushdown = pushdown or {}
+    if task_type == 'read':
+        task_space = TaskReadSpace(task_name, v['filename'], v['sep'],
+                                   v.get('dtype'),
+                                   v.get('auto_compact', False),
+                                   v.get('parallel', 1),
+                                   v.get('compression', 'infer'),
+                                   pushdown.get('predicates'),
+                                   pushdown.get('aggregate'))
+    elif task_type == 'write':
+        task_space = TaskWriteSpace(task_name, v['filename'], v['sep'],
+                                    v.get('compression', 'infer'),
+                                    v.get('compression_level'),
+                                    v.get('compression_threads'),
+                                    v.get('column_stats', False),
+                                    v.get('partition_by'))
+    elif task_type == 'drop':
+        task_space = TaskDropColumnSpace(task_name, v['column_name'])
+    elif task_type == 'filter':
+        task_space = TaskFilterSpace(task_name, v['expression'],
+                                     pushdown.get('fused_into'))
+    elif task_type == 'aggregate':
+        task_space = TaskAggregateSpace(task_name, v['group_by'],
+                                        v['aggregations'],
+                                        pushdown.get('fused_into'))
+    if task_space is not None:
+        task_space.merge_options = v.get('merge')
+    return task_space
+
+
+def get_task_stats(dataframe, seconds: float, size: Optional[int] = None) \
+        -> Dict[str, Any]:
+    """
+    Task 하나의 실행 통계 (실행 시간, 결과 행 갯수, 결과 크기)
+    """
+    if size is None:
+        size = get_frame_bytes(dataframe)
+    return {'seconds': seconds, 'rows': len(dataframe), 'bytes': size}
+
+
+def run_task_in_process(task_name: str, v: Dict[str, Any],
+                        inputs: List[Tuple[str, FrameHandle]],
+                        pushdown: Optional[Dict[str, Any]] = None) \
+        -> Tuple[FrameHandle, List[Tuple[str, Any]], Dict[str, Any]]:
+    """
+    process pool의 worker에서 Task 하나를 실행한다.
+
+    :param task_name: Task 이름
+    :param v: Task Property
+    :param inputs: 이전 Task의 (이름, 결과 DataFrame 위치), 병합 순서대로 들어있다.
+    :param pushdown: Task의 pushdown 계획 (plan_pushdown)
+    :return: (결과 DataFrame 위치, Task 실행 기록, Task 실행 통계)
+    """
+    start = time.perf_counter()
+    task_space = generate_task_space(task_name, v, pushdown)
+    shms = []
+    try:
+        for prev_task_name, handle in inputs:
+            # 복사하지 않고 SharedMemory를 그대로 사용한다.
+            dataframe, shm = import_frame(handle)
+            shms.append(shm)
+            task_space.input_dataframe(prev_task_name, dataframe, copy=False)
+        dataframe = task_space.run()
+        task_stats = get_task_stats(dataframe, time.perf_counter() - start)
+        handle = export_frame(dataframe)
+        return handle, task_space.tasklog_stack, task_stats
+    finally:
+        # SharedMemory를 가리키는 DataFrame을 모두 버린 다음 닫는다.
+        dataframe = task_space = None
+        for shm in shms:
+            close_shared_memory(shm)
 
 
 class TaskWorker:
@@ -10,45 +164,218 @@ class TaskWorker:
     Job Data에 있는 Task Data를 활용해
     모든 Task를 실행
 
-    :params task_dictionary: task_name으로 TaskSpace를 찾는다.
+    Task 이름은 정수 ID로 바꾸고(CompactGraph) 실행 순서, 실행 가능 여부 등은 ID 배열로 계산한다.
+
+    :params task_spaces: Task ID별 TaskSpace
     :params graph: task_list
+    :params compact: 정수 ID 그래프 (CompactGraph)
+    :params task_order: Task 실행 순서(위상 정렬 결과)
+    :params executor: Task 실행 방식 (serial/process)
+    :params max_workers: process 실행 시 최대 process 갯수 (None이면 CPU 갯수)
+    :params pushdown: Task별 pushdown 계획 (filter 조건 옮기기, aggregate 합치기)
+    :params memory_budget: buffer 메모리 제한, 넘으면 디스크에 내려둔다. (serial 실행만 해당)
+    :params stats: 실행 통계 (실행 시간, spill 횟수/크기 등)
     """
-    task_dictionary: Dict[str, TaskSpace]
-    graph: Dict[str, str]
+    task_spaces: List[TaskSpace]
+    graph: Dict[str, List[str]]
+    compact: CompactGraph
+    task_order: List[str]
+    properties: Dict[str, Dict[str, Any]]
+    executor: str
+    max_workers: Optional[int]
+    pushdown: Dict[str, Dict[str, Any]]
+    memory_budget: MemoryBudget
+    stats: Dict[str, Any]
 
-    def __init__(self, job_data: Dict[str, Any]):
+    def __init__(self, job_data: Dict[str, Any],
+                 task_order: Optional[List[str]] = None,
+                 executor: str = 'serial',
+                 max_workers: Optional[int] = None,
+                 pushdown: bool = True,
+                 memory_budget: Optional[int] = None,
+                 spill_dir: Optional[str] = None):
         """
         그래프 및 데이터 세팅
+        task_order가 없으면 직접 위상 정렬을 수행한다.
+        pushdown이 True면 filter 조건을 가능한 read Task로 옮기고
+        aggregate Task를 read Task와 합친다.
+        memory_budget(byte)이 있으면 buffer에 남아있는 dataframe의 크기 합을 제한한다.
         """
-        self.task_dictionary = dict()
+        if executor not in TASK_EXECUTORS:
+            raise ValueError(f'unknown executor: {executor}')
+        self.executor = executor
+        self.max_workers = max_workers
 
         # 데이터 가져오기
-        self.graph, properties = \
+        self.graph, self.properties = \
             job_data['task_list'], job_data['property']
+        self.compact = CompactGraph(self.graph)
+        self.pushdown = plan_pushdown(self.graph, self.properties) \
+            if pushdown else {}
+
+        # TaskSpace 세팅 (Task ID 순서)
+        self.task_spaces = [
+            generate_task_space(task_name, self.properties[task_name],
+                                self.pushdown.get(task_name))
+            for task_name in self.compact.names
+        ]
 
-        # TaskSpace 세팅
-        for task_name, v in properties.items():
-            task_type = v['task_name']
-            task_space = None
-            if task_type == 'read':
-                task_space = TaskReadSpace(task_name, v['filename'], v['sep'])
-            elif task_type == 'write':
-                task_space = TaskWriteSpace(task_name, v['filename'], v['sep'])
-            elif task_type == 'drop':
-                task_space = TaskDropColumnSpace(task_name, v['column_name'])
+        if task_order is None:
+            self.__order = topological_sort_compact(self.compact)
+            self.task_order = [self.compact.names[u] for u in self.__order]
+        else:
+            self.task_order = task_order
+            self.__order = array(GRAPH_INDEX_TYPECODE,
+                                 (self.compact.ids[t] for t in task_order))
 
-            self.task_dictionary[task_name] = task_space
+        # buffer 메모리 제한
+        self.memory_budget = MemoryBudget(memory_budget, spill_dir)
+        self.stats = dict()
+        if memory_budget is not None:
+            for i, u in enumerate(self.__order):
+                task_space = self.task_spaces[u]
+                task_space.memory_budget = self.memory_budget
+                task_space.run_order = i
 
-    def __call__(self):
+    def get_trace(self) -> Dict[str, List[Dict[str, Any]]]:
         """
-        Task 실행
+        Task별 실행 기록(tasklog_stack)
+        """
+        return {
+            task_space.task_name: [
+                {'type': task_type, 'prev_task': prev_task_name, 'log': log}
+                for task_type, prev_task_name, log in task_space.tasklog_stack
+            ]
+            for task_space in self.task_spaces
+            if task_space.tasklog_stack
+        }
+
+    def __run_serial(self):
         """
-        task_queue: Deque[str] = collections.deque(topological_sort(self.graph))
+        위상 정렬 순서대로 실행한다.
+        실행 중 메모리에 있는 DataFrame(buffer + 실행 중인 Task의 결과) 크기의 최댓값을 기록한다.
+        (문자열 column도 실제 크기로 계산한다. Scheduler의 예상 메모리 사용량이 이 값으로 보정된다.)
+        """
+        offsets, targets = self.compact.offsets, self.compact.targets
+        names, task_spaces = self.compact.names, self.task_spaces
+        # Task ID별 buffer에 들어있는 DataFrame 크기 합
+        pending = [0] * len(names)
+        live = peak = 0
         # Run
-        while task_queue:
-            task_name = task_queue.popleft()
-            result_dataframe = self.task_dictionary[task_name].run()
+        task_stats = self.stats['tasks']
+        for u in self.__order:
+            start = time.perf_counter()
+            result_dataframe = task_spaces[u].run()
+            size = get_frame_bytes(result_dataframe)
+            task_stats[names[u]] = get_task_stats(
+                result_dataframe, time.perf_counter() - start, size)
+            peak = max(peak, live + size)
+            live -= pending[u]
+            pending[u] = 0
             # 다른 TaskSpace에 결과 데이터 뿌리기
-            for next_task_name in self.graph[task_name]:
-                self.task_dictionary[next_task_name]    \
-                    .input_dataframe(task_name, result_dataframe)
\ No newline at end of file
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                task_spaces[v].input_dataframe(names[u], result_dataframe)
+                pending[v] += size
+                live += size
+        self.stats['peak_frame_bytes'] = peak
+
+    def __run_in_processes(self):
+        """
+        이전 Task가 모두 끝난 Task부터 process pool에 넣는다.
+        병합 결과가 serial과 같도록 이전 Task의 결과는 위상 정렬 순서대로 넘긴다.
+        Task 결과(SharedMemory)는 다음 Task들이 모두 사용하면 해제한다.
+        """
+        compact, names = self.compact, self.compact.names
+        parents = compact.parents()
+        position = array(GRAPH_INDEX_TYPECODE, [0]) * len(names)
+        for i, u in enumerate(self.__order):
+            position[u] = i
+        waiting_parents = array(GRAPH_INDEX_TYPECODE, compact.in_degree)
+        waiting_children = array(GRAPH_INDEX_TYPECODE, parents.in_degree)
+        results: Dict[int, FrameHandle] = dict()
+        futures: Dict[Future, int] = dict()
+
+        def __release(u: int):
+            release_frame(results.pop(u))
+
+        pool = start_process_pool(self.max_workers)
+
+        def __submit(u: int):
+            inputs = [(names[p], results[p]) for p in
+                      sorted(parents.children(u),
+                             key=position.__getitem__)]
+            futures[pool.submit(run_task_in_process, names[u],
+                                self.properties[names[u]], inputs,
+                                self.pushdown.get(names[u]))] = u
+
+        try:
+            for u in self.__order:
+                if waiting_parents[u] == 0:
+                    __submit(u)
+
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    u = futures.pop(future)
+                    handle, tasklog_stack, task_stats = future.result()
+                    self.task_spaces[u].tasklog_stack = tasklog_stack
+                    self.stats['tasks'][names[u]] = task_stats
+                    results[u] = handle
+
+                    # 이전 Task 결과를 다 사용했으면 해제
+                    for p in parents.children(u):
+                        waiting_children[p] -= 1
+                        if waiting_children[p] == 0:
+                            __release(p)
+                    # 다음 Task 실행
+                    for v in compact.children(u):
+                        waiting_parents[v] -= 1
+                        if waiting_parents[v] == 0:
+                            __submit(v)
+                    if not compact.out_degree(u):
+                        __release(u)
+        except BrokenProcessPool as e:
+            # worker process가 죽은 pool은 다시 사용할 수 없으므로 다음 실행에서 새로 만든다.
+            shutdown_process_pool(pool)
+            raise e
+        finally:
+            # 실패한 경우 남은 Task를 취소하고 SharedMemory를 정리한다.
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            for future in futures:
+                if not future.cancelled() and future.exception() is None:
+                    release_frame(future.result()[0])
+            for u in list(results):
+                __release(u)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        실행 통계
+        executor, seconds(실행 시간), peak_frame_bytes(serial 실행 중 메모리에 있던 DataFrame 크기의 최댓값),
+        tasks(Task별 실행 시간, 결과 행 갯수/크기), buffer 메모리 제한과 spill 횟수/크기
+        """
+        return dict(self.stats)
+
+    def __call__(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Task 실행
+
+        :return: Task별 실행 기록
+        """
+        start = time.perf_counter()
+        self.stats = {'peak_frame_bytes': None, 'tasks': dict()}
+        try:
+            if self.executor == 'process':
+                self.__run_in_processes()
+            else:
+                self.__run_serial()
+        finally:
+            self.memory_budget.close()
+            self.stats.update({
+                'executor': self.executor,
+                'seconds': time.perf_counter() - start,
+                **self.memory_budget.get_stats(),
+            })
+        return self.get_trace()
@@ -0,0 +1,366 @@
+import ctypes
+import ctypes.util
+import fcntl
+import hashlib
+import logging
+import os
+import select
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+"""
+입력 파일 감시
+
+read Task가 읽는 파일이 바뀌면 그 파일을 구독(subscribe_inputs)한 Job을 실행한다.
+Linux에서는 inotify로 디렉토리를 감시하고, 사용할 수 없으면 주기적으로 파일 상태를 확인(polling)한다.
+
+WATCH_DEBOUNCE_SECONDS: 마지막 변경 이후 이 시간 동안 더 바뀌지 않아야 변경으로 판단한다.
+WATCH_POLL_SECONDS: polling 주기, inotify를 사용할 때는 구독 목록을 다시 읽는 주기
+WATCH_HASH_BUFFER_SIZE: 파일 hash를 계산할 때 읽는 단위(byte)
+"""
+WATCH_DEBOUNCE_SECONDS = 0.5
+WATCH_POLL_SECONDS = 1.0
+WATCH_HASH_BUFFER_SIZE = 1 << 20
+
+logger = logging.getLogger(__name__)
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO \
+    | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct('iIII')
+
+# 파일 상태: (수정 시간(ns), 크기), 파일이 없으면 None
+FileStat = Optional[Tuple[int, int]]
+
+
+def get_file_stat(path: str) -> FileStat:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def get_file_hash(path: str) -> Optional[str]:
+    """
+    파일 내용의 hash, 파일이 없으면 None
+    """
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(WATCH_HASH_BUFFER_SIZE), b''):
+                h.update(chunk)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+class PollingBackend:
+    """
+    변경 이벤트 없이 구독 중인 파일 전부를 변경 후보로 돌려준다.
+    """
+    name = 'polling'
+
+    def update(self, directories: Set[str]):
+        pass
+
+    def read(self, timeout: float) -> Optional[Set[str]]:
+        """
+        :return: 바뀌었을 수 있는 파일 경로, None이면 구독 중인 파일 전부
+        """
+        time.sleep(timeout)
+        return None
+
+    def close(self):
+        pass
+
+
+class InotifyBackend:
+    """
+    inotify(ctypes)로 디렉토리의 파일 생성/수정/이동/삭제 이벤트를 받는다.
+
+    :exception OSError: inotify를 사용할 수 없음 (Linux가 아니거나 watch 갯수 제한)
+    """
+    name = 'inotify'
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None,
+                           use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError('inotify is not supported')
+        self.__libc = libc
+        self.__fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.__fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        # watch descriptor <-> 디렉토리
+        self.__directories: Dict[int, str] = dict()
+        self.__watches: Dict[str, int] = dict()
+
+    def update(self, directories: Set[str]):
+        for directory in set(self.__watches) - directories:
+            self.__libc.inotify_rm_watch(self.__fd,
+                                         self.__watches.pop(directory))
+        for directory in directories - set(self.__watches):
+            wd = self.__libc.inotify_add_watch(
+                self.__fd, os.fsencode(directory), INOTIFY_MASK)
+            if wd < 0:
+                # 디렉토리가 아직 없으면 다음 update에서 다시 시도한다.
+                continue
+            self.__watches[directory] = wd
+            self.__directories[wd] = directory
+
+    def read(self, timeout: float) -> Optional[Set[str]]:
+        readable, _, _ = select.select([self.__fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self.__fd, 1 << 16)
+        except BlockingIOError:
+            return set()
+        paths, offset = set(), 0
+        while offset + INOTIFY_EVENT.size <= len(data):
+            wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                # 이벤트가 넘쳐서 버려졌으면 전부 다시 확인한다.
+                return None
+            directory = self.__directories.get(wd)
+            if directory is not None and name:
+                paths.add(os.path.join(directory, os.fsdecode(name)))
+        return paths
+
+    def close(self):
+        os.close(self.__fd)
+
+
+class InputWatcher:
+    """
+    구독 중인 입력 파일이 바뀌면 그 파일을 읽는 Job을 실행하는 클래스
+
+    * 이벤트(또는 polling)로 파일 상태(수정 시간, 크기)가 바뀐 것을 확인하면
+      debounce 시간 동안 더 바뀌지 않을 때까지 기다린다.
+    * 그 다음 파일 내용의 hash를 비교해서 내용이 실제로 바뀐 경우에만 Job을 실행한다.
+      (수정 시간만 바뀐 경우(touch, 같은 내용으로 다시 쓰기)는 실행하지 않는다.)
+    * 같은 Job은 한번에 하나만 실행한다. 실행 중에 다시 바뀌면 끝난 다음 한번 더 실행한다.
+
+    여러 worker process가 같은 디렉토리를 감시하면 Job이 여러번 실행되므로
+    lock_path 파일을 먼저 잠근(flock) process 하나만 감시한다.
+
+    :param data_dir: 입력 파일 디렉토리
+    :param get_subscriptions: {파일 이름(data_dir 기준): [job_id, ...]} 를 돌려주는 함수
+    :param run_job: Job 실행 함수 (job_id, 바뀐 파일 이름 목록)
+    :param backend: 'auto'(inotify, 안되면 polling), 'inotify', 'polling'
+    :param lock_path: 감시 lock 파일, None이면 lock 없이 감시한다.
+    """
+    data_dir: str
+    debounce: float
+    poll_interval: float
+    backend_name: str
+    lock_path: Optional[str]
+
+    def __init__(self, data_dir: str,
+                 get_subscriptions: Callable[[], Dict[str, List[int]]],
+                 run_job: Callable[[int, List[str]], Any],
+                 debounce: float = WATCH_DEBOUNCE_SECONDS,
+                 poll_interval: float = WATCH_POLL_SECONDS,
+                 backend: str = 'auto',
+                 lock_path: Optional[str] = None):
+        if backend not in ('auto', 'inotify', 'polling'):
+            raise ValueError(f'unknown watcher backend: {backend}')
+        self.data_dir = data_dir
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.backend_name = backend
+        self.lock_path = lock_path
+        self.__get_subscriptions = get_subscriptions
+        self.__run_job = run_job
+
+        self.__mutex = threading.Lock()
+        self.__stop = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+        self.__backend = None
+        self.__lock_fd: Optional[int] = None
+        self.__subscriptions: Dict[str, List[int]] = dict()
+        # 파일별 마지막으로 확인한 상태와 hash, 변경을 확인할 시각(debounce)
+        self.__stats: Dict[str, FileStat] = dict()
+        self.__hashes: Dict[str, Optional[str]] = dict()
+        self.__pending: Dict[str, float] = dict()
+        # 실행 중인 Job과 실행 중에 입력이 다시 바뀐 Job
+        self.__running: Set[int] = set()
+        self.__dirty: Dict[int, Set[str]] = dict()
+        self.__counters = {'events': 0, 'changes': 0, 'unchanged': 0,
+                           'runs': 0, 'run_errors': 0}
+
+    def __create_backend(self):
+        if self.backend_name == 'polling':
+            return PollingBackend()
+        try:
+            return InotifyBackend()
+        except OSError:
+            if self.backend_name == 'inotify':
+                raise
+            logger.info('inotify is not available, fall back to polling')
+            return PollingBackend()
+
+    def __acquire_lock(self) -> bool:
+        if self.lock_path is None:
+            return True
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self.__lock_fd = fd
+        return True
+
+    def start(self):
+        if self.__thread is not None:
+            return
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self.__loop,
+                                         name='input-watcher', daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def is_active(self) -> bool:
+        """
+        lock을 얻어서 실제로 감시하고 있는지
+        """
+        return self.__backend is not None
+
+    def __loop(self):
+        # 다른 process가 감시 중이면 그 process가 종료될 때까지 기다린다.
+        while not self.__acquire_lock():
+            if self.__stop.wait(self.poll_interval):
+                return
+        self.__backend = self.__create_backend()
+        try:
+            self.__refresh(time.monotonic())
+            last_refresh = time.monotonic()
+            while not self.__stop.is_set():
+                now = time.monotonic()
+                if now - last_refresh >= self.poll_interval:
+                    self.__refresh(now)
+                    last_refresh = now
+                timeout = min([self.poll_interval]
+                              + [max(0.0, t - now)
+                                 for t in self.__pending.values()])
+                paths = self.__backend.read(timeout)
+                self.__check(paths, time.monotonic())
+        except Exception:
+            logger.exception('input watcher stopped')
+        finally:
+            self.__backend.close()
+            self.__backend = None
+            if self.__lock_fd is not None:
+                os.close(self.__lock_fd)
+                self.__lock_fd = None
+
+    def __refresh(self, now: float):
+        """
+        구독 목록을 다시 읽고 새로 구독한 파일의 현재 상태를 기록한다.
+        """
+        subscriptions = self.__get_subscriptions()
+        for filename in set(self.__stats) - set(subscriptions):
+            self.__stats.pop(filename)
+            self.__hashes.pop(filename, None)
+            self.__pending.pop(filename, None)
+        for filename in set(subscriptions) - set(self.__stats):
+            path = os.path.join(self.data_dir, filename)
+            self.__stats[filename] = get_file_stat(path)
+            self.__hashes[filename] = get_file_hash(path)
+        self.__subscriptions = subscriptions
+        self.__backend.update({
+            os.path.dirname(os.path.join(self.data_dir, filename))
+            for filename in subscriptions
+        })
+
+    def __check(self, paths: Optional[Set[str]], now: float):
+        if paths is None:
+            filenames = set(self.__stats)
+        else:
+            filenames = {os.path.relpath(p, self.data_dir) for p in paths}
+            filenames &= set(self.__stats)
+            self.__counters['events'] += len(filenames)
+
+        # 상태가 바뀐 파일은 debounce 시간 뒤에 다시 확인한다.
+        for filename in filenames:
+            stat = get_file_stat(os.path.join(self.data_dir, filename))
+            if stat != self.__stats[filename]:
+                self.__stats[filename] = stat
+                self.__pending[filename] = now + self.debounce
+
+        changed: Dict[int, Set[str]] = dict()
+        for filename, deadline in list(self.__pending.items()):
+            if deadline > now:
+                continue
+            del self.__pending[filename]
+            file_hash = get_file_hash(os.path.join(self.data_dir, filename))
+            if file_hash == self.__hashes[filename]:
+                self.__counters['unchanged'] += 1
+                continue
+            self.__hashes[filename] = file_hash
+            if file_hash is None:
+                # 파일이 삭제된 경우에는 실행하지 않는다.
+                continue
+            self.__counters['changes'] += 1
+            for job_id in self.__subscriptions.get(filename, []):
+                changed.setdefault(job_id, set()).add(filename)
+
+        for job_id, filenames in changed.items():
+            self.__trigger(job_id, filenames)
+
+    def __trigger(self, job_id: int, filenames: Set[str]):
+        with self.__mutex:
+            if job_id in self.__running:
+                self.__dirty.setdefault(job_id, set()).update(filenames)
+                return
+            self.__running.add(job_id)
+        threading.Thread(target=self.__run, args=(job_id, filenames),
+                         name=f'input-watcher-run-{job_id}',
+                         daemon=True).start()
+
+    def __run(self, job_id: int, filenames: Set[str]):
+        while True:
+            try:
+                self.__run_job(job_id, sorted(filenames))
+                counter = 'runs'
+            except Exception:
+                logger.exception('triggered run failed (job %s)', job_id)
+                counter = 'run_errors'
+            with self.__mutex:
+                self.__counters[counter] += 1
+                filenames = self.__dirty.pop(job_id, None)
+                if not filenames:
+                    self.__running.discard(job_id)
+                    return
+
+    def get_stats(self) -> Dict[str, Any]:
+        backend = self.__backend
+        with self.__mutex:
+            return {
+                'backend': backend.name if backend else None,
+                'watched_files': len(self.__stats),
+                'pending_files': len(self.__pending),
+                'running_jobs': len(self.__running),
+                **self.__counters,
+            }
@@ -16,4 +16,8 @@ def get_job_validator_chain() \
         AutomaticValidator(validate_logic=validate_job_properties),
         lambda job: (list(job['task_list'].keys()), job['property'])
     )
+    validator_chain.add_validator(
+        AutomaticValidator(validate_logic=validate_job_options),
+        lambda job: (job.get('subscribe_inputs', False),)
+    )
     return validator_chain
\ No newline at end of file
@@ -1,5 +1,67 @@
-from typing import Dict, List
-from utils.algorithms import topological_sort
+import re
+from typing import Any, Callable, Dict, List
+from utils.algorithms import topological_sort, is_filter_expression, \
+    is_group_by, is_aggregations, is_merge_options
+from libs.resource_access import COMPRESSION_METHODS, infer_compression, \
+    is_compression_available, is_compression_level, is_path_inside
+
+"""
+Task Property에 사용할 수 있는 dtype 이름
+날짜(datetime64)는 read_csv의 dtype으로 지정할 수 없어서 받지 않는다.
+"""
+DTYPE_PATTERN = re.compile(
+    r'^(u?int(8|16|32|64)|U?Int(8|16|32|64)|float(16|32|64)|Float(32|64)'
+    r'|bool|boolean|str|string|object|category)$')
+
+"""
+read/write Task의 filename 기준 디렉토리 (JobDatabaseEngine의 DATA_DIR과 같다)
+filename은 이 디렉토리 밖을 가리킬 수 없다.
+"""
+DATA_DIR = 'storage/data'
+
+
+def __is_bool(v: Any) -> bool:
+    return isinstance(v, bool)
+
+
+def __is_positive_int(v: Any) -> bool:
+    return isinstance(v, int) and not isinstance(v, bool) and v > 0
+
+
+def __is_compression(v: Any) -> bool:
+    return isinstance(v, str) and v in COMPRESSION_METHODS
+
+
+def __is_compression_level(v: Any) -> bool:
+    """
+    압축 방식별 범위는 __is_compression_setting에서 확인한다.
+    """
+    return isinstance(v, int) and not isinstance(v, bool)
+
+
+def __is_compression_setting(p: Dict[str, Any]) -> bool:
+    """
+    압축 방식(지정하지 않으면 filename의 확장자로 추정)을 사용할 수 있어야 하고
+    압축 수준은 압축 방식의 범위 안에 있어야 한다.
+    """
+    if not isinstance(p['filename'], str):
+        return False
+    method = infer_compression(p['filename'], p.get('compression', 'infer'))
+    if not is_compression_available(method):
+        return False
+    return 'compression_level' not in p or \
+        is_compression_level(method, p['compression_level'])
+
+
+def __is_dtype_spec(v: Any) -> bool:
+    """
+    {column 이름: dtype 이름} 형태여야 한다.
+    """
+    return isinstance(v, dict) and all(
+        isinstance(col, str) and isinstance(dtype, str)
+        and DTYPE_PATTERN.match(dtype)
+        for col, dtype in v.items()
+    )
 
 
 def validate_job_list(graph: Dict[str, List[str]])  \
@@ -13,6 +75,16 @@ def validate_job_list(graph: Dict[str, List[str]])  \
     return True
 
 
+def validate_job_options(subscribe_inputs: Any) \
+        -> bool:
+    """
+    Job 단위 옵션의 유효성을 판단하는 함수
+    :param subscribe_inputs: read Task의 파일이 바뀌면 Job을 실행할지 여부
+    :return:
+    """
+    return __is_bool(subscribe_inputs)
+
+
 def validate_job_properties(job_names: List[str],
                             properties: Dict[str, Dict[str, str]])  \
         -> bool:
@@ -23,13 +95,15 @@ def validate_job_properties(job_names: List[str],
     :return:
     """
 
-    def __check_property(p: Dict[str, str], needs: Dict[str, str])  \
+    def __check_property(p: Dict[str, str],
+                         needs: Dict[str, str],
+                         options: Dict[str, Dict[str, Callable]])  \
             -> bool:
 
         # task_name이 반드시 property 안에 들어가야 한다.
         if 'task_name' not in p:
             return False
-        # task_name은 read/write/drop 중 하나여야만 한다
+        # task_name은 read/write/drop/filter/aggregate 중 하나여야만 한다
         if p['task_name'] not in set(needs.keys()):
             return False
         # task_name 갖고오기
@@ -38,9 +112,31 @@ def validate_job_properties(job_names: List[str],
         """
         read/write: filename, sep이 있어야 한다
         drop: column_name이 있어야 한다.
+        filter: expression이 있어야 한다.
+        aggregate: group_by, aggregations가 있어야 하고 group key column은 집계할 수 없다.
+        read/write의 압축 방식은 사용할 수 있어야 하고 압축 수준은 압축 방식의 범위 안이어야 한다.
+        read/write의 filename은 data 디렉토리 밖(절대 경로, '..' 등)을 가리킬 수 없다.
+        그 외 선택 property는 없어도 되지만 있으면 형식이 맞아야 한다.
+        merge(이전 Task 결과 병합 옵션)는 모든 Task에 사용할 수 있다.
+        형식 검사 함수가 있는 필수 property도 형식이 맞아야 한다.
         """
 
-        if (needs[task_name] | {'task_name'}) != set(p.keys()):
+        task_options = {**common_options, **options.get(task_name, {})}
+        keys = set(p.keys()) - {'task_name'}
+        if not needs[task_name] <= keys:
+            return False
+        if not keys - needs[task_name] <= set(task_options.keys()):
+            return False
+        for option in keys & set(task_options.keys()):
+            if not task_options[option](p[option]):
+                return False
+        if task_name == 'aggregate' \
+                and set(p['group_by']) & set(p['aggregations']):
+            return False
+        if task_name in ('read', 'write') and not __is_compression_setting(p):
+            return False
+        if task_name in ('read', 'write') \
+                and not is_path_inside(DATA_DIR, p['filename']):
             return False
         return True
 
@@ -48,6 +144,37 @@ def validate_job_properties(job_names: List[str],
         'read': {'filename', 'sep'},
         'write': {'filename', 'sep'},
         'drop': {'column_name'},
+        'filter': {'expression'},
+        'aggregate': {'group_by', 'aggregations'},
+    }
+
+    # 모든 Task에 사용할 수 있는 선택 property
+    common_options = {
+        'merge': is_merge_options,
+    }
+
+    # 선택 property(및 형식 검사가 필요한 필수 property): {task 종류: {property 이름: 형식 검사 함수}}
+    options = {
+        'read': {
+            'dtype': __is_dtype_spec,
+            'auto_compact': __is_bool,
+            'parallel': __is_positive_int,
+            'compression': __is_compression,
+        },
+        'write': {
+            'compression': __is_compression,
+            'compression_level': __is_compression_level,
+            'compression_threads': __is_positive_int,
+            'column_stats': __is_bool,
+            'partition_by': is_group_by,
+        },
+        'filter': {
+            'expression': is_filter_expression,
+        },
+        'aggregate': {
+            'group_by': is_group_by,
+            'aggregations': is_aggregations,
+        },
     }
 
     # jobs_names의 내용과 properties key의 데이터가 정확히 일치해야 한다
@@ -55,6 +182,6 @@ def validate_job_properties(job_names: List[str],
         raise ValueError("jobs and properties does not equal")
 
     for p in properties.values():
-        if not __check_property(p, needs):
+        if not __check_property(p, needs, options):
             return False
     return True
@@ -1,6 +1,183 @@
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+
 from flask_restful import Resource
-from flask import request
-from utils.job_database import JobDatabaseEngine
+from flask import request, Response
+from utils.algorithms import MergeCheckError, FilterError, \
+    AggregateError
+from utils.job_database import JobDatabaseEngine, RunQueueFull, \
+    JobVersionConflict, ShardReadError, PartitionColumnError, get_job_version
+
+"""
+Job 실행 요청 옵션
+CLIENT_ID_HEADER: 클라이언트 구분 헤더, 없으면 요청한 주소를 사용한다.
+PRIORITY_RANGE: priority(query string)로 지정할 수 있는 우선순위 범위
+RUN_RETRY_AFTER: 대기열이 가득 찼을 때 다시 요청하기까지 기다릴 시간(초)
+"""
+CLIENT_ID_HEADER = 'X-Client-Id'
+PRIORITY_RANGE = (-100, 100)
+RUN_RETRY_AFTER = 5
+
+
+def parse_run_options(client_id: Optional[str], priority: Optional[str],
+                      remote_addr: Optional[str]) -> Tuple[str, int]:
+    """
+    Job 실행 요청의 (클라이언트, 우선순위)
+
+    :exception ValueError: 우선순위가 정수가 아니거나 범위를 벗어남
+    """
+    client_id = (client_id or '').strip()[:128] or remote_addr or 'anonymous'
+    priority = int(priority) if priority not in (None, '') else 0
+    if not PRIORITY_RANGE[0] <= priority <= PRIORITY_RANGE[1]:
+        raise ValueError(f'priority must be in {PRIORITY_RANGE}')
+    return client_id, priority
+
+
+"""
+Job 결과 미리보기 옵션
+PREVIEW_DEFAULT_LIMIT: limit을 지정하지 않았을 때 보내는 행 갯수
+PREVIEW_MAX_LIMIT: 한번에 보낼 수 있는 최대 행 갯수
+PREVIEW_FORMATS: 응답 형식
+"""
+PREVIEW_DEFAULT_LIMIT = 100
+PREVIEW_MAX_LIMIT = 10000
+PREVIEW_FORMATS = ('json', 'csv')
+
+
+def parse_preview_options(args: Dict[str, str]) -> Dict[str, Any]:
+    """
+    결과 미리보기 요청의 옵션 (task, offset, limit, columns, format)
+
+    :exception ValueError: 숫자가 아니거나 범위를 벗어남, 지원하지 않는 형식
+    """
+    offset = int(args.get('offset') or 0)
+    limit = int(args.get('limit') or PREVIEW_DEFAULT_LIMIT)
+    if offset < 0 or not 0 < limit <= PREVIEW_MAX_LIMIT:
+        raise ValueError(f'offset >= 0, 0 < limit <= {PREVIEW_MAX_LIMIT}')
+    fmt = args.get('format') or 'json'
+    if fmt not in PREVIEW_FORMATS:
+        raise ValueError(f'format must be one of {PREVIEW_FORMATS}')
+    columns = [col for col in (args.get('columns') or '').split(',') if col]
+    return {'task_name': args.get('task') or None, 'offset': offset,
+            'limit': limit, 'columns': columns or None, 'format': fmt}
+
+
+def get_preview_response(dataframe, info: Dict[str, Any],
+                         options: Dict[str, Any]) \
+        -> Tuple[Any, Dict[str, str]]:
+    """
+    결과 미리보기 응답 (json이면 dict, csv면 문자열)과 헤더
+    다음 페이지가 있으면 next_offset(X-Next-Offset 헤더)을 보낸다.
+    """
+    offset, limit = options['offset'], options['limit']
+    total_rows = info['total_rows']
+    end = offset + len(dataframe)
+    next_offset = end if len(dataframe) == limit \
+        and (total_rows is None or end < total_rows) else None
+    headers = {}
+    if total_rows is not None:
+        headers['X-Total-Rows'] = str(total_rows)
+    if next_offset is not None:
+        headers['X-Next-Offset'] = str(next_offset)
+
+    if options['format'] == 'csv':
+        headers['Content-Type'] = 'text/csv; charset=utf-8'
+        return dataframe.to_csv(None, sep=info['sep'], index=False), headers
+    rows = dataframe.astype(object).where(dataframe.notna(), None) \
+        .values.tolist()
+    return {
+        'task': info['task'],
+        'filename': info['filename'],
+        'columns': [str(col) for col in dataframe.columns],
+        'rows': rows,
+        'offset': offset,
+        'limit': limit,
+        'total_rows': total_rows,
+        'next_offset': next_offset,
+        'indexed': info['indexed'],
+    }, headers
+
+
+"""
+Job 실행 기록 조회 옵션
+RUNS_DEFAULT_LIMIT: limit을 지정하지 않았을 때 보내는 실행 기록 수
+RUNS_MAX_LIMIT: 한번에 보낼 수 있는 최대 실행 기록 수
+"""
+RUNS_DEFAULT_LIMIT = 100
+RUNS_MAX_LIMIT = 10000
+
+
+def parse_time(value: Optional[str]) -> Optional[float]:
+    """
+    epoch 초 또는 ISO 8601 시각 (시간대가 없으면 서버 시간대)
+
+    :exception ValueError: 시각 형식이 아님
+    """
+    if value in (None, ''):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def parse_runs_options(args: Dict[str, str]) -> Dict[str, Any]:
+    """
+    실행 기록 조회 요청의 옵션 (since, until, limit, offset)
+
+    :exception ValueError: 시각 형식이 아니거나 limit, offset이 범위를 벗어남
+    """
+    limit = int(args.get('limit') or RUNS_DEFAULT_LIMIT)
+    if not 0 < limit <= RUNS_MAX_LIMIT:
+        raise ValueError(f'0 < limit <= {RUNS_MAX_LIMIT}')
+    offset = int(args.get('offset') or 0)
+    if offset < 0:
+        raise ValueError('offset >= 0')
+    return {'since': parse_time(args.get('since')),
+            'until': parse_time(args.get('until')), 'limit': limit,
+            'offset': offset}
+
+
+def get_job_etag(job_id: int, version: int) -> str:
+    """
+    Job version의 ETag (예: "3-2" -> job_id 3의 2번째 version)
+    """
+    return f'"{job_id}-{version}"'
+
+
+def parse_etag_versions(header: Optional[str], job_id: int) \
+        -> Optional[Set[int]]:
+    """
+    If-Match/If-None-Match 헤더에 있는 job_id의 version 목록
+
+    :return: version 목록, 헤더가 없거나 '*' 이면 None
+    """
+    if not header or header.strip() == '*':
+        return None
+    versions = set()
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        prefix = f'"{job_id}-'
+        if tag.startswith(prefix) and tag.endswith('"') \
+                and tag[len(prefix):-1].isdigit():
+            versions.add(int(tag[len(prefix):-1]))
+    return versions
+
+
+def get_job_response(job: Dict[str, Any], if_none_match: Optional[str]):
+    """
+    Job 조회 응답, If-None-Match에 현재 version이 있으면 내용 없이 304를 보낸다.
+    """
+    job_id, version = job['job_id'], get_job_version(job)
+    headers = {'ETag': get_job_etag(job_id, version)}
+    if if_none_match and if_none_match.strip() == '*':
+        return None, 304, headers
+    versions = parse_etag_versions(if_none_match, job_id)
+    if versions and version in versions:
+        return None, 304, headers
+    return job, 200, headers
 
 
 class JobCreateView(Resource):
@@ -24,7 +201,9 @@ class JobView(Resource):
     Job 데이터 관리 뷰
 
     (GET)       /api/jobs/<int:job_id>   Job 정보 검색
+                If-None-Match 헤더의 ETag가 현재 version과 같으면 304
     (PATCH)     /api/jobs/<int:job_id>   Job 수정
+                If-Match 헤더의 ETag가 현재 version과 다르면 412
     (DELETE)    /api/jobs/<int:job_id>   Job 삭제
     """
 
@@ -36,19 +215,26 @@ class JobView(Resource):
         except Exception:
             return {'err': 'Server Error'}, 500
         else:
-            return res_data, 200
+            return get_job_response(res_data,
+                                    request.headers.get('If-None-Match'))
 
     def patch(self, job_id):
         try:
-            success = JobDatabaseEngine().update(job_id, request.get_json())
+            version = JobDatabaseEngine().update(
+                job_id, request.get_json(),
+                parse_etag_versions(request.headers.get('If-Match'), job_id))
+        except JobVersionConflict as e:
+            return {'error': 'version mismatch', 'version': e.version}, 412, \
+                {'ETag': get_job_etag(job_id, e.version)}
         except ValueError:
             return {'error': 'data not found'}, 404
         except Exception:
             return {'error': 'server error'}, 500
 
-        if not success:
+        if version is None:
             return {'error': 'Data valid failed'}, 400
-        return {'error': 'success'}, 201
+        return {'error': 'success', 'version': version}, 201, \
+            {'ETag': get_job_etag(job_id, version)}
 
     def delete(self, job_id):
         try:
@@ -67,11 +253,118 @@ class JobRunView(Resource):
     Job 실행 뷰
 
     (GET)   /api/jobs/<int:job_id>/run  실행
+            X-Client-Id 헤더: 클라이언트 구분 (같은 우선순위에서 클라이언트별로 번갈아 실행)
+            priority: 우선순위, 클수록 먼저 실행된다. (기본값 0)
+            Task의 병합 옵션(merge) 검사에 실패하면 422와 진단 정보를 보낸다.
+            여러 파일을 읽는 read Task에서 읽지 못한 파일이 있거나 해당하는 파일이 없으면 422와 파일별 에러를 보낸다.
+            filter 조건을 적용하지 못하면(없는 column 등) 422와 Task, 조건, 에러 내용을 보낸다.
+            aggregate Task에서 집계하지 못하면(없는 column, 집계할 수 없는 타입 등) 422와 Task, 집계 함수, 에러 내용을 보낸다.
+            write Task의 partition_by column이 데이터에 없으면 422와 Task, 없는 column을 보낸다.
     """
     def get(self, job_id):
         try:
-            JobDatabaseEngine().run(job_id)
+            client_id, priority = parse_run_options(
+                request.headers.get(CLIENT_ID_HEADER),
+                request.args.get('priority'), request.remote_addr)
+        except ValueError:
+            return {'err': 'invalid priority'}, 400
+        try:
+            result = JobDatabaseEngine().run(job_id, client_id, priority)
+        except RunQueueFull:
+            return {'err': 'run queue is full'}, 503, \
+                {'Retry-After': str(RUN_RETRY_AFTER)}
+        except MergeCheckError as e:
+            return {'err': 'merge check failed', 'merge': e.to_dict()}, 422
+        except ShardReadError as e:
+            return {'err': 'shard read failed', 'shards': e.to_dict()}, 422
+        except PartitionColumnError as e:
+            return {'err': 'partition failed', 'partition': e.to_dict()}, 422
+        except FilterError as e:
+            return {'err': 'filter failed', 'filter': e.to_dict()}, 422
+        except AggregateError as e:
+            return {'err': 'aggregate failed', 'aggregate': e.to_dict()}, 422
         except ValueError as e:
             print(e)
             return {'err': 'job not found'}, 404
-        return {'status': 'ok'}, 200
+        return {'status': 'ok',
+                'trace': result['trace'], 'stats': result['stats']}, 200
+
+
+class JobRunHistoryView(Resource):
+    """
+    Job 실행 기록 뷰
+
+    (GET)   /api/jobs/<int:job_id>/runs  실행 기록 (실행이 끝난 시각 순서)
+            since, until: 실행이 끝난 시각 범위 (epoch 초 또는 ISO 8601)
+            limit: 최대 실행 기록 수 (기본값 100), 더 남아있으면 next_since, next_offset으로 이어서 조회한다.
+            offset: 끝난 시각이 since와 같은 기록 중 건너뛸 기록 수 (기본값 0)
+    """
+    def get(self, job_id):
+        try:
+            options = parse_runs_options(request.args)
+        except ValueError as e:
+            return {'err': str(e)}, 400
+        try:
+            runs = JobDatabaseEngine().get_runs(job_id, **options)
+        except ValueError:
+            return {'err': 'job not found'}, 404
+        except Exception:
+            return {'err': 'Server Error'}, 500
+        return runs, 200
+
+
+class JobOutputView(Resource):
+    """
+    Job 결과 미리보기 뷰
+
+    (GET)   /api/jobs/<int:job_id>/output   write Task 결과 파일의 일부
+            task: write Task 이름 (write Task가 하나면 생략 가능)
+            offset, limit: 읽을 행 범위 (기본값 0, 100)
+            columns: 읽을 column (쉼표로 구분)
+            format: json(기본값) 또는 csv
+    """
+    def get(self, job_id):
+        try:
+            options = parse_preview_options(request.args)
+        except ValueError as e:
+            return {'err': str(e)}, 400
+        try:
+            dataframe, info = JobDatabaseEngine().preview_output(
+                job_id, options['task_name'], options['offset'],
+                options['limit'], options['columns'])
+        except KeyError as e:
+            return {'err': str(e)}, 400
+        except (ValueError, FileNotFoundError):
+            return {'err': 'output not found'}, 404
+        except Exception:
+            return {'err': 'Server Error'}, 500
+        data, headers = get_preview_response(dataframe, info, options)
+        if options['format'] == 'csv':
+            return Response(data, 200, headers)
+        return data, 200, headers
+
+
+class JobPlanView(Resource):
+    """
+    Job 실행 계획 뷰
+
+    (GET)   /api/jobs/<int:job_id>/plan  실행 순서와 Task별 예상 행 갯수/크기/병합 방식/최대 메모리
+    """
+    def get(self, job_id):
+        try:
+            plan = JobDatabaseEngine().explain(job_id)
+        except ValueError:
+            return {'err': 'job not found'}, 404
+        except Exception:
+            return {'err': 'Server Error'}, 500
+        return plan, 200
+
+
+class RunSchedulerView(Resource):
+    """
+    Job 실행 대기열 상태 뷰
+
+    (GET)   /api/scheduler  실행 중/대기 중인 Job 수, 예상 메모리, 대기 시간 통계
+    """
+    def get(self):
+        return JobDatabaseEngine().scheduler.get_stats(), 200
@@ -0,0 +1,260 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Optional
+
+from libs.async_api import AsyncResource, AsyncRequest
+from utils.algorithms import MergeCheckError, FilterError, \
+    AggregateError
+from utils.job_database import JobDatabaseEngine, RunQueueFull, \
+    JobVersionConflict, ShardReadError, PartitionColumnError
+from views.job import CLIENT_ID_HEADER, RUN_RETRY_AFTER, parse_run_options, \
+    get_job_etag, get_job_response, parse_etag_versions, \
+    parse_preview_options, get_preview_response, parse_runs_options
+
+"""
+Blocking 작업은 Event Loop 밖의 Executor에서 실행한다.
+
+STORAGE: jobs.json 접근(생성/조회/수정/삭제), 짧게 끝나는 작업
+RUN: Job 실행, 오래 걸리는 작업이므로 STORAGE 작업을 막지 않도록 분리한다.
+     실행 허가(Scheduler)는 Event Loop에서 받고 허가를 받은 Job만 RUN Executor에 넘긴다.
+"""
+STORAGE_EXECUTOR_WORKERS = 8
+RUN_EXECUTOR_WORKERS = 4
+
+__storage_executor: Optional[ThreadPoolExecutor] = None
+__run_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_storage_executor() -> ThreadPoolExecutor:
+    global __storage_executor
+    if __storage_executor is None:
+        __storage_executor = ThreadPoolExecutor(
+            max_workers=STORAGE_EXECUTOR_WORKERS,
+            thread_name_prefix='storage')
+    return __storage_executor
+
+
+def get_run_executor() -> ThreadPoolExecutor:
+    global __run_executor
+    if __run_executor is None:
+        __run_executor = ThreadPoolExecutor(
+            max_workers=RUN_EXECUTOR_WORKERS,
+            thread_name_prefix='job-run')
+    return __run_executor
+
+
+def shutdown_executors():
+    """
+    Application 종료 시 Executor 정리
+    """
+    global __storage_executor, __run_executor
+    for executor in (__storage_executor, __run_executor):
+        if executor is not None:
+            executor.shutdown(wait=True)
+    __storage_executor, __run_executor = None, None
+
+
+async def run_in_storage_executor(func: Callable, *args):
+    return await asyncio.get_running_loop().run_in_executor(
+        get_storage_executor(), partial(func, *args))
+
+
+async def run_in_run_executor(func: Callable, *args):
+    return await asyncio.get_running_loop().run_in_executor(
+        get_run_executor(), partial(func, *args))
+
+
+class AsyncJobCreateView(AsyncResource):
+    """
+    Job 생성 View (JobCreateView와 동일)
+
+    (POST)  /api/jobs   Job 생성
+    """
+
+    async def post(self, request: AsyncRequest):
+        try:
+            job_id = await run_in_storage_executor(
+                JobDatabaseEngine().save, request.get_json())
+        except Exception:
+            return {'error': 'Bad Request'}, 400
+        else:
+            return {'job_id': job_id}, 201
+
+
+class AsyncJobView(AsyncResource):
+    """
+    Job 데이터 관리 뷰 (JobView와 동일)
+
+    (GET)       /api/jobs/<int:job_id>   Job 정보 검색
+    (PATCH)     /api/jobs/<int:job_id>   Job 수정
+    (DELETE)    /api/jobs/<int:job_id>   Job 삭제
+    """
+
+    async def get(self, request: AsyncRequest, job_id: int):
+        try:
+            res_data = await run_in_storage_executor(
+                JobDatabaseEngine().get_item, job_id)
+        except ValueError:
+            return {'err': 'Data Not Found'}, 404
+        except Exception:
+            return {'err': 'Server Error'}, 500
+        else:
+            return get_job_response(res_data,
+                                    request.headers.get('if-none-match'))
+
+    async def patch(self, request: AsyncRequest, job_id: int):
+        try:
+            version = await run_in_storage_executor(
+                JobDatabaseEngine().update, job_id, request.get_json(),
+                parse_etag_versions(request.headers.get('if-match'), job_id))
+        except JobVersionConflict as e:
+            return {'error': 'version mismatch', 'version': e.version}, 412, \
+                {'ETag': get_job_etag(job_id, e.version)}
+        except ValueError:
+            return {'error': 'data not found'}, 404
+        except Exception:
+            return {'error': 'server error'}, 500
+
+        if version is None:
+            return {'error': 'Data valid failed'}, 400
+        return {'error': 'success', 'version': version}, 201, \
+            {'ETag': get_job_etag(job_id, version)}
+
+    async def delete(self, request: AsyncRequest, job_id: int):
+        try:
+            success = await run_in_storage_executor(
+                JobDatabaseEngine().remove, job_id)
+        except Exception:
+            return {'error': 'server error'}, 500
+
+        if success:
+            return {'deleted': job_id}, 204
+        else:
+            return {'error': 'data not found'}, 404
+
+
+class AsyncJobRunView(AsyncResource):
+    """
+    Job 실행 뷰 (JobRunView와 동일)
+
+    (GET)   /api/jobs/<int:job_id>/run  실행
+    """
+
+    async def get(self, request: AsyncRequest, job_id: int):
+        try:
+            client_id, priority = parse_run_options(
+                request.headers.get(CLIENT_ID_HEADER.lower()),
+                request.args.get('priority'), None)
+        except ValueError:
+            return {'err': 'invalid priority'}, 400
+        engine = JobDatabaseEngine()
+        try:
+            prepared = await run_in_storage_executor(
+                engine.prepare_run, job_id)
+            # 실행 허가는 Event Loop에서 받는다.
+            # Executor에 먼저 넘기면 Executor의 대기 순서(FIFO)대로 Scheduler에 도착한다.
+            async with engine.scheduler.admit_async(
+                    job_id, prepared['memory'], client_id, priority) \
+                    as admission:
+                result = await run_in_run_executor(
+                    engine.execute_run, prepared, admission,
+                    client_id, priority)
+        except RunQueueFull:
+            return {'err': 'run queue is full'}, 503, \
+                {'Retry-After': str(RUN_RETRY_AFTER)}
+        except MergeCheckError as e:
+            return {'err': 'merge check failed', 'merge': e.to_dict()}, 422
+        except ShardReadError as e:
+            return {'err': 'shard read failed', 'shards': e.to_dict()}, 422
+        except PartitionColumnError as e:
+            return {'err': 'partition failed', 'partition': e.to_dict()}, 422
+        except FilterError as e:
+            return {'err': 'filter failed', 'filter': e.to_dict()}, 422
+        except AggregateError as e:
+            return {'err': 'aggregate failed', 'aggregate': e.to_dict()}, 422
+        except ValueError as e:
+            print(e)
+            return {'err': 'job not found'}, 404
+        return {'status': 'ok',
+                'trace': result['trace'], 'stats': result['stats']}, 200
+
+
+class AsyncJobRunHistoryView(AsyncResource):
+    """
+    Job 실행 기록 뷰 (JobRunHistoryView와 동일)
+
+    (GET)   /api/jobs/<int:job_id>/runs
+    """
+
+    async def get(self, request: AsyncRequest, job_id: int):
+        try:
+            options = parse_runs_options(request.args)
+        except ValueError as e:
+            return {'err': str(e)}, 400
+        try:
+            runs = await run_in_storage_executor(
+                partial(JobDatabaseEngine().get_runs, job_id, **options))
+        except ValueError:
+            return {'err': 'job not found'}, 404
+        except Exception:
+            return {'err': 'Server Error'}, 500
+        return runs, 200
+
+
+class AsyncJobOutputView(AsyncResource):
+    """
+    Job 결과 미리보기 뷰 (JobOutputView와 동일)
+
+    (GET)   /api/jobs/<int:job_id>/output
+    """
+
+    async def get(self, request: AsyncRequest, job_id: int):
+        try:
+            options = parse_preview_options(request.args)
+        except ValueError as e:
+            return {'err': str(e)}, 400
+        try:
+            dataframe, info = await run_in_storage_executor(
+                JobDatabaseEngine().preview_output, job_id,
+                options['task_name'], options['offset'], options['limit'],
+                options['columns'])
+        except KeyError as e:
+            return {'err': str(e)}, 400
+        except (ValueError, FileNotFoundError):
+            return {'err': 'output not found'}, 404
+        except Exception:
+            return {'err': 'Server Error'}, 500
+        data, headers = get_preview_response(dataframe, info, options)
+        if options['format'] == 'csv':
+            return data.encode('utf-8'), 200, headers
+        return data, 200, headers
+
+
+class AsyncJobPlanView(AsyncResource):
+    """
+    Job 실행 계획 뷰 (JobPlanView와 동일)
+
+    (GET)   /api/jobs/<int:job_id>/plan
+    """
+
+    async def get(self, request: AsyncRequest, job_id: int):
+        try:
+            plan = await run_in_storage_executor(
+                JobDatabaseEngine().explain, job_id)
+        except ValueError:
+            return {'err': 'job not found'}, 404
+        except Exception:
+            return {'err': 'Server Error'}, 500
+        return plan, 200
+
+
+class AsyncRunSchedulerView(AsyncResource):
+    """
+    Job 실행 대기열 상태 뷰 (RunSchedulerView와 동일)
+
+    (GET)   /api/scheduler
+    """
+
+    async def get(self, request: AsyncRequest):
+        return JobDatabaseEngine().scheduler.get_stats(), 200